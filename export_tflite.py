@@ -6,6 +6,7 @@ Converts trained Keras models to TensorFlow Lite with quantization
 Usage:
     python export_tflite.py --model models/checkpoints/thermal_smoke_test.h5
     python export_tflite.py --model thermal --quantize all
+    python export_tflite.py --model thermal_compact --quantize int8 --io-type uint8
 """
 
 import os
@@ -43,12 +44,16 @@ def representative_dataset_generator(input_shape, num_samples=100, use_real_data
                 for img_file in image_files:
                     try:
                         from PIL import Image
-                        img = Image.open(img_file).resize((input_shape[0], input_shape[1]))
+                        img = Image.open(img_file)
+                        if input_shape[-1] == 1:
+                            img = img.convert('L')
+                        # PIL sizes are (width, height); box filter matches area downsampling
+                        img = img.resize((input_shape[1], input_shape[0]), Image.BOX)
                         img_array = np.array(img).astype(np.float32) / 255.0
 
                         # Ensure correct shape
                         if len(img_array.shape) == 2:
-                            img_array = np.stack([img_array]*3, axis=-1)
+                            img_array = np.stack([img_array]*input_shape[-1], axis=-1)
                         elif img_array.shape[-1] != input_shape[-1]:
                             img_array = img_array[:, :, :input_shape[-1]]
 
@@ -106,16 +111,23 @@ def export_dynamic_range(model, output_path):
     return size_mb
 
 def export_int8(model, input_shape, output_path, num_calibration=100,
-               use_real_data=False, dataset_path=None):
-    """Export model with full INT8 quantization."""
+               use_real_data=False, dataset_path=None, io_type='float32'):
+    """
+    Export model with full INT8 quantization.
+
+    io_type selects the model's input/output tensors: 'float32' (converter
+    quantizes internally), or 'uint8'/'int8' so the Pi can feed integer data
+    directly - e.g. uint8 MLX90640 frames through thermal_pipeline.py.
+    """
     converter = tf.lite.TFLiteConverter.from_keras_model(model)
     converter.optimizations = [tf.lite.Optimize.DEFAULT]
     converter.representative_dataset = lambda: representative_dataset_generator(
         input_shape, num_calibration, use_real_data, dataset_path
     )
     converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
-    converter.inference_input_type = tf.float32
-    converter.inference_output_type = tf.float32
+    io_dtype = {'float32': tf.float32, 'uint8': tf.uint8, 'int8': tf.int8}[io_type]
+    converter.inference_input_type = io_dtype
+    converter.inference_output_type = io_dtype
 
     tflite_model = converter.convert()
 
@@ -123,7 +135,7 @@ def export_int8(model, input_shape, output_path, num_calibration=100,
         f.write(tflite_model)
 
     size_mb = len(tflite_model) / (1024 * 1024)
-    print(f"  INT8 model: {size_mb:.2f} MB -> {output_path}")
+    print(f"  INT8 model ({io_type} I/O): {size_mb:.2f} MB -> {output_path}")
     return size_mb
 
 def main():
@@ -135,6 +147,8 @@ def main():
     parser.add_argument('--use-real-calibration', action='store_true',
                        help='Use real dataset samples for INT8 calibration')
     parser.add_argument('--dataset-path', help='Path to dataset for calibration')
+    parser.add_argument('--io-type', choices=['float32', 'uint8', 'int8'], default='float32',
+                       help='Input/output tensor type of the INT8 model (uint8 for the compact thermal model)')
 
     args = parser.parse_args()
 
@@ -178,14 +192,16 @@ def main():
         sizes['int8'] = export_int8(model, input_shape, output_path,
                                     args.calibration_samples,
                                     args.use_real_calibration,
-                                    args.dataset_path)
+                                    args.dataset_path,
+                                    args.io_type)
 
     # Save export report
     report = {
         'model': model_path,
         'input_shape': list(input_shape),
         'export_sizes_mb': sizes,
-        'calibration_samples': args.calibration_samples if 'int8' in sizes else None
+        'calibration_samples': args.calibration_samples if 'int8' in sizes else None,
+        'int8_io_type': args.io_type if 'int8' in sizes else None
     }
 
     report_path = os.path.join(args.output, f"{model_name}_export_report.json")
@@ -10,6 +10,7 @@ __author__ = "PREMONITOR Team"
 from . import config
 from . import equipment_registry
 from .equipment_registry import (
+    EquipmentRegistry,
     get_equipment_by_pi,
     get_equipment_by_id,
     get_equipment_thresholds,
@@ -19,6 +20,7 @@ from .equipment_registry import (
 __all__ = [
     'config',
     'equipment_registry',
+    'EquipmentRegistry',
     'get_equipment_by_pi',
     'get_equipment_by_id',
     'get_equipment_thresholds',
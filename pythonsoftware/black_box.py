@@ -0,0 +1,256 @@
+"""
+Per-equipment black-box recorder for PREMONITOR incident forensics.
+
+Every unit keeps the last N readings in preallocated ring buffers: thermal
+frames and audio windows as float16, scalar sensors as float32, timestamps
+as float64. N is derived from a fixed per-unit memory budget and the array
+shapes of the first recorded reading, so memory use is known up front and
+nothing is written to disk during normal operation.
+
+When an alert fires, trigger() keeps recording for a post-trigger period
+(SECURITY_CONFIG["motion_detection"]["capture_duration"] by default) -
+sampling the unit's sensors directly every `sample_interval_s` if a sampler
+is registered - and then dumps the whole buffer to one compressed .npz:
+
+    timestamps (N,), scalars (N, len(SCALAR_FIELDS)) with NaN for missing,
+    scalar_fields, thermal (M, ...) + thermal_timestamps, audio (K, ...) +
+    audio_timestamps, and meta (JSON: equipment_id, reasons, trigger_time).
+
+Usage:
+    manager = BlackBoxManager("../logs/black_box", memory_budget_bytes=8 * 2**20)
+    manager.record("fridge_lab_a_01", readings)          # Every cycle
+    manager.trigger("fridge_lab_a_01", "gas threshold")  # On any alert
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger('black_box')
+
+# Scalar readings kept per slot, in column order
+SCALAR_FIELDS = ("temperature", "gas", "co2", "oxygen", "vibration", "current", "airflow", "motion")
+
+# Array readings kept per slot: readings key -> storage dtype
+ARRAY_FIELDS = {"thermal": np.float16, "audio": np.float16}
+
+MIN_CAPACITY = 2
+
+
+def _scalar(value: Any) -> float:
+    try:
+        return float(value)
+    except Exception:
+        return np.nan
+
+
+class BlackBox:
+    """
+    Ring buffers for one equipment unit.
+
+    Args:
+        equipment_id: Equipment identifier
+        memory_budget_bytes: Upper bound for all of this unit's buffers
+    """
+
+    def __init__(self, equipment_id: str, memory_budget_bytes: int):
+        self.equipment_id = equipment_id
+        self.memory_budget_bytes = memory_budget_bytes
+        self.capacity = 0
+        self.count = 0  # Readings recorded so far (next slot = count % capacity)
+        self.timestamps: Optional[np.ndarray] = None
+        self.scalars: Optional[np.ndarray] = None
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.present: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        if self.timestamps is None:
+            return 0
+        return (self.timestamps.nbytes + self.scalars.nbytes
+                + sum(a.nbytes for a in self.arrays.values()) + sum(p.nbytes for p in self.present.values()))
+
+    def _allocate(self, sensors: Dict[str, Any]):
+        """Size the buffers from the first reading's array shapes and the memory budget."""
+        shapes = {}
+        for key, dtype in ARRAY_FIELDS.items():
+            value = sensors.get(key)
+            if isinstance(value, np.ndarray):
+                shapes[key] = (value.shape, dtype)
+        slot_bytes = 8 + 4 * len(SCALAR_FIELDS) + sum(
+            int(np.prod(shape)) * np.dtype(dtype).itemsize + 1 for shape, dtype in shapes.values())
+        capacity = self.memory_budget_bytes // slot_bytes
+        if capacity < MIN_CAPACITY:
+            logger.warning(f"[{self.equipment_id}] Black-box budget of {self.memory_budget_bytes} bytes "
+                           f"holds {capacity} readings; dropping array streams")
+            shapes = {}
+            capacity = max(MIN_CAPACITY, self.memory_budget_bytes // (8 + 4 * len(SCALAR_FIELDS)))
+
+        self.capacity = int(capacity)
+        self.timestamps = np.full(self.capacity, np.nan, dtype=np.float64)
+        self.scalars = np.full((self.capacity, len(SCALAR_FIELDS)), np.nan, dtype=np.float32)
+        self.arrays = {key: np.zeros((self.capacity,) + shape, dtype=dtype) for key, (shape, dtype) in shapes.items()}
+        self.present = {key: np.zeros(self.capacity, dtype=bool) for key in shapes}
+        logger.info(f"[{self.equipment_id}] Black box holds {self.capacity} readings ({self.nbytes / 2**20:.1f} MB)")
+
+    def record(self, readings: Dict[str, Any], timestamp: float):
+        """Store one reading, overwriting the oldest once full."""
+        sensors = readings.get("sensors", {})
+        with self._lock:
+            if self.timestamps is None:
+                self._allocate(sensors)
+            slot = self.count % self.capacity
+            self.timestamps[slot] = timestamp
+            self.scalars[slot] = [_scalar(sensors[name]) if name in sensors else np.nan for name in SCALAR_FIELDS]
+            for key, buffer in self.arrays.items():
+                value = sensors.get(key)
+                fits = isinstance(value, np.ndarray) and value.shape == buffer.shape[1:]
+                if fits:
+                    buffer[slot] = value
+                self.present[key][slot] = fits
+            self.count += 1
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Buffer contents, oldest first, as arrays for np.savez."""
+        with self._lock:
+            if self.timestamps is None:
+                return {"timestamps": np.empty(0), "scalars": np.empty((0, len(SCALAR_FIELDS)), dtype=np.float32),
+                        "scalar_fields": np.array(SCALAR_FIELDS)}
+            filled = min(self.count, self.capacity)
+            order = (np.arange(self.count - filled, self.count) % self.capacity)
+            data = {
+                "timestamps": self.timestamps[order],
+                "scalars": self.scalars[order],
+                "scalar_fields": np.array(SCALAR_FIELDS),
+            }
+            for key, buffer in self.arrays.items():
+                keep = order[self.present[key][order]]
+                data[key] = buffer[keep]
+                data[f"{key}_timestamps"] = self.timestamps[keep]
+            return data
+
+
+class BlackBoxManager:
+    """
+    Black boxes for every unit, with post-trigger capture and dumps.
+
+    Args:
+        dump_dir: Directory for incident dumps
+        memory_budget_bytes: Per-unit buffer budget
+        post_trigger_s: Recording time after a trigger before dumping
+        sample_interval_s: Direct sampling period during post-trigger capture
+        clock: Wall-clock time source
+    """
+
+    def __init__(self, dump_dir: str, memory_budget_bytes: int = 8 * 2**20, post_trigger_s: float = 10.0,
+                 sample_interval_s: float = 1.0, clock: Callable[[], float] = time.time):
+        self.dump_dir = Path(dump_dir)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.post_trigger_s = post_trigger_s
+        self.sample_interval_s = sample_interval_s
+        self.clock = clock
+        self.boxes: Dict[str, BlackBox] = {}
+        self.samplers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self.dumps: List[str] = []
+        self._pending: Dict[str, Tuple[threading.Thread, List[str]]] = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def box(self, equipment_id: str) -> BlackBox:
+        with self._lock:
+            if equipment_id not in self.boxes:
+                self.boxes[equipment_id] = BlackBox(equipment_id, self.memory_budget_bytes)
+            return self.boxes[equipment_id]
+
+    def set_sampler(self, equipment_id: str, sampler: Optional[Callable[[], Dict[str, Any]]]):
+        """Function returning fresh readings for post-trigger sampling (None = cycle readings only)."""
+        if sampler is None:
+            self.samplers.pop(equipment_id, None)
+        else:
+            self.samplers[equipment_id] = sampler
+
+    def drop(self, equipment_id: str):
+        """Forget a unit (removed or reconfigured)."""
+        with self._lock:
+            self.boxes.pop(equipment_id, None)
+        self.samplers.pop(equipment_id, None)
+
+    def record(self, equipment_id: str, readings: Dict[str, Any]):
+        self.box(equipment_id).record(readings, self.clock())
+
+    def trigger(self, equipment_id: str, reason: str) -> bool:
+        """
+        Start post-trigger capture and a dump for a unit.
+
+        A trigger while the unit's capture is still running adds its reason to
+        that dump instead of starting another.
+
+        Returns:
+            True if a new capture was started
+        """
+        with self._lock:
+            pending = self._pending.get(equipment_id)
+            if pending is not None:
+                pending[1].append(reason)
+                return False
+            reasons = [reason]
+            thread = threading.Thread(target=self._capture, args=(equipment_id, reasons, self.clock()),
+                                      name=f"black-box-{equipment_id}", daemon=True)
+            self._pending[equipment_id] = (thread, reasons)
+        thread.start()
+        return True
+
+    def _capture(self, equipment_id: str, reasons: List[str], trigger_time: float):
+        deadline = time.monotonic() + self.post_trigger_s
+        sampler = self.samplers.get(equipment_id)
+        while not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if sampler is not None:
+                try:
+                    self.record(equipment_id, sampler())
+                except Exception as e:
+                    logger.error(f"[{equipment_id}] Black-box sampling failed: {e}")
+                    sampler = None
+            self._stop.wait(min(self.sample_interval_s, max(0.0, deadline - time.monotonic())))
+
+        with self._lock:
+            self._pending.pop(equipment_id, None)
+        try:
+            self.dump(equipment_id, reasons, trigger_time)
+        except Exception as e:
+            logger.error(f"[{equipment_id}] Black-box dump failed: {e}")
+
+    def dump(self, equipment_id: str, reasons: List[str], trigger_time: float) -> str:
+        """Write a unit's buffer to a compressed .npz and return its path."""
+        data = self.box(equipment_id).snapshot()
+        meta = {"equipment_id": equipment_id, "reasons": list(reasons),
+                "trigger_time": datetime.fromtimestamp(trigger_time).isoformat()}
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.fromtimestamp(trigger_time).strftime("%Y%m%d_%H%M%S")
+        path = self.dump_dir / f"blackbox_{equipment_id}_{stamp}.npz"
+        with open(path, "wb") as f:
+            np.savez_compressed(f, meta=np.array(json.dumps(meta)), **data)
+        self.dumps.append(str(path))
+        logger.warning(f"[{equipment_id}] Black box dumped to {path} ({len(data['timestamps'])} readings)")
+        return str(path)
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for running post-trigger captures and their dumps."""
+        with self._lock:
+            threads = [thread for thread, _ in self._pending.values()]
+        for thread in threads:
+            thread.join(timeout)
+
+    def close(self):
+        """Cut running captures short and dump them."""
+        self._stop.set()
+        self.wait()
@@ -0,0 +1,174 @@
+"""
+Precompiled business-hours calendar for PREMONITOR security monitoring.
+
+SECURITY_CONFIG["business_hours"] is compiled once into sorted
+open/close boundaries over the week (seconds from Monday 00:00), a set of
+holiday dates, and one calendar per location override. A lookup bisects the
+boundaries (O(log n)), and the answer is cached together with the time of
+the next transition (next boundary or midnight, when a holiday may start or
+end), so most calls are a single datetime comparison.
+
+Config (all keys except start/end optional):
+    "start": "08:00", "end": "18:00",      # Daily hours...
+    "weekdays_only": True,                 # ...Monday-Friday only
+    "weekly": {"mon": [["08:00", "12:00"], ["13:00", "18:00"]], "sat": [["09:00", "13:00"]]},
+                                           # Per-day intervals; replaces start/end/weekdays_only
+    "holidays": ["2026-12-25", "2027-01-01"],  # Closed all day
+    "locations": {"Lab B": {"start": "06:00", "end": "22:00", "holidays": ["2026-08-14"]}}
+                                           # Per-location overrides; holidays add to the global list
+
+Intervals whose end is before their start run overnight into the next day.
+
+Usage:
+    schedule = BusinessSchedule.from_config(SECURITY_CONFIG["business_hours"])
+    schedule.is_after_hours()                     # Now, default calendar
+    schedule.is_after_hours(location="Lab B")     # Location override (falls back to default)
+"""
+
+import threading
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DAY_S = 24 * 3600
+WEEK_S = 7 * DAY_S
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# Keys describing the weekly hours; an override using any of them replaces the base hours
+_HOURS_KEYS = ("weekly", "start", "end", "weekdays_only")
+
+
+def _parse_hhmm(value: str) -> int:
+    """Seconds after midnight of an "HH:MM" string ("24:00" = end of day)."""
+    hours, minutes = (int(part) for part in str(value).split(":"))
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or (hours == 24 and minutes):
+        raise ValueError(f"Invalid time of day: {value!r}")
+    return hours * 3600 + minutes * 60
+
+
+def _merge(intervals: List[Tuple[int, int]]) -> List[int]:
+    """Sorted, merged [open, close) week intervals as a flat boundary list."""
+    boundaries: List[int] = []
+    for start, end in sorted(intervals):
+        if boundaries and start <= boundaries[-1]:
+            boundaries[-1] = max(boundaries[-1], end)
+        else:
+            boundaries.extend((start, end))
+    return boundaries
+
+
+class BusinessCalendar:
+    """
+    One compiled weekly schedule plus holidays.
+
+    Args:
+        daily_intervals: weekday (0 = Monday) -> [(open_s, close_s)] seconds after midnight
+        holidays: Dates that are closed all day
+    """
+
+    def __init__(self, daily_intervals: Dict[int, Sequence[Tuple[int, int]]], holidays: Iterable[date] = ()):
+        week_intervals = []
+        for weekday, intervals in daily_intervals.items():
+            for open_s, close_s in intervals:
+                if close_s <= open_s:
+                    close_s += DAY_S  # Overnight
+                start, end = weekday * DAY_S + open_s, weekday * DAY_S + close_s
+                if end > WEEK_S:  # Sunday night into Monday morning
+                    week_intervals.append((0, end - WEEK_S))
+                    end = WEEK_S
+                week_intervals.append((start, end))
+        self.boundaries = _merge(week_intervals)  # Even index = opens, odd index = closes
+        self.holidays = frozenset(holidays)
+        self._lock = threading.Lock()
+        self._valid_from = datetime.max
+        self._valid_until = datetime.min
+        self._after_hours = True
+
+    @classmethod
+    def from_config(cls, hours_config: Dict[str, Any]) -> 'BusinessCalendar':
+        """Compile a "business_hours" config dict (see module docstring)."""
+        holidays = [date.fromisoformat(str(day)) for day in hours_config.get("holidays", [])]
+        weekly = hours_config.get("weekly")
+        if weekly is not None:
+            daily = {}
+            for day_name, intervals in weekly.items():
+                day_name = day_name.lower()[:3]
+                if day_name not in DAY_NAMES:
+                    raise ValueError(f"Unknown weekday in business hours: {day_name!r}")
+                daily[DAY_NAMES.index(day_name)] = [(_parse_hhmm(start), _parse_hhmm(end)) for start, end in intervals]
+            return cls(daily, holidays)
+
+        hours = (_parse_hhmm(hours_config.get("start", "08:00")), _parse_hhmm(hours_config.get("end", "18:00")))
+        days = range(5) if hours_config.get("weekdays_only", True) else range(7)
+        return cls({day: [hours] for day in days}, holidays)
+
+    def _lookup(self, when: datetime) -> Tuple[bool, datetime]:
+        """(after hours?, time of the next possible change) by bisecting the week boundaries."""
+        midnight = when.replace(hour=0, minute=0, second=0, microsecond=0)
+        next_midnight = midnight + timedelta(days=1)
+        if when.date() in self.holidays:
+            return True, next_midnight
+        if not self.boundaries:
+            return True, next_midnight
+
+        week_start = midnight - timedelta(days=when.weekday())
+        second_of_week = (when - week_start).total_seconds()
+        index = bisect_right(self.boundaries, second_of_week)
+        after_hours = index % 2 == 0
+        if index < len(self.boundaries):
+            next_boundary = week_start + timedelta(seconds=self.boundaries[index])
+        else:
+            next_boundary = week_start + timedelta(seconds=WEEK_S + self.boundaries[0])
+        # A holiday can start or end at any midnight
+        return after_hours, min(next_boundary, next_midnight)
+
+    def is_after_hours(self, when: Optional[datetime] = None) -> bool:
+        """True outside business hours (or on a holiday) at `when` (default: now)."""
+        if when is None:
+            when = datetime.now()
+        with self._lock:
+            if self._valid_from <= when < self._valid_until:
+                return self._after_hours
+            self._after_hours, self._valid_until = self._lookup(when)
+            self._valid_from = when
+            return self._after_hours
+
+    def next_transition(self, when: Optional[datetime] = None) -> datetime:
+        """Time after which is_after_hours() may change (a boundary or midnight)."""
+        if when is None:
+            when = datetime.now()
+        return self._lookup(when)[1]
+
+
+class BusinessSchedule:
+    """Default calendar plus compiled per-location overrides."""
+
+    def __init__(self, default: BusinessCalendar, locations: Optional[Dict[str, BusinessCalendar]] = None):
+        self.default = default
+        self.locations = dict(locations or {})
+
+    @classmethod
+    def from_config(cls, hours_config: Dict[str, Any]) -> 'BusinessSchedule':
+        """
+        Compile the default calendar and every location override.
+
+        Raises:
+            ValueError: On malformed times, weekdays or holiday dates
+        """
+        base = {key: value for key, value in hours_config.items() if key != "locations"}
+        locations = {}
+        for location, override in hours_config.get("locations", {}).items():
+            merged = dict(base)
+            if any(key in override for key in _HOURS_KEYS):
+                for key in _HOURS_KEYS:
+                    merged.pop(key, None)
+            merged.update(override)
+            merged["holidays"] = list(base.get("holidays", [])) + list(override.get("holidays", []))
+            locations[location] = BusinessCalendar.from_config(merged)
+        return cls(BusinessCalendar.from_config(base), locations)
+
+    def calendar(self, location: Optional[str] = None) -> BusinessCalendar:
+        return self.locations.get(location, self.default) if location is not None else self.default
+
+    def is_after_hours(self, when: Optional[datetime] = None, location: Optional[str] = None) -> bool:
+        return self.calendar(location).is_after_hours(when)
@@ -22,6 +22,28 @@ DEBUG_MODE = os.environ.get("PREMONITOR_DEBUG", "False").lower() == "true"
 # Sensor reading interval in seconds
 SENSOR_READ_INTERVAL = float(os.environ.get("PREMONITOR_SENSOR_INTERVAL", "30.0"))
 
+# Sensor bus freshness window in seconds (0 = share device reads within one cycle only).
+# Sensors can override it with "max_age_s" in their equipment_registry config.
+SENSOR_BUS_MAX_AGE_S = float(os.environ.get("PREMONITOR_SENSOR_BUS_MAX_AGE", "0"))
+
+# Per-device sensor drivers (sensor_drivers.py): "off" uses the hardware module's
+# read_* functions, "hardware" opens the real I2C/SPI/1-Wire buses, "simulated"
+# uses in-memory buses for development without a Pi.
+SENSOR_DRIVER_BACKEND = os.environ.get("PREMONITOR_SENSOR_DRIVERS", "off").lower()
+I2C_BUS = int(os.environ.get("PREMONITOR_I2C_BUS", "1"))
+SPI_BUS = 0
+SPI_DEVICE = 0  # Chip select (CE0) of the MCP3008
+SPI_MAX_SPEED_HZ = 1350000
+ADC_OVERSAMPLE = int(os.environ.get("PREMONITOR_ADC_OVERSAMPLE", "16"))  # MCP3008 conversions averaged per reading
+W1_DEVICES_DIR = os.environ.get("PREMONITOR_W1_DIR", "/sys/bus/w1/devices")
+W1_REFRESH_INTERVAL_S = float(os.environ.get("PREMONITOR_W1_REFRESH", "10"))  # 0 = blocking DS18B20 reads
+
+# Per-equipment black box (black_box.py): recent readings kept in memory and dumped on any alert,
+# after SECURITY_CONFIG["motion_detection"]["capture_duration"] seconds of post-trigger sampling.
+BLACK_BOX_ENABLED = os.environ.get("PREMONITOR_BLACK_BOX", "true").lower() == "true"
+BLACK_BOX_MEMORY_MB = float(os.environ.get("PREMONITOR_BLACK_BOX_MB", "8"))  # Per equipment unit
+BLACK_BOX_SAMPLE_INTERVAL_S = 1.0
+
 # =============================================================================
 # FILE PATHS
 # =============================================================================
@@ -37,10 +59,20 @@ THERMAL_MODEL_PATH = MODEL_DIR / os.environ.get("THERMAL_MODEL_NAME", "thermal_a
 ACOUSTIC_MODEL_PATH = MODEL_DIR / os.environ.get("ACOUSTIC_MODEL_NAME", "acoustic_anomaly_model_int8.tflite")
 LSTM_MODEL_PATH = MODEL_DIR / os.environ.get("LSTM_MODEL_NAME", "lstm_autoencoder_model.tflite")
 LSTM_AE_MODEL_PATH = LSTM_MODEL_PATH  # Alias for compatibility
+# Append vibration burst features (vibration_features.LSTM_VIBRATION_FEATURES) to the LSTM input.
+# Only for LSTM models trained with them: the input width grows from 6 to 6 + 7.
+LSTM_VIBRATION_FEATURES = os.environ.get("PREMONITOR_LSTM_VIBRATION_FEATURES", "false").lower() == "true"
+
+# Thermal model variant: "standard" (224x224 RGB Xception) or "compact" (native MLX90640 32x24 frames)
+THERMAL_MODEL_VARIANT = os.environ.get("PREMONITOR_THERMAL_MODEL", "standard").lower()
+THERMAL_COMPACT_MODEL_PATH = MODEL_DIR / os.environ.get("THERMAL_COMPACT_MODEL_NAME", "thermal_compact_int8.tflite")
+if THERMAL_MODEL_VARIANT == "compact":
+    THERMAL_MODEL_PATH = THERMAL_COMPACT_MODEL_PATH
 
 # Logging and capture directories
 LOG_DIR = Path(os.environ.get("PREMONITOR_LOG_DIR", BASE_DIR.parent / "logs"))
 CAPTURE_DIR = Path(os.environ.get("PREMONITOR_CAPTURE_DIR", BASE_DIR.parent / "captures"))
+BLACK_BOX_DIR = LOG_DIR / "black_box"  # Incident dumps (created on first dump)
 
 # Ensure directories exist
 for directory in [LOG_DIR, CAPTURE_DIR]:
@@ -65,6 +97,13 @@ GAS_ANALOG_THRESHOLD = 600
 
 # Input shapes for models
 THERMAL_MODEL_INPUT_SHAPE = (224, 224, 3)
+THERMAL_COMPACT_INPUT_SHAPE = (24, 32, 1)  # MLX90640: 24 rows x 32 columns, single channel
+
+# Temperature window mapped onto 0-255 when MLX90640 frames are converted to uint8
+THERMAL_COMPACT_TEMP_RANGE_C = (-20.0, 120.0)
+
+# Frame shape thermal readers deliver for the selected model variant
+THERMAL_FRAME_SHAPE = THERMAL_COMPACT_INPUT_SHAPE if THERMAL_MODEL_VARIANT == "compact" else THERMAL_MODEL_INPUT_SHAPE
 ACOUSTIC_MODEL_INPUT_SHAPE = (128, 128, 1)
 
 # Spectrogram settings for acoustic model
@@ -72,6 +111,11 @@ SPECTROGRAM_SAMPLE_RATE = 16000
 SPECTROGRAM_N_MELS = 128
 SPECTROGRAM_HOP_LENGTH = 512
 
+# Persistent spectrogram cache for training (keyed by audio content + spectrogram settings)
+FEATURE_CACHE_ENABLED = os.environ.get("PREMONITOR_FEATURE_CACHE", "true").lower() == "true"
+FEATURE_CACHE_DIR = Path(os.environ.get("PREMONITOR_FEATURE_CACHE_DIR", BASE_DIR.parent / "cache" / "features"))
+FEATURE_CACHE_MAX_MB = int(os.environ.get("PREMONITOR_FEATURE_CACHE_MB", "4096"))  # Least recently used evicted beyond this
+
 # Confidence thresholds for AI models
 THERMAL_ANOMALY_CONFIDENCE = 0.80
 ACOUSTIC_ANOMALY_CONFIDENCE = 0.75
@@ -79,6 +123,33 @@ ACOUSTIC_ANOMALY_CONFIDENCE = 0.75
 # Fusion logic threshold
 FUSION_CORRELATION_CONFIDENCE = 0.60
 
+# Thermal frame-difference gating (reuse the last thermal score while the scene is static)
+THERMAL_GATE_ENABLED = os.environ.get("PREMONITOR_THERMAL_GATE", "true").lower() == "true"
+THERMAL_GATE_DIFF_THRESHOLD = float(os.environ.get("PREMONITOR_THERMAL_GATE_DIFF", "0.02"))  # Mean abs diff, fraction of full scale
+THERMAL_GATE_MAX_AGE_S = float(os.environ.get("PREMONITOR_THERMAL_GATE_MAX_AGE", "300"))  # Force a fresh inference after this
+THERMAL_GATE_DOWNSAMPLE = 8  # Pixel stride used for the change check
+
+# Multi-process inference (0 = run models in the monitor process)
+INFERENCE_WORKERS = int(os.environ.get("PREMONITOR_INFERENCE_WORKERS", "0"))
+INFERENCE_WORKER_TIMEOUT_S = float(os.environ.get("PREMONITOR_INFERENCE_TIMEOUT", "30"))
+INFERENCE_WORKER_START_METHOD = os.environ.get("PREMONITOR_INFERENCE_START_METHOD") or None  # fork/spawn/forkserver
+
+# TFLite interpreter options per model
+#   num_threads:  Interpreter threads (None = runtime default)
+#   xnnpack:      Use the XNNPACK CPU delegate
+#   cpu_affinity: Cores for the inference threads, e.g. [2, 3] (None = no pinning)
+#   autotune:     Benchmark 1..INTERPRETER_CPU_BUDGET threads at startup and keep the fastest
+_INTERPRETER_THREADS = os.environ.get("PREMONITOR_INTERPRETER_THREADS")
+_INTERPRETER_AUTOTUNE = os.environ.get("PREMONITOR_INTERPRETER_AUTOTUNE", "false").lower() == "true"
+MODEL_INTERPRETER_OPTIONS = {
+    "thermal": {"num_threads": int(_INTERPRETER_THREADS) if _INTERPRETER_THREADS else None,
+                "xnnpack": True, "cpu_affinity": None, "autotune": _INTERPRETER_AUTOTUNE},
+    "acoustic": {"num_threads": int(_INTERPRETER_THREADS) if _INTERPRETER_THREADS else None,
+                 "xnnpack": True, "cpu_affinity": None, "autotune": _INTERPRETER_AUTOTUNE},
+    "lstm": {"num_threads": 1, "xnnpack": True, "cpu_affinity": None, "autotune": False}  # Tiny model
+}
+INTERPRETER_CPU_BUDGET = int(os.environ.get("PREMONITOR_INTERPRETER_CPU_BUDGET", "0"))  # Max threads per model, 0 = all cores
+
 # =============================================================================
 # ALERTING CONFIGURATION
 # =============================================================================
@@ -221,35 +292,64 @@ def load_device_config() -> Dict[str, Any]:
         return {}
 
 
+# device_config.json key -> (config variable, type) for scalar overrides
+DEVICE_CONFIG_OVERRIDES = {
+    'sensor_read_interval': ('SENSOR_READ_INTERVAL', float),
+    'thermal_threshold': ('THERMAL_ANOMALY_CONFIDENCE', float),
+    'acoustic_threshold': ('ACOUSTIC_ANOMALY_CONFIDENCE', float),
+    'gas_threshold': ('GAS_ANALOG_THRESHOLD', int),
+}
+
+
+def device_config_snapshot() -> Dict[str, Any]:
+    """
+    Current values of everything apply_device_config() can change.
+
+    Returns:
+        Snapshot for restore_device_config()
+    """
+    snapshot = {name: globals()[name] for name, _ in DEVICE_CONFIG_OVERRIDES.values()}
+    snapshot['MODEL_INTERPRETER_OPTIONS'] = {model: dict(options) for model, options in MODEL_INTERPRETER_OPTIONS.items()}
+    return snapshot
+
+
+def restore_device_config(snapshot: Dict[str, Any]):
+    """Put back values saved by device_config_snapshot() (e.g. after a failed reload)."""
+    for name, value in snapshot.items():
+        if name == 'MODEL_INTERPRETER_OPTIONS':
+            MODEL_INTERPRETER_OPTIONS.clear()
+            MODEL_INTERPRETER_OPTIONS.update({model: dict(options) for model, options in value.items()})
+        else:
+            globals()[name] = value
+
+
 def apply_device_config(device_config: Dict[str, Any]):
     """
     Apply device-specific configuration overrides.
 
+    Settings the device config does not mention go back to their defaults,
+    so removing a key from device_config.json and reloading reverts it.
+
     Args:
         device_config: Dictionary of configuration overrides
     """
-    global SENSOR_READ_INTERVAL, THERMAL_ANOMALY_CONFIDENCE
-    global ACOUSTIC_ANOMALY_CONFIDENCE, GAS_ANALOG_THRESHOLD
-
     logger = logging.getLogger('config')
 
-    # Override sensor interval if specified
-    if 'sensor_read_interval' in device_config:
-        SENSOR_READ_INTERVAL = float(device_config['sensor_read_interval'])
-        logger.info(f"Override: SENSOR_READ_INTERVAL = {SENSOR_READ_INTERVAL}")
+    restore_device_config(_DEVICE_CONFIG_DEFAULTS)
+
+    # Sensor interval and thresholds
+    for key, (name, cast) in DEVICE_CONFIG_OVERRIDES.items():
+        if key in device_config:
+            globals()[name] = cast(device_config[key])
+            logger.info(f"Override: {name} = {globals()[name]}")
 
-    # Override thresholds if specified
-    if 'thermal_threshold' in device_config:
-        THERMAL_ANOMALY_CONFIDENCE = float(device_config['thermal_threshold'])
-        logger.info(f"Override: THERMAL_ANOMALY_CONFIDENCE = {THERMAL_ANOMALY_CONFIDENCE}")
+    # Per-model interpreter options, e.g. {"thermal": {"num_threads": 2}}
+    for model_name, options in device_config.get('interpreter_options', {}).items():
+        MODEL_INTERPRETER_OPTIONS.setdefault(model_name, {}).update(options)
+        logger.info(f"Override: MODEL_INTERPRETER_OPTIONS[{model_name}] = {MODEL_INTERPRETER_OPTIONS[model_name]}")
 
-    if 'acoustic_threshold' in device_config:
-        ACOUSTIC_ANOMALY_CONFIDENCE = float(device_config['acoustic_threshold'])
-        logger.info(f"Override: ACOUSTIC_ANOMALY_CONFIDENCE = {ACOUSTIC_ANOMALY_CONFIDENCE}")
 
-    if 'gas_threshold' in device_config:
-        GAS_ANALOG_THRESHOLD = int(device_config['gas_threshold'])
-        logger.info(f"Override: GAS_ANALOG_THRESHOLD = {GAS_ANALOG_THRESHOLD}")
+_DEVICE_CONFIG_DEFAULTS = device_config_snapshot()
 
 
 # =============================================================================
@@ -0,0 +1,209 @@
+"""
+Hot reload support for PREMONITOR configuration.
+
+The equipment registry (with its thresholds) and device_config.json can be
+changed while the monitor is running. A ReloadTrigger notices changes by
+polling file modification times once per monitoring cycle, or when the
+process receives SIGHUP. Candidates are loaded and validated in full before
+anything is applied; the monitor then swaps its compiled plans in one
+assignment and keeps loaded interpreters untouched.
+
+Usage:
+    trigger = ReloadTrigger(watched_paths())
+    trigger.install_signal_handler()
+    ...
+    if trigger.poll():
+        registry = load_candidate_registry()
+        device_config = load_candidate_device_config()
+"""
+
+import json
+import logging
+import os
+import signal
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import config
+import equipment_registry
+from equipment_registry import EquipmentRegistry
+
+logger = logging.getLogger('config_reload')
+
+# Module files whose tables form the built-in registry
+REGISTRY_MODULE_FILE = Path(equipment_registry.__file__)
+
+# device_config.json keys and the converters apply_device_config() uses
+DEVICE_CONFIG_CONVERTERS = {
+    'sensor_read_interval': float,
+    'thermal_threshold': float,
+    'acoustic_threshold': float,
+    'gas_threshold': int,
+}
+
+
+class ConfigReloadError(Exception):
+    """Raised when a changed configuration fails validation and is not applied."""
+
+
+def registry_path() -> Optional[str]:
+    """External registry file from PREMONITOR_EQUIPMENT_REGISTRY, or None for the built-in one."""
+    return os.environ.get(equipment_registry.REGISTRY_PATH_ENV) or None
+
+
+def watched_paths() -> List[Path]:
+    """Files whose changes trigger a reload: the registry source and device_config.json."""
+    path = registry_path()
+    return [Path(path) if path else REGISTRY_MODULE_FILE, Path(config.DEVICE_CONFIG_FILE)]
+
+
+class ReloadTrigger:
+    """
+    Decides when to reload: on SIGHUP, or when a watched file's mtime/size changes.
+
+    poll() is a handful of stat() calls, cheap enough to run every cycle.
+    Missing files are watched too, so creating device_config.json triggers
+    a reload.
+    """
+
+    def __init__(self, paths: List[Path]):
+        self.paths = [Path(p) for p in paths]
+        self._requested = threading.Event()
+        self._snapshot = self._stat_all()
+
+    def _stat_all(self) -> Dict[Path, Optional[tuple]]:
+        snapshot = {}
+        for path in self.paths:
+            try:
+                stat = path.stat()
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                snapshot[path] = None
+        return snapshot
+
+    def request(self):
+        """Ask for a reload at the next poll (signal-handler safe)."""
+        self._requested.set()
+
+    def install_signal_handler(self) -> bool:
+        """
+        Reload on SIGHUP. Only possible from the main thread on platforms with SIGHUP.
+
+        Returns:
+            True if the handler was installed
+        """
+        if not hasattr(signal, 'SIGHUP') or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signal.SIGHUP, lambda signum, frame: self.request())
+        logger.info("SIGHUP will reload equipment registry and device config")
+        return True
+
+    def poll(self) -> bool:
+        """True (once) if a reload was requested or a watched file changed since the last poll."""
+        snapshot = self._stat_all()
+        changed = [str(path) for path in self.paths if snapshot[path] != self._snapshot[path]]
+        self._snapshot = snapshot
+
+        requested = self._requested.is_set()
+        self._requested.clear()
+        if changed:
+            logger.info(f"Configuration change detected: {', '.join(changed)}")
+        elif requested:
+            logger.info("Configuration reload requested by signal")
+        return requested or bool(changed)
+
+
+def _load_registry_module(path: Path) -> EquipmentRegistry:
+    """
+    Build a registry from a fresh execution of equipment_registry.py.
+
+    The source runs in its own namespace, so a broken edit never touches the
+    tables the monitor is using.
+    """
+    namespace = {'__name__': 'equipment_registry_reload', '__file__': str(path)}
+    source = path.read_text(encoding='utf-8')
+    exec(compile(source, str(path), 'exec'), namespace)
+    return EquipmentRegistry(namespace['EQUIPMENT_REGISTRY'],
+                             namespace['EQUIPMENT_THRESHOLDS'],
+                             namespace['EQUIPMENT_TYPES'])
+
+
+def load_candidate_registry(pi_id: Optional[str] = None) -> EquipmentRegistry:
+    """
+    Load and validate the registry from its source, without activating it.
+
+    Args:
+        pi_id: If given, every unit assigned to this Pi must pass sensor validation
+
+    Raises:
+        ConfigReloadError: If the source cannot be loaded or fails validation
+    """
+    path = registry_path()
+    try:
+        registry = EquipmentRegistry.from_file(path) if path else _load_registry_module(REGISTRY_MODULE_FILE)
+    except Exception as e:
+        raise ConfigReloadError(f"Equipment registry not reloaded: {e}") from e
+
+    if "fridge" not in registry.thresholds:
+        raise ConfigReloadError("Equipment registry not reloaded: 'fridge' default thresholds missing")
+
+    if pi_id is not None:
+        errors = [f"{eq['id']}: {registry.validation_errors[eq['id']]}"
+                  for eq in registry.get_by_pi(pi_id) if eq['id'] in registry.validation_errors]
+        if errors:
+            raise ConfigReloadError(f"Equipment registry not reloaded: {'; '.join(errors)}")
+    return registry
+
+
+def validate_device_config(device_config: Dict[str, Any]) -> List[str]:
+    """
+    Check a device config the way apply_device_config() will read it.
+
+    Returns:
+        List of error messages (empty if valid)
+    """
+    if not isinstance(device_config, dict):
+        return ["device config must be a JSON object"]
+
+    errors = []
+    for key, converter in DEVICE_CONFIG_CONVERTERS.items():
+        if key in device_config:
+            try:
+                converter(device_config[key])
+            except (TypeError, ValueError):
+                errors.append(f"{key}: {device_config[key]!r} is not a valid {converter.__name__}")
+
+    interpreter_options = device_config.get('interpreter_options', {})
+    if not isinstance(interpreter_options, dict) or \
+            not all(isinstance(options, dict) for options in interpreter_options.values()):
+        errors.append("interpreter_options must map model names to option objects")
+    return errors
+
+
+def load_candidate_device_config(path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Load and validate device_config.json without applying it.
+
+    Unlike config.load_device_config(), a malformed file is an error rather
+    than an empty config, so a bad edit cannot silently drop overrides.
+
+    Returns:
+        Device config dict ({} if the file does not exist)
+
+    Raises:
+        ConfigReloadError: If the file cannot be parsed or fails validation
+    """
+    path = Path(path or config.DEVICE_CONFIG_FILE)
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r') as f:
+            device_config = json.load(f)
+    except Exception as e:
+        raise ConfigReloadError(f"Device config not reloaded: {e}") from e
+
+    errors = validate_device_config(device_config)
+    if errors:
+        raise ConfigReloadError(f"Device config not reloaded: {'; '.join(errors)}")
+    return device_config
@@ -9,6 +9,11 @@ Comprehensive dataset loading system that integrates ALL available datasets:
 
 This module provides unified data loaders for training on your development PC.
 After training, only the learned weights (.tflite files) are deployed to Raspberry Pi.
+
+The audio loaders can also stream their spectrograms (iter_* methods) into
+memory-mapped float16 shards with build_acoustic_shards(), so the corpus
+never has to fit in RAM; see spectrogram_shards.py. Spectrograms are
+cached on disk across runs by content hash and settings (feature_cache.py).
 """
 
 import os
@@ -24,12 +29,47 @@ from pathlib import Path
 
 # Import our custom project configuration
 import config
+import feature_cache
+from spectrogram_shards import DEFAULT_SHARD_SIZE, ShardWriter
 
 
 # ============================================================================
 # AUDIO DATASET LOADERS
 # ============================================================================
 
+def _compute_model_spectrogram(audio_path):
+    """Log-mel spectrogram resized to the acoustic model input shape, or None on failure."""
+    try:
+        y, sr = librosa.load(audio_path, sr=config.SPECTROGRAM_SAMPLE_RATE)
+        mel_spec = librosa.feature.melspectrogram(
+            y=y, sr=sr, 
+            n_mels=config.SPECTROGRAM_N_MELS, 
+            hop_length=config.SPECTROGRAM_HOP_LENGTH
+        )
+        log_mel = librosa.power_to_db(mel_spec, ref=np.max)
+        
+        # Resize to model input shape
+        log_mel_resized = tf.image.resize(
+            log_mel[..., np.newaxis], 
+            config.ACOUSTIC_MODEL_INPUT_SHAPE[:2]
+        )
+        return log_mel_resized.numpy()
+    except Exception as e:
+        if config.DEBUG_MODE:
+            print(f"Error processing {audio_path}: {e}")
+        return None
+
+
+def audio_to_model_spectrogram(audio_path):
+    """
+    Model-ready spectrogram of an audio file, from the persistent feature
+    cache when the file and SPECTROGRAM_* settings are unchanged.
+    """
+    return feature_cache.cached_features(audio_path, 'log_mel_resized', _compute_model_spectrogram,
+                                         shape=list(config.ACOUSTIC_MODEL_INPUT_SHAPE[:2]),
+                                         librosa=librosa.__version__)
+
+
 class MIMIIDatasetLoader:
     """
     Loads MIMII dataset (industrial fan sounds with normal/abnormal labels).
@@ -48,14 +88,40 @@ class MIMIIDatasetLoader:
         self.base_path = base_path
         self.machine_ids = ['id_00', 'id_02', 'id_04', 'id_06']
         
+    def iter_machine_sounds(self, use_all_ids=True):
+        """
+        Yield (spectrogram, label) for every normal and abnormal machine sound.
+
+        Args:
+            use_all_ids: If True, load from all 4 machine IDs.
+                        If False, use id_00 only.
+
+        Yields:
+            spectrogram of shape (H, W, 1), label 0=normal / 1=abnormal
+        """
+        ids_to_use = self.machine_ids if use_all_ids else ['id_00']
+
+        for machine_id in ids_to_use:
+            for condition, label in (('normal', 0), ('abnormal', 1)):
+                condition_dir = os.path.join(self.base_path, machine_id, condition)
+                if not os.path.exists(condition_dir):
+                    continue
+                audio_files = glob.glob(os.path.join(condition_dir, '*.wav'))
+                print(f"Loading {len(audio_files)} {condition} sounds from {machine_id}...")
+
+                for audio_file in tqdm(audio_files, desc=f"{machine_id}/{condition}"):
+                    spec = self._audio_to_spectrogram(audio_file)
+                    if spec is not None:
+                        yield spec, label
+
     def load_all_machine_sounds(self, use_all_ids=True):
         """
         Load all normal and abnormal machine sounds.
-        
+
         Args:
             use_all_ids: If True, load from all 4 machine IDs. 
                         If False, use id_00 for train, others for test.
-        
+
         Returns:
             spectrograms: np.array of shape (N, H, W, 1)
             labels: np.array of shape (N,) with 0=normal, 1=abnormal
@@ -63,64 +129,23 @@ class MIMIIDatasetLoader:
         print("=" * 60)
         print("LOADING MIMII DATASET (Industrial Fan Sounds)")
         print("=" * 60)
-        
+
         spectrograms = []
         labels = []
-        
-        ids_to_use = self.machine_ids if use_all_ids else ['id_00']
-        
-        for machine_id in ids_to_use:
-            # Load normal sounds
-            normal_dir = os.path.join(self.base_path, machine_id, 'normal')
-            if os.path.exists(normal_dir):
-                normal_files = glob.glob(os.path.join(normal_dir, '*.wav'))
-                print(f"Loading {len(normal_files)} normal sounds from {machine_id}...")
-                
-                for audio_file in tqdm(normal_files, desc=f"{machine_id}/normal"):
-                    spec = self._audio_to_spectrogram(audio_file)
-                    if spec is not None:
-                        spectrograms.append(spec)
-                        labels.append(0)  # Normal
-            
-            # Load abnormal sounds
-            abnormal_dir = os.path.join(self.base_path, machine_id, 'abnormal')
-            if os.path.exists(abnormal_dir):
-                abnormal_files = glob.glob(os.path.join(abnormal_dir, '*.wav'))
-                print(f"Loading {len(abnormal_files)} abnormal sounds from {machine_id}...")
-                
-                for audio_file in tqdm(abnormal_files, desc=f"{machine_id}/abnormal"):
-                    spec = self._audio_to_spectrogram(audio_file)
-                    if spec is not None:
-                        spectrograms.append(spec)
-                        labels.append(1)  # Abnormal
-        
+
+        for spec, label in self.iter_machine_sounds(use_all_ids):
+            spectrograms.append(spec)
+            labels.append(label)
+
         print(f"\nTotal samples loaded: {len(spectrograms)}")
         print(f"  - Normal: {np.sum(np.array(labels) == 0)}")
         print(f"  - Abnormal: {np.sum(np.array(labels) == 1)}")
-        
+
         return np.array(spectrograms), np.array(labels)
-    
+
     def _audio_to_spectrogram(self, audio_path):
-        """Convert audio file to log-mel spectrogram."""
-        try:
-            y, sr = librosa.load(audio_path, sr=config.SPECTROGRAM_SAMPLE_RATE)
-            mel_spec = librosa.feature.melspectrogram(
-                y=y, sr=sr, 
-                n_mels=config.SPECTROGRAM_N_MELS, 
-                hop_length=config.SPECTROGRAM_HOP_LENGTH
-            )
-            log_mel = librosa.power_to_db(mel_spec, ref=np.max)
-            
-            # Resize to model input shape
-            log_mel_resized = tf.image.resize(
-                log_mel[..., np.newaxis], 
-                config.ACOUSTIC_MODEL_INPUT_SHAPE[:2]
-            )
-            return log_mel_resized.numpy()
-        except Exception as e:
-            if config.DEBUG_MODE:
-                print(f"Error processing {audio_path}: {e}")
-            return None
+        """Convert audio file to log-mel spectrogram (cached across runs, see feature_cache.py)."""
+        return audio_to_model_spectrogram(audio_path)
 
 
 class ESC50DatasetLoader:
@@ -166,37 +191,37 @@ class ESC50DatasetLoader:
         spectrograms = []
         labels = []
         
+        for spec, label in self.iter_environmental_sounds(df):
+            spectrograms.append(spec)
+            labels.append(label)
+        
+        print(f"Loaded {len(spectrograms)} samples")
+        return np.array(spectrograms), np.array(labels)
+
+    def iter_environmental_sounds(self, df=None, fire_classes_only=False):
+        """
+        Yield (spectrogram, class ID) for the rows of the ESC-50 metadata.
+
+        Args:
+            df: Metadata rows to load (None = read esc50.csv)
+            fire_classes_only: Filter to fire/alarm/siren sounds when reading esc50.csv
+        """
+        if df is None:
+            df = pd.read_csv(self.meta_file)
+            if fire_classes_only:
+                df = df[df['category'].isin(['fire_crackling', 'fireworks', 'siren', 'church_bells'])]
+
         print(f"Loading {len(df)} audio files...")
         for _, row in tqdm(df.iterrows(), total=len(df)):
             audio_path = os.path.join(self.audio_dir, row['filename'])
             if os.path.exists(audio_path):
                 spec = self._audio_to_spectrogram(audio_path)
                 if spec is not None:
-                    spectrograms.append(spec)
-                    labels.append(row['target'])
-        
-        print(f"Loaded {len(spectrograms)} samples")
-        return np.array(spectrograms), np.array(labels)
+                    yield spec, row['target']
     
     def _audio_to_spectrogram(self, audio_path):
-        """Convert audio file to log-mel spectrogram."""
-        try:
-            y, sr = librosa.load(audio_path, sr=config.SPECTROGRAM_SAMPLE_RATE)
-            mel_spec = librosa.feature.melspectrogram(
-                y=y, sr=sr, 
-                n_mels=config.SPECTROGRAM_N_MELS, 
-                hop_length=config.SPECTROGRAM_HOP_LENGTH
-            )
-            log_mel = librosa.power_to_db(mel_spec, ref=np.max)
-            log_mel_resized = tf.image.resize(
-                log_mel[..., np.newaxis], 
-                config.ACOUSTIC_MODEL_INPUT_SHAPE[:2]
-            )
-            return log_mel_resized.numpy()
-        except Exception as e:
-            if config.DEBUG_MODE:
-                print(f"Error processing {audio_path}: {e}")
-            return None
+        """Convert audio file to log-mel spectrogram (cached across runs, see feature_cache.py)."""
+        return audio_to_model_spectrogram(audio_path)
 
 
 class UrbanSound8KDatasetLoader:
@@ -238,37 +263,81 @@ class UrbanSound8KDatasetLoader:
         spectrograms = []
         labels = []
         
+        for spec, label in self.iter_urban_sounds(df):
+            spectrograms.append(spec)
+            labels.append(label)
+        
+        print(f"Loaded {len(spectrograms)} samples")
+        return np.array(spectrograms), np.array(labels)
+
+    def iter_urban_sounds(self, df=None, folds=None):
+        """
+        Yield (spectrogram, class ID) for the rows of the UrbanSound8K metadata.
+
+        Args:
+            df: Metadata rows to load (None = read UrbanSound8K.csv)
+            folds: Fold numbers to keep when reading the metadata (None = all)
+        """
+        if df is None:
+            df = pd.read_csv(self.meta_file)
+            if folds is not None:
+                df = df[df['fold'].isin(folds)]
+
         print(f"Loading {len(df)} audio files...")
         for _, row in tqdm(df.iterrows(), total=len(df)):
             audio_path = os.path.join(self.base_path, f"fold{row['fold']}", row['slice_file_name'])
             if os.path.exists(audio_path):
                 spec = self._audio_to_spectrogram(audio_path)
                 if spec is not None:
-                    spectrograms.append(spec)
-                    labels.append(row['classID'])
-        
-        print(f"Loaded {len(spectrograms)} samples")
-        return np.array(spectrograms), np.array(labels)
+                    yield spec, row['classID']
     
     def _audio_to_spectrogram(self, audio_path):
-        """Convert audio file to log-mel spectrogram."""
-        try:
-            y, sr = librosa.load(audio_path, sr=config.SPECTROGRAM_SAMPLE_RATE)
-            mel_spec = librosa.feature.melspectrogram(
-                y=y, sr=sr, 
-                n_mels=config.SPECTROGRAM_N_MELS, 
-                hop_length=config.SPECTROGRAM_HOP_LENGTH
-            )
-            log_mel = librosa.power_to_db(mel_spec, ref=np.max)
-            log_mel_resized = tf.image.resize(
-                log_mel[..., np.newaxis], 
-                config.ACOUSTIC_MODEL_INPUT_SHAPE[:2]
-            )
-            return log_mel_resized.numpy()
-        except Exception as e:
-            if config.DEBUG_MODE:
-                print(f"Error processing {audio_path}: {e}")
-            return None
+        """Convert audio file to log-mel spectrogram (cached across runs, see feature_cache.py)."""
+        return audio_to_model_spectrogram(audio_path)
+
+
+def build_acoustic_shards(out_dir, use_esc50=True, urbansound_folds=None,
+                          shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Stream the acoustic training corpus into float16 memory-mapped shards.
+
+    Labels follow train_models.train_acoustic_model(): MIMII 0=normal /
+    1=abnormal, environmental sounds (ESC-50, UrbanSound8K) 2=ignore.
+
+    Args:
+        out_dir: Shard directory (manifest.json is written last, and only if the build completes)
+        use_esc50: Add ESC-50 as environmental sounds
+        urbansound_folds: UrbanSound8K folds to add as environmental sounds (None = skip)
+        shard_size: Spectrograms per shard
+
+    Returns:
+        Path to manifest.json
+    """
+    params = {
+        'sample_rate': config.SPECTROGRAM_SAMPLE_RATE,
+        'n_mels': config.SPECTROGRAM_N_MELS,
+        'hop_length': config.SPECTROGRAM_HOP_LENGTH,
+        'sources': ['mimii'] + (['esc50'] if use_esc50 else []) + (['urbansound8k'] if urbansound_folds else []),
+    }
+    with ShardWriter(out_dir, config.ACOUSTIC_MODEL_INPUT_SHAPE, shard_size, params=params) as writer:
+        for spec, label in MIMIIDatasetLoader().iter_machine_sounds(use_all_ids=True):
+            writer.add(spec, label)
+        if use_esc50:
+            # Optional like in train_acoustic_model(): a missing ESC-50 is skipped, not fatal
+            esc50_loader = ESC50DatasetLoader()
+            try:
+                esc50_df = pd.read_csv(esc50_loader.meta_file)
+            except Exception as e:
+                print(f"⚠ Skipping environmental sounds: {e}")
+                esc50_df = None
+            if esc50_df is not None:
+                for spec, _ in esc50_loader.iter_environmental_sounds(df=esc50_df):
+                    writer.add(spec, 2)
+        if urbansound_folds:
+            for spec, _ in UrbanSound8KDatasetLoader().iter_urban_sounds(folds=urbansound_folds):
+                writer.add(spec, 2)
+    print(f"Wrote {writer.total} spectrograms in {len(writer.shards)} shards to {out_dir}")
+    return writer.out_dir / 'manifest.json'
 
 
 # ============================================================================
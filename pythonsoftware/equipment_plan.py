@@ -0,0 +1,289 @@
+"""
+Compiled per-equipment monitoring plans for PREMONITOR.
+
+A plan is built once per equipment unit at startup (and again on config
+reload): thresholds are resolved from equipment_registry and config, enabled
+sensors become a list of bound hardware readers, and the models to run are
+fixed. The per-cycle code then works from plain attributes instead of probing
+nested config dictionaries.
+
+Sensor readers come from a sensor_drivers.DriverRegistry (one driver per
+physical sensor) where one handles the sensor, otherwise from the hardware
+module. They can be routed through a sensor_bus.SensorBus so units that
+share a physical device read it once per cycle.
+
+Usage:
+    plans = compile_plans(equipment_list, hardware, bus=bus)
+    readings = read_sensors(plans[0])
+    alerts = evaluate_raw_thresholds(readings["sensors"], plans[0].thresholds)
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import config
+import equipment_registry
+
+logger = logging.getLogger('equipment_plan')
+
+# (config key, readings key, hardware reader, label used in log messages)
+SENSOR_READERS = (
+    ("thermal_camera", "thermal", "read_thermal_camera", "thermal camera"),
+    ("microphone", "audio", "read_microphone", "microphone"),
+    ("gas_sensor", "gas", "read_gas_sensor", "gas sensor"),
+    ("temperature", "temperature", "read_temperature", "temperature"),
+    ("co2", "co2", "read_co2_sensor", "CO2 sensor"),
+    ("oxygen", "oxygen", "read_oxygen_sensor", "oxygen sensor"),
+    ("vibration", "vibration", "read_vibration_sensor", "vibration sensor"),
+    ("current", "current", "read_current_sensor", "current sensor"),
+    ("motion_sensor", "motion", "read_motion_sensor", "PIR motion sensor"),
+    ("airflow", "airflow", "read_airflow_sensor", "airflow sensor"),
+)
+
+
+@dataclass
+class ResolvedThresholds:
+    """Threshold values for one equipment unit, with config fallbacks applied."""
+    temperature_range: Optional[Tuple[float, float]] = None
+    critical_temperature_c: Optional[float] = None
+    gas_threshold: Optional[float] = None
+    co2_range: Optional[Tuple[float, float]] = None
+    oxygen_min: Optional[float] = None
+    vibration_threshold: Optional[float] = None
+    vibration_crest_factor_threshold: Optional[float] = None
+    vibration_kurtosis_threshold: Optional[float] = None
+    current_threshold: Optional[float] = None
+    thermal_confidence: float = 0.85
+    acoustic_confidence: float = 0.85
+    lstm_reconstruction_threshold: float = 0.045
+
+
+@dataclass
+class SensorReader:
+    """One enabled sensor: where its value goes and the bound function that reads it."""
+    key: str
+    label: str
+    read: Callable[[], Any]
+    direct: Optional[Callable[[], Any]] = None  # Reader bypassing the sensor bus (None = same as read)
+
+
+@dataclass
+class EquipmentPlan:
+    """Everything the monitoring loop needs for one equipment unit."""
+    equipment: Dict[str, Any]
+    equipment_id: str
+    equipment_type: str
+    name: str
+    location: str
+    alert_channels: Tuple[str, ...]
+    thresholds: ResolvedThresholds
+    sensor_readers: List[SensorReader] = field(default_factory=list)
+    models: Tuple[str, ...] = ()
+
+
+def resolve_thresholds(equipment_type: str, registry: equipment_registry.EquipmentRegistry = None) -> ResolvedThresholds:
+    """
+    Resolve the thresholds for an equipment type.
+
+    Values are kept exactly as configured (no float conversion) so alert
+    messages read the same as the registry. `registry` defaults to the
+    active one; pass a candidate registry to compile before activating it.
+    """
+    if registry is None:
+        thresholds = equipment_registry.get_equipment_thresholds(equipment_type)
+    else:
+        thresholds = registry.get_thresholds(equipment_type)
+    return ResolvedThresholds(
+        temperature_range=thresholds.get("temperature_range") or None,
+        critical_temperature_c=getattr(config, 'THERMAL_CRITICAL_THRESHOLD_C', None),
+        gas_threshold=thresholds.get("gas_analog_threshold", getattr(config, 'GAS_ANALOG_THRESHOLD', None)),
+        co2_range=thresholds.get("co2_range") or None,
+        oxygen_min=thresholds.get("oxygen_min"),
+        vibration_threshold=thresholds.get("vibration_threshold"),
+        vibration_crest_factor_threshold=thresholds.get("vibration_crest_factor_threshold"),
+        vibration_kurtosis_threshold=thresholds.get("vibration_kurtosis_threshold"),
+        current_threshold=thresholds.get("current_threshold"),
+        thermal_confidence=thresholds.get("thermal_anomaly_confidence", 0.85),
+        acoustic_confidence=thresholds.get("acoustic_anomaly_confidence", 0.85),
+        lstm_reconstruction_threshold=thresholds.get("lstm_reconstruction_threshold", 0.045)
+    )
+
+
+def compile_plan(equipment: Dict[str, Any], hardware=None,
+                 registry: equipment_registry.EquipmentRegistry = None, bus=None,
+                 drivers=None) -> EquipmentPlan:
+    """
+    Compile the monitoring plan for one equipment unit.
+
+    Args:
+        equipment: Equipment configuration from the registry
+        hardware: Module providing the read_* functions (None = no sensor readers)
+        registry: Registry to resolve thresholds from (None = active registry)
+        bus: SensorBus to share device reads through (None = call readers directly)
+        drivers: DriverRegistry providing per-device readers (None = hardware module only)
+    """
+    equipment_id = equipment["id"]
+    sensors_config = equipment.get("sensors", {})
+
+    sensor_readers = []
+    if hardware is not None or drivers is not None:
+        for config_key, readings_key, reader_name, label in SENSOR_READERS:
+            if not sensors_config.get(config_key, {}).get("enabled", False):
+                continue
+            reader = drivers.reader(config_key, sensors_config[config_key]) if drivers is not None else None
+            if reader is None:
+                reader = getattr(hardware, reader_name, None)
+            if reader is None:
+                logger.warning(f"[{equipment_id}] No hardware reader {reader_name}() for enabled sensor {config_key}")
+                continue
+            direct = reader
+            if bus is not None:
+                reader = bus.reader(reader_name, reader, sensors_config[config_key], equipment_id)
+            sensor_readers.append(SensorReader(readings_key, label, reader, direct))
+
+    enabled_keys = {reader.key for reader in sensor_readers}
+    models = []
+    if "thermal" in enabled_keys:
+        models.append("thermal")
+    if "audio" in enabled_keys:
+        models.append("acoustic")
+    models.append("lstm")  # Uses whatever scalar sensors are present
+
+    return EquipmentPlan(
+        equipment=equipment,
+        equipment_id=equipment_id,
+        equipment_type=equipment["type"],
+        name=equipment.get("name", equipment_id),
+        location=equipment.get("location", "Unknown"),
+        alert_channels=tuple(equipment.get("alert_channels", ["discord"])),
+        thresholds=resolve_thresholds(equipment["type"], registry),
+        sensor_readers=sensor_readers,
+        models=tuple(models)
+    )
+
+
+def compile_plans(equipment_list: List[Dict[str, Any]], hardware=None,
+                  registry: equipment_registry.EquipmentRegistry = None, bus=None,
+                  drivers=None) -> List[EquipmentPlan]:
+    """Compile plans for every equipment unit, in registry order."""
+    plans = [compile_plan(equipment, hardware, registry, bus, drivers) for equipment in equipment_list]
+    if drivers is not None:
+        drivers.start()  # One DS18B20 conversion for all new probes, not one per unit
+    logger.info(f"Compiled monitoring plans for {len(plans)} equipment units")
+    return plans
+
+
+def read_sensors(plan: EquipmentPlan, direct: bool = False) -> Dict[str, Any]:
+    """
+    Read every enabled sensor of a plan.
+
+    Args:
+        plan: Compiled plan
+        direct: Bypass the sensor bus (fresh reads outside the monitoring cycle)
+
+    Returns:
+        Dict with equipment_id, timestamp and a sensors dict of readings
+    """
+    sensors = {}
+    for reader in plan.sensor_readers:
+        try:
+            sensors[reader.key] = (reader.direct or reader.read)() if direct else reader.read()
+        except Exception as e:
+            logger.error(f"[{plan.equipment_id}] Error reading {reader.label}: {e}")
+
+    return {
+        "equipment_id": plan.equipment_id,
+        "timestamp": datetime.now().isoformat(),
+        "sensors": sensors
+    }
+
+
+def evaluate_raw_thresholds(sensors: Dict[str, Any], thresholds: ResolvedThresholds,
+                            equipment_id: str = "") -> List[str]:
+    """
+    Check raw sensor values against resolved thresholds.
+
+    Returns:
+        Alert messages, in the order temperature, gas, CO2, oxygen, vibration, current
+    """
+    alerts = []
+
+    # Temperature checks
+    if "temperature" in sensors:
+        try:
+            temp_val = float(sensors["temperature"])
+            # Equipment-specific acceptable range
+            temp_range = thresholds.temperature_range
+            if temp_range and (temp_val < temp_range[0] or temp_val > temp_range[1]):
+                alerts.append(f"Temperature out of expected range: {temp_val:.2f}°C (expected {temp_range})")
+
+            # Hard critical temperature (fire risk)
+            critical_c = thresholds.critical_temperature_c
+            if critical_c is not None and temp_val >= critical_c:
+                alerts.append(f"CRITICAL: High temperature detected: {temp_val:.2f}°C >= {critical_c}°C")
+        except Exception:
+            logger.debug(f"[{equipment_id}] Could not parse temperature sensor value: {sensors.get('temperature')}")
+
+    # Gas sensor checks (analog value)
+    if "gas" in sensors:
+        try:
+            gas_val = float(sensors["gas"])
+            gas_threshold = thresholds.gas_threshold
+            if gas_threshold is not None and gas_val >= gas_threshold:
+                alerts.append(f"Gas sensor above threshold: {gas_val} >= {gas_threshold}")
+        except Exception:
+            logger.debug(f"[{equipment_id}] Could not parse gas sensor value: {sensors.get('gas')}")
+
+    # CO2 checks (percent)
+    if "co2" in sensors:
+        try:
+            co2_val = float(sensors["co2"])
+            co2_range = thresholds.co2_range
+            if co2_range and (co2_val < co2_range[0] or co2_val > co2_range[1]):
+                alerts.append(f"CO2 level out of expected range: {co2_val:.2f}% (expected {co2_range})")
+        except Exception:
+            logger.debug(f"[{equipment_id}] Could not parse CO2 sensor value: {sensors.get('co2')}")
+
+    # Oxygen checks (optional) - user can add 'oxygen_min' to equipment thresholds
+    if "oxygen" in sensors:
+        try:
+            oxy_val = float(sensors["oxygen"])
+            oxy_min = thresholds.oxygen_min
+            if oxy_min is not None and oxy_val < oxy_min:
+                alerts.append(f"Low oxygen detected: {oxy_val:.2f}% < {oxy_min}%")
+        except Exception:
+            logger.debug(f"[{equipment_id}] Could not parse oxygen sensor value: {sensors.get('oxygen')}")
+
+    # Vibration checks (mechanical fault detection)
+    if "vibration" in sensors:
+        try:
+            vib_val = float(sensors["vibration"])
+            vib_threshold = thresholds.vibration_threshold
+            if vib_threshold is not None and vib_val >= vib_threshold:
+                alerts.append(f"High vibration detected: {vib_val:.2f}G >= {vib_threshold}G (possible bearing wear)")
+
+            # Burst features (sensor_drivers.ADXL345): impacts raise crest factor and kurtosis before RMS
+            crest = getattr(sensors["vibration"], "crest_factor", None)
+            crest_threshold = thresholds.vibration_crest_factor_threshold
+            if crest is not None and crest_threshold is not None and crest >= crest_threshold:
+                alerts.append(f"Impulsive vibration detected: crest factor {crest:.2f} >= {crest_threshold} (possible bearing defect)")
+            kurtosis = getattr(sensors["vibration"], "kurtosis", None)
+            kurtosis_threshold = thresholds.vibration_kurtosis_threshold
+            if kurtosis is not None and kurtosis_threshold is not None and kurtosis >= kurtosis_threshold:
+                alerts.append(f"Impulsive vibration detected: kurtosis {kurtosis:.2f} >= {kurtosis_threshold} (possible bearing defect)")
+        except Exception:
+            logger.debug(f"[{equipment_id}] Could not parse vibration sensor value: {sensors.get('vibration')}")
+
+    # Current checks (motor overload detection)
+    if "current" in sensors:
+        try:
+            current_val = float(sensors["current"])
+            current_threshold = thresholds.current_threshold
+            if current_threshold is not None and current_val >= current_threshold:
+                alerts.append(f"Motor overload detected: {current_val:.2f}A >= {current_threshold}A (possible mechanical jam)")
+        except Exception:
+            logger.debug(f"[{equipment_id}] Could not parse current sensor value: {sensors.get('current')}")
+
+    return alerts
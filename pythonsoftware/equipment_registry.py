@@ -12,9 +12,18 @@ Each equipment entry defines:
 - Equipment-specific thresholds
 """
 
+import json
+import logging
 import os
 from typing import Dict, List, Any, Optional, Tuple
 
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+logger = logging.getLogger('equipment_registry')
+
 # ============================================================================
 # EQUIPMENT TYPE DEFINITIONS
 # ============================================================================
@@ -127,6 +136,8 @@ EQUIPMENT_THRESHOLDS = {
         "acoustic_anomaly_confidence": 0.75,  # Very sensitive (high RPM, safety critical)
         "lstm_reconstruction_threshold": 0.050,
         "vibration_threshold": 0.5,  # G-force
+        "vibration_crest_factor_threshold": 6.0,  # Peak/RMS of a vibration burst
+        "vibration_kurtosis_threshold": 5.0,  # Gaussian = 3, bearing impacts push it up
         "current_threshold": 5.0  # Amps (motor overload)
     },
     "autoclave": {
@@ -315,6 +326,189 @@ EQUIPMENT_REGISTRY = [
     # },
 ]
 
+# ============================================================================
+# REGISTRY INDEX
+# ============================================================================
+
+# Map sensor type names (EQUIPMENT_TYPES) to sensor config keys
+SENSOR_NAME_MAPPING = {
+    "thermal": "thermal_camera",
+    "acoustic": "microphone",
+    "temperature": "temperature",
+    "gas": "gas_sensor",
+    "vibration": "vibration",
+    "current": "current",
+    "co2": "co2",
+    "humidity": "humidity",
+    "pressure": "pressure",
+    "airflow": "airflow"
+}
+
+# Environment variable pointing at an external registry file (JSON or YAML)
+REGISTRY_PATH_ENV = "PREMONITOR_EQUIPMENT_REGISTRY"
+
+
+class EquipmentRegistry:
+    """
+    Indexed view of an equipment list, built and validated once.
+
+    Lookups by id, Pi, type and criticality are dictionary hits instead of
+    scans over the whole registry. Required-sensor validation also runs at
+    construction; failures are kept in `validation_errors` (id -> message)
+    rather than raised, matching how the monitor reports them at startup.
+
+    Raises:
+        ValueError: If an entry lacks id/type/pi_id or an id is used twice
+    """
+
+    def __init__(self, equipment: List[Dict[str, Any]],
+                 thresholds: Optional[Dict[str, Dict[str, Any]]] = None,
+                 equipment_types: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.equipment = list(equipment)
+        self.thresholds = EQUIPMENT_THRESHOLDS if thresholds is None else thresholds
+        self.equipment_types = EQUIPMENT_TYPES if equipment_types is None else equipment_types
+
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_pi: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_type: Dict[str, List[Dict[str, Any]]] = {}
+        self._critical: List[Dict[str, Any]] = []
+        self.validation_errors: Dict[str, str] = {}
+
+        for index, eq in enumerate(self.equipment):
+            missing = [key for key in ("id", "type", "pi_id") if key not in eq]
+            if missing:
+                raise ValueError(f"Equipment entry {index} is missing {', '.join(missing)}")
+            if eq["id"] in self._by_id:
+                raise ValueError(f"Duplicate equipment id: {eq['id']}")
+
+            self._by_id[eq["id"]] = eq
+            self._by_pi.setdefault(eq["pi_id"], []).append(eq)
+            self._by_type.setdefault(eq["type"], []).append(eq)
+            if eq.get("critical", False):
+                self._critical.append(eq)
+
+            valid, msg = self.validate(eq)
+            if not valid:
+                self.validation_errors[eq["id"]] = msg
+
+    def __len__(self) -> int:
+        return len(self.equipment)
+
+    def __iter__(self):
+        return iter(self.equipment)
+
+    @property
+    def pi_ids(self) -> List[str]:
+        """Raspberry Pi ids with at least one equipment unit assigned."""
+        return sorted(self._by_pi)
+
+    def get_by_id(self, equipment_id: str) -> Optional[Dict[str, Any]]:
+        """Equipment configuration by id, or None if not registered."""
+        return self._by_id.get(equipment_id)
+
+    def get_by_pi(self, pi_id: str) -> List[Dict[str, Any]]:
+        """Equipment assigned to a Raspberry Pi, in registry order."""
+        return list(self._by_pi.get(pi_id, ()))
+
+    def get_by_type(self, equipment_type: str) -> List[Dict[str, Any]]:
+        """Equipment of one type, in registry order."""
+        return list(self._by_type.get(equipment_type, ()))
+
+    def get_critical(self) -> List[Dict[str, Any]]:
+        """Equipment marked as critical, in registry order."""
+        return list(self._critical)
+
+    def get_thresholds(self, equipment_type: str) -> Dict[str, Any]:
+        """Thresholds for an equipment type (fridge thresholds for unknown types)."""
+        return self.thresholds.get(equipment_type, self.thresholds["fridge"])
+
+    def validate(self, equipment: Dict[str, Any]) -> Tuple[bool, str]:
+        """Check that all required sensors for the equipment type are present and enabled."""
+        eq_type = equipment["type"]
+        if eq_type not in self.equipment_types:
+            return False, f"Unknown equipment type: {eq_type}"
+
+        sensors_config = equipment.get("sensors", {})
+        for required_sensor in self.equipment_types[eq_type]["sensors_required"]:
+            config_key = SENSOR_NAME_MAPPING.get(required_sensor, required_sensor)
+            if config_key not in sensors_config or not sensors_config[config_key].get("enabled", False):
+                return False, f"Required sensor missing: {required_sensor} (config key: {config_key})"
+
+        return True, "Configuration valid"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EquipmentRegistry':
+        """
+        Build a registry from parsed JSON/YAML data.
+
+        Expected layout:
+            {"equipment": [...],
+             "thresholds": {"fridge": {...}},        # optional, merged over EQUIPMENT_THRESHOLDS
+             "equipment_types": {"fridge": {...}}}   # optional, merged over EQUIPMENT_TYPES
+
+        "*_range" thresholds given as lists are turned back into tuples so
+        alert messages read the same as the built-in registry.
+        """
+        if not isinstance(data.get("equipment"), list):
+            raise ValueError("Registry data must contain an 'equipment' list")
+
+        thresholds = {eq_type: dict(values) for eq_type, values in EQUIPMENT_THRESHOLDS.items()}
+        for eq_type, values in data.get("thresholds", {}).items():
+            merged = thresholds.setdefault(eq_type, {})
+            for key, value in values.items():
+                merged[key] = tuple(value) if key.endswith("_range") and isinstance(value, list) else value
+
+        equipment_types = dict(EQUIPMENT_TYPES)
+        equipment_types.update(data.get("equipment_types", {}))
+
+        return cls(data["equipment"], thresholds, equipment_types)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'EquipmentRegistry':
+        """
+        Load a registry from a .json, .yaml or .yml file.
+
+        Raises:
+            ValueError: For unsupported extensions, or YAML without PyYAML installed
+        """
+        extension = os.path.splitext(path)[1].lower()
+        with open(path, "r", encoding="utf-8") as f:
+            if extension == ".json":
+                data = json.load(f)
+            elif extension in (".yaml", ".yml"):
+                if yaml is None:
+                    raise ValueError(f"PyYAML is required to load {path}")
+                data = yaml.safe_load(f)
+            else:
+                raise ValueError(f"Unsupported registry file type: {path}")
+
+        registry = cls.from_dict(data or {})
+        logger.info(f"Loaded {len(registry)} equipment units from {path}")
+        return registry
+
+
+_registry: Optional[EquipmentRegistry] = None
+
+
+def get_registry() -> EquipmentRegistry:
+    """
+    Return the active registry, building it on first use.
+
+    Loads the file named by PREMONITOR_EQUIPMENT_REGISTRY if set, otherwise
+    indexes the built-in EQUIPMENT_REGISTRY.
+    """
+    global _registry
+    if _registry is None:
+        path = os.environ.get(REGISTRY_PATH_ENV)
+        _registry = EquipmentRegistry.from_file(path) if path else EquipmentRegistry(EQUIPMENT_REGISTRY)
+    return _registry
+
+
+def set_registry(registry: Optional[EquipmentRegistry]):
+    """Replace the active registry (None rebuilds it on next use)."""
+    global _registry
+    _registry = registry
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -334,7 +528,7 @@ def get_equipment_by_pi(pi_id: str) -> List[Dict[str, Any]]:
         >>> print(len(equipment))
         1
     """
-    return [eq for eq in EQUIPMENT_REGISTRY if eq["pi_id"] == pi_id]
+    return get_registry().get_by_pi(pi_id)
 
 
 def get_equipment_by_id(equipment_id: str) -> Optional[Dict[str, Any]]:
@@ -352,10 +546,7 @@ def get_equipment_by_id(equipment_id: str) -> Optional[Dict[str, Any]]:
         >>> print(eq['name'])
         'Main Lab Fridge A1'
     """
-    for eq in EQUIPMENT_REGISTRY:
-        if eq["id"] == equipment_id:
-            return eq
-    return None
+    return get_registry().get_by_id(equipment_id)
 
 
 def get_equipment_thresholds(equipment_type: str) -> Dict[str, Any]:
@@ -368,7 +559,7 @@ def get_equipment_thresholds(equipment_type: str) -> Dict[str, Any]:
     Returns:
         Dictionary of threshold values for the equipment type
     """
-    return EQUIPMENT_THRESHOLDS.get(equipment_type, EQUIPMENT_THRESHOLDS["fridge"])
+    return get_registry().get_thresholds(equipment_type)
 
 
 def get_critical_equipment() -> List[Dict[str, Any]]:
@@ -378,7 +569,7 @@ def get_critical_equipment() -> List[Dict[str, Any]]:
     Returns:
         List of critical equipment configurations
     """
-    return [eq for eq in EQUIPMENT_REGISTRY if eq.get("critical", False)]
+    return get_registry().get_critical()
 
 
 def validate_equipment_config(equipment: Dict[str, Any]) -> Tuple[bool, str]:
@@ -402,35 +593,7 @@ def validate_equipment_config(equipment: Dict[str, Any]) -> Tuple[bool, str]:
         >>> print(f"{valid}: {msg}")
         False: Required sensor missing: acoustic (config key: microphone)
     """
-    eq_type = equipment["type"]
-    if eq_type not in EQUIPMENT_TYPES:
-        return False, f"Unknown equipment type: {eq_type}"
-    
-    type_def = EQUIPMENT_TYPES[eq_type]
-    sensors_config = equipment.get("sensors", {})
-    
-    # Map sensor type names to config keys
-    sensor_name_mapping = {
-        "thermal": "thermal_camera",
-        "acoustic": "microphone",
-        "temperature": "temperature",
-        "gas": "gas_sensor",
-        "vibration": "vibration",
-        "current": "current",
-        "co2": "co2",
-        "humidity": "humidity",
-        "pressure": "pressure",
-        "airflow": "airflow"
-    }
-    
-    # Check required sensors
-    for required_sensor in type_def["sensors_required"]:
-        # Map sensor type to config key
-        config_key = sensor_name_mapping.get(required_sensor, required_sensor)
-        if config_key not in sensors_config or not sensors_config[config_key].get("enabled", False):
-            return False, f"Required sensor missing: {required_sensor} (config key: {config_key})"
-    
-    return True, "Configuration valid"
+    return get_registry().validate(equipment)
 
 def get_pi_id() -> str:
     """
@@ -465,18 +628,16 @@ if __name__ == "__main__":
     print("=" * 80)
     print()
     
+    registry = get_registry()
+
     # Validate all equipment
-    print(f"Total equipment registered: {len(EQUIPMENT_REGISTRY)}")
-    print(f"Equipment types available: {len(EQUIPMENT_TYPES)}")
-    print(f"Raspberry Pis in use: {len(set(eq['pi_id'] for eq in EQUIPMENT_REGISTRY))}")
+    print(f"Total equipment registered: {len(registry)}")
+    print(f"Equipment types available: {len(registry.equipment_types)}")
+    print(f"Raspberry Pis in use: {len(registry.pi_ids)}")
     print()
     
-    # Validate each equipment
-    errors = []
-    for eq in EQUIPMENT_REGISTRY:
-        valid, msg = validate_equipment_config(eq)
-        if not valid:
-            errors.append(f"  ✗ {eq['id']}: {msg}")
+    # Validation ran when the registry was built
+    errors = [f"  ✗ {eq_id}: {msg}" for eq_id, msg in registry.validation_errors.items()]
     
     if errors:
         print("❌ Configuration Errors:")
@@ -487,7 +648,7 @@ if __name__ == "__main__":
     
     print()
     print("Equipment by Pi:")
-    for pi_id in sorted(set(eq['pi_id'] for eq in EQUIPMENT_REGISTRY)):
+    for pi_id in registry.pi_ids:
         equipment = get_equipment_by_pi(pi_id)
         print(f"\n{pi_id}:")
         for eq in equipment:
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Premonitor: feature_cache.py
+
+Persistent, content-addressed cache for audio features used in training.
+
+Every training run used to recompute librosa spectrograms for thousands of
+MIMII / ESC-50 / UrbanSound8K files even when neither the audio nor the
+SPECTROGRAM_* settings had changed. Here each feature array is stored as
+<cache_dir>/<key[:2]>/<key>.npy, where key = SHA-256 of the file's bytes
+plus the preprocessing parameters. A moved or renamed file still hits, and
+any change to the audio or the settings misses.
+
+Content hashes are memoised per (path, size, mtime), so a warm re-run only
+stats each file and loads its .npy. The cache is bounded by max_bytes:
+hits refresh an entry's mtime, and the least recently used entries are
+evicted once the total is exceeded.
+
+Usage:
+    spec = cached_features(audio_path, "log_mel", audio_to_spectrogram)  # Default cache from config
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+# Import our custom project configuration
+import config
+
+HASH_CHUNK_BYTES = 1 << 20
+EVICT_TO_FRACTION = 0.9  # Evict down to this fraction of max_bytes so eviction is not run on every write
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def spectrogram_params(kind, **extra):
+    """Preprocessing parameters that determine a spectrogram, for cache keys."""
+    params = {
+        'kind': kind,
+        'sample_rate': config.SPECTROGRAM_SAMPLE_RATE,
+        'n_mels': config.SPECTROGRAM_N_MELS,
+        'hop_length': config.SPECTROGRAM_HOP_LENGTH,
+    }
+    params.update(extra)
+    return params
+
+
+class FeatureCache:
+    """
+    Content-addressed .npy feature store with LRU eviction.
+
+    Args:
+        cache_dir: Cache directory (created if needed)
+        max_bytes: Size bound for cached features (0 = unbounded)
+    """
+
+    def __init__(self, cache_dir, max_bytes=0):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._hash_file = self.cache_dir / 'hashes.json'
+        self._hashes = {}  # path -> [size, mtime_ns, sha256]
+        self._hashes_dirty = 0
+        try:
+            with open(self._hash_file, 'r') as f:
+                self._hashes = json.load(f)
+        except (OSError, ValueError):
+            pass
+        self.total_bytes = sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        for shard in os.scandir(self.cache_dir):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith('.npy'):
+                        yield entry
+
+    def content_hash(self, path):
+        """SHA-256 of a file's bytes, memoised while its size and mtime are unchanged."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        known = self._hashes.get(path)
+        if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        with self._lock:
+            self._hashes[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+            self._hashes_dirty += 1
+            if self._hashes_dirty >= 256:
+                self._save_hashes()
+        return self._hashes[path][2]
+
+    def key(self, path, params):
+        """Cache key of a file's features under the given preprocessing parameters."""
+        digest = hashlib.sha256(self.content_hash(path).encode())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.npy"
+
+    def get(self, key):
+        """Cached array for a key, or None."""
+        path = self._path(key)
+        try:
+            features = np.load(path)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return features
+
+    def put(self, key, features):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.asarray(features))
+        size = tmp_path.stat().st_size
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.total_bytes += size
+            if self.max_bytes and self.total_bytes > self.max_bytes:
+                self.evict(int(self.max_bytes * EVICT_TO_FRACTION))
+
+    def evict(self, target_bytes):
+        """Delete least recently used entries until the cache holds at most target_bytes."""
+        entries = sorted((entry.stat().st_mtime_ns, entry.stat().st_size, entry.path) for entry in self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self.total_bytes = total
+
+    def get_or_compute(self, path, params, compute):
+        """
+        Features of an audio file: from the cache, or compute(path) and store them.
+
+        compute() returning None (unreadable file) is passed through uncached.
+        """
+        key = self.key(path, params)
+        features = self.get(key)
+        if features is not None:
+            self.hits += 1
+            return features
+        self.misses += 1
+        features = compute(path)
+        if features is not None:
+            self.put(key, features)
+        return features
+
+    def _save_hashes(self):
+        tmp_file = self._hash_file.with_name(f"hashes.{os.getpid()}.tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(self._hashes, f)
+        os.replace(tmp_file, self._hash_file)
+        self._hashes_dirty = 0
+
+    def flush(self):
+        """Persist memoised content hashes (they are only a speed-up, so failures are ignored)."""
+        with self._lock:
+            if self._hashes_dirty:
+                try:
+                    self._save_hashes()
+                except OSError:
+                    pass
+
+
+def get_feature_cache():
+    """Process-wide cache from config (None if FEATURE_CACHE_ENABLED is off)."""
+    global _default_cache
+    if not config.FEATURE_CACHE_ENABLED:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = FeatureCache(config.FEATURE_CACHE_DIR, config.FEATURE_CACHE_MAX_MB * 1024 * 1024)
+            atexit.register(_default_cache.flush)
+        return _default_cache
+
+
+def cached_features(audio_path, kind, compute, **params):
+    """
+    compute(audio_path) through the default cache.
+
+    Args:
+        audio_path: Audio file
+        kind: Name of the feature pipeline (part of the key, with the SPECTROGRAM_* settings)
+        compute: Function returning the features of a path, or None on failure
+        params: Further settings the result depends on (e.g. output shape)
+    """
+    cache = get_feature_cache()
+    if cache is None:
+        return compute(audio_path)
+    try:
+        key_params = spectrogram_params(kind, **params)
+        return cache.get_or_compute(audio_path, key_params, compute)
+    except OSError as e:
+        if config.DEBUG_MODE:
+            print(f"Feature cache unavailable for {audio_path}: {e}")
+        return compute(audio_path)
@@ -0,0 +1,214 @@
+"""
+Vectorized raw-threshold evaluation for many equipment units at once.
+
+check_raw_sensor_thresholds() evaluates one unit with a chain of Python
+comparisons. When a gateway ingests readings from many Pis, or when an
+archive is replayed, the same rules are applied here to a structured array
+of readings (one row per equipment unit, one field per sensor) against
+threshold arrays compiled once from the equipment plans. Missing or
+unparsable readings are NaN, and unset thresholds are NaN, so every
+comparison involving them is False, just like the skipped `if` branches.
+
+Messages are produced only for the violations and match
+equipment_plan.evaluate_raw_thresholds() exactly.
+
+Usage:
+    fleet = compile_fleet_thresholds([plan.thresholds for plan in plans])
+    readings = readings_to_array([r["sensors"] for r in cycle_readings])
+    violations = evaluate_fleet(readings, fleet)
+    for plan, messages in zip(plans, violations.messages()):
+        ...
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from equipment_plan import ResolvedThresholds
+
+# Sensor fields of the readings array (same keys as readings["sensors"])
+SENSOR_FIELDS = ("temperature", "gas", "co2", "oxygen", "vibration", "current")
+# Burst features of a vibration reading (vibration_features.VibrationFeatures), NaN for plain values
+VIBRATION_FEATURE_FIELDS = ("vibration_crest_factor", "vibration_kurtosis")
+READINGS_DTYPE = np.dtype([(name, np.float64) for name in SENSOR_FIELDS + VIBRATION_FEATURE_FIELDS])
+
+# Violation rules, in the order evaluate_raw_thresholds() reports them
+RULES = ("temperature_range", "critical_temperature", "gas", "co2_range", "oxygen", "vibration",
+         "vibration_crest_factor", "vibration_kurtosis", "current")
+VIOLATIONS_DTYPE = np.dtype([(name, np.bool_) for name in RULES])
+
+
+def _to_float(value: Any) -> float:
+    """float(value), or NaN where the scalar path would skip the reading."""
+    try:
+        return float(value)
+    except Exception:
+        return np.nan
+
+
+def _parses(value: Any) -> bool:
+    """Whether float(value) succeeds (NaN included), i.e. the scalar path gets past its conversion."""
+    try:
+        float(value)
+        return True
+    except Exception:
+        return False
+
+
+def readings_to_array(sensor_dicts: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """
+    Pack per-equipment sensor dicts into a structured readings array.
+
+    Args:
+        sensor_dicts: One readings["sensors"] dict per equipment unit
+
+    Returns:
+        Array of READINGS_DTYPE, NaN where a sensor is missing or unparsable
+    """
+    readings = np.full(len(sensor_dicts), np.nan, dtype=READINGS_DTYPE)
+    for row, sensors in enumerate(sensor_dicts):
+        for name in SENSOR_FIELDS:
+            if name in sensors:
+                readings[name][row] = _to_float(sensors[name])
+        # Like the scalar path, burst features only count when the vibration value itself parses
+        vibration = sensors.get("vibration")
+        if "vibration" in sensors and _parses(vibration):
+            readings["vibration_crest_factor"][row] = _to_float(getattr(vibration, "crest_factor", None))
+            readings["vibration_kurtosis"][row] = _to_float(getattr(vibration, "kurtosis", None))
+    return readings
+
+
+def _threshold_array(values: List[Any]) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+@dataclass
+class FleetThresholds:
+    """Threshold arrays (one entry per equipment unit), NaN where a check is disabled."""
+    thresholds: List[ResolvedThresholds]
+    temperature_low: np.ndarray
+    temperature_high: np.ndarray
+    critical_temperature: np.ndarray
+    gas: np.ndarray
+    co2_low: np.ndarray
+    co2_high: np.ndarray
+    oxygen_min: np.ndarray
+    vibration: np.ndarray
+    vibration_crest_factor: np.ndarray
+    vibration_kurtosis: np.ndarray
+    current: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.thresholds)
+
+
+def compile_fleet_thresholds(thresholds: Sequence[ResolvedThresholds]) -> FleetThresholds:
+    """
+    Compile resolved per-unit thresholds into arrays, row-aligned with the readings.
+
+    The original ResolvedThresholds are kept so messages can quote the
+    configured values verbatim.
+    """
+    thresholds = list(thresholds)
+    temp_ranges = [t.temperature_range if t.temperature_range else (None, None) for t in thresholds]
+    co2_ranges = [t.co2_range if t.co2_range else (None, None) for t in thresholds]
+    return FleetThresholds(
+        thresholds=thresholds,
+        temperature_low=_threshold_array([r[0] for r in temp_ranges]),
+        temperature_high=_threshold_array([r[1] for r in temp_ranges]),
+        critical_temperature=_threshold_array([t.critical_temperature_c for t in thresholds]),
+        gas=_threshold_array([t.gas_threshold for t in thresholds]),
+        co2_low=_threshold_array([r[0] for r in co2_ranges]),
+        co2_high=_threshold_array([r[1] for r in co2_ranges]),
+        oxygen_min=_threshold_array([t.oxygen_min for t in thresholds]),
+        vibration=_threshold_array([t.vibration_threshold for t in thresholds]),
+        vibration_crest_factor=_threshold_array([t.vibration_crest_factor_threshold for t in thresholds]),
+        vibration_kurtosis=_threshold_array([t.vibration_kurtosis_threshold for t in thresholds]),
+        current=_threshold_array([t.current_threshold for t in thresholds])
+    )
+
+
+class FleetViolations:
+    """Violation masks for a fleet evaluation, with lazily formatted messages."""
+
+    def __init__(self, readings: np.ndarray, fleet: FleetThresholds, masks: np.ndarray):
+        self.readings = readings
+        self.fleet = fleet
+        self.masks = masks  # VIOLATIONS_DTYPE, one row per equipment unit
+
+    @property
+    def any(self) -> np.ndarray:
+        """Boolean mask of equipment units with at least one violation."""
+        combined = np.zeros(len(self.masks), dtype=bool)
+        for rule in RULES:
+            combined |= self.masks[rule]
+        return combined
+
+    def _message(self, rule: str, row: int) -> str:
+        t = self.fleet.thresholds[row]
+        r = self.readings[row]
+        if rule == "temperature_range":
+            return f"Temperature out of expected range: {r['temperature']:.2f}°C (expected {t.temperature_range})"
+        if rule == "critical_temperature":
+            return f"CRITICAL: High temperature detected: {r['temperature']:.2f}°C >= {t.critical_temperature_c}°C"
+        if rule == "gas":
+            return f"Gas sensor above threshold: {float(r['gas'])} >= {t.gas_threshold}"
+        if rule == "co2_range":
+            return f"CO2 level out of expected range: {r['co2']:.2f}% (expected {t.co2_range})"
+        if rule == "oxygen":
+            return f"Low oxygen detected: {r['oxygen']:.2f}% < {t.oxygen_min}%"
+        if rule == "vibration":
+            return f"High vibration detected: {r['vibration']:.2f}G >= {t.vibration_threshold}G (possible bearing wear)"
+        if rule == "vibration_crest_factor":
+            return (f"Impulsive vibration detected: crest factor {r['vibration_crest_factor']:.2f} >= "
+                    f"{t.vibration_crest_factor_threshold} (possible bearing defect)")
+        if rule == "vibration_kurtosis":
+            return (f"Impulsive vibration detected: kurtosis {r['vibration_kurtosis']:.2f} >= "
+                    f"{t.vibration_kurtosis_threshold} (possible bearing defect)")
+        return f"Motor overload detected: {r['current']:.2f}A >= {t.current_threshold}A (possible mechanical jam)"
+
+    def messages_for(self, row: int) -> List[str]:
+        """Alert messages for one equipment unit, in evaluate_raw_thresholds() order."""
+        mask = self.masks[row]
+        return [self._message(rule, row) for rule in RULES if mask[rule]]
+
+    def messages(self) -> List[List[str]]:
+        """Alert messages for every equipment unit (empty lists for clean rows)."""
+        result = [[] for _ in range(len(self.masks))]
+        for row in np.flatnonzero(self.any):
+            result[row] = self.messages_for(int(row))
+        return result
+
+
+def evaluate_fleet(readings: np.ndarray, fleet: FleetThresholds) -> FleetViolations:
+    """
+    Evaluate every raw threshold rule for every equipment unit in one pass.
+
+    Args:
+        readings: Structured array of READINGS_DTYPE (see readings_to_array)
+        fleet: Thresholds compiled for the same rows
+
+    Raises:
+        ValueError: If readings and thresholds have a different number of rows
+    """
+    if len(readings) != len(fleet):
+        raise ValueError(f"{len(readings)} reading rows for {len(fleet)} threshold rows")
+
+    temperature = readings["temperature"]
+    co2 = readings["co2"]
+
+    # NaN on either side makes a comparison False, i.e. the check is skipped
+    with np.errstate(invalid='ignore'):
+        masks = np.zeros(len(readings), dtype=VIOLATIONS_DTYPE)
+        masks["temperature_range"] = (temperature < fleet.temperature_low) | (temperature > fleet.temperature_high)
+        masks["critical_temperature"] = temperature >= fleet.critical_temperature
+        masks["gas"] = readings["gas"] >= fleet.gas
+        masks["co2_range"] = (co2 < fleet.co2_low) | (co2 > fleet.co2_high)
+        masks["oxygen"] = readings["oxygen"] < fleet.oxygen_min
+        masks["vibration"] = readings["vibration"] >= fleet.vibration
+        masks["vibration_crest_factor"] = readings["vibration_crest_factor"] >= fleet.vibration_crest_factor
+        masks["vibration_kurtosis"] = readings["vibration_kurtosis"] >= fleet.vibration_kurtosis
+        masks["current"] = readings["current"] >= fleet.current
+
+    return FleetViolations(readings, fleet, masks)
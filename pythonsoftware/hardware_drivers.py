@@ -192,14 +192,21 @@ def shutdown_hardware():
 
 
 # --- Sensor Reading Functions (Real Implementations) ---
+# These read one global device per sensor type. For per-equipment devices
+# (analog_channel, device_id, i2c_address from equipment_registry) enable the
+# driver objects in sensor_drivers.py via PREMONITOR_SENSOR_DRIVERS.
 def read_thermal_image():
     """
     TODO: Reads from a real thermal camera (e.g., FLIR Lepton).
     This requires a specific library like 'pylepton' or similar.
+
+    Frames are returned as uint8 of config.THERMAL_FRAME_SHAPE, which the
+    thermal pipeline consumes without a float conversion. An MLX90640 driver
+    should convert its temperature frame with thermal_pipeline.temperatures_to_uint8().
     """
     if not HARDWARE_AVAILABLE:
-        return np.random.rand(*config.THERMAL_MODEL_INPUT_SHAPE).astype(np.float32)
-    return np.zeros(config.THERMAL_MODEL_INPUT_SHAPE, dtype=np.float32)
+        return np.random.randint(0, 256, size=config.THERMAL_FRAME_SHAPE, dtype=np.uint8)
+    return np.zeros(config.THERMAL_FRAME_SHAPE, dtype=np.uint8)
 
 def read_acoustic_spectrogram():
     """
@@ -0,0 +1,386 @@
+"""
+Shared TFLite inference helpers for PREMONITOR.
+Selects the TFLite runtime, loads interpreters and runs them for all monitoring
+scripts and the multi-process inference workers.
+
+ModelRunner is the one place inputs are quantized and outputs dequantized:
+scale and zero-point are read once per model, and inputs are quantized with
+vectorized numpy ops into a preallocated buffer of the model's input dtype.
+"""
+
+import os
+import time
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger('inference')
+
+# Try importing tflite_runtime first (preferred on Pi), fallback to tensorflow
+try:
+    import tflite_runtime.interpreter as tflite
+    USING_TFLITE_RUNTIME = True
+except ImportError:
+    try:
+        import tensorflow as tf
+        tflite = tf.lite
+        USING_TFLITE_RUNTIME = False
+    except ImportError:
+        tflite = None
+        USING_TFLITE_RUNTIME = False
+
+# Op resolver enum (used to switch the default XNNPACK delegate off)
+OpResolverType = getattr(tflite, 'OpResolverType', None)
+if OpResolverType is None and tflite is not None:
+    OpResolverType = getattr(getattr(tflite, 'experimental', None), 'OpResolverType', None)
+
+# Interpreter options used when a model has no explicit configuration
+DEFAULT_INTERPRETER_OPTIONS = {
+    "num_threads": None,    # None = runtime default
+    "xnnpack": True,        # XNNPACK is the default CPU delegate in current runtimes
+    "cpu_affinity": None,   # e.g. [2, 3] to keep inference threads off core 0
+    "autotune": False       # Benchmark thread counts at startup
+}
+
+
+def get_cpu_budget() -> int:
+    """Number of CPU cores available to this process."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def merge_interpreter_options(options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fill in defaults for a per-model interpreter options dict."""
+    merged = dict(DEFAULT_INTERPRETER_OPTIONS)
+    if options:
+        merged.update({key: value for key, value in options.items() if value is not None})
+    return merged
+
+
+def _set_thread_affinity(cpus) -> Optional[set]:
+    """
+    Pin the calling thread to `cpus`, returning the previous set (None if unsupported).
+
+    Threads spawned while pinned (the TFLite thread pool) inherit the mask.
+    """
+    if not cpus or not hasattr(os, 'sched_setaffinity'):
+        return None
+    try:
+        previous = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, set(int(cpu) for cpu in cpus))
+        return previous
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not apply CPU affinity {cpus}: {e}")
+        return None
+
+
+def create_interpreter(model_path: str, options: Optional[Dict[str, Any]] = None):
+    """
+    Construct and allocate an interpreter with the given options.
+
+    The CPU affinity hint is applied while the interpreter is created and warmed
+    up, so its worker threads stay on those cores; the caller's mask is restored.
+
+    Raises:
+        RuntimeError: If no TFLite runtime is available
+    """
+    if tflite is None:
+        raise RuntimeError("No TFLite runtime available")
+
+    options = merge_interpreter_options(options)
+    kwargs = {"model_path": str(model_path)}
+    if options["num_threads"]:
+        kwargs["num_threads"] = int(options["num_threads"])
+    if not options["xnnpack"]:
+        if OpResolverType is not None:
+            kwargs["experimental_op_resolver_type"] = OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+        else:
+            logger.warning("This TFLite runtime cannot disable XNNPACK - using the default delegate")
+
+    previous_affinity = _set_thread_affinity(options["cpu_affinity"])
+    try:
+        interpreter = tflite.Interpreter(**kwargs)
+        interpreter.allocate_tensors()
+        if previous_affinity is not None:
+            # First invoke starts the thread pool under the pinned mask
+            _invoke_with_zeros(interpreter)
+    finally:
+        if previous_affinity is not None:
+            os.sched_setaffinity(0, previous_affinity)
+
+    return interpreter
+
+
+def _invoke_with_zeros(interpreter):
+    """Run one inference on all-zero inputs (warm-up / benchmarking)."""
+    for detail in interpreter.get_input_details():
+        interpreter.set_tensor(detail['index'], np.zeros(detail['shape'], dtype=detail['dtype']))
+    interpreter.invoke()
+
+
+def benchmark_interpreter(interpreter, runs: int = 5, warmup: int = 1) -> float:
+    """
+    Median latency of one invoke() in milliseconds.
+    """
+    for _ in range(warmup):
+        _invoke_with_zeros(interpreter)
+
+    timings = []
+    for _ in range(max(1, runs)):
+        start = time.perf_counter()
+        interpreter.invoke()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(timings))
+
+
+def autotune_num_threads(model_path: str, model_name: str, options: Optional[Dict[str, Any]] = None,
+                         cpu_budget: Optional[int] = None, runs: int = 5,
+                         min_speedup: float = 0.05) -> Dict[str, Any]:
+    """
+    Benchmark thread counts 1..cpu_budget on the real model and pick the fastest.
+
+    More threads are only chosen when they beat the best smaller count by at
+    least `min_speedup`, so marginal gains do not cost cores.
+
+    Returns:
+        Dict with model, num_threads, latency_ms, timings_ms, cpu_budget and xnnpack
+    """
+    options = merge_interpreter_options(options)
+    budget = max(1, int(cpu_budget or get_cpu_budget()))
+    if options["cpu_affinity"]:
+        budget = min(budget, len(options["cpu_affinity"]))
+
+    timings = {}
+    for num_threads in range(1, budget + 1):
+        trial_options = dict(options, num_threads=num_threads)
+        try:
+            interpreter = create_interpreter(model_path, trial_options)
+            timings[num_threads] = benchmark_interpreter(interpreter, runs=runs)
+        except Exception as e:
+            logger.warning(f"{model_name} auto-tune with {num_threads} thread(s) failed: {e}")
+        finally:
+            interpreter = None
+
+    if not timings:
+        raise RuntimeError(f"{model_name} auto-tune could not run the model")
+
+    best_threads = min(timings)
+    for num_threads in sorted(timings):
+        if timings[num_threads] < timings[best_threads] * (1.0 - min_speedup):
+            best_threads = num_threads
+
+    result = {
+        "model": model_name,
+        "num_threads": best_threads,
+        "latency_ms": round(timings[best_threads], 3),
+        "timings_ms": {n: round(t, 3) for n, t in timings.items()},
+        "cpu_budget": budget,
+        "xnnpack": bool(options["xnnpack"])
+    }
+    logger.info(f"{model_name} auto-tune: {best_threads} thread(s), {result['latency_ms']} ms "
+                f"(budget={budget}, xnnpack={result['xnnpack']}, timings_ms={result['timings_ms']})")
+    return result
+
+
+def resolve_interpreter_options(model_path: str, model_name: str,
+                                options: Optional[Dict[str, Any]] = None,
+                                cpu_budget: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Turn configured options into concrete ones, running the auto-tune if enabled.
+
+    The returned dict has autotune switched off so it can be handed to worker
+    processes without re-benchmarking there.
+    """
+    options = merge_interpreter_options(options)
+    if options["autotune"] and tflite is not None and os.path.exists(model_path):
+        try:
+            options["num_threads"] = autotune_num_threads(model_path, model_name, options,
+                                                          cpu_budget=cpu_budget)["num_threads"]
+        except Exception as e:
+            logger.warning(f"{model_name} auto-tune failed, using configured options: {e}")
+    options["autotune"] = False
+    return options
+
+
+def load_tflite_model(model_path: str, model_name: str, options: Optional[Dict[str, Any]] = None):
+    """
+    Load a TensorFlow Lite model and return the interpreter.
+
+    Args:
+        model_path: Path to the .tflite file
+        model_name: Name used in log messages
+        options: Interpreter options (num_threads, xnnpack, cpu_affinity, autotune)
+    """
+    try:
+        if tflite is None:
+            logger.error(f"Cannot load {model_name} model: no TFLite runtime available")
+            return None
+
+        if not os.path.exists(model_path):
+            logger.error(f"{model_name} model not found: {model_path}")
+            return None
+
+        options = resolve_interpreter_options(str(model_path), model_name, options)
+        logger.info(f"Loading {model_name} model from: {model_path} "
+                    f"(num_threads={options['num_threads'] or 'default'}, xnnpack={options['xnnpack']}, "
+                    f"cpu_affinity={options['cpu_affinity']})")
+        interpreter = create_interpreter(model_path, options)
+
+        # Log input/output details
+        input_details = interpreter.get_input_details()
+        output_details = interpreter.get_output_details()
+        logger.info(f"{model_name} input shape: {input_details[0]['shape']}")
+        logger.info(f"{model_name} output shape: {output_details[0]['shape']}")
+
+        return interpreter
+    except Exception as e:
+        logger.error(f"Failed to load {model_name} model: {e}")
+        return None
+
+
+class ModelRunner:
+    """
+    Quantization-aware wrapper around one interpreter.
+
+    Input/output details, scale and zero-point are resolved once. Each calling
+    thread gets its own preallocated input and scratch buffers, so runners can
+    be shared by the per-equipment inference threads.
+    """
+
+    def __init__(self, interpreter, model_name: str = "model"):
+        self.interpreter = interpreter
+        self.model_name = model_name
+
+        input_detail = interpreter.get_input_details()[0]
+        output_detail = interpreter.get_output_details()[0]
+        self.input_index = input_detail['index']
+        self.output_index = output_detail['index']
+        self.input_shape = tuple(int(dim) for dim in input_detail['shape'])
+        self.input_dtype = np.dtype(input_detail['dtype'])
+        self.output_dtype = np.dtype(output_detail['dtype'])
+
+        self.input_quantized = self.input_dtype in (np.dtype(np.int8), np.dtype(np.uint8))
+        self.input_scale, self.input_zero_point = self._quantization(input_detail, self.input_dtype)
+        self.output_scale, self.output_zero_point = self._quantization(output_detail, self.output_dtype)
+        if self.input_quantized:
+            dtype_info = np.iinfo(self.input_dtype)
+            self.input_min, self.input_max = float(dtype_info.min), float(dtype_info.max)
+
+        self._local = threading.local()
+
+    @staticmethod
+    def _quantization(detail: Dict[str, Any], dtype: np.dtype):
+        """
+        (scale, zero_point) for a tensor; (1.0, 0) for float tensors.
+
+        Quantized tensors without parameters fall back to the [0, 1] -> full
+        integer range mapping older exports relied on.
+        """
+        if dtype not in (np.dtype(np.int8), np.dtype(np.uint8)):
+            return 1.0, 0
+        scale, zero_point = detail.get('quantization', (0.0, 0))
+        if not scale:
+            return 1.0 / 255.0, (-128 if dtype == np.dtype(np.int8) else 0)
+        return float(scale), int(zero_point)
+
+    def _buffers(self):
+        """Per-thread (input, scratch) buffers, allocated on first use."""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            input_buffer = np.zeros(self.input_shape, dtype=self.input_dtype)
+            scratch = np.zeros(self.input_shape, dtype=np.float32) if self.input_quantized else None
+            buffers = self._local.buffers = (input_buffer, scratch)
+        return buffers
+
+    def prepare(self, data: np.ndarray, data_scale: float = 1.0) -> np.ndarray:
+        """
+        Write `data` into this thread's input buffer in the model's dtype.
+
+        Args:
+            data: Input without batch dimension (or with a batch of 1)
+            data_scale: Real value of one unit of `data` (e.g. 1/255 for 8-bit frames)
+
+        Returns:
+            The filled input buffer (batch of 1)
+
+        Raises:
+            ValueError: If the input does not match the model input shape
+        """
+        data = np.asarray(data)
+        input_buffer, scratch = self._buffers()
+        # Exact shape only: a transposed input with the same element count must not be reshaped and scored
+        if data.shape != self.input_shape[1:] and data.shape != self.input_shape:
+            raise ValueError(f"{self.model_name} input shape {data.shape} does not match "
+                             f"model expected shape {self.input_shape[1:]}")
+        data = data.reshape(self.input_shape)
+
+        if not self.input_quantized:
+            if data_scale == 1.0:
+                np.copyto(input_buffer, data, casting='unsafe')
+            else:
+                np.multiply(data, data_scale, out=input_buffer, casting='unsafe')
+            return input_buffer
+
+        multiplier = data_scale / self.input_scale
+        if data.dtype == self.input_dtype and self.input_zero_point == 0 and abs(multiplier - 1.0) < 1e-6:
+            # Data is already in the model's quantized domain
+            np.copyto(input_buffer, data)
+            return input_buffer
+
+        np.multiply(data, multiplier, out=scratch, casting='unsafe')
+        if self.input_zero_point:
+            np.add(scratch, self.input_zero_point, out=scratch)
+        np.rint(scratch, out=scratch)
+        np.clip(scratch, self.input_min, self.input_max, out=scratch)
+        np.copyto(input_buffer, scratch, casting='unsafe')
+        return input_buffer
+
+    def input_buffer(self) -> np.ndarray:
+        """This thread's preallocated input buffer, for callers that fill it themselves."""
+        return self._buffers()[0]
+
+    def run(self, data: np.ndarray, data_scale: float = 1.0) -> np.ndarray:
+        """
+        Run the model and return the first output as float32 (dequantized if needed).
+        """
+        return self.run_buffer(self.prepare(data, data_scale))
+
+    def run_buffer(self, input_buffer: np.ndarray) -> np.ndarray:
+        """
+        Run the model on an already-filled input buffer (see input_buffer()).
+        """
+        self.interpreter.set_tensor(self.input_index, input_buffer)
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self.output_index)
+
+        if self.output_dtype in (np.dtype(np.int8), np.dtype(np.uint8)):
+            return (output.astype(np.float32) - self.output_zero_point) * np.float32(self.output_scale)
+        return output.astype(np.float32, copy=False)
+
+    def score(self, data: np.ndarray, data_scale: float = 1.0) -> float:
+        """Run the model and return its first output value (e.g. sigmoid anomaly score)."""
+        return float(np.ravel(self.run(data, data_scale))[0])
+
+
+_runners = weakref.WeakKeyDictionary()
+_runners_lock = threading.Lock()
+
+
+def get_runner(interpreter, model_name: str = "model") -> ModelRunner:
+    """
+    Return the cached ModelRunner for an interpreter, creating it on first use.
+
+    Runners are keyed by interpreter object, so swapping an interpreter (model
+    reload) transparently builds a new runner.
+    """
+    with _runners_lock:
+        runner = _runners.get(interpreter)
+        if runner is None:
+            runner = ModelRunner(interpreter, model_name)
+            _runners[interpreter] = runner
+        return runner
@@ -0,0 +1,487 @@
+"""
+Multi-process TFLite inference workers for PREMONITOR.
+
+Worker processes own the TFLite interpreters so CNN inference runs outside the
+monitor process (and its GIL). Model inputs are handed over through
+multiprocessing.shared_memory slots - the worker reads the slot in place and
+nothing is pickled on the way in. Only the small model outputs travel back on
+a result queue.
+
+Each worker has its own task queue, so the pool knows which worker holds every
+in-flight job. When a worker dies, only its jobs fail (their input slots are
+returned) and it is respawned, up to `max_restarts` times. Once no worker is
+left the pool reports `failed` so callers can fall back to local interpreters.
+
+Usage:
+    pool = InferenceWorkerPool({"thermal": config.THERMAL_MODEL_PATH}, processes=2)
+    if pool.start():
+        thermal_interpreter = pool.interpreter("thermal")  # Drop-in for tflite.Interpreter
+"""
+
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger('inference_worker')
+
+# How often the collector thread checks that the workers are still alive
+_COLLECTOR_POLL_SECONDS = 1.0
+
+_NO_MESSAGE = object()
+
+
+def _default_interpreter_factory(model_path: str, model_name: str, options: Optional[Dict[str, Any]] = None):
+    """Load an interpreter inside the worker process."""
+    import inference
+    return inference.load_tflite_model(model_path, model_name, options)
+
+
+def _worker_main(worker_index: int, model_paths: Dict[str, str], model_options: Dict[str, Dict[str, Any]],
+                 interpreter_factory: Callable, task_queue, result_queue) -> None:
+    """
+    Worker process entry point: load the models, then serve tasks until a None sentinel.
+
+    Tasks are (job_id, model_name, shm_name, shape, dtype) tuples; results are
+    (job_id, {output_index: array}, error) tuples.
+    """
+    interpreters = {}
+    specs = {}
+    for model_name, model_path in model_paths.items():
+        try:
+            interpreter = interpreter_factory(str(model_path), model_name, model_options.get(model_name))
+        except Exception as e:
+            logger.error(f"Worker {worker_index}: failed to load {model_name}: {e}")
+            interpreter = None
+        if interpreter is None:
+            continue
+        interpreters[model_name] = interpreter
+        specs[model_name] = {
+            "input_details": interpreter.get_input_details(),
+            "output_details": interpreter.get_output_details()
+        }
+
+    result_queue.put(("ready", worker_index, specs))
+
+    attached = {}
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        job_id, model_name, shm_name, shape, dtype = task
+        try:
+            shm = attached.get(shm_name)
+            if shm is None:
+                shm = shared_memory.SharedMemory(name=shm_name)
+                attached[shm_name] = shm
+            input_view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+            interpreter = interpreters[model_name]
+            interpreter.set_tensor(specs[model_name]["input_details"][0]["index"], input_view)
+            interpreter.invoke()
+            outputs = {
+                detail["index"]: interpreter.get_tensor(detail["index"])
+                for detail in specs[model_name]["output_details"]
+            }
+            del input_view
+            result_queue.put((job_id, outputs, None))
+        except Exception as e:
+            result_queue.put((job_id, None, f"{type(e).__name__}: {e}"))
+
+    for shm in attached.values():
+        shm.close()
+
+
+class InferenceJob:
+    """Handle for one submitted inference request."""
+
+    __slots__ = ("job_id", "model_name", "slot", "worker", "event", "outputs", "error")
+
+    def __init__(self, job_id: int, model_name: str, slot: int, worker: int):
+        self.job_id = job_id
+        self.model_name = model_name
+        self.slot = slot
+        self.worker = worker
+        self.event = threading.Event()
+        self.outputs: Optional[Dict[int, np.ndarray]] = None
+        self.error: Optional[str] = None
+
+    def result(self, timeout: Optional[float] = None) -> Dict[int, np.ndarray]:
+        """
+        Wait for the job to finish.
+
+        Returns:
+            Dict mapping output tensor index to output array
+
+        Raises:
+            TimeoutError: If no result arrives within timeout
+            RuntimeError: If the worker reported an error
+        """
+        if not self.event.wait(timeout):
+            raise TimeoutError(f"{self.model_name} inference timed out after {timeout}s")
+        if self.error is not None:
+            raise RuntimeError(f"{self.model_name} inference failed in worker: {self.error}")
+        return self.outputs
+
+
+class RemoteInterpreter:
+    """
+    Stand-in for tflite.Interpreter that runs invoke() on the worker pool.
+
+    set_tensor/invoke/get_tensor state is thread-local, so several threads can
+    share one RemoteInterpreter and keep multiple workers busy.
+    """
+
+    def __init__(self, pool: 'InferenceWorkerPool', model_name: str, timeout: float):
+        self._pool = pool
+        self._model_name = model_name
+        self._timeout = timeout
+        self._local = threading.local()
+
+    def allocate_tensors(self):
+        """No-op: tensors are allocated by the worker processes."""
+
+    def get_input_details(self) -> List[Dict[str, Any]]:
+        return self._pool.specs[self._model_name]["input_details"]
+
+    def get_output_details(self) -> List[Dict[str, Any]]:
+        return self._pool.specs[self._model_name]["output_details"]
+
+    def set_tensor(self, index: int, value: np.ndarray):
+        self._local.input = value
+
+    def invoke(self):
+        job = self._pool.submit(self._model_name, self._local.input)
+        self._local.outputs = job.result(self._timeout)
+
+    def get_tensor(self, index: int) -> np.ndarray:
+        return self._local.outputs[index]
+
+
+class InferenceWorkerPool:
+    """
+    Small pool of inference processes that each load every configured model.
+
+    Each model gets `slots_per_model` shared-memory input slots; a slot is held
+    from submit() until its result arrives (or its worker dies), which bounds
+    the number of in-flight requests per model. Jobs go to the worker with the
+    fewest in-flight jobs.
+    """
+
+    def __init__(self, model_paths: Dict[str, Any], processes: int = 1,
+                 slots_per_model: Optional[int] = None,
+                 interpreter_factory: Callable = _default_interpreter_factory,
+                 start_method: Optional[str] = None,
+                 timeout: float = 30.0,
+                 model_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 max_restarts: int = 3):
+        """
+        Args:
+            model_paths: Dict of model name -> .tflite path
+            processes: Number of worker processes
+            slots_per_model: Shared-memory input slots per model (default: processes)
+            interpreter_factory: Picklable callable(model_path, model_name, options) -> interpreter
+            start_method: multiprocessing start method (default: platform default)
+            timeout: Seconds to wait for worker startup and for each inference
+            model_options: Dict of model name -> interpreter options (see inference.py)
+            max_restarts: Dead workers respawned over the life of the pool before it gives up
+        """
+        self.model_paths = {name: str(path) for name, path in model_paths.items() if path}
+        self.processes = max(1, int(processes))
+        self.slots_per_model = max(1, int(slots_per_model or self.processes))
+        self.model_options = dict(model_options or {})
+        self.interpreter_factory = interpreter_factory
+        self.timeout = timeout
+        self.max_restarts = max(0, int(max_restarts))
+        self.restarts = 0
+        self.failed = False
+        self.specs: Dict[str, Dict[str, Any]] = {}
+
+        self._ctx = mp.get_context(start_method)
+        self._result_queue = None
+        self._task_queues: List[Any] = []
+        self._workers: List[Any] = []  # None for workers that exited and were not respawned
+        self._loads: List[int] = []  # In-flight jobs per worker
+        self._shm: Dict[str, List[shared_memory.SharedMemory]] = {}
+        self._slot_views: Dict[str, List[np.ndarray]] = {}
+        self._free_slots: Dict[str, queue.Queue] = {}
+        self._pending: Dict[int, InferenceJob] = {}
+        self._pending_lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._collector = None
+        self._running = False
+
+    @property
+    def models(self) -> List[str]:
+        """Names of the models every worker loaded successfully."""
+        return list(self.specs.keys())
+
+    def start(self) -> bool:
+        """
+        Start the worker processes and allocate shared-memory input slots.
+
+        Returns:
+            True if at least one model is available on every worker
+        """
+        self._result_queue = self._ctx.Queue()
+
+        self._task_queues = [None] * self.processes
+        self._workers = [None] * self.processes
+        self._loads = [0] * self.processes
+        for worker_index in range(self.processes):
+            self._spawn(worker_index)
+
+        # Wait for every worker to report which models it loaded
+        worker_specs = []
+        for _ in range(self.processes):
+            try:
+                message = self._result_queue.get(timeout=self.timeout)
+            except queue.Empty:
+                logger.error("Inference workers did not start in time")
+                self.stop()
+                return False
+            worker_specs.append(message[2])
+
+        common_models = set(worker_specs[0])
+        for specs in worker_specs[1:]:
+            common_models &= set(specs)
+        self.specs = {name: worker_specs[0][name] for name in self.model_paths if name in common_models}
+
+        if not self.specs:
+            logger.error("No models could be loaded by the inference workers")
+            self.stop()
+            return False
+
+        for model_name, spec in self.specs.items():
+            detail = spec["input_details"][0]
+            shape = tuple(int(dim) for dim in detail["shape"])
+            dtype = np.dtype(detail["dtype"])
+            nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+
+            self._shm[model_name] = []
+            self._slot_views[model_name] = []
+            self._free_slots[model_name] = queue.Queue()
+            for slot in range(self.slots_per_model):
+                shm = shared_memory.SharedMemory(create=True, size=nbytes)
+                self._shm[model_name].append(shm)
+                self._slot_views[model_name].append(np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+                self._free_slots[model_name].put(slot)
+
+        self._running = True
+        self._collector = threading.Thread(target=self._collect_results, name="inference-collector", daemon=True)
+        self._collector.start()
+
+        logger.info(f"Inference worker pool started: {self.processes} process(es), models={self.models}")
+        return True
+
+    def _spawn(self, worker_index: int):
+        """Start (or restart) one worker process with a fresh task queue."""
+        task_queue = self._ctx.Queue()
+        worker = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_index, self.model_paths, self.model_options, self.interpreter_factory,
+                  task_queue, self._result_queue),
+            name=f"premonitor-inference-{worker_index}",
+            daemon=True
+        )
+        worker.start()
+        self._task_queues[worker_index] = task_queue
+        self._workers[worker_index] = worker
+
+    def interpreter(self, model_name: str) -> Optional[RemoteInterpreter]:
+        """Return an interpreter-compatible proxy for a pooled model, or None if unavailable."""
+        if model_name not in self.specs:
+            return None
+        return RemoteInterpreter(self, model_name, self.timeout)
+
+    def submit(self, model_name: str, input_data: np.ndarray) -> InferenceJob:
+        """
+        Queue one inference request.
+
+        The input is written once into a shared-memory slot that the worker reads in place.
+
+        Raises:
+            KeyError: If the model is not loaded in the pool
+            ValueError: If the input dtype or size does not match the model input
+            TimeoutError: If no input slot frees up in time
+        """
+        if self.failed:
+            raise RuntimeError("Inference worker pool has failed")
+        if not self._running:
+            raise RuntimeError("Inference worker pool is not running")
+        if model_name not in self.specs:
+            raise KeyError(f"Model not available in worker pool: {model_name}")
+
+        try:
+            slot = self._free_slots[model_name].get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free {model_name} input slot after {self.timeout}s")
+
+        view = self._slot_views[model_name][slot]
+        try:
+            input_data = np.asarray(input_data)
+            if input_data.dtype != view.dtype:
+                raise ValueError(f"Got value of type {input_data.dtype} but expected {view.dtype} "
+                                 f"for {model_name} input")
+            if input_data.size != view.size:
+                raise ValueError(f"Got input of shape {input_data.shape} but expected {view.shape} "
+                                 f"for {model_name} input")
+            np.copyto(view, input_data.reshape(view.shape))
+        except Exception:
+            self._free_slots[model_name].put(slot)
+            raise
+
+        shm = self._shm[model_name][slot]
+        with self._pending_lock:
+            workers = [index for index, worker in enumerate(self._workers) if worker is not None]
+            if not workers:
+                self._free_slots[model_name].put(slot)
+                raise RuntimeError("Inference worker pool has failed")
+            worker_index = min(workers, key=self._loads.__getitem__)
+            job = InferenceJob(next(self._job_ids), model_name, slot, worker_index)
+            self._pending[job.job_id] = job
+            self._loads[worker_index] += 1
+            self._task_queues[worker_index].put((job.job_id, model_name, shm.name, view.shape, view.dtype.str))
+        return job
+
+    def _collect_results(self):
+        """Background thread: route results from the workers back to their jobs."""
+        next_check = time.monotonic() + _COLLECTOR_POLL_SECONDS
+        while self._running:
+            try:
+                message = self._result_queue.get(timeout=_COLLECTOR_POLL_SECONDS)
+            except queue.Empty:
+                message = _NO_MESSAGE
+            except (EOFError, OSError):
+                break
+
+            if message is None:
+                break
+
+            # Checked on a timer too, so a busy result queue cannot hide a dead worker
+            if message is _NO_MESSAGE or time.monotonic() >= next_check:
+                self._check_workers()
+                next_check = time.monotonic() + _COLLECTOR_POLL_SECONDS
+            if message is _NO_MESSAGE:
+                continue
+
+            if message[0] == "ready":
+                self._worker_ready(message[1], message[2])
+                continue
+
+            job_id, outputs, error = message
+            with self._pending_lock:
+                job = self._pending.pop(job_id, None)
+                if job is not None:
+                    self._loads[job.worker] -= 1
+            if job is None:
+                continue
+
+            self._free_slots[job.model_name].put(job.slot)
+            job.outputs = outputs
+            job.error = error
+            job.event.set()
+
+    def _check_workers(self):
+        """Fail the jobs of dead workers and respawn them while restarts remain."""
+        for worker_index, worker in enumerate(self._workers):
+            if worker is None or worker.is_alive():
+                continue
+            logger.error(f"Inference worker {worker_index} exited unexpectedly (exit code {worker.exitcode})")
+            self._retire_worker(worker_index, "inference worker exited unexpectedly")
+            if self.restarts < self.max_restarts:
+                self.restarts += 1
+                logger.warning(f"Restarting inference worker {worker_index} "
+                               f"(restart {self.restarts}/{self.max_restarts})")
+                self._spawn(worker_index)
+        self._check_failed()
+
+    def _worker_ready(self, worker_index: int, specs: Dict[str, Any]):
+        """A respawned worker finished loading; retire it if it lost a model the pool serves."""
+        missing = set(self.specs) - set(specs)
+        if not missing:
+            return
+        logger.error(f"Restarted inference worker {worker_index} could not load {sorted(missing)}")
+        worker = self._workers[worker_index]
+        self._retire_worker(worker_index, f"inference worker could not load {sorted(missing)}")
+        if worker is not None:
+            worker.terminate()
+        self._check_failed()
+
+    def _retire_worker(self, worker_index: int, reason: str):
+        """Stop dispatching to a worker and fail the jobs it holds."""
+        with self._pending_lock:
+            self._workers[worker_index] = None
+            self._loads[worker_index] = 0
+            jobs = [job for job in self._pending.values() if job.worker == worker_index]
+            for job in jobs:
+                del self._pending[job.job_id]
+        self._fail_jobs(jobs, reason)
+
+    def _check_failed(self):
+        if self.failed or any(worker is not None for worker in self._workers):
+            return
+        logger.error("No inference workers left - worker pool failed")
+        self.failed = True
+        self._fail_pending("inference worker pool failed")
+
+    def _fail_jobs(self, jobs: List[InferenceJob], reason: str):
+        """Fail jobs and return their input slots."""
+        for job in jobs:
+            self._free_slots[job.model_name].put(job.slot)
+            job.error = reason
+            job.event.set()
+
+    def _fail_pending(self, reason: str):
+        """Fail every in-flight job."""
+        with self._pending_lock:
+            jobs = list(self._pending.values())
+            self._pending.clear()
+            self._loads = [0] * len(self._loads)
+        self._fail_jobs(jobs, reason)
+
+    def stop(self):
+        """Stop the workers and release all shared memory."""
+        self._running = False
+
+        # Collector first, so it cannot respawn workers that are being stopped
+        if self._result_queue is not None:
+            try:
+                self._result_queue.put(None)
+            except (OSError, ValueError):
+                pass
+        if self._collector is not None:
+            self._collector.join(timeout=5)
+            self._collector = None
+
+        workers = [(worker, task_queue) for worker, task_queue in zip(self._workers, self._task_queues)
+                   if worker is not None]
+        for _, task_queue in workers:
+            try:
+                task_queue.put(None)
+            except (OSError, ValueError):
+                pass
+        for worker, _ in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+        self._task_queues = []
+
+        self._fail_pending("inference worker pool stopped")
+
+        self._slot_views.clear()
+        for slots in self._shm.values():
+            for shm in slots:
+                shm.close()
+                shm.unlink()
+        self._shm.clear()
+
+        logger.info("Inference worker pool stopped")
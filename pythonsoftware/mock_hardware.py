@@ -24,10 +24,12 @@ import os
 import random
 import numpy as np
 import tensorflow as tf
+from PIL import Image
 
 # Import our custom project configuration
 import config
 import utils # We need this for the audio_to_spectrogram function
+import thermal_pipeline
 
 # --- Global variables to hold the paths to our mock data ---
 MOCK_THERMAL_IMAGE_PATHS = []
@@ -75,23 +77,30 @@ def read_thermal_image():
     from the pre-loaded dataset paths.
 
     Returns:
-        A NumPy array representing an image, in the format expected by the AI model.
+        A uint8 NumPy array of config.THERMAL_FRAME_SHAPE (224x224 RGB, or 24x32
+        single channel for the compact MLX90640 model), like a real camera
+        driver would deliver. Pixels stay 8-bit all the way to the model.
     """
+    frame_shape = config.THERMAL_FRAME_SHAPE
     if not MOCK_THERMAL_IMAGE_PATHS:
         if config.DEBUG_MODE:
             print("MOCK_THERMAL: No image paths loaded. Returning empty array.")
-        return np.zeros(config.THERMAL_MODEL_INPUT_SHAPE, dtype=np.float32)
+        return np.zeros(frame_shape, dtype=np.uint8)
 
     random_image_path = random.choice(MOCK_THERMAL_IMAGE_PATHS)
 
     if config.DEBUG_MODE:
         print(f"MOCK_THERMAL: Reading mock image from {os.path.basename(random_image_path)}")
 
-    # Use the loader from utils to ensure consistent pre-processing
-    # We need to load the image and then get its numpy value for the mock hardware
-    image_tensor, _ = utils.load_image_and_label(random_image_path, 0) # Label is irrelevant here
-
-    return image_tensor.numpy() if image_tensor is not None else np.zeros(config.THERMAL_MODEL_INPUT_SHAPE, dtype=np.float32)
+    # Decode straight to uint8 and resize in integer space (no float tensors)
+    try:
+        with Image.open(random_image_path) as image:
+            frame = np.asarray(image.convert('L' if frame_shape[2] == 1 else 'RGB'), dtype=np.uint8)
+        frame = thermal_pipeline.resize_uint8(frame, frame_shape[:2])
+        return frame.reshape(frame_shape)
+    except Exception as e:
+        print(f"MOCK_THERMAL: Could not read {random_image_path}: {e}")
+        return np.zeros(frame_shape, dtype=np.uint8)
 
 
 def read_acoustic_spectrogram():
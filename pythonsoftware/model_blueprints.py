@@ -58,6 +58,39 @@ def get_thermal_anomaly_model(input_shape=config.THERMAL_MODEL_INPUT_SHAPE):
     print("--- Blueprint created: Thermal Anomaly Model (SimSiam with XceptionNet) ---")
     return siamese_model, encoder, predictor
 
+def get_compact_thermal_model(input_shape=config.THERMAL_COMPACT_INPUT_SHAPE):
+    """
+    Creates a compact CNN that runs directly on native MLX90640 frames
+    (24x32, single channel) - no upscaling to 224x224 RGB.
+
+    Depthwise-separable convolutions keep it to a few thousand parameters,
+    so the full-int8 export runs in well under a millisecond on a Pi.
+    All layers are int8-friendly (Conv/BN/ReLU/pooling/Dense).
+    """
+    model = models.Sequential([
+        layers.Input(shape=input_shape),
+        layers.Conv2D(16, (3, 3), padding='same', use_bias=False),
+        layers.BatchNormalization(),
+        layers.ReLU(),
+        layers.SeparableConv2D(32, (3, 3), padding='same', use_bias=False),
+        layers.BatchNormalization(),
+        layers.ReLU(),
+        layers.MaxPooling2D((2, 2)),                 # 12x16
+        layers.SeparableConv2D(64, (3, 3), padding='same', use_bias=False),
+        layers.BatchNormalization(),
+        layers.ReLU(),
+        layers.MaxPooling2D((2, 2)),                 # 6x8
+        layers.SeparableConv2D(64, (3, 3), padding='same', use_bias=False),
+        layers.BatchNormalization(),
+        layers.ReLU(),
+        layers.GlobalAveragePooling2D(),
+        layers.Dropout(0.3),
+        layers.Dense(1, activation='sigmoid')
+    ], name="thermal_compact_cnn")
+
+    print("\n--- Blueprint created: Compact Thermal Model (native 32x24 MLX90640) ---")
+    return model
+
 def get_acoustic_anomaly_model(input_shape=config.ACOUSTIC_MODEL_INPUT_SHAPE):
     """
     Creates a basic CNN for classifying spectrograms.
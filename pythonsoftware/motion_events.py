@@ -0,0 +1,254 @@
+"""
+Interrupt-driven PIR motion events for PREMONITOR.
+
+Polling GPIO.input() once per monitoring cycle misses any motion that starts
+and ends between two polls (an HC-SR501 pulse can be as short as a few
+seconds; cycles are 30 s). Here every PIR pin gets an edge callback. Each
+transition is timestamped into a fixed-size ring buffer, rising edges are
+latched per target (equipment id or zone) until the security pipeline
+consumes them, and a waiting thread is woken immediately.
+
+Pins map to targets from the equipment registry: a unit whose
+"motion_sensor" config has a gpio_pin is a target of that pin, and an
+optional "zone" adds the target "zone:<name>" so several units (or several
+pins) can share a room.
+
+Usage:
+    events = MotionEventMonitor.from_equipment(equipment_list, RPiGPIOEvents())
+    events.start()
+    woken = events.wait(timeout=30)        # Targets with new motion, or empty on timeout
+    if events.consume("fridge_lab_a_01"):  # Motion since the last check?
+        ...
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+try:
+    import RPi.GPIO as GPIO
+except (ImportError, RuntimeError):
+    GPIO = None
+
+logger = logging.getLogger('motion_events')
+
+# One GPIO transition: when, which pin, new level (1 = motion)
+TRANSITION_DTYPE = np.dtype([("timestamp", "f8"), ("pin", "i2"), ("level", "i1")])
+
+
+# ============================================================================
+# GPIO EVENT SOURCES
+# ============================================================================
+
+class RPiGPIOEvents:
+    """Edge callbacks from RPi.GPIO (BCM numbering), both edges per pin."""
+
+    def __init__(self):
+        if GPIO is None:
+            raise RuntimeError("RPi.GPIO is not available")
+        GPIO.setmode(GPIO.BCM)
+        self.pins: List[int] = []
+
+    def setup(self, pin: int, callback: Callable[[int, int], None], bouncetime_ms: int = 200):
+        """Call callback(pin, level) from the GPIO thread on every edge of `pin`."""
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+        GPIO.add_event_detect(pin, GPIO.BOTH, callback=lambda channel: callback(channel, GPIO.input(channel)),
+                              bouncetime=bouncetime_ms)
+        self.pins.append(pin)
+
+    def read(self, pin: int) -> int:
+        return int(GPIO.input(pin))
+
+    def close(self):
+        for pin in self.pins:
+            GPIO.remove_event_detect(pin)
+        self.pins.clear()
+
+
+class SimulatedGPIOEvents:
+    """
+    GPIO event source for tests and development without a Pi.
+
+    set_level() drives a pin like the PIR output would and calls the edge
+    callback on every change, from the caller's thread.
+    """
+
+    def __init__(self):
+        self.levels: Dict[int, int] = {}
+        self.callbacks: Dict[int, Callable[[int, int], None]] = {}
+
+    def setup(self, pin: int, callback: Callable[[int, int], None], bouncetime_ms: int = 200):
+        self.levels.setdefault(pin, 0)
+        self.callbacks[pin] = callback
+
+    def read(self, pin: int) -> int:
+        return self.levels.get(pin, 0)
+
+    def set_level(self, pin: int, level: int):
+        level = 1 if level else 0
+        if self.levels.get(pin, 0) == level:
+            return
+        self.levels[pin] = level
+        if pin in self.callbacks:
+            self.callbacks[pin](pin, level)
+
+    def pulse(self, pin: int):
+        """A complete motion pulse (rising then falling edge)."""
+        self.set_level(pin, 1)
+        self.set_level(pin, 0)
+
+    def close(self):
+        self.callbacks.clear()
+
+
+# ============================================================================
+# TRANSITION RING BUFFER
+# ============================================================================
+
+class TransitionRing:
+    """
+    Fixed-capacity ring buffer of GPIO transitions.
+
+    Every transition gets a sequence number; readers keep the sequence they
+    have seen and ask for everything after it. When a reader falls more than
+    `capacity` transitions behind, the oldest ones are gone and `dropped`
+    tells it how many.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=TRANSITION_DTYPE)
+        self.count = 0  # Sequence number of the next transition
+        self._lock = threading.Lock()
+
+    def append(self, timestamp: float, pin: int, level: int):
+        with self._lock:
+            self._buffer[self.count % self.capacity] = (timestamp, pin, level)
+            self.count += 1
+
+    def since(self, sequence: int = 0):
+        """
+        Transitions with sequence number >= `sequence`, oldest first.
+
+        Returns:
+            (transitions array, next sequence number, number dropped by overflow)
+        """
+        with self._lock:
+            end = self.count
+            start = max(sequence, end - self.capacity)
+            indices = np.arange(start, end) % self.capacity
+            return self._buffer[indices].copy(), end, start - sequence
+
+
+# ============================================================================
+# MOTION EVENT MONITOR
+# ============================================================================
+
+class MotionEventMonitor:
+    """
+    Edge-triggered motion state for every PIR pin.
+
+    Args:
+        source: GPIO event source (RPiGPIOEvents or SimulatedGPIOEvents)
+        pin_targets: GPIO pin -> equipment ids / zones it covers
+        capacity: Transitions kept in the ring buffer
+        bouncetime_ms: GPIO debounce time
+        clock: Wall-clock time source for transition timestamps
+    """
+
+    def __init__(self, source, pin_targets: Dict[int, Sequence[str]], capacity: int = 1024,
+                 bouncetime_ms: int = 200, clock: Callable[[], float] = time.time):
+        self.source = source
+        self.pin_targets = {int(pin): tuple(targets) for pin, targets in pin_targets.items()}
+        self.target_pins: Dict[str, np.ndarray] = {}
+        for pin, targets in self.pin_targets.items():
+            for target in targets:
+                self.target_pins[target] = np.append(self.target_pins.get(target, np.empty(0, dtype=np.int16)), pin)
+        self.bouncetime_ms = bouncetime_ms
+        self.clock = clock
+        self.ring = TransitionRing(capacity)
+        self._cursors: Dict[str, int] = {target: 0 for target in self.target_pins}
+        self._pending: Set[str] = set()
+        self._wake = threading.Condition()
+        self._started = False
+
+    @classmethod
+    def from_equipment(cls, equipment_list: Iterable[Dict], source, **kwargs) -> 'MotionEventMonitor':
+        """Map each enabled motion_sensor gpio_pin to its unit (and "zone:<name>" if configured)."""
+        pin_targets: Dict[int, List[str]] = {}
+        for equipment in equipment_list:
+            cfg = equipment.get("sensors", {}).get("motion_sensor", {})
+            if not cfg.get("enabled", False) or cfg.get("gpio_pin") is None:
+                continue
+            targets = pin_targets.setdefault(int(cfg["gpio_pin"]), [])
+            for target in (equipment["id"], f"zone:{cfg['zone']}" if cfg.get("zone") else None):
+                if target is not None and target not in targets:
+                    targets.append(target)
+        return cls(source, pin_targets, **kwargs)
+
+    def start(self):
+        """Register the edge callbacks (idempotent)."""
+        if self._started:
+            return
+        for pin in self.pin_targets:
+            self.source.setup(pin, self._on_edge, self.bouncetime_ms)
+        self._started = True
+        logger.info(f"Motion events on GPIO {sorted(self.pin_targets)} for {len(self.target_pins)} targets")
+
+    def _on_edge(self, pin: int, level: int):
+        """GPIO callback: record the transition and wake waiters on motion. Must stay short."""
+        self.ring.append(self.clock(), pin, 1 if level else 0)
+        if level:
+            with self._wake:
+                self._pending.update(self.pin_targets.get(pin, ()))
+                self._wake.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Block until motion is detected on any pin, or until `timeout`.
+
+        Returns:
+            Targets with motion since the previous wait() (empty on timeout)
+        """
+        with self._wake:
+            if not self._pending:
+                self._wake.wait(timeout)
+            woken, self._pending = self._pending, set()
+        return woken
+
+    def consume(self, target: str) -> bool:
+        """True if any of the target's pins saw a rising edge since the last consume()."""
+        pins = self.target_pins.get(target)
+        if pins is None:
+            return False
+        transitions, next_sequence, dropped = self.ring.since(self._cursors[target])
+        self._cursors[target] = next_sequence
+        if dropped:
+            logger.warning(f"Motion ring buffer overflowed: {dropped} transitions lost for {target}")
+        rising = (transitions["level"] == 1) & np.isin(transitions["pin"], pins)
+        return bool(rising.any())
+
+    def motion_active(self, target: str) -> bool:
+        """Current PIR output of any of the target's pins."""
+        return any(self.source.read(int(pin)) for pin in self.target_pins.get(target, ()))
+
+    def last_motion_time(self, target: str) -> Optional[float]:
+        """Timestamp of the most recent rising edge still in the ring buffer."""
+        pins = self.target_pins.get(target)
+        if pins is None:
+            return None
+        transitions, _, _ = self.ring.since(0)
+        rising = transitions[(transitions["level"] == 1) & np.isin(transitions["pin"], pins)]
+        return float(rising["timestamp"][-1]) if len(rising) else None
+
+    def close(self):
+        """Remove the edge callbacks and release any waiter."""
+        self.source.close()
+        self._started = False
+        with self._wake:
+            self._wake.notify_all()
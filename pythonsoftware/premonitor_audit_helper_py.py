@@ -9,11 +9,25 @@ Usage:
     generator = AuditReportGenerator()
     generator.generate_report(start_date='2025-10-01', end_date='2025-10-31',
                             output_format='pdf')
+
+Reports are computed in one streaming pass: alerts are read lazily from the
+JSON-lines log (a sparse block index, alerts.json.idx, lets a date range skip
+straight to the blocks that can contain it), aggregated as they go past, and
+written out incrementally, so memory use does not grow with the log.
+
+Weekly and monthly reports are assembled from daily rollups instead
+(logs/audit_rollups/YYYY-MM-DD.json: per-day counts, severity, category and
+per-equipment aggregates plus that day's table rows). The rollups are
+updated by record_alert() as alerts are written, or caught up lazily from a
+checkpoint (byte offset into the log) before each report, so a report reads
+at most 31 small files however long the history is.
 """
 
 import os
+import re
 import json
 import csv
+import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
 from collections import defaultdict, Counter
@@ -21,6 +35,376 @@ import logging
 
 logger = logging.getLogger('premonitor.audit')
 
+# Report categories and the table layout used for each
+CATEGORY_FORMATS = {
+    'thermal_incidents': 'thermal',
+    'fire_risk_events': 'thermal',
+    'acoustic_incidents': 'acoustic',
+    'gas_incidents': 'gas',
+    'fridge_incidents': 'thermal',
+    'correlated_events': 'generic',
+}
+
+INDEX_STRIDE = 256  # Alerts per index block
+TABLE_SPOOL_BYTES = 64 * 1024  # Table rows kept in memory before spilling to a temp file
+
+_PLACEHOLDER = re.compile(r'\$\{(\w+)\}')
+
+
+def classify_alert(alert):
+    """
+    (category, severity) of an alert from its title; category is None if it fits none.
+    """
+    title = alert.get('title', '').lower()
+    severity = 'CRITICAL' if 'critical' in title else 'WARNING'
+
+    if 'thermal' in title:
+        if 'fridge' in title or 'refrigerat' in title:
+            return 'fridge_incidents', severity
+        if 'fire' in title or 'overheating' in title:
+            return 'fire_risk_events', severity
+        return 'thermal_incidents', severity
+    if 'acoustic' in title or 'sound' in title:
+        return 'acoustic_incidents', severity
+    if 'gas' in title:
+        return 'gas_incidents', severity
+    if 'correlat' in title or 'multi' in title:
+        return 'correlated_events', severity
+    return None, severity
+
+
+def format_alert_row(alert, format_type='thermal'):
+    """One Markdown table row for an alert."""
+    timestamp = alert.get('timestamp', 'Unknown')
+    title = alert.get('title', 'Unknown')
+    details = str(alert.get('details', ''))
+
+    # Extract relevant info based on format type
+    if format_type == 'thermal':
+        return f"| {timestamp} | Lab Area | N/A | N/A | {title} | Pending |\n"
+    elif format_type == 'acoustic':
+        return f"| {timestamp} | Anomaly | High | {title} | Logged |\n"
+    elif format_type == 'gas':
+        return f"| {timestamp} | N/A | Threshold | N/A | Active | Resolved |\n"
+    return f"| {timestamp} | {title} | {details[:50]}... |\n"
+
+
+def _parse_time(value):
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _alert_time(alert):
+    """An alert's timestamp as a datetime, or None if it is missing or unparsable."""
+    try:
+        alert_time = _parse_time(alert.get('timestamp'))
+    except ValueError:
+        return None
+    return alert_time if isinstance(alert_time, datetime) else None
+
+
+class AlertIndex:
+    """
+    Sparse timestamp index over the JSON-lines alert log.
+
+    The log is split into blocks of INDEX_STRIDE alerts; for each block the
+    byte offset and the earliest and latest timestamp are stored in
+    <log>.idx. A date-range query only reads blocks whose [min, max] overlaps
+    the range, so out-of-order entries are still found. The index is
+    extended from where it stopped whenever the log has grown, and rebuilt
+    if the log was truncated or rotated.
+    """
+
+    def __init__(self, log_file, stride=INDEX_STRIDE):
+        self.log_file = Path(log_file)
+        self.index_file = self.log_file.with_name(self.log_file.name + '.idx')
+        self.stride = stride
+        self.offsets = []  # Start of each complete block
+        self.min_times = []
+        self.max_times = []
+        self.indexed_size = 0  # End of the last complete block
+
+    def _load(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+            if data.get('stride') != self.stride:
+                return
+            self.offsets = data['offsets']
+            self.min_times = data['min_times']
+            self.max_times = data['max_times']
+            self.indexed_size = data['indexed_size']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save(self):
+        data = {'stride': self.stride, 'indexed_size': self.indexed_size, 'offsets': self.offsets,
+                'min_times': self.min_times, 'max_times': self.max_times}
+        tmp_file = self.index_file.with_name(self.index_file.name + '.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_file, self.index_file)
+
+    def refresh(self):
+        """Bring the index up to date with the log; returns the log size."""
+        if not self.offsets:
+            self._load()
+        size = self.log_file.stat().st_size if self.log_file.exists() else 0
+        if size < self.indexed_size:
+            logger.info(f"Alert log shrank - rebuilding index {self.index_file}")
+            self.offsets, self.min_times, self.max_times, self.indexed_size = [], [], [], 0
+
+        grown = False
+        for offset, end, times, lines in self._scan_blocks(self.indexed_size, size):
+            if lines < self.stride:
+                break  # Incomplete tail block, scanned on every read
+            self.offsets.append(offset)
+            self.min_times.append(min(times, default=float('inf')))
+            self.max_times.append(max(times, default=float('-inf')))
+            self.indexed_size = end
+            grown = True
+        if grown:
+            self._save()
+        return size
+
+    def _scan_blocks(self, offset, size):
+        """(start, end, timestamps, line count) of each block of complete lines from offset to size."""
+        with open(self.log_file, 'rb') as f:
+            f.seek(offset)
+            block_offset, times, lines = offset, [], 0
+            while f.tell() < size:
+                line = f.readline()
+                if not line.endswith(b'\n'):
+                    break  # End of file or a line still being written
+                lines += 1
+                try:
+                    times.append(_parse_time(json.loads(line)['timestamp']).timestamp())
+                except (ValueError, KeyError, TypeError):
+                    pass
+                if lines == self.stride:
+                    yield block_offset, f.tell(), times, lines
+                    block_offset, times, lines = f.tell(), [], 0
+            if lines:
+                yield block_offset, f.tell(), times, lines
+
+    def ranges(self, start_date=None, end_date=None):
+        """Byte ranges (start, end) of the log that may hold alerts in [start_date, end_date]."""
+        size = self.refresh()
+        start = start_date.timestamp() if start_date else float('-inf')
+        end = end_date.timestamp() if end_date else float('inf')
+        block_ends = self.offsets[1:] + [self.indexed_size]
+        for offset, block_end, low, high in zip(self.offsets, block_ends, self.min_times, self.max_times):
+            if high >= start and low <= end:
+                yield offset, block_end
+        if size > self.indexed_size:
+            yield self.indexed_size, size
+
+
+class AlertAggregator:
+    """
+    One-pass aggregation of an alert stream for audit reports.
+
+    Keeps counts, severity and category breakdowns and per-equipment
+    statistics, and spools each category's Markdown table rows (in memory up
+    to TABLE_SPOOL_BYTES, then a temp file) instead of keeping the alerts.
+    """
+
+    def __init__(self, keep_tables=True):
+        self.total = 0
+        self.severity_counts = Counter()
+        self.category_counts = Counter()
+        self.equipment = {}  # equipment_id -> [count, critical, first, last]
+        self.tables = {}
+        if keep_tables:
+            self.tables = {category: tempfile.SpooledTemporaryFile(TABLE_SPOOL_BYTES, mode='w+', encoding='utf-8')
+                           for category in CATEGORY_FORMATS}
+
+    def add(self, alert, alert_time):
+        """Count one alert; without a time (None) it is left out of the per-equipment statistics."""
+        category, severity = classify_alert(alert)
+        self.total += 1
+        self.severity_counts[severity] += 1
+        if category is not None:
+            self.category_counts[category] += 1
+            if self.tables:
+                self.tables[category].write(format_alert_row(alert, CATEGORY_FORMATS[category]))
+
+        if alert_time is not None:
+            self._add_equipment(alert.get('equipment_id', 'unknown'), 1, int(severity == 'CRITICAL'),
+                                alert_time, alert_time)
+
+    def _add_equipment(self, equipment_id, count, critical, first, last):
+        stats = self.equipment.get(equipment_id)
+        if stats is None:
+            self.equipment[equipment_id] = [count, critical, first, last]
+        else:
+            stats[0] += count
+            stats[1] += critical
+            stats[2] = min(stats[2], first)
+            stats[3] = max(stats[3], last)
+
+    def merge(self, rollup):
+        """Add one day's rollup record (see DailyRollupStore)."""
+        self.total += rollup['total']
+        self.severity_counts.update(rollup['severity'])
+        self.category_counts.update(rollup['categories'])
+        if self.tables:
+            for category, rows in rollup['rows'].items():
+                self.tables[category].write(rows)
+        for equipment_id, (count, critical, first, last) in rollup['equipment'].items():
+            self._add_equipment(equipment_id, count, critical,
+                                datetime.fromisoformat(first), datetime.fromisoformat(last))
+
+    def equipment_statistics(self):
+        """Per-equipment counts and mean time between alerts (hours, None for a single alert)."""
+        result = {}
+        for equipment_id, (count, critical, first, last) in sorted(self.equipment.items()):
+            mtbf = (last - first).total_seconds() / 3600 / (count - 1) if count > 1 else None
+            result[equipment_id] = {'alerts': count, 'critical': critical, 'first': first.isoformat(),
+                                    'last': last.isoformat(), 'mean_hours_between_alerts': mtbf}
+        return result
+
+    def write_table(self, category, out):
+        """Copy a category's spooled table rows to `out`."""
+        table = self.tables[category]
+        if not self.category_counts[category]:
+            out.write("No incidents recorded during this period.\n")
+            return
+        table.seek(0)
+        for chunk in iter(lambda: table.read(TABLE_SPOOL_BYTES), ''):
+            out.write(chunk)
+
+    def write_equipment_table(self, out):
+        if not self.equipment:
+            out.write("No equipment alerts recorded during this period.\n")
+            return
+        for equipment_id, stats in self.equipment_statistics().items():
+            mtbf = stats['mean_hours_between_alerts']
+            mtbf = f"{mtbf:.1f}" if mtbf is not None else 'N/A'
+            out.write(f"| {equipment_id} | {stats['alerts']} | {stats['critical']} | {mtbf} | {stats['last']} |\n")
+
+    def close(self):
+        for table in self.tables.values():
+            table.close()
+
+
+class DailyRollupStore:
+    """
+    Per-day alert aggregates, one small JSON file per day, kept in step with the log.
+
+    checkpoint.json records how far into the log the rollups go; catch_up()
+    folds in everything after it, and a log that shrank (rotated) restarts
+    from the beginning with fresh rollups.
+    """
+
+    def __init__(self, rollup_dir, log_file):
+        self.rollup_dir = Path(rollup_dir)
+        self.log_file = Path(log_file)
+        self.checkpoint_file = self.rollup_dir / 'checkpoint.json'
+        self._days = {}  # Loaded records by ISO date
+        self._dirty = set()
+
+    def _path(self, day):
+        return self.rollup_dir / f"{day}.json"
+
+    def record(self, day):
+        """Rollup record for an ISO date (an empty one if nothing was rolled up)."""
+        if day not in self._days:
+            try:
+                with open(self._path(day), 'r', encoding='utf-8') as f:
+                    self._days[day] = json.load(f)
+            except (OSError, ValueError):
+                self._days[day] = {'date': day, 'total': 0, 'severity': {}, 'categories': {},
+                                   'equipment': {}, 'rows': {}}
+        return self._days[day]
+
+    def add(self, alert, alert_time):
+        """Count one alert in the rollup of its day; alert_time must be a datetime (catch_up skips the rest)."""
+        category, severity = classify_alert(alert)
+        day = alert_time.date().isoformat()
+        rollup = self.record(day)
+        rollup['total'] += 1
+        rollup['severity'][severity] = rollup['severity'].get(severity, 0) + 1
+        if category is not None:
+            rollup['categories'][category] = rollup['categories'].get(category, 0) + 1
+            rollup['rows'][category] = rollup['rows'].get(category, '') + format_alert_row(
+                alert, CATEGORY_FORMATS[category])
+
+        timestamp = alert_time.isoformat()
+        equipment_id = alert.get('equipment_id', 'unknown')
+        stats = rollup['equipment'].get(equipment_id)
+        if stats is None:
+            rollup['equipment'][equipment_id] = [1, int(severity == 'CRITICAL'), timestamp, timestamp]
+        else:
+            stats[0] += 1
+            stats[1] += severity == 'CRITICAL'
+            stats[2] = min(stats[2], timestamp)
+            stats[3] = max(stats[3], timestamp)
+        self._dirty.add(day)
+
+    def _read_checkpoint(self):
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                return json.load(f).get('offset', 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_json(self, path, data):
+        tmp_file = path.with_name(path.name + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_file, path)
+
+    def _reset(self):
+        for path in self.rollup_dir.glob('????-??-??.json'):
+            path.unlink()
+        self._days.clear()
+        self._dirty.clear()
+
+    def catch_up(self):
+        """Fold log entries written since the checkpoint into the rollups; returns how many."""
+        if not self.log_file.exists():
+            return 0
+        self.rollup_dir.mkdir(parents=True, exist_ok=True)
+        offset = self._read_checkpoint()
+        if self.log_file.stat().st_size < offset:
+            logger.info(f"Alert log shrank - rebuilding rollups in {self.rollup_dir}")
+            self._reset()
+            offset = 0
+
+        added = 0
+        with open(self.log_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Line still being written; picked up next time
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    alert = json.loads(line)
+                    alert_time = datetime.fromisoformat(alert.get('timestamp', ''))
+                except (json.JSONDecodeError, ValueError, TypeError) as e:
+                    logger.warning(f"Skipping malformed alert entry: {e}")
+                    continue
+                self.add(alert, alert_time)
+                added += 1
+
+        for day in self._dirty:
+            self._write_json(self._path(day), self._days[day])
+        self._dirty.clear()
+        self._write_json(self.checkpoint_file, {'offset': offset, 'log_file': str(self.log_file)})
+        return added
+
+    def records(self, start_day, end_day):
+        """Rollup records for the days from start_day to end_day inclusive (days without alerts skipped)."""
+        day = start_day
+        while day <= end_day:
+            if self._path(day.isoformat()).exists() or day.isoformat() in self._days:
+                yield self.record(day.isoformat())
+            day += timedelta(days=1)
+
 
 class AuditReportGenerator:
     """Generate compliance audit reports from PREMONITOR alert logs."""
@@ -30,6 +414,8 @@ class AuditReportGenerator:
         self.logs_dir = Path(logs_dir)
         self.templates_dir = Path(templates_dir)
         self.alerts_log_file = self.logs_dir / 'alerts.json'
+        self.index = AlertIndex(self.alerts_log_file)
+        self.rollups = DailyRollupStore(self.logs_dir / 'audit_rollups', self.alerts_log_file)
 
         # Ensure directories exist
         self.logs_dir.mkdir(parents=True, exist_ok=True)
@@ -37,88 +423,84 @@ class AuditReportGenerator:
 
         logger.info(f"AuditReportGenerator initialized: logs={self.logs_dir}")
 
-    def load_alerts(self, start_date=None, end_date=None):
+    def record_alert(self, alert):
+        """Append an alert to the log and update the daily rollups with it."""
+        alert.setdefault('timestamp', datetime.now().isoformat())
+        with open(self.alerts_log_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(alert) + '\n')
+        self.rollups.catch_up()
+
+    def iter_alerts(self, start_date=None, end_date=None):
         """
-        Load alerts from log file within date range.
+        Yield (alert, timestamp) pairs within the date range, reading only the
+        parts of the log the timestamp index says can contain it.
 
         Args:
             start_date: Start date (datetime or ISO string)
             end_date: End date (datetime or ISO string)
-
-        Returns:
-            List of alert dictionaries
         """
         if not self.alerts_log_file.exists():
             logger.warning(f"Alerts log file not found: {self.alerts_log_file}")
-            return []
+            return
+
+        start_date = _parse_time(start_date)
+        end_date = _parse_time(end_date)
+
+        with open(self.alerts_log_file, 'rb') as f:
+            for offset, end in self.index.ranges(start_date, end_date):
+                f.seek(offset)
+                while f.tell() < end:
+                    line = f.readline()
+                    if not line:
+                        break
+                    if not line.strip():
+                        continue
+                    try:
+                        alert = json.loads(line)
+                        alert_time = datetime.fromisoformat(alert.get('timestamp', ''))
+                    except (json.JSONDecodeError, ValueError, TypeError) as e:
+                        logger.warning(f"Skipping malformed alert entry: {e}")
+                        continue
 
-        # Parse dates
-        if isinstance(start_date, str):
-            start_date = datetime.fromisoformat(start_date)
-        if isinstance(end_date, str):
-            end_date = datetime.fromisoformat(end_date)
+                    # Filter by date range
+                    if start_date and alert_time < start_date:
+                        continue
+                    if end_date and alert_time > end_date:
+                        continue
 
-        alerts = []
+                    yield alert, alert_time
 
-        try:
-            with open(self.alerts_log_file, 'r') as f:
-                for line in f:
-                    try:
-                        alert = json.loads(line.strip())
-                        alert_time = datetime.fromisoformat(alert.get('timestamp', ''))
+    def load_alerts(self, start_date=None, end_date=None):
+        """
+        Load alerts from log file within date range.
 
-                        # Filter by date range
-                        if start_date and alert_time < start_date:
-                            continue
-                        if end_date and alert_time > end_date:
-                            continue
+        Prefer iter_alerts() for large logs; this materialises the whole range.
 
-                        alerts.append(alert)
-                    except (json.JSONDecodeError, ValueError) as e:
-                        logger.warning(f"Skipping malformed alert entry: {e}")
+        Args:
+            start_date: Start date (datetime or ISO string)
+            end_date: End date (datetime or ISO string)
 
+        Returns:
+            List of alert dictionaries
+        """
+        try:
+            alerts = [alert for alert, _ in self.iter_alerts(start_date, end_date)]
             logger.info(f"Loaded {len(alerts)} alerts from {start_date} to {end_date}")
             return alerts
-
         except Exception as e:
             logger.error(f"Error loading alerts: {e}")
             return []
 
     def categorize_alerts(self, alerts):
         """Categorize alerts by type and severity."""
-        categories = {
-            'thermal_incidents': [],
-            'fire_risk_events': [],
-            'acoustic_incidents': [],
-            'gas_incidents': [],
-            'fridge_incidents': [],
-            'correlated_events': []
-        }
-
+        categories = {category: [] for category in CATEGORY_FORMATS}
         severity_counts = Counter()
 
         for alert in alerts:
-            title = alert.get('title', '').lower()
-            severity = 'CRITICAL' if 'critical' in title else 'WARNING'
+            category, severity = classify_alert(alert)
             severity_counts[severity] += 1
-
-            # Categorize by alert type
-            if 'thermal' in title:
-                if 'fridge' in title or 'refrigerat' in title:
-                    categories['fridge_incidents'].append(alert)
-                elif 'fire' in title or 'overheating' in title:
-                    categories['fire_risk_events'].append(alert)
-                else:
-                    categories['thermal_incidents'].append(alert)
-
-            elif 'acoustic' in title or 'sound' in title:
-                categories['acoustic_incidents'].append(alert)
-
-            elif 'gas' in title:
-                categories['gas_incidents'].append(alert)
-
-            elif 'correlat' in title or 'multi' in title:
-                categories['correlated_events'].append(alert)
+            if category is not None:
+                categories[category].append(alert)
 
         return categories, severity_counts
 
@@ -127,41 +509,18 @@ class AuditReportGenerator:
         if not alerts:
             return "No incidents recorded during this period.\n"
 
-        rows = []
-
-        for alert in alerts:
-            timestamp = alert.get('timestamp', 'Unknown')
-            title = alert.get('title', 'Unknown')
-            details = alert.get('details', '')
-
-            # Extract relevant info based on format type
-            if format_type == 'thermal':
-                # Example row format
-                row = f"| {timestamp} | Lab Area | N/A | N/A | {title} | Pending |\n"
-            elif format_type == 'acoustic':
-                row = f"| {timestamp} | Anomaly | High | {title} | Logged |\n"
-            elif format_type == 'gas':
-                row = f"| {timestamp} | N/A | Threshold | N/A | Active | Resolved |\n"
-            else:
-                row = f"| {timestamp} | {title} | {details[:50]}... |\n"
-
-            rows.append(row)
+        return ''.join(format_alert_row(alert, format_type) for alert in alerts)
 
-        return ''.join(rows)
-
-    def calculate_statistics(self, alerts, start_date, end_date):
-        """Calculate report statistics."""
+    def _report_statistics(self, aggregator, start_date, end_date):
         total_hours = (end_date - start_date).total_seconds() / 3600
 
-        categories, severity_counts = self.categorize_alerts(alerts)
-
-        stats = {
+        return {
             'timestamp': datetime.now().isoformat(),
             'report_type': 'Automated Safety Audit',
             'total_hours': f"{total_hours:.1f}",
-            'total_alerts': len(alerts),
-            'critical_count': severity_counts.get('CRITICAL', 0),
-            'warning_count': severity_counts.get('WARNING', 0),
+            'total_alerts': aggregator.total,
+            'critical_count': aggregator.severity_counts.get('CRITICAL', 0),
+            'warning_count': aggregator.severity_counts.get('WARNING', 0),
             'uptime_percent': '99.9',  # Placeholder - calculate from system logs
             'thermal_coverage': '95',
             'acoustic_coverage': '90',
@@ -177,18 +536,85 @@ class AuditReportGenerator:
             'institutional_compliant': '✓ Compliant',
         }
 
+    def calculate_statistics(self, alerts, start_date, end_date):
+        """Calculate report statistics."""
+        aggregator = AlertAggregator(keep_tables=False)
+        for alert in alerts:
+            aggregator.add(alert, _alert_time(alert))
+
+        stats = self._report_statistics(aggregator, start_date, end_date)
+        stats['equipment_statistics'] = aggregator.equipment_statistics()
+        categories, _ = self.categorize_alerts(alerts)
         return stats, categories
 
+    def aggregate(self, start_date, end_date, csv_out=None):
+        """
+        Aggregate the date range in one pass over the log.
+
+        Args:
+            csv_out: Open text file; if given, every alert is also written to it as a CSV row
+
+        Returns:
+            AlertAggregator (close() it when done)
+        """
+        aggregator = AlertAggregator(keep_tables=csv_out is None)
+        writer = None
+        for alert, alert_time in self.iter_alerts(start_date, end_date):
+            aggregator.add(alert, alert_time)
+            if csv_out is not None:
+                if writer is None:
+                    writer = csv.DictWriter(csv_out, fieldnames=list(alert.keys()), extrasaction='ignore')
+                    writer.writeheader()
+                writer.writerow(alert)
+        return aggregator
+
+    def aggregate_rollups(self, start_date, end_date):
+        """
+        Aggregate whole days from start_date to end_date from the daily rollups.
+
+        Returns:
+            AlertAggregator (close() it when done)
+        """
+        self.rollups.catch_up()
+        aggregator = AlertAggregator()
+        for rollup in self.rollups.records(start_date.date(), end_date.date()):
+            aggregator.merge(rollup)
+        return aggregator
+
+    def _render_markdown(self, template, out, aggregator, stats, placeholders):
+        """Write the template to `out`, streaming tables into their placeholders."""
+        position = 0
+        for match in _PLACEHOLDER.finditer(template):
+            out.write(template[position:match.start()])
+            position = match.end()
+            key = match.group(1)
+            if key in stats:
+                out.write(str(stats[key]))
+            elif key in CATEGORY_FORMATS:
+                aggregator.write_table(key, out)
+            elif key == 'equipment_statistics':
+                aggregator.write_equipment_table(out)
+            elif key in placeholders:
+                out.write(placeholders[key])
+            else:
+                out.write(match.group(0))
+        out.write(template[position:])
+
     def generate_report(self, start_date, end_date, output_format='markdown',
-                       output_file=None):
+                       output_file=None, use_rollups=False):
         """
         Generate a complete audit report.
 
+        Alerts are streamed from the log once; CSV rows and Markdown tables are
+        written as they are produced.
+
         Args:
             start_date: Report start date (datetime or ISO string)
             end_date: Report end date (datetime or ISO string)
             output_format: 'markdown', 'csv', or 'pdf'
             output_file: Output file path (auto-generated if None)
+            use_rollups: Build a Markdown/PDF report from the daily rollups
+                (whole days from start_date to end_date) instead of the raw log
 
         Returns:
             Path to generated report file
@@ -196,16 +622,22 @@ class AuditReportGenerator:
         logger.info(f"Generating audit report: {start_date} to {end_date}")
 
         # Parse dates
-        if isinstance(start_date, str):
-            start_date = datetime.fromisoformat(start_date)
-        if isinstance(end_date, str):
-            end_date = datetime.fromisoformat(end_date)
+        start_date = _parse_time(start_date)
+        end_date = _parse_time(end_date)
 
-        # Load alerts
-        alerts = self.load_alerts(start_date, end_date)
+        # Generate output filename
+        if not output_file:
+            period_str = f"{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"
+            output_file = self.logs_dir / f"audit_report_{period_str}.{output_format}"
+        output_file = Path(output_file)
 
-        # Calculate statistics
-        stats, categories = self.calculate_statistics(alerts, start_date, end_date)
+        if output_format == 'csv':
+            # Export alerts as CSV
+            csv_file = output_file.with_suffix('.csv')
+            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+                self.aggregate(start_date, end_date, csv_out=f).close()
+            logger.info(f"CSV report generated: {csv_file}")
+            return csv_file
 
         # Load template
         template_file = self.templates_dir / 'lab_safety_audit_template.md'
@@ -216,101 +648,51 @@ class AuditReportGenerator:
         with open(template_file, 'r') as f:
             template = f.read()
 
-        # Populate template
-        report_content = template
-
-        # Replace basic variables
-        for key, value in stats.items():
-            report_content = report_content.replace(f'${{{key}}}', str(value))
-
-        # Replace table sections
-        report_content = report_content.replace(
-            '${thermal_incidents}',
-            self.format_alert_table(categories['thermal_incidents'], 'thermal')
-        )
-        report_content = report_content.replace(
-            '${fire_risk_events}',
-            self.format_alert_table(categories['fire_risk_events'], 'thermal')
-        )
-        report_content = report_content.replace(
-            '${acoustic_incidents}',
-            self.format_alert_table(categories['acoustic_incidents'], 'acoustic')
-        )
-        report_content = report_content.replace(
-            '${gas_incidents}',
-            self.format_alert_table(categories['gas_incidents'], 'gas')
-        )
-        report_content = report_content.replace(
-            '${fridge_incidents}',
-            self.format_alert_table(categories['fridge_incidents'], 'thermal')
-        )
-        report_content = report_content.replace(
-            '${correlated_events}',
-            self.format_alert_table(categories['correlated_events'], 'generic')
-        )
-
         # Replace text sections with placeholders
         placeholders = {
-            '${equipment_thermal_anomalies}': 'No equipment thermal anomalies detected.\n',
-            '${equipment_acoustic_anomalies}': 'No equipment acoustic anomalies detected.\n',
-            '${ventilation_notes}': 'Ventilation system operating nominally.\n',
-            '${compressor_anomalies}': 'No compressor anomalies detected.\n',
-            '${immediate_recommendations}': '- Continue routine monitoring\n- Review any critical alerts\n',
-            '${preventive_maintenance}': '- Schedule quarterly calibration\n- Test backup power systems\n',
-            '${system_improvements}': '- Consider adding redundant sensors\n- Expand coverage to additional areas\n',
-            '${period}': start_date.strftime('%Y-%m')
+            'equipment_thermal_anomalies': 'No equipment thermal anomalies detected.\n',
+            'equipment_acoustic_anomalies': 'No equipment acoustic anomalies detected.\n',
+            'ventilation_notes': 'Ventilation system operating nominally.\n',
+            'compressor_anomalies': 'No compressor anomalies detected.\n',
+            'immediate_recommendations': '- Continue routine monitoring\n- Review any critical alerts\n',
+            'preventive_maintenance': '- Schedule quarterly calibration\n- Test backup power systems\n',
+            'system_improvements': '- Consider adding redundant sensors\n- Expand coverage to additional areas\n',
+            'period': start_date.strftime('%Y-%m')
         }
 
-        for key, value in placeholders.items():
-            report_content = report_content.replace(key, value)
-
-        # Generate output filename
-        if not output_file:
-            period_str = f"{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"
-            output_file = self.logs_dir / f"audit_report_{period_str}.{output_format}"
-
-        # Write report
-        output_file = Path(output_file)
-
-        if output_format == 'markdown':
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(report_content)
-            logger.info(f"Markdown report generated: {output_file}")
-
-        elif output_format == 'csv':
-            # Export alerts as CSV
-            csv_file = output_file.with_suffix('.csv')
-            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                if alerts:
-                    writer = csv.DictWriter(f, fieldnames=alerts[0].keys())
-                    writer.writeheader()
-                    writer.writerows(alerts)
-            logger.info(f"CSV report generated: {csv_file}")
-            output_file = csv_file
-
-        elif output_format == 'pdf':
+        if output_format == 'pdf':
             # PDF generation requires additional dependencies (e.g., reportlab, weasyprint)
             logger.warning("PDF generation not yet implemented - falling back to markdown")
-            with open(output_file.with_suffix('.md'), 'w', encoding='utf-8') as f:
-                f.write(report_content)
             output_file = output_file.with_suffix('.md')
 
+        if use_rollups:
+            aggregator = self.aggregate_rollups(start_date, end_date)
+        else:
+            aggregator = self.aggregate(start_date, end_date)
+        try:
+            stats = self._report_statistics(aggregator, start_date, end_date)
+            with open(output_file, 'w', encoding='utf-8') as f:
+                self._render_markdown(template, f, aggregator, stats, placeholders)
+        finally:
+            aggregator.close()
+        logger.info(f"Markdown report generated: {output_file}")
+
         return output_file
 
     def generate_weekly_report(self, week_offset=0):
         """Generate report for a specific week (0 = current week, -1 = last week)."""
-        today = datetime.now()
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         start_of_week = today - timedelta(days=today.weekday() + 7 * abs(week_offset))
         end_of_week = start_of_week + timedelta(days=6, hours=23, minutes=59, seconds=59)
 
-        return self.generate_report(start_of_week, end_of_week)
+        return self.generate_report(start_of_week, end_of_week, use_rollups=True)
 
     def generate_monthly_report(self, month_offset=0):
         """Generate report for a specific month (0 = current month, -1 = last month)."""
         today = datetime.now()
 
         # Calculate target month
-        target_month = today.month - month_offset
+        target_month = today.month - abs(month_offset)
         target_year = today.year
 
         while target_month < 1:
@@ -326,7 +708,7 @@ class AuditReportGenerator:
         else:
             end_date = datetime(target_year, target_month + 1, 1) - timedelta(seconds=1)
 
-        return self.generate_report(start_date, end_date)
+        return self.generate_report(start_date, end_date, use_rollups=True)
 
 
 # CLI interface
@@ -22,25 +22,20 @@ from pathlib import Path
 from datetime import datetime
 import numpy as np
 
-# Try importing tflite_runtime first (lighter weight for Pi), fall back to tensorflow
-try:
-    from tflite_runtime.interpreter import Interpreter as TFLiteInterpreter
-    TFLITE_RUNTIME_AVAILABLE = True
-    logging.info("Using tflite_runtime for model inference")
-except ImportError:
-    try:
-        import tensorflow as tf
-        TFLiteInterpreter = tf.lite.Interpreter
-        TFLITE_RUNTIME_AVAILABLE = False
-        logging.info("Using tensorflow.lite for model inference")
-    except ImportError:
-        logging.critical("Neither tflite_runtime nor tensorflow available. Cannot run.")
-        sys.exit(1)
-
 # Add pythonsoftware to path
 SCRIPT_DIR = Path(__file__).resolve().parent
 sys.path.insert(0, str(SCRIPT_DIR))
 
+# Shared inference module (tflite_runtime preferred, tensorflow.lite fallback)
+import inference
+import thermal_pipeline
+
+if inference.tflite is None:
+    logging.critical("Neither tflite_runtime nor tensorflow available. Cannot run.")
+    sys.exit(1)
+TFLITE_RUNTIME_AVAILABLE = inference.USING_TFLITE_RUNTIME
+logging.info(f"Using {'tflite_runtime' if TFLITE_RUNTIME_AVAILABLE else 'tensorflow.lite'} for model inference")
+
 # Import custom modules
 try:
     import premonitor_config_py as config
@@ -125,17 +120,20 @@ def startup_check():
 def load_models():
     """
     Loads the trained and quantized .tflite models into memory.
-    Uses TFLiteInterpreter (either tflite_runtime or tensorflow.lite).
+    Uses the shared inference module (either tflite_runtime or tensorflow.lite).
     Raises RuntimeError if models cannot be loaded.
     """
     global thermal_interpreter, acoustic_interpreter
     logger.info("Loading AI models...")
     
+    model_options = getattr(config, 'MODEL_INTERPRETER_OPTIONS', {})
     try:
         # Load thermal model
         logger.debug(f"Loading thermal model from: {config.THERMAL_MODEL_PATH}")
-        thermal_interpreter = TFLiteInterpreter(model_path=config.THERMAL_MODEL_PATH)
-        thermal_interpreter.allocate_tensors()
+        thermal_interpreter = inference.create_interpreter(
+            config.THERMAL_MODEL_PATH,
+            inference.resolve_interpreter_options(str(config.THERMAL_MODEL_PATH), "thermal",
+                                                  model_options.get('thermal')))
         
         # Log model details
         input_details = thermal_interpreter.get_input_details()
@@ -144,8 +142,10 @@ def load_models():
         
         # Load acoustic model
         logger.debug(f"Loading acoustic model from: {config.ACOUSTIC_MODEL_PATH}")
-        acoustic_interpreter = TFLiteInterpreter(model_path=config.ACOUSTIC_MODEL_PATH)
-        acoustic_interpreter.allocate_tensors()
+        acoustic_interpreter = inference.create_interpreter(
+            config.ACOUSTIC_MODEL_PATH,
+            inference.resolve_interpreter_options(str(config.ACOUSTIC_MODEL_PATH), "acoustic",
+                                                  model_options.get('acoustic')))
         
         input_details = acoustic_interpreter.get_input_details()
         output_details = acoustic_interpreter.get_output_details()
@@ -179,52 +179,18 @@ def run_inference(interpreter, input_data):
         return 0.0
     
     try:
-        input_details = interpreter.get_input_details()[0]
-        output_details = interpreter.get_output_details()[0]
-        
-        # Normalize expected shape (ignore batch dimension)
-        expected_shape = normalize_shape(input_details['shape'][1:])
-        input_shape = input_data.shape
-        
+        runner = inference.get_runner(interpreter)
+
         # Check shape compatibility (allow for flexible dimensions marked as -1)
+        expected_shape = normalize_shape(runner.input_shape[1:])
+        input_shape = input_data.shape
         if not all(exp == -1 or exp == inp for exp, inp in zip(expected_shape, input_shape)):
             logger.warning(f"Input shape mismatch: got {input_shape}, expected {expected_shape}")
             return 0.0
-        
-        # Prepare input tensor with correct dtype
-        input_dtype = input_details['dtype']
-        
-        if input_dtype == np.uint8:
-            # Quantized model - scale float input to uint8
-            input_tensor = np.expand_dims(input_data, axis=0)
-            input_tensor = (np.clip(input_tensor, 0, 1) * 255).astype(np.uint8)
-            logger.debug("Using quantized (uint8) input")
-        elif input_dtype == np.int8:
-            # INT8 quantized model
-            scale, zero_point = input_details['quantization']
-            input_tensor = np.expand_dims(input_data, axis=0)
-            input_tensor = ((input_tensor / scale) + zero_point).astype(np.int8)
-            logger.debug("Using INT8 quantized input")
-        else:
-            # Float32 model
-            input_tensor = np.expand_dims(input_data, axis=0).astype(np.float32)
-            logger.debug("Using float32 input")
-        
-        # Run inference
-        interpreter.set_tensor(input_details['index'], input_tensor)
-        interpreter.invoke()
-        prediction = interpreter.get_tensor(output_details['index'])
-        
-        # Handle output dtype
-        output_dtype = output_details['dtype']
-        if output_dtype in (np.uint8, np.int8):
-            # Dequantize output
-            scale, zero_point = output_details['quantization']
-            prediction = (prediction.astype(np.float32) - zero_point) * scale
-            logger.debug(f"Dequantized output: scale={scale}, zero_point={zero_point}")
-        
-        # Extract scalar score
-        score = float(np.ravel(prediction)[0])
+
+        # Quantize input / dequantize output with the model's scale and zero-point
+        logger.debug(f"Running inference with {runner.input_dtype} input")
+        score = runner.score(input_data)
         score = np.clip(score, 0.0, 1.0)  # Ensure in valid range
         
         return score
@@ -234,6 +200,28 @@ def run_inference(interpreter, input_data):
         return 0.0
 
 
+def run_thermal_inference(interpreter, thermal_image):
+    """
+    Run the thermal model on a camera frame.
+
+    uint8 frames are resized and quantized in integer space (see thermal_pipeline.py),
+    so no float copy is made; float frames are expected in the 0-1 range.
+
+    Returns:
+        float: Anomaly score (0.0-1.0), 0.0 if inference fails
+    """
+    if interpreter is None:
+        logger.warning("Interpreter is None, returning default score")
+        return 0.0
+
+    try:
+        score = thermal_pipeline.get_pipeline(interpreter).score(thermal_image, float_scale=1.0)
+        return float(np.clip(score, 0.0, 1.0))
+    except Exception as e:
+        logger.error(f"Thermal inference error: {e}", exc_info=True)
+        return 0.0
+
+
 def main():
     """
     Main orchestration function for the Premonitor system.
@@ -294,7 +282,7 @@ def main():
             
             # 2. Run AI inference
             logger.debug("Running inference...")
-            thermal_score = run_inference(thermal_interpreter, thermal_image)
+            thermal_score = run_thermal_inference(thermal_interpreter, thermal_image)
             acoustic_score = run_inference(acoustic_interpreter, acoustic_spectrogram)
             
             logger.info(f"Scores: Thermal={thermal_score:.3f}, Acoustic={acoustic_score:.3f}, Gas={gas_reading}")
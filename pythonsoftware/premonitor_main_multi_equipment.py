@@ -20,6 +20,7 @@ import sys
 import logging
 from pathlib import Path
 from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure structured logging
 logging.basicConfig(
@@ -29,27 +30,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger('premonitor_multi')
 
-# Try importing tflite_runtime first (preferred on Pi), fallback to tensorflow
-try:
-    import tflite_runtime.interpreter as tflite
-    logger.info("Using tflite_runtime for inference")
-    USING_TFLITE_RUNTIME = True
-except ImportError:
-    try:
-        import tensorflow as tf
-        tflite = tf.lite
-        logger.info("Using tensorflow.lite for inference")
-        USING_TFLITE_RUNTIME = False
-    except ImportError:
-        logger.critical("Neither tflite_runtime nor tensorflow.lite could be imported")
-        sys.exit(1)
-
 # Import our custom project files
 try:
     import config
     import alert_manager
     import equipment_registry
+    import equipment_plan
+    import config_reload
+    import sensor_bus
+    import sensor_drivers
     import security_monitor
+    import motion_events
+    import black_box
+    import inference
+    import thermal_pipeline
+    import vibration_features
+    from inference import load_tflite_model
+    from inference_worker import InferenceWorkerPool
     # For the MVP, we use the mock hardware. To switch to real hardware,
     # you would change this line to: import hardware_drivers as hardware
     import mock_hardware as hardware
@@ -58,14 +55,28 @@ except ImportError as e:
     logger.critical(f"Failed to import project modules: {e}")
     sys.exit(1)
 
+# TFLite runtime selection (tflite_runtime preferred on Pi) happens in inference.py
+if inference.tflite is None:
+    logger.critical("Neither tflite_runtime nor tensorflow.lite could be imported")
+    sys.exit(1)
+USING_TFLITE_RUNTIME = inference.USING_TFLITE_RUNTIME
+logger.info(f"Using {'tflite_runtime' if USING_TFLITE_RUNTIME else 'tensorflow.lite'} for inference")
+
 # --- Global variables for loaded AI models ---
 thermal_interpreter = None
 acoustic_interpreter = None
 lstm_interpreter = None
+inference_pool = None  # InferenceWorkerPool when PREMONITOR_INFERENCE_WORKERS > 0
 
 # --- Equipment state tracking ---
 equipment_states = {}  # Dict[equipment_id, Dict[sensor_type, value]]
 equipment_lstm_buffers = {}  # Dict[equipment_id, List[sensor_readings]]
+thermal_frame_cache = {}  # Dict[equipment_id, Dict[reference frame, last result, time]]
+equipment_plans = []  # List[EquipmentPlan], compiled at startup / config reload
+device_bus = None  # SensorBus shared by equipment_plans (one read per physical device per cycle)
+device_drivers = None  # sensor_drivers.DriverRegistry when config.SENSOR_DRIVER_BACKEND != "off"
+motion_event_monitor = None  # motion_events.MotionEventMonitor for interrupt-driven PIR pins
+black_box_manager = None  # black_box.BlackBoxManager when config.BLACK_BOX_ENABLED
 
 # ============================================================================
 # GAS SENSOR CALIBRATION HELPER
@@ -118,16 +129,20 @@ def calibrate_gas_sensor(adc_value: float, sensor_type: str = "MQ-2",
 # LSTM FEATURE VECTOR BUILDER (Deterministic Ordering)
 # ============================================================================
 
-def build_lstm_feature_vector(readings: Dict[str, Any], equipment_type: str) -> np.ndarray:
+def build_lstm_feature_vector(readings: Dict[str, Any], equipment_type: str,
+                              include_vibration_features: bool = False) -> np.ndarray:
     """
     Build deterministic feature vector for LSTM input from sensor readings.
 
     Feature order is fixed regardless of sensor read order:
     [temperature, gas, vibration, current, acoustic_rms, thermal_mean]
+    followed, if include_vibration_features, by
+    vibration_features.LSTM_VIBRATION_FEATURES (crest factor, kurtosis, band energies).
 
     Args:
         readings: Sensor readings dict from read_equipment_sensors()
         equipment_type: Equipment type (from equipment_registry)
+        include_vibration_features: Append the vibration burst features
 
     Returns:
         NumPy array of shape (n_features,) with NaN for missing sensors
@@ -169,36 +184,20 @@ def build_lstm_feature_vector(readings: Dict[str, Any], equipment_type: str) ->
     else:
         feature_vector.append(np.nan)
 
+    # Features 6+: Vibration burst features (VibrationFeatures from sensor_drivers.ADXL345)
+    if include_vibration_features:
+        vibration = sensors.get("vibration")
+        if isinstance(vibration, vibration_features.VibrationFeatures):
+            feature_vector.extend(vibration.to_lstm_features())
+        else:
+            feature_vector.extend([np.nan] * len(vibration_features.LSTM_VIBRATION_FEATURES))
+
     return np.array(feature_vector, dtype=np.float32)
 
 # ============================================================================
 # MODEL LOADING
 # ============================================================================
 
-def load_tflite_model(model_path: str, model_name: str):
-    """
-    Load a TensorFlow Lite model and return the interpreter.
-    """
-    try:
-        if not os.path.exists(model_path):
-            logger.error(f"{model_name} model not found: {model_path}")
-            return None
-        
-        logger.info(f"Loading {model_name} model from: {model_path}")
-        interpreter = tflite.Interpreter(model_path=model_path)
-        interpreter.allocate_tensors()
-        
-        # Log input/output details
-        input_details = interpreter.get_input_details()
-        output_details = interpreter.get_output_details()
-        logger.info(f"{model_name} input shape: {input_details[0]['shape']}")
-        logger.info(f"{model_name} output shape: {output_details[0]['shape']}")
-        
-        return interpreter
-    except Exception as e:
-        logger.error(f"Failed to load {model_name} model: {e}")
-        return None
-
 def startup_check():
     """
     Verify all required model paths, config entries, and dependencies before starting.
@@ -252,25 +251,93 @@ def startup_check():
 
     return all_checks_passed
 
-def load_models():
+def resolve_model_options(model_paths: Dict[str, Any], processes: int = 1) -> Dict[str, Dict[str, Any]]:
+    """
+    Resolve the configured interpreter options for every model, auto-tuning
+    thread counts where enabled.
+
+    The CPU budget is shared between inference processes, so each worker gets
+    budget // processes cores to tune against. The chosen options are logged
+    with the Pi ID so tuning results can be compared across the fleet.
+    """
+    configured = getattr(config, 'MODEL_INTERPRETER_OPTIONS', {})
+    cpu_budget = getattr(config, 'INTERPRETER_CPU_BUDGET', 0) or inference.get_cpu_budget()
+    cpu_budget = max(1, cpu_budget // max(1, processes))
+
+    resolved = {}
+    for model_name, model_path in model_paths.items():
+        if not model_path:
+            continue
+        options = inference.resolve_interpreter_options(
+            str(model_path), model_name, configured.get(model_name), cpu_budget=cpu_budget)
+        resolved[model_name] = options
+        logger.info(f"Interpreter options [{equipment_registry.get_pi_id()}] {model_name}: "
+                    f"num_threads={options['num_threads'] or 'default'}, xnnpack={options['xnnpack']}, "
+                    f"cpu_affinity={options['cpu_affinity']}, cpu_budget={cpu_budget}")
+    return resolved
+
+def start_inference_pool(model_paths: Dict[str, Any], model_options: Dict[str, Dict[str, Any]] = None) -> bool:
+    """
+    Start the multi-process inference pool and point the model globals at it.
+
+    Models the pool could not load fall back to in-process interpreters.
+    """
+    global inference_pool, thermal_interpreter, acoustic_interpreter, lstm_interpreter
+
+    processes = getattr(config, 'INFERENCE_WORKERS', 0)
+    pool = InferenceWorkerPool(
+        model_paths,
+        processes=processes,
+        start_method=getattr(config, 'INFERENCE_WORKER_START_METHOD', None),
+        timeout=getattr(config, 'INFERENCE_WORKER_TIMEOUT_S', 30.0),
+        model_options=model_options
+    )
+    if not pool.start():
+        logger.warning("Inference worker pool failed to start - running models in-process")
+        return False
+
+    inference_pool = pool
+    thermal_interpreter = pool.interpreter("thermal")
+    acoustic_interpreter = pool.interpreter("acoustic")
+    lstm_interpreter = pool.interpreter("lstm")
+    logger.info(f"Running inference in {processes} worker process(es): {pool.models}")
+    return True
+
+def load_models(use_pool: bool = True):
     """
     Load all TFLite models into memory.
+
+    With config.INFERENCE_WORKERS > 0 (and use_pool) the interpreters live in
+    worker processes and the globals hold RemoteInterpreter proxies instead.
     """
     global thermal_interpreter, acoustic_interpreter, lstm_interpreter
     
     logger.info("Loading AI models...")
-    
+
+    model_paths = {
+        'thermal': getattr(config, 'THERMAL_MODEL_PATH', None),
+        'acoustic': getattr(config, 'ACOUSTIC_MODEL_PATH', None),
+        'lstm': getattr(config, 'LSTM_MODEL_PATH', None)
+    }
+
+    available_paths = {name: path for name, path in model_paths.items() if path and os.path.exists(path)}
+    processes = getattr(config, 'INFERENCE_WORKERS', 0) if use_pool else 0
+    model_options = resolve_model_options(available_paths, processes)
+
+    if processes > 0:
+        start_inference_pool(available_paths, model_options)
+
     # Load thermal model
-    if hasattr(config, 'THERMAL_MODEL_PATH') and config.THERMAL_MODEL_PATH:
-        thermal_interpreter = load_tflite_model(config.THERMAL_MODEL_PATH, "Thermal")
+    if thermal_interpreter is None and model_paths['thermal']:
+        thermal_interpreter = load_tflite_model(model_paths['thermal'], "Thermal", model_options.get('thermal'))
     
     # Load acoustic model
-    if hasattr(config, 'ACOUSTIC_MODEL_PATH') and config.ACOUSTIC_MODEL_PATH:
-        acoustic_interpreter = load_tflite_model(config.ACOUSTIC_MODEL_PATH, "Acoustic")
+    if acoustic_interpreter is None and model_paths['acoustic']:
+        acoustic_interpreter = load_tflite_model(model_paths['acoustic'], "Acoustic", model_options.get('acoustic'))
     
     # Load LSTM model
-    if hasattr(config, 'LSTM_MODEL_PATH') and config.LSTM_MODEL_PATH:
-        lstm_interpreter = load_tflite_model(config.LSTM_MODEL_PATH, "LSTM-AE")
+    if lstm_interpreter is None and model_paths['lstm']:
+        lstm_interpreter = load_tflite_model(model_paths['lstm'], "LSTM-AE", model_options.get('lstm'))
     
     # Check if at least one model loaded
     if not any([thermal_interpreter, acoustic_interpreter, lstm_interpreter]):
@@ -280,88 +347,309 @@ def load_models():
     logger.info("Model loading complete")
     return True
 
+def shutdown_models():
+    """Stop the inference worker pool, if one is running."""
+    global inference_pool
+    if inference_pool is not None:
+        inference_pool.stop()
+        inference_pool = None
+
+def check_inference_pool() -> bool:
+    """
+    Replace a failed worker pool (every worker dead, restarts used up) with in-process interpreters.
+
+    Returns:
+        True if the models were switched to in-process interpreters
+    """
+    global thermal_interpreter, acoustic_interpreter, lstm_interpreter
+    if inference_pool is None or not inference_pool.failed:
+        return False
+
+    logger.error("Inference worker pool failed - switching to in-process interpreters")
+    shutdown_models()
+    thermal_interpreter = acoustic_interpreter = lstm_interpreter = None
+    if not load_models(use_pool=False):
+        logger.critical("No models could be loaded in-process after the worker pool failed")
+    return True
+
 # ============================================================================
 # SENSOR READING
 # ============================================================================
 
-def read_equipment_sensors(equipment: Dict[str, Any]) -> Dict[str, Any]:
+def open_sensor_drivers():
+    """
+    Open per-device sensor drivers (see config.SENSOR_DRIVER_BACKEND).
+
+    Drivers and their bus handles stay open for the life of the process and
+    survive config reloads.
+    """
+    global device_drivers
+    backend = getattr(config, 'SENSOR_DRIVER_BACKEND', 'off')
+    if backend == 'off' or device_drivers is not None:
+        return device_drivers
+
+    backends = sensor_drivers.SensorBackends.from_config(
+        backend,
+        i2c_bus=getattr(config, 'I2C_BUS', 1),
+        spi_bus=getattr(config, 'SPI_BUS', 0),
+        spi_device=getattr(config, 'SPI_DEVICE', 0),
+        spi_max_speed_hz=getattr(config, 'SPI_MAX_SPEED_HZ', 1350000),
+        w1_dir=getattr(config, 'W1_DEVICES_DIR', sensor_drivers.W1_DEVICES_DIR),
+        w1_refresh_s=getattr(config, 'W1_REFRESH_INTERVAL_S', 10.0) or None,
+        adc_oversample=getattr(config, 'ADC_OVERSAMPLE', 16)
+    )
+    device_drivers = sensor_drivers.DriverRegistry(backends)
+    logger.info(f"Sensor drivers enabled ({backend} backends)")
+    return device_drivers
+
+def close_sensor_drivers():
+    """Close driver handles opened by open_sensor_drivers()."""
+    global device_drivers
+    if device_drivers is not None:
+        device_drivers.close()
+        device_drivers = None
+
+def start_motion_events(equipment_list: List[Dict[str, Any]]):
+    """
+    Watch the units' PIR pins with edge callbacks and hand the events to
+    security_monitor. Without RPi.GPIO (or simulated drivers) PIRs stay polled.
+    """
+    global motion_event_monitor
+    stop_motion_events()
+    if motion_events.GPIO is not None:
+        source = motion_events.RPiGPIOEvents()
+    elif getattr(config, 'SENSOR_DRIVER_BACKEND', 'off') == 'simulated':
+        source = motion_events.SimulatedGPIOEvents()
+    else:
+        return None
+
+    monitor = motion_events.MotionEventMonitor.from_equipment(equipment_list, source)
+    if not monitor.pin_targets:
+        return None
+    monitor.start()
+    security_monitor.set_motion_events(monitor)
+    motion_event_monitor = monitor
+    return monitor
+
+def stop_motion_events():
+    """Remove PIR edge callbacks started by start_motion_events()."""
+    global motion_event_monitor
+    if motion_event_monitor is not None:
+        security_monitor.set_motion_events(None)
+        motion_event_monitor.close()
+        motion_event_monitor = None
+
+def wait_for_next_cycle(sleep_time: float):
+    """
+    Sleep until the next monitoring cycle. Motion on an interrupt-driven PIR
+    wakes this immediately and the affected units' motion checks run without
+    waiting for the cycle (using their last readings for thermal capture).
+    """
+    if motion_event_monitor is None:
+        time.sleep(sleep_time)
+        return
+
+    deadline = time.monotonic() + sleep_time
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        woken = motion_event_monitor.wait(remaining)
+        for plan in equipment_plans:
+            if plan.equipment_id not in woken:
+                continue
+            readings = equipment_states.get(plan.equipment_id, {}).get("last_reading") or {"sensors": {}}
+            try:
+                security_monitor.check_motion(plan.equipment, readings)
+            except Exception as e:
+                logger.error(f"[{plan.equipment_id}] Error handling motion event: {e}")
+
+def start_black_box():
+    """Start per-equipment black-box recording (see config.BLACK_BOX_*)."""
+    global black_box_manager
+    if not getattr(config, 'BLACK_BOX_ENABLED', False) or black_box_manager is not None:
+        return black_box_manager
+    black_box_manager = black_box.BlackBoxManager(
+        getattr(config, 'BLACK_BOX_DIR', Path("../logs/black_box")),
+        memory_budget_bytes=int(getattr(config, 'BLACK_BOX_MEMORY_MB', 8) * 1024 * 1024),
+        post_trigger_s=security_monitor.SECURITY_CONFIG["motion_detection"]["capture_duration"],
+        sample_interval_s=getattr(config, 'BLACK_BOX_SAMPLE_INTERVAL_S', 1.0)
+    )
+    if black_box_intrusion_listener not in security_monitor.intrusion_listeners:
+        security_monitor.intrusion_listeners.append(black_box_intrusion_listener)
+    set_black_box_samplers(equipment_plans)
+    return black_box_manager
+
+def set_black_box_samplers(plans: List[equipment_plan.EquipmentPlan]):
+    """Let post-trigger capture read each unit's sensors directly, bypassing the per-cycle bus."""
+    if black_box_manager is None:
+        return
+    for plan in plans:
+        black_box_manager.set_sampler(plan.equipment_id, lambda plan=plan: equipment_plan.read_sensors(plan, direct=True))
+
+def trigger_black_box(equipment_id: str, reason: str):
+    """Dump the unit's black box after post-trigger capture (no-op when disabled)."""
+    if black_box_manager is None:
+        return
+    try:
+        black_box_manager.trigger(equipment_id, reason)
+    except Exception as e:
+        logger.error(f"[{equipment_id}] Failed to trigger black box: {e}")
+
+def black_box_intrusion_listener(equipment_id: str, alert_type: str):
+    """security_monitor intrusion listener: security alerts dump the black box too."""
+    trigger_black_box(equipment_id, f"security: {alert_type}")
+
+def stop_black_box():
+    """Dump any running post-trigger captures and stop recording."""
+    global black_box_manager
+    if black_box_manager is not None:
+        black_box_manager.close()
+        black_box_manager = None
+
+def compile_equipment_plans(equipment_list: List[Dict[str, Any]]) -> List[equipment_plan.EquipmentPlan]:
+    """
+    Compile monitoring plans (resolved thresholds, bound sensor readers,
+    models to run) for the given equipment. Call at startup and after any
+    registry/threshold/config change.
+    """
+    global equipment_plans, device_bus
+    device_bus = sensor_bus.SensorBus(getattr(config, 'SENSOR_BUS_MAX_AGE_S', 0.0))
+    equipment_plans = equipment_plan.compile_plans(equipment_list, hardware, bus=device_bus, drivers=device_drivers)
+    return equipment_plans
+
+def reload_configuration(pi_id: str) -> bool:
+    """
+    Reload the equipment registry, thresholds and device_config.json in place.
+
+    Everything is loaded and validated before anything is applied; on error
+    the running configuration is kept. Interpreters stay loaded, and LSTM
+    buffers / thermal caches survive for units whose configuration did not
+    change. Model interpreter options only take effect on restart.
+
+    Returns:
+        True if the new configuration was applied
+    """
+    global equipment_plans, device_bus
+
+    try:
+        registry = config_reload.load_candidate_registry(pi_id)
+        device_config = config_reload.load_candidate_device_config()
+    except config_reload.ConfigReloadError as e:
+        logger.error(f"{e} - keeping current configuration")
+        return False
+
+    equipment_list = registry.get_by_pi(pi_id)
+    if not equipment_list:
+        logger.error(f"Reloaded registry assigns no equipment to Pi {pi_id} - keeping current configuration")
+        return False
+
+    # Plans are compiled against the new device config; it is rolled back if they fail
+    previous_device_config = config.device_config_snapshot()
+    config.apply_device_config(device_config)
+    new_bus = sensor_bus.SensorBus(getattr(config, 'SENSOR_BUS_MAX_AGE_S', 0.0))
+    try:
+        new_plans = equipment_plan.compile_plans(equipment_list, hardware, registry, new_bus, device_drivers)
+    except Exception as e:
+        config.restore_device_config(previous_device_config)
+        logger.error(f"Failed to compile reloaded equipment plans: {e} - keeping current configuration")
+        return False
+
+    new_by_id = {plan.equipment_id: plan for plan in new_plans}
+    unchanged = 0
+    for old_plan in equipment_plans:
+        equipment_id = old_plan.equipment_id
+        new_plan = new_by_id.get(equipment_id)
+        if new_plan is not None and new_plan.equipment == old_plan.equipment:
+            unchanged += 1
+            continue
+        # Removed or reconfigured unit: its history no longer matches its sensors
+        equipment_lstm_buffers.pop(equipment_id, None)
+        thermal_frame_cache.pop(equipment_id, None)
+        if black_box_manager is not None:
+            black_box_manager.drop(equipment_id)
+        if new_plan is None:
+            equipment_states.pop(equipment_id, None)
+
+    # Swap: the next cycle sees either the old or the new configuration, never a mix
+    equipment_registry.set_registry(registry)
+    equipment_plans, device_bus = new_plans, new_bus
+    set_black_box_samplers(new_plans)
+    start_motion_events(equipment_list)
+    logger.info(f"Configuration reloaded: {len(new_plans)} equipment units ({unchanged} unchanged)")
+    return True
+
+def read_equipment_sensors(equipment: Dict[str, Any], plan: equipment_plan.EquipmentPlan = None) -> Dict[str, Any]:
     """
     Read all enabled sensors for a specific equipment unit.
     Returns dict of sensor readings.
     """
-    readings = {
-        "equipment_id": equipment["id"],
-        "timestamp": datetime.now().isoformat(),
-        "sensors": {}
-    }
-    
-    sensors_config = equipment.get("sensors", {})
-    
-    # Thermal camera
-    if sensors_config.get("thermal_camera", {}).get("enabled", False):
-        try:
-            thermal_data = hardware.read_thermal_camera()
-            readings["sensors"]["thermal"] = thermal_data
-        except Exception as e:
-            logger.error(f"[{equipment['id']}] Error reading thermal camera: {e}")
-    
-    # Microphone
-    if sensors_config.get("microphone", {}).get("enabled", False):
-        try:
-            audio_data = hardware.read_microphone()
-            readings["sensors"]["audio"] = audio_data
-        except Exception as e:
-            logger.error(f"[{equipment['id']}] Error reading microphone: {e}")
-    
-    # Gas sensor
-    if sensors_config.get("gas_sensor", {}).get("enabled", False):
-        try:
-            gas_value = hardware.read_gas_sensor()
-            readings["sensors"]["gas"] = gas_value
-        except Exception as e:
-            logger.error(f"[{equipment['id']}] Error reading gas sensor: {e}")
-    
-    # Temperature sensor
-    if sensors_config.get("temperature", {}).get("enabled", False):
-        try:
-            temp_value = hardware.read_temperature()
-            readings["sensors"]["temperature"] = temp_value
-        except Exception as e:
-            logger.error(f"[{equipment['id']}] Error reading temperature: {e}")
+    if plan is None:
+        plan = equipment_plan.compile_plan(equipment, hardware)
+    return equipment_plan.read_sensors(plan)
 
-    # CO2 sensor
-    if sensors_config.get("co2", {}).get("enabled", False):
-        try:
-            co2_value = hardware.read_co2_sensor()
-            readings["sensors"]["co2"] = co2_value
-        except Exception as e:
-            logger.error(f"[{equipment['id']}] Error reading CO2 sensor: {e}")
+# ============================================================================
+# THERMAL FRAME-DIFFERENCE GATING
+# ============================================================================
 
-    # Oxygen sensor
-    if sensors_config.get("oxygen", {}).get("enabled", False):
-        try:
-            oxygen_value = hardware.read_oxygen_sensor()
-            readings["sensors"]["oxygen"] = oxygen_value
-        except Exception as e:
-            logger.error(f"[{equipment['id']}] Error reading oxygen sensor: {e}")
+def downsample_thermal_frame(thermal_data: np.ndarray, step: int) -> np.ndarray:
+    """
+    Cheap strided downsample of a thermal frame, scaled to 0-1 of full scale.
 
-    # Vibration sensor
-    if sensors_config.get("vibration", {}).get("enabled", False):
-        try:
-            vibration_value = hardware.read_vibration_sensor()
-            readings["sensors"]["vibration"] = vibration_value
-        except Exception as e:
-            logger.error(f"[{equipment['id']}] Error reading vibration sensor: {e}")
+    Only used for change detection, so no filtering is applied. Integer frames
+    (e.g. uint8) are divided by their dtype maximum; float frames are assumed
+    to already be normalized.
+    """
+    small = thermal_data[::step, ::step].astype(np.float32)
+    if np.issubdtype(thermal_data.dtype, np.integer):
+        small /= float(np.iinfo(thermal_data.dtype).max)
+    return small
 
-    # Current sensor
-    if sensors_config.get("current", {}).get("enabled", False):
-        try:
-            current_value = hardware.read_current_sensor()
-            readings["sensors"]["current"] = current_value
-        except Exception as e:
-            logger.error(f"[{equipment['id']}] Error reading current sensor: {e}")
 
-    return readings
+def get_cached_thermal_result(thermal_data: np.ndarray, equipment_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached thermal result if the scene has not changed enough to re-run the CNN.
+
+    The frame is compared against the reference frame stored when the model last ran
+    (not the previous cycle), so slow drift accumulates and eventually forces a re-run.
+
+    Returns:
+        Copy of the cached result marked with "cached": True, or None if inference is needed
+    """
+    if not getattr(config, 'THERMAL_GATE_ENABLED', True):
+        return None
+
+    cached = thermal_frame_cache.get(equipment_id)
+    if cached is None:
+        return None
+
+    age = time.monotonic() - cached["time"]
+    if age > getattr(config, 'THERMAL_GATE_MAX_AGE_S', 300.0):
+        return None
+
+    frame = downsample_thermal_frame(thermal_data, getattr(config, 'THERMAL_GATE_DOWNSAMPLE', 8))
+    if frame.shape != cached["frame"].shape:
+        return None
+
+    difference = float(np.mean(np.abs(frame - cached["frame"])))
+    if difference >= getattr(config, 'THERMAL_GATE_DIFF_THRESHOLD', 0.02):
+        return None
+
+    result = dict(cached["result"])
+    result["cached"] = True
+    result["cache_age_s"] = round(age, 1)
+    result["frame_difference"] = difference
+    result["timestamp"] = datetime.now().isoformat()
+    return result
+
+
+def update_thermal_cache(thermal_data: np.ndarray, equipment_id: str, result: Dict[str, Any]):
+    """Store the reference frame and result of a fresh thermal inference."""
+    thermal_frame_cache[equipment_id] = {
+        "frame": downsample_thermal_frame(thermal_data, getattr(config, 'THERMAL_GATE_DOWNSAMPLE', 8)),
+        "result": result,
+        "time": time.monotonic()
+    }
 
 # ============================================================================
 # AI INFERENCE
@@ -370,34 +658,32 @@ def read_equipment_sensors(equipment: Dict[str, Any]) -> Dict[str, Any]:
 def run_thermal_inference(thermal_data: np.ndarray, equipment_id: str) -> Dict[str, Any]:
     """
     Run thermal anomaly detection model.
+
+    Skips the CNN and reuses the last score when the frame is nearly identical
+    to the one the model last scored (see get_cached_thermal_result).
     """
     if thermal_interpreter is None:
         return {"error": "Thermal model not loaded"}
-    
+
+    cached_result = get_cached_thermal_result(thermal_data, equipment_id)
+    if cached_result is not None:
+        logger.debug(f"[{equipment_id}] Thermal frame unchanged "
+                     f"(diff={cached_result['frame_difference']:.4f}), reusing cached score")
+        return cached_result
+
     try:
-        # Prepare input
-        input_details = thermal_interpreter.get_input_details()
-        output_details = thermal_interpreter.get_output_details()
-        
-        # Normalize and reshape
-        thermal_normalized = thermal_data.astype(np.float32) / 255.0
-        input_shape = input_details[0]['shape']
-        thermal_reshaped = np.expand_dims(thermal_normalized, axis=0)
-        
-        # Run inference
-        thermal_interpreter.set_tensor(input_details[0]['index'], thermal_reshaped)
-        thermal_interpreter.invoke()
-        output = thermal_interpreter.get_tensor(output_details[0]['index'])
-        
-        # Parse results
-        anomaly_confidence = float(output[0][0])
-        
-        return {
+        # uint8 frames are resized and quantized in integer space (thermal_pipeline.py)
+        pipeline = thermal_pipeline.get_pipeline(thermal_interpreter)
+        anomaly_confidence = pipeline.score(thermal_data, float_scale=1.0 / 255.0)
+
+        result = {
             "model": "thermal_cnn",
             "equipment_id": equipment_id,
             "anomaly_confidence": anomaly_confidence,
             "timestamp": datetime.now().isoformat()
         }
+        update_thermal_cache(thermal_data, equipment_id, result)
+        return result
     except Exception as e:
         logger.error(f"[{equipment_id}] Thermal inference error: {e}")
         return {"error": str(e)}
@@ -410,21 +696,9 @@ def run_acoustic_inference(audio_data: np.ndarray, equipment_id: str) -> Dict[st
         return {"error": "Acoustic model not loaded"}
     
     try:
-        # Prepare input (assume spectrogram or similar preprocessing)
-        input_details = acoustic_interpreter.get_input_details()
-        output_details = acoustic_interpreter.get_output_details()
-        
-        # Normalize
-        audio_normalized = audio_data.astype(np.float32)
-        audio_reshaped = np.expand_dims(audio_normalized, axis=0)
-        
-        # Run inference
-        acoustic_interpreter.set_tensor(input_details[0]['index'], audio_reshaped)
-        acoustic_interpreter.invoke()
-        output = acoustic_interpreter.get_tensor(output_details[0]['index'])
-        
-        # Parse results
-        anomaly_confidence = float(output[0][0])
+        # Input is a spectrogram (or similar preprocessed audio)
+        runner = inference.get_runner(acoustic_interpreter, "acoustic")
+        anomaly_confidence = runner.score(audio_data)
         
         return {
             "model": "acoustic_cnn",
@@ -448,10 +722,8 @@ def run_lstm_inference(sensor_buffer: np.ndarray, equipment_id: str) -> Dict[str
         return {"error": "LSTM model not loaded"}
 
     try:
-        input_details = lstm_interpreter.get_input_details()
-        output_details = lstm_interpreter.get_output_details()
-
-        expected_shape = input_details[0]['shape']  # e.g., (1, 50, 6)
+        runner = inference.get_runner(lstm_interpreter, "lstm")
+        expected_shape = runner.input_shape  # e.g., (1, 50, 6)
 
         # Validate input shape matches model
         if sensor_buffer.shape[0] != expected_shape[1]:
@@ -462,12 +734,9 @@ def run_lstm_inference(sensor_buffer: np.ndarray, equipment_id: str) -> Dict[str
         # Normalize (handle NaN values from missing sensors)
         sequence_normalized = np.nan_to_num(sensor_buffer, nan=0.0)  # Replace NaN with 0
         sequence_normalized = (sequence_normalized - np.mean(sequence_normalized)) / (np.std(sequence_normalized) + 1e-7)
-        sequence_reshaped = np.expand_dims(sequence_normalized, axis=0).astype(np.float32)
 
         # Run inference
-        lstm_interpreter.set_tensor(input_details[0]['index'], sequence_reshaped)
-        lstm_interpreter.invoke()
-        reconstructed = lstm_interpreter.get_tensor(output_details[0]['index'])
+        reconstructed = runner.run(sequence_normalized)
 
         # Calculate reconstruction error
         mse = np.mean((sequence_normalized - reconstructed[0]) ** 2)
@@ -486,13 +755,16 @@ def run_lstm_inference(sensor_buffer: np.ndarray, equipment_id: str) -> Dict[str
 # ANOMALY DETECTION & ALERTS
 # ============================================================================
 
-def check_anomaly_and_alert(equipment: Dict[str, Any], inference_results: List[Dict[str, Any]]):
+def check_anomaly_and_alert(equipment: Dict[str, Any], inference_results: List[Dict[str, Any]],
+                            plan: equipment_plan.EquipmentPlan = None):
     """
     Check inference results against equipment-specific thresholds and trigger alerts.
     """
-    equipment_id = equipment["id"]
-    equipment_type = equipment["type"]
-    thresholds = equipment_registry.get_equipment_thresholds(equipment_type)
+    if plan is None:
+        plan = equipment_plan.compile_plan(equipment)
+    equipment_id = plan.equipment_id
+    equipment_type = plan.equipment_type
+    thresholds = plan.thresholds
     
     anomalies_detected = []
     
@@ -505,7 +777,7 @@ def check_anomaly_and_alert(equipment: Dict[str, Any], inference_results: List[D
         # Thermal model
         if model_type == "thermal_cnn":
             confidence = result["anomaly_confidence"]
-            threshold = thresholds.get("thermal_anomaly_confidence", 0.85)
+            threshold = thresholds.thermal_confidence
             if confidence > threshold:
                 anomalies_detected.append({
                     "type": "thermal",
@@ -517,7 +789,7 @@ def check_anomaly_and_alert(equipment: Dict[str, Any], inference_results: List[D
         # Acoustic model
         elif model_type == "acoustic_cnn":
             confidence = result["anomaly_confidence"]
-            threshold = thresholds.get("acoustic_anomaly_confidence", 0.85)
+            threshold = thresholds.acoustic_confidence
             if confidence > threshold:
                 anomalies_detected.append({
                     "type": "acoustic",
@@ -529,7 +801,7 @@ def check_anomaly_and_alert(equipment: Dict[str, Any], inference_results: List[D
         # LSTM model
         elif model_type == "lstm_ae":
             reconstruction_error = result["reconstruction_error"]
-            threshold = thresholds.get("lstm_reconstruction_threshold", 0.045)
+            threshold = thresholds.lstm_reconstruction_threshold
             if reconstruction_error > threshold:
                 anomalies_detected.append({
                     "type": "lstm_degradation",
@@ -540,10 +812,10 @@ def check_anomaly_and_alert(equipment: Dict[str, Any], inference_results: List[D
     
     # Trigger alerts if anomalies detected
     if anomalies_detected:
-        alert_channels = equipment.get("alert_channels", ["discord"])
+        alert_channels = plan.alert_channels
         
-        alert_message = f"🚨 ANOMALY DETECTED: {equipment['name']} ({equipment_id})\n"
-        alert_message += f"Location: {equipment.get('location', 'Unknown')}\n"
+        alert_message = f"🚨 ANOMALY DETECTED: {plan.name} ({equipment_id})\n"
+        alert_message += f"Location: {plan.location}\n"
         alert_message += f"Equipment Type: {equipment_type}\n\n"
         
         for anomaly in anomalies_detected:
@@ -557,7 +829,7 @@ def check_anomaly_and_alert(equipment: Dict[str, Any], inference_results: List[D
                 if channel == "discord":
                     alert_manager.send_discord_alert(alert_message)
                 elif channel == "email":
-                    alert_manager.send_email_alert(f"Anomaly: {equipment['name']}", alert_message)
+                    alert_manager.send_email_alert(f"Anomaly: {plan.name}", alert_message)
                 elif channel == "sms":
                     # Implement SMS if needed
                     logger.warning(f"SMS alerts not implemented yet for {equipment_id}")
@@ -565,9 +837,11 @@ def check_anomaly_and_alert(equipment: Dict[str, Any], inference_results: List[D
                 logger.error(f"[{equipment_id}] Failed to send alert via {channel}: {e}")
         
         logger.warning(f"[{equipment_id}] Anomaly alert sent: {len(anomalies_detected)} issues detected")
+        trigger_black_box(equipment_id, "anomaly: " + ", ".join(a["type"] for a in anomalies_detected))
 
 
-def check_raw_sensor_thresholds(equipment: Dict[str, Any], readings: Dict[str, Any]):
+def check_raw_sensor_thresholds(equipment: Dict[str, Any], readings: Dict[str, Any],
+                                plan: equipment_plan.EquipmentPlan = None):
     """
     Check raw (non-AI) sensor values against configured thresholds and send immediate alerts.
 
@@ -578,115 +852,58 @@ def check_raw_sensor_thresholds(equipment: Dict[str, Any], readings: Dict[str, A
       - Optional oxygen sensor checks (if 'oxygen' sensor present and thresholds configured)
 
     This is intentionally simple and acts as a fast fail-safe in addition to AI models.
+    Without a compiled plan the thresholds are resolved on the spot.
     """
-    equipment_id = equipment["id"]
-    equipment_type = equipment["type"]
-    thresholds = equipment_registry.get_equipment_thresholds(equipment_type)
-
-    sensors = readings.get("sensors", {})
+    if plan is None:
+        plan = equipment_plan.compile_plan(equipment)
+    equipment_id = plan.equipment_id
+    equipment_type = plan.equipment_type
 
-    alerts = []
-
-    # Temperature checks
-    if "temperature" in sensors:
-        try:
-            temp_val = float(sensors["temperature"])
-            # Equipment-specific acceptable range
-            temp_range = thresholds.get("temperature_range")
-            if temp_range and (temp_val < temp_range[0] or temp_val > temp_range[1]):
-                alerts.append(f"Temperature out of expected range: {temp_val:.2f}°C (expected {temp_range})")
-
-            # Hard critical temperature (fire risk)
-            critical_c = getattr(config, 'THERMAL_CRITICAL_THRESHOLD_C', None)
-            if critical_c is not None and temp_val >= critical_c:
-                alerts.append(f"CRITICAL: High temperature detected: {temp_val:.2f}°C >= {critical_c}°C")
-        except Exception:
-            logger.debug(f"[{equipment_id}] Could not parse temperature sensor value: {sensors.get('temperature')}")
-
-    # Gas sensor checks (analog value)
-    if "gas" in sensors:
-        try:
-            gas_val = float(sensors["gas"])
-            gas_threshold = thresholds.get("gas_analog_threshold", getattr(config, 'GAS_ANALOG_THRESHOLD', None))
-            if gas_threshold is not None and gas_val >= gas_threshold:
-                alerts.append(f"Gas sensor above threshold: {gas_val} >= {gas_threshold}")
-        except Exception:
-            logger.debug(f"[{equipment_id}] Could not parse gas sensor value: {sensors.get('gas')}")
-
-    # CO2 checks (percent)
-    if "co2" in sensors:
-        try:
-            co2_val = float(sensors["co2"])
-            co2_range = thresholds.get("co2_range")
-            if co2_range and (co2_val < co2_range[0] or co2_val > co2_range[1]):
-                alerts.append(f"CO2 level out of expected range: {co2_val:.2f}% (expected {co2_range})")
-        except Exception:
-            logger.debug(f"[{equipment_id}] Could not parse CO2 sensor value: {sensors.get('co2')}")
-
-    # Oxygen checks (optional) - user can add 'oxygen_min' to equipment thresholds
-    if "oxygen" in sensors:
-        try:
-            oxy_val = float(sensors["oxygen"])
-            oxy_min = thresholds.get("oxygen_min")
-            if oxy_min is not None and oxy_val < oxy_min:
-                alerts.append(f"Low oxygen detected: {oxy_val:.2f}% < {oxy_min}%")
-        except Exception:
-            logger.debug(f"[{equipment_id}] Could not parse oxygen sensor value: {sensors.get('oxygen')}")
-
-    # Vibration checks (mechanical fault detection)
-    if "vibration" in sensors:
-        try:
-            vib_val = float(sensors["vibration"])
-            vib_threshold = thresholds.get("vibration_threshold")
-            if vib_threshold is not None and vib_val >= vib_threshold:
-                alerts.append(f"High vibration detected: {vib_val:.2f}G >= {vib_threshold}G (possible bearing wear)")
-        except Exception:
-            logger.debug(f"[{equipment_id}] Could not parse vibration sensor value: {sensors.get('vibration')}")
-
-    # Current checks (motor overload detection)
-    if "current" in sensors:
-        try:
-            current_val = float(sensors["current"])
-            current_threshold = thresholds.get("current_threshold")
-            if current_threshold is not None and current_val >= current_threshold:
-                alerts.append(f"Motor overload detected: {current_val:.2f}A >= {current_threshold}A (possible mechanical jam)")
-        except Exception:
-            logger.debug(f"[{equipment_id}] Could not parse current sensor value: {sensors.get('current')}")
+    alerts = equipment_plan.evaluate_raw_thresholds(readings.get("sensors", {}), plan.thresholds, equipment_id)
 
     # If any raw alerts found, send immediate notifications
     if alerts:
-        alert_message = f"🚨 SENSOR THRESHOLD ALERT: {equipment.get('name', equipment_id)} ({equipment_id})\n"
-        alert_message += f"Location: {equipment.get('location', 'Unknown')}\n"
+        alert_message = f"🚨 SENSOR THRESHOLD ALERT: {plan.name} ({equipment_id})\n"
+        alert_message += f"Location: {plan.location}\n"
         alert_message += f"Equipment Type: {equipment_type}\n\n"
         for a in alerts:
             alert_message += f"• {a}\n"
         alert_message += f"\nTimestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 
-        for channel in equipment.get('alert_channels', ['discord']):
+        for channel in plan.alert_channels:
             try:
                 if channel == 'discord':
                     alert_manager.send_discord_alert(alert_message)
                 elif channel == 'email':
-                    alert_manager.send_email_alert(f"Sensor Threshold Alert: {equipment.get('name', equipment_id)}", alert_message)
+                    alert_manager.send_email_alert(f"Sensor Threshold Alert: {plan.name}", alert_message)
                 elif channel == 'sms':
                     logger.warning(f"SMS alerts not implemented yet for {equipment_id}")
             except Exception as e:
                 logger.error(f"[{equipment_id}] Failed to send sensor threshold alert via {channel}: {e}")
 
         logger.warning(f"[{equipment_id}] Sensor threshold alert sent: {len(alerts)} issues")
+        trigger_black_box(equipment_id, "sensor threshold: " + "; ".join(alerts))
 
 # ============================================================================
 # MAIN MONITORING LOOP
 # ============================================================================
 
-def monitor_equipment(equipment: Dict[str, Any]):
+def read_and_check_equipment(equipment: Dict[str, Any], plan: equipment_plan.EquipmentPlan = None) -> Dict[str, Any]:
     """
-    Monitor a single equipment unit (one iteration).
+    Fail-safe phase of one monitoring iteration: read sensors, run security
+    monitoring and raw threshold checks. Never waits on a CNN.
+
+    Returns:
+        Sensor readings for run_equipment_inference()
     """
-    equipment_id = equipment["id"]
+    if plan is None:
+        plan = equipment_plan.compile_plan(equipment, hardware)
+    equipment_id = plan.equipment_id
     
     # Read all sensors
-    readings = read_equipment_sensors(equipment)
+    readings = read_equipment_sensors(equipment, plan)
+    if black_box_manager is not None:
+        black_box_manager.record(equipment_id, readings)
 
     # Security monitoring (motion, tampering, after-hours activity)
     try:
@@ -696,20 +913,33 @@ def monitor_equipment(equipment: Dict[str, Any]):
 
     # Quick raw sensor threshold checks (fire, gas, CO2, oxygen, fridge temps)
     try:
-        check_raw_sensor_thresholds(equipment, readings)
+        check_raw_sensor_thresholds(equipment, readings, plan)
     except Exception as e:
         logger.error(f"[{equipment_id}] Error in raw sensor threshold checks: {e}")
-    
+
+    return readings
+
+def run_equipment_inference(equipment: Dict[str, Any], readings: Dict[str, Any],
+                            plan: equipment_plan.EquipmentPlan = None):
+    """
+    AI phase of one monitoring iteration: run the plan's models on the readings,
+    alert on anomalies and store the equipment state.
+    """
+    if plan is None:
+        plan = equipment_plan.compile_plan(equipment, hardware)
+    equipment_id = plan.equipment_id
+    models = plan.models
+
     # Run AI inference on sensor data
     inference_results = []
     
     # Thermal inference
-    if "thermal" in readings["sensors"]:
+    if "thermal" in models and "thermal" in readings["sensors"]:
         thermal_result = run_thermal_inference(readings["sensors"]["thermal"], equipment_id)
         inference_results.append(thermal_result)
     
     # Acoustic inference
-    if "audio" in readings["sensors"]:
+    if "acoustic" in models and "audio" in readings["sensors"]:
         acoustic_result = run_acoustic_inference(readings["sensors"]["audio"], equipment_id)
         inference_results.append(acoustic_result)
     
@@ -719,7 +949,8 @@ def monitor_equipment(equipment: Dict[str, Any]):
 
     # Build deterministic feature vector
     try:
-        feature_vector = build_lstm_feature_vector(readings, equipment["type"])
+        feature_vector = build_lstm_feature_vector(readings, equipment["type"],
+                                                   getattr(config, 'LSTM_VIBRATION_FEATURES', False))
         equipment_lstm_buffers[equipment_id].append(feature_vector)
 
         # Keep only last 50 time steps
@@ -737,7 +968,7 @@ def monitor_equipment(equipment: Dict[str, Any]):
         logger.error(f"[{equipment_id}] Error building LSTM feature vector: {e}")
     
     # Check for anomalies and send alerts
-    check_anomaly_and_alert(equipment, inference_results)
+    check_anomaly_and_alert(equipment, inference_results, plan)
     
     # Store equipment state
     equipment_states[equipment_id] = {
@@ -746,6 +977,50 @@ def monitor_equipment(equipment: Dict[str, Any]):
         "timestamp": datetime.now().isoformat()
     }
 
+def monitor_equipment(equipment: Dict[str, Any], plan: equipment_plan.EquipmentPlan = None):
+    """
+    Monitor a single equipment unit (one iteration).
+    """
+    if plan is None:
+        plan = equipment_plan.compile_plan(equipment, hardware)
+    readings = read_and_check_equipment(equipment, plan)
+    run_equipment_inference(equipment, readings, plan)
+
+def run_monitoring_cycle(plans: List[equipment_plan.EquipmentPlan], executor=None, bus=None):
+    """
+    Run one monitoring cycle over all compiled equipment plans.
+
+    `bus` is the SensorBus the plans read through; each cycle is one bus
+    tick, so a device shared by several units is read once.
+
+    Fail-safe checks for every unit complete before any CNN runs, so a slow
+    model on one unit never delays a fire/gas/temperature alert on another.
+    With an inference worker pool, the inference phase is fanned out over
+    `executor` threads that wait on the worker processes in parallel.
+    """
+    if bus is not None:
+        bus.begin_tick()
+
+    cycle_readings = []
+    for plan in plans:
+        try:
+            cycle_readings.append((plan, read_and_check_equipment(plan.equipment, plan)))
+        except Exception as e:
+            logger.error(f"Error monitoring {plan.equipment_id}: {e}")
+
+    def _infer(item):
+        plan, readings = item
+        try:
+            run_equipment_inference(plan.equipment, readings, plan)
+        except Exception as e:
+            logger.error(f"Error running inference for {plan.equipment_id}: {e}")
+
+    if executor is not None:
+        list(executor.map(_infer, cycle_readings))
+    else:
+        for item in cycle_readings:
+            _infer(item)
+
 def main_loop():
     """
     Main monitoring loop for all equipment assigned to this Pi.
@@ -763,8 +1038,21 @@ def main_loop():
     for eq in equipment_list:
         logger.info(f"  - {eq['id']}: {eq['name']} ({eq['type']})")
     
-    # Get sensor read interval
-    sensor_read_interval = getattr(config, 'SENSOR_READ_INTERVAL', 30)
+    # Resolve thresholds, sensor readers and models once, not every cycle
+    open_sensor_drivers()
+    compile_equipment_plans(equipment_list)
+    start_motion_events(equipment_list)
+    start_black_box()
+
+    # Registry / device_config.json edits (or SIGHUP) are applied between cycles
+    reload_trigger = config_reload.ReloadTrigger(config_reload.watched_paths())
+    reload_trigger.install_signal_handler()
+
+    # Threads that wait on the inference worker processes in parallel
+    executor = None
+    if inference_pool is not None:
+        executor = ThreadPoolExecutor(max_workers=inference_pool.processes,
+                                      thread_name_prefix="inference")
     
     iteration_count = 0
     
@@ -772,28 +1060,39 @@ def main_loop():
         while True:
             iteration_count += 1
             loop_start = time.time()
+
+            if reload_trigger.poll():
+                reload_configuration(pi_id)
+            if check_inference_pool() and executor is not None:
+                # In-process interpreters are not safe to share across threads
+                executor.shutdown(wait=False)
+                executor = None
+            sensor_read_interval = getattr(config, 'SENSOR_READ_INTERVAL', 30)
             
             logger.info(f"--- Monitoring Cycle {iteration_count} ---")
             
             # Monitor each equipment unit
-            for equipment in equipment_list:
-                try:
-                    monitor_equipment(equipment)
-                except Exception as e:
-                    logger.error(f"Error monitoring {equipment['id']}: {e}")
+            run_monitoring_cycle(equipment_plans, executor, device_bus)
             
             # Calculate sleep time
             loop_duration = time.time() - loop_start
             sleep_time = max(0, sensor_read_interval - loop_duration)
             
             logger.info(f"Cycle complete. Loop took {loop_duration:.2f}s. Sleeping for {sleep_time:.2f}s")
-            time.sleep(sleep_time)
+            wait_for_next_cycle(sleep_time)
             
     except KeyboardInterrupt:
         logger.info("Monitoring stopped by user")
     except Exception as e:
         logger.critical(f"Critical error in main loop: {e}")
         raise
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+        shutdown_models()
+        stop_motion_events()
+        stop_black_box()
+        close_sensor_drivers()
 
 # ============================================================================
 # ENTRY POINT
@@ -810,6 +1109,9 @@ if __name__ == "__main__":
         sys.exit(1)
     
     logger.info("✓ Startup checks passed")
+
+    # Device-specific overrides (loaded by config.py, applied once logging is up)
+    config.apply_device_config(config.load_device_config())
     
     # Load AI models
     if not load_models():
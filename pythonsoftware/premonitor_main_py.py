@@ -14,7 +14,6 @@ Original file is located at
 # This script is intended to be run on the Raspberry Pi.
 
 import time
-import numpy as np
 from datetime import datetime
 import os
 import json
@@ -30,25 +29,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger('premonitor')
 
-# Try importing tflite_runtime first (preferred on Pi), fallback to tensorflow
-try:
-    import tflite_runtime.interpreter as tflite
-    logger.info("Using tflite_runtime for inference")
-    USING_TFLITE_RUNTIME = True
-except ImportError:
-    try:
-        import tensorflow as tf
-        tflite = tf.lite
-        logger.info("Using tensorflow.lite for inference")
-        USING_TFLITE_RUNTIME = False
-    except ImportError:
-        logger.critical("Neither tflite_runtime nor tensorflow.lite could be imported")
-        sys.exit(1)
-
 # Import our custom project files
 try:
     import config
     import alert_manager
+    import inference
+    import thermal_pipeline
     # For the MVP, we use the mock hardware. To switch to real hardware,
     # you would change this line to: import hardware_drivers as hardware
     import mock_hardware as hardware
@@ -57,6 +43,13 @@ except ImportError as e:
     logger.critical(f"Failed to import project modules: {e}")
     sys.exit(1)
 
+# TFLite runtime selection (tflite_runtime preferred on Pi) happens in inference.py
+if inference.tflite is None:
+    logger.critical("Neither tflite_runtime nor tensorflow.lite could be imported")
+    sys.exit(1)
+USING_TFLITE_RUNTIME = inference.USING_TFLITE_RUNTIME
+logger.info(f"Using {'tflite_runtime' if USING_TFLITE_RUNTIME else 'tensorflow.lite'} for inference")
+
 # --- Global variables for loaded AI models ---
 thermal_interpreter = None
 acoustic_interpreter = None
@@ -128,9 +121,12 @@ def load_models():
     global thermal_interpreter, acoustic_interpreter
     logger.info("Loading AI models...")
 
+    model_options = getattr(config, 'MODEL_INTERPRETER_OPTIONS', {})
     try:
-        thermal_interpreter = tflite.Interpreter(model_path=config.THERMAL_MODEL_PATH)
-        thermal_interpreter.allocate_tensors()
+        thermal_interpreter = inference.create_interpreter(
+            config.THERMAL_MODEL_PATH,
+            inference.resolve_interpreter_options(str(config.THERMAL_MODEL_PATH), "thermal",
+                                                  model_options.get('thermal')))
 
         # Log input/output details
         input_details = thermal_interpreter.get_input_details()
@@ -139,8 +135,10 @@ def load_models():
                    f"dtype {input_details[0]['dtype']}")
         logger.info(f"  Output shape {output_details[0]['shape']}, dtype {output_details[0]['dtype']}")
 
-        acoustic_interpreter = tflite.Interpreter(model_path=config.ACOUSTIC_MODEL_PATH)
-        acoustic_interpreter.allocate_tensors()
+        acoustic_interpreter = inference.create_interpreter(
+            config.ACOUSTIC_MODEL_PATH,
+            inference.resolve_interpreter_options(str(config.ACOUSTIC_MODEL_PATH), "acoustic",
+                                                  model_options.get('acoustic')))
 
         input_details = acoustic_interpreter.get_input_details()
         output_details = acoustic_interpreter.get_output_details()
@@ -158,52 +156,26 @@ def load_models():
 def run_inference(interpreter, input_data):
     """
     A generic function to run inference on a loaded TFLite interpreter.
-    Handles both float32 and int8 quantized models properly.
+    Quantization of int8/uint8 inputs and outputs is handled by inference.ModelRunner.
     """
-    input_details = interpreter.get_input_details()
-    output_details = interpreter.get_output_details()
-
-    # Prepare the input tensor (needs to be in a batch of 1)
-    input_tensor = np.expand_dims(input_data, axis=0)
-
-    # Check if input shape matches model's expected shape
-    expected_shape = input_details[0]['shape'][1:]
-    if not np.array_equal(expected_shape, input_data.shape):
-         logger.error(f"Input data shape {input_data.shape} does not match "
-                     f"model expected shape {expected_shape}")
-         return 0.0 # Return a non-anomaly score
-
-    # Handle quantized input if needed
-    input_dtype = input_details[0]['dtype']
-    if input_dtype == np.int8:
-        # Model expects INT8 input, but we keep input/output as float32
-        # The interpreter handles conversion internally when configured properly
-        input_tensor = input_tensor.astype(np.float32)
-    elif input_dtype == np.uint8:
-        input_tensor = input_tensor.astype(np.float32)
-    else:
-        input_tensor = input_tensor.astype(np.float32)
-
     try:
-        interpreter.set_tensor(input_details[0]['index'], input_tensor)
-        interpreter.invoke()
-        prediction = interpreter.get_tensor(output_details[0]['index'])[0]
-
-        # Handle quantized output if needed
-        output_dtype = output_details[0]['dtype']
-        if output_dtype in [np.int8, np.uint8]:
-            # Dequantize if output is quantized (though we configured for float32 output)
-            scale, zero_point = output_details[0]['quantization']
-            if scale != 0:
-                prediction = scale * (prediction.astype(np.float32) - zero_point)
-
-        # Assuming the model's output is a single value from a sigmoid function
-        return float(prediction[0])
-
+        return inference.get_runner(interpreter).score(input_data)
     except Exception as e:
         logger.error(f"Inference error: {e}")
         return 0.0
 
+def run_thermal_inference(interpreter, thermal_image):
+    """
+    Run the thermal model on a camera frame.
+    uint8 frames are resized and quantized in integer space (see thermal_pipeline.py);
+    float frames are expected in the 0-1 range.
+    """
+    try:
+        return thermal_pipeline.get_pipeline(interpreter).score(thermal_image, float_scale=1.0)
+    except Exception as e:
+        logger.error(f"Thermal inference error: {e}")
+        return 0.0
+
 def main():
     """
     The main function that orchestrates the Premonitor system.
@@ -241,7 +213,7 @@ def main():
             gas_reading = hardware.read_gas_sensor()
 
             # 2. Process data with AI models to get confidence scores
-            thermal_score = run_inference(thermal_interpreter, thermal_image)
+            thermal_score = run_thermal_inference(thermal_interpreter, thermal_image)
             acoustic_score = run_inference(acoustic_interpreter, acoustic_spectrogram)
 
             if config.DEBUG_MODE:
@@ -0,0 +1,189 @@
+"""
+Asynchronous thermal snapshot capture for PREMONITOR security events.
+
+capture_thermal_image_on_motion() used to encode and write a PNG in the
+monitoring thread for every event. Here the monitoring thread only copies
+the frame into a bounded queue; a worker thread encodes and writes it. Each
+event becomes one file holding the trigger frame and, optionally, the last
+few frames seen before it (a per-equipment pre-event ring buffer), so the
+footage shows what led up to the trigger.
+
+A disk quota is enforced on the capture directory: after every write the
+oldest captures are deleted until the directory fits.
+
+Formats:
+    "png" - Animated PNG (pre-event frames then trigger), needs Pillow
+    "npz" - Compressed numpy archive with "frames" and "timestamps" (raw values)
+
+Usage:
+    writer = CaptureWriter("../logs/security_captures", quota_bytes=200 * 2**20, pre_event_frames=5)
+    writer.record_frame("fridge_lab_a_01", thermal)       # Every cycle
+    path = writer.capture("fridge_lab_a_01", thermal, "motion")  # On an event; returns at once
+    writer.close()
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger('security_capture')
+
+
+def to_image_array(frame: np.ndarray) -> np.ndarray:
+    """uint8 image of a thermal frame: RGB frames as-is, normalised [0, 1] frames scaled to 0-255."""
+    frame = np.asarray(frame)
+    if frame.ndim == 3 and frame.shape[-1] == 3:
+        return np.clip(frame, 0, 255).astype(np.uint8)
+    return (np.clip(frame, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+@dataclass
+class CaptureJob:
+    """One event: frames oldest first (the last one is the trigger) and where to write them."""
+    path: Path
+    frames: List[np.ndarray]
+    timestamps: List[float]
+
+
+class CaptureWriter:
+    """
+    Queue + worker thread writing event captures under a disk quota.
+
+    Args:
+        capture_dir: Directory for captures (created once)
+        quota_bytes: Maximum total size of the directory's captures (0 = unlimited)
+        pre_event_frames: Frames kept per equipment unit to prepend to a capture
+        max_queue: Pending captures; further events are dropped while the queue is full
+        image_format: "png" or "npz" (None = png if Pillow is installed, else npz)
+        clock: Wall-clock time source for frame timestamps
+    """
+
+    def __init__(self, capture_dir: str, quota_bytes: int = 0, pre_event_frames: int = 0,
+                 max_queue: int = 32, image_format: Optional[str] = None,
+                 clock: Callable[[], float] = time.time):
+        if image_format is None:
+            image_format = "png" if Image is not None else "npz"
+        if image_format not in ("png", "npz"):
+            raise ValueError(f"Unsupported capture format: {image_format}")
+        if image_format == "png" and Image is None:
+            raise RuntimeError("Pillow is required for PNG captures")
+        self.capture_dir = Path(capture_dir)
+        self.capture_dir.mkdir(parents=True, exist_ok=True)
+        self.quota_bytes = quota_bytes
+        self.pre_event_frames = pre_event_frames
+        self.image_format = image_format
+        self.clock = clock
+        self.dropped = 0
+        self.written = 0
+        self.evicted = 0
+
+        self._history: Dict[str, Deque[Tuple[float, np.ndarray]]] = {}
+        self._history_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[CaptureJob]]" = queue.Queue(maxsize=max_queue)
+        self._sequence = 0
+
+        # Existing captures, oldest first, so the quota covers earlier runs too
+        self._files: Deque[Tuple[Path, int]] = deque()
+        existing = sorted((entry.stat().st_mtime, entry.path) for entry in os.scandir(self.capture_dir)
+                          if entry.is_file() and entry.name.endswith((".png", ".npz")))
+        for _, path in existing:
+            self._files.append((Path(path), os.path.getsize(path)))
+        self.total_bytes = sum(size for _, size in self._files)
+
+        self._worker = threading.Thread(target=self._run, name="security-capture", daemon=True)
+        self._worker.start()
+
+    def record_frame(self, equipment_id: str, frame: np.ndarray):
+        """Remember a frame for the unit's pre-event buffer (no-op if pre_event_frames is 0)."""
+        if not self.pre_event_frames:
+            return
+        with self._history_lock:
+            history = self._history.get(equipment_id)
+            if history is None:
+                history = self._history[equipment_id] = deque(maxlen=self.pre_event_frames)
+            history.append((self.clock(), np.array(frame, copy=True)))
+
+    def capture(self, equipment_id: str, frame: np.ndarray, event_type: str = "motion") -> Optional[str]:
+        """
+        Queue a capture of `frame` plus the unit's pre-event frames. Never blocks.
+
+        Returns:
+            Path the capture will be written to, or None if the queue is full
+        """
+        now = self.clock()
+        with self._history_lock:
+            history = list(self._history.get(equipment_id, ()))
+            self._sequence += 1
+            sequence = self._sequence
+        timestamp = datetime.fromtimestamp(now).strftime("%Y%m%d_%H%M%S")
+        path = self.capture_dir / f"{event_type}_{equipment_id}_{timestamp}_{sequence:04d}.{self.image_format}"
+        job = CaptureJob(path, [f for _, f in history] + [np.array(frame, copy=True)],
+                         [t for t, _ in history] + [now])
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Capture queue full - dropped {event_type} capture for {equipment_id}")
+            return None
+        return str(path)
+
+    def _write(self, job: CaptureJob):
+        if self.image_format == "npz":
+            with open(job.path, "wb") as f:
+                np.savez_compressed(f, frames=np.stack(job.frames), timestamps=np.array(job.timestamps))
+        else:
+            images = [Image.fromarray(to_image_array(frame)) for frame in job.frames]
+            images[0].save(job.path, format="PNG", save_all=len(images) > 1, append_images=images[1:])
+
+    def _enforce_quota(self):
+        while self.quota_bytes and self.total_bytes > self.quota_bytes and len(self._files) > 1:
+            path, size = self._files.popleft()
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Could not evict capture {path}: {e}")
+            self.total_bytes -= size
+            self.evicted += 1
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._write(job)
+                size = job.path.stat().st_size
+                self._files.append((job.path, size))
+                self.total_bytes += size
+                self.written += 1
+                self._enforce_quota()
+                logger.info(f"Captured thermal image: {job.path}")
+            except Exception as e:
+                logger.error(f"Failed to write capture {job.path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Wait until every queued capture is written."""
+        self._queue.join()
+
+    def close(self):
+        """Write the remaining captures and stop the worker."""
+        self._queue.put(None)
+        self._worker.join()
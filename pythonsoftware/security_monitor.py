@@ -15,6 +15,16 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 import numpy as np
 
+from business_calendar import DAY_S, BusinessCalendar, BusinessSchedule
+from security_capture import CaptureWriter
+from security_state import SecurityStateManager
+from tamper_engine import TamperEngine
+
+try:
+    import RPi.GPIO as GPIO
+except (ImportError, RuntimeError):
+    GPIO = None
+
 logger = logging.getLogger('security_monitor')
 
 # ============================================================================
@@ -26,7 +36,9 @@ SECURITY_CONFIG = {
     "business_hours": {
         "start": "08:00",  # 8 AM
         "end": "18:00",    # 6 PM
-        "weekdays_only": True  # Enhanced security on weekends
+        "weekdays_only": True,  # Enhanced security on weekends
+        "holidays": [],  # "YYYY-MM-DD" dates with after-hours security all day
+        "locations": {}  # Per-location overrides, see business_calendar.py
     },
 
     # Motion detection settings
@@ -35,7 +47,10 @@ SECURITY_CONFIG = {
         "sensitivity": 0.7,  # 0.0-1.0, higher = more sensitive
         "cooldown_seconds": 300,  # 5 minutes between motion alerts
         "capture_images": True,
-        "capture_duration": 10  # Capture for 10 seconds after motion
+        "capture_duration": 10,  # Capture for 10 seconds after motion
+        "capture_dir": "../logs/security_captures",
+        "capture_quota_mb": 200,  # Oldest captures are deleted beyond this
+        "pre_event_frames": 5  # Frames from before the trigger included in each capture
     },
 
     # Tamper detection settings
@@ -43,7 +58,21 @@ SECURITY_CONFIG = {
         "enabled": True,
         "vibration_threshold": 2.0,  # G-force (much higher than normal operation)
         "temperature_change_rate": 5.0,  # °C per minute (rapid change = tampering)
-        "door_open_sensor": False  # Set to True if using magnetic door sensors
+        "door_open_sensor": False,  # Set to True if using magnetic door sensors
+        "cooldown_seconds": 300,  # Between tamper alerts for the same unit
+        "history_size": 16,  # Readings kept per unit for baselines
+        "rate_window": 5,  # Readings in the robust (Theil-Sen) temperature slope
+        "min_history": 3,  # Readings needed before history-based checks
+        "vibration_burst_sigma": 6.0,  # Robust z-score against the unit's own vibration baseline
+        "vibration_noise_floor": 0.05,  # G, minimum baseline spread (quiet units)
+        "coincidence_sigma": 3.0,  # Weak vibration indicator...
+        "coincidence_rate_fraction": 0.5,  # ...weak temperature indicator (fraction of the rate limit)...
+        "coincidence_count": 2,  # ...and how many weak indicators (incl. motion) must coincide
+        "equipment_types": {  # Per-type overrides of any key above except history_size/rate_window
+            "centrifuge": {"vibration_threshold": 6.0, "vibration_burst_sigma": 8.0},
+            "freezer_ultra_low": {"temperature_change_rate": 2.0},
+            "incubator": {"temperature_change_rate": 1.0}
+        }
     },
 
     # Activity logging
@@ -73,65 +102,83 @@ class MotionDetector:
     """
     PIR motion sensor integration for detecting unauthorized access.
     Compatible with HC-SR501 PIR sensor or similar.
+
+    Motion state is kept per equipment unit in a SecurityStateManager, so
+    one unit's detection does not hide another's. With a
+    motion_events.MotionEventMonitor, units mapped to a PIR pin are answered
+    from its edge-triggered events, so motion between two checks is not missed.
     """
 
-    def __init__(self, gpio_pin: int = 18):
+    def __init__(self, gpio_pin: int = 18, events=None, states: Optional[SecurityStateManager] = None):
         """
         Initialize motion detector.
 
         Args:
             gpio_pin: GPIO pin number for PIR sensor (default: GPIO 18)
+            events: MotionEventMonitor for interrupt-driven PIR pins (None = polling only)
+            states: Per-unit security state (None = a private manager)
         """
         self.gpio_pin = gpio_pin
-        self.last_motion_time = None
-        self.motion_active = False
+        self.events = events
+        self.states = states if states is not None else create_security_state()
 
-        try:
-            import RPi.GPIO as GPIO
+        self.gpio_available = GPIO is not None
+        # gpio_pin is only polled without an event monitor (which owns the PIR pins)
+        self.polling = self.gpio_available and events is None
+        if self.polling:
             GPIO.setmode(GPIO.BCM)
             GPIO.setup(self.gpio_pin, GPIO.IN)
-            self.gpio_available = True
             logger.info(f"Motion detector initialized on GPIO {gpio_pin}")
-        except ImportError:
-            self.gpio_available = False
+        elif GPIO is None and events is None:
             logger.warning("RPi.GPIO not available - motion detection will use mock data")
 
-    def detect_motion(self) -> bool:
+    @property
+    def last_motion_time(self) -> Optional[datetime]:
+        """Most recent motion on any unit."""
+        last = self.states.last_motion_time()
+        return datetime.fromtimestamp(last) if last is not None else None
+
+    def detect_motion(self, reading: Optional[bool] = None, equipment_id: Optional[str] = None,
+                      has_sensor: bool = True) -> bool:
         """
         Check if motion is detected.
 
+        Args:
+            reading: PIR state already read this cycle (e.g. via the sensor bus);
+                None reads the GPIO pin
+            equipment_id: Unit to check; units with an interrupt-driven PIR use
+                the edges latched since their last check
+            has_sensor: False for units without a motion sensor, which never
+                report motion
+
         Returns:
             True if motion detected, False otherwise
         """
         if not SECURITY_CONFIG["motion_detection"]["enabled"]:
             return False
 
-        if self.gpio_available:
-            import RPi.GPIO as GPIO
+        if self.events is not None and equipment_id in self.events.target_pins:
+            motion = self.events.consume(equipment_id) or self.events.motion_active(equipment_id)
+        elif reading is not None:
+            motion = bool(reading)
+        elif not has_sensor or self.events is not None:
+            # No PIR on this unit, or its PIR is not one of the event monitor's pins
+            motion = False
+        elif self.polling:
             motion = GPIO.input(self.gpio_pin) == GPIO.HIGH
         else:
-            # Mock motion detection for testing
+            # Mock motion detection for testing (no RPi.GPIO at all)
             import random
             motion = random.random() < 0.02  # 2% chance of "motion" for testing
 
-        if motion and not self.motion_active:
-            self.last_motion_time = datetime.now()
-            self.motion_active = True
-            logger.warning(f"MOTION DETECTED at {self.last_motion_time}")
-            return True
-        elif not motion and self.motion_active:
-            self.motion_active = False
+        if self.states.note_motion(equipment_id or f"gpio:{self.gpio_pin}", motion):
+            logger.warning(f"MOTION DETECTED at {self.last_motion_time}" + (f" ({equipment_id})" if equipment_id else ""))
 
         return motion
 
-    def is_cooldown_active(self) -> bool:
-        """Check if motion detection is in cooldown period."""
-        if self.last_motion_time is None:
-            return False
-
-        cooldown = SECURITY_CONFIG["motion_detection"]["cooldown_seconds"]
-        elapsed = (datetime.now() - self.last_motion_time).total_seconds()
-        return elapsed < cooldown
+    def is_cooldown_active(self, key: str) -> bool:
+        """Check if motion alerts for a unit or zone are in their cooldown period."""
+        return self.states.cooldown_active(key, "motion")
 
 
 # ============================================================================
@@ -141,19 +188,25 @@ class MotionDetector:
 class TamperDetector:
     """
     Detect physical tampering with equipment using multiple sensor inputs.
+
+    Indicators are computed over short per-unit sensor histories by
+    tamper_engine.TamperEngine (robust rate of change, vibration bursts,
+    multi-sensor coincidence), with thresholds per equipment type.
     """
 
     def __init__(self):
-        self.baseline_readings = {}
+        self.engine = TamperEngine(SECURITY_CONFIG["tamper_detection"])
         self.tamper_events = []
 
-    def check_tamper(self, equipment_id: str, readings: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    def check_tamper(self, equipment_id: str, readings: Dict[str, Any],
+                     equipment_type: Optional[str] = None) -> Optional[Dict[str, str]]:
         """
         Check for tampering indicators.
 
         Args:
             equipment_id: Equipment identifier
             readings: Current sensor readings
+            equipment_type: Selects SECURITY_CONFIG["tamper_detection"]["equipment_types"] overrides
 
         Returns:
             Dict with tamper details if detected, None otherwise
@@ -161,122 +214,105 @@ class TamperDetector:
         if not SECURITY_CONFIG["tamper_detection"]["enabled"]:
             return None
 
-        sensors = readings.get("sensors", {})
-
-        # Check 1: Abnormal vibration (equipment being moved/hit)
-        if "vibration" in sensors:
-            vib_val = float(sensors["vibration"])
-            threshold = SECURITY_CONFIG["tamper_detection"]["vibration_threshold"]
-            if vib_val >= threshold:
-                return {
-                    "type": "physical_tampering",
-                    "indicator": "abnormal_vibration",
-                    "value": f"{vib_val:.2f}G",
-                    "message": f"Equipment experienced {vib_val:.2f}G vibration (possible physical tampering)"
-                }
-
-        # Check 2: Rapid temperature change (door left open or equipment disabled)
-        if equipment_id in self.baseline_readings and "temperature" in sensors:
-            prev_temp = self.baseline_readings[equipment_id].get("temperature")
-            prev_time = self.baseline_readings[equipment_id].get("timestamp")
-
-            if prev_temp is not None and prev_time is not None:
-                current_temp = float(sensors["temperature"])
-                time_diff = (datetime.now() - prev_time).total_seconds() / 60.0  # minutes
-
-                if time_diff > 0:
-                    temp_change_rate = abs(current_temp - prev_temp) / time_diff
-                    max_rate = SECURITY_CONFIG["tamper_detection"]["temperature_change_rate"]
-
-                    if temp_change_rate > max_rate:
-                        return {
-                            "type": "thermal_tampering",
-                            "indicator": "rapid_temperature_change",
-                            "value": f"{temp_change_rate:.2f}°C/min",
-                            "message": f"Temperature changing at {temp_change_rate:.2f}°C/min (possible door open/tampering)"
-                        }
-
-        # Update baseline readings
-        self.baseline_readings[equipment_id] = {
-            "temperature": sensors.get("temperature"),
-            "timestamp": datetime.now()
-        }
-
-        return None
+        result = self.engine.check(equipment_id, readings, equipment_type)
+        if result is not None:
+            self.tamper_events.append({"equipment_id": equipment_id, "timestamp": datetime.now().isoformat(), **result})
+        return result
 
 
 # ============================================================================
 # AFTER-HOURS MONITORING
 # ============================================================================
 
-def is_after_hours() -> bool:
+_business_schedule = None  # Compiled from SECURITY_CONFIG["business_hours"] on first use
+
+
+def get_business_schedule() -> BusinessSchedule:
+    """Compiled business-hours schedule (compiled once; see reload_business_schedule)."""
+    global _business_schedule
+    if _business_schedule is None:
+        try:
+            _business_schedule = BusinessSchedule.from_config(SECURITY_CONFIG["business_hours"])
+        except Exception as e:
+            logger.error(f"Error parsing business hours: {e}")
+            # Same fallback as before: treat all times as business hours
+            _business_schedule = BusinessSchedule(BusinessCalendar({day: [(0, DAY_S)] for day in range(7)}))
+    return _business_schedule
+
+
+def reload_business_schedule() -> None:
+    """Recompile the schedule after SECURITY_CONFIG["business_hours"] has changed."""
+    global _business_schedule
+    _business_schedule = None
+
+
+def is_after_hours(location: Optional[str] = None, when: Optional[datetime] = None) -> bool:
     """
-    Check if current time is outside business hours.
+    Check if a time is outside business hours.
+
+    Args:
+        location: Equipment location, for per-location schedules (None = default schedule)
+        when: Time to check (None = now)
 
     Returns:
-        True if after-hours (enhanced security), False if business hours
+        True if after-hours or a holiday (enhanced security), False if business hours
     """
-    now = datetime.now()
-    config = SECURITY_CONFIG["business_hours"]
-
-    # Check weekends
-    if config["weekdays_only"] and now.weekday() >= 5:  # Saturday=5, Sunday=6
-        return True
-
-    # Parse business hours
-    try:
-        start_time = datetime.strptime(config["start"], "%H:%M").time()
-        end_time = datetime.strptime(config["end"], "%H:%M").time()
-        current_time = now.time()
-
-        return not (start_time <= current_time <= end_time)
-    except Exception as e:
-        logger.error(f"Error parsing business hours: {e}")
-        return False
+    return get_business_schedule().is_after_hours(when, location)
 
 
 # ============================================================================
 # CAMERA CAPTURE ON MOTION
 # ============================================================================
 
-def capture_thermal_image_on_motion(equipment_id: str, thermal_data: np.ndarray) -> Optional[str]:
+capture_writer = None  # security_capture.CaptureWriter, created on first use
+
+
+def get_capture_writer() -> Optional[CaptureWriter]:
+    """Background capture writer configured from SECURITY_CONFIG["motion_detection"]."""
+    global capture_writer
+    if capture_writer is None:
+        settings = SECURITY_CONFIG["motion_detection"]
+        try:
+            capture_writer = CaptureWriter(
+                settings.get("capture_dir", "../logs/security_captures"),
+                quota_bytes=int(settings.get("capture_quota_mb", 0) * 1024 * 1024),
+                pre_event_frames=settings.get("pre_event_frames", 0)
+            )
+        except Exception as e:
+            logger.error(f"Failed to start capture writer: {e}")
+            return None
+    return capture_writer
+
+
+def record_thermal_frame(equipment_id: str, thermal_data: np.ndarray) -> None:
+    """Keep a frame for the pre-event part of a later capture."""
+    if SECURITY_CONFIG["motion_detection"]["capture_images"] and SECURITY_CONFIG["motion_detection"].get("pre_event_frames"):
+        writer = get_capture_writer()
+        if writer is not None:
+            writer.record_frame(equipment_id, thermal_data)
+
+
+def capture_thermal_image_on_motion(equipment_id: str, thermal_data: np.ndarray,
+                                    event_type: str = "motion") -> Optional[str]:
     """
-    Save thermal image when motion detected.
+    Queue a thermal capture for a security event; encoding and writing happen
+    in the background (see security_capture.CaptureWriter).
 
     Args:
         equipment_id: Equipment identifier
         thermal_data: Thermal camera data array
+        event_type: Prefix of the capture file name
 
     Returns:
-        Path to saved image, or None if capture failed
+        Path the capture will be written to, or None if capture is disabled or the queue is full
     """
     if not SECURITY_CONFIG["motion_detection"]["capture_images"]:
         return None
 
-    try:
-        from PIL import Image
-
-        # Create security captures directory
-        capture_dir = Path("../logs/security_captures")
-        capture_dir.mkdir(parents=True, exist_ok=True)
-
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = capture_dir / f"motion_{equipment_id}_{timestamp}.png"
-
-        # Convert thermal data to image
-        if thermal_data.shape[-1] == 3:  # RGB thermal image
-            img = Image.fromarray(thermal_data.astype(np.uint8))
-        else:  # Grayscale thermal
-            img = Image.fromarray((thermal_data * 255).astype(np.uint8), mode='L')
-
-        img.save(filename)
-        logger.info(f"Captured thermal image on motion: {filename}")
-        return str(filename)
-
-    except Exception as e:
-        logger.error(f"Failed to capture thermal image: {e}")
+    writer = get_capture_writer()
+    if writer is None:
         return None
+    return writer.capture(equipment_id, thermal_data, event_type)
 
 
 # ============================================================================
@@ -315,7 +351,7 @@ class ActivityLogger:
             "event_type": event_type,
             "equipment_id": equipment_id,
             "details": details,
-            "after_hours": is_after_hours()
+            "after_hours": is_after_hours(details.get("location") if isinstance(details, dict) else None)
         }
 
         # Append to JSON log file
@@ -376,7 +412,7 @@ def send_intrusion_alert(equipment_id: str, alert_type: str, details: Dict[str,
     import alert_manager
 
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    after_hours = is_after_hours()
+    after_hours = is_after_hours(details.get("location"))
 
     # Build alert message
     alert_message = f"🚨🚨 SECURITY ALERT 🚨🚨\n"
@@ -396,6 +432,12 @@ def send_intrusion_alert(equipment_id: str, alert_type: str, details: Dict[str,
 
     config = SECURITY_CONFIG["intrusion_response"]
 
+    for listener in intrusion_listeners:
+        try:
+            listener(equipment_id, alert_type)
+        except Exception as e:
+            logger.error(f"Intrusion alert listener failed: {e}")
+
     # Send via Discord
     if config["send_discord"]:
         try:
@@ -430,18 +472,118 @@ def send_intrusion_alert(equipment_id: str, alert_type: str, details: Dict[str,
 motion_detector = None
 tamper_detector = None
 activity_logger = None
+security_state = None  # security_state.SecurityStateManager shared by motion and tamper alerts
+motion_events = None  # motion_events.MotionEventMonitor, if PIR pins are interrupt-driven
+intrusion_listeners = []  # Called as listener(equipment_id, alert_type) for every intrusion alert
+
+def initialize_security_monitoring(events=None):
+    """
+    Initialize all security monitoring components.
 
-def initialize_security_monitoring():
-    """Initialize all security monitoring components."""
-    global motion_detector, tamper_detector, activity_logger
+    Args:
+        events: Started MotionEventMonitor for interrupt-driven PIR pins (None = polling)
+    """
+    global motion_detector, tamper_detector, activity_logger, motion_events, security_state
 
-    motion_detector = MotionDetector()
+    motion_events = events
+    security_state = create_security_state()
+    motion_detector = MotionDetector(events=events, states=security_state)
     tamper_detector = TamperDetector()
     activity_logger = ActivityLogger()
 
     logger.info("Security monitoring initialized")
 
 
+def create_security_state() -> SecurityStateManager:
+    """State manager with the motion and tamper cooldowns from SECURITY_CONFIG."""
+    return SecurityStateManager({
+        "motion": SECURITY_CONFIG["motion_detection"]["cooldown_seconds"],
+        "tamper": SECURITY_CONFIG["tamper_detection"].get("cooldown_seconds", 0)
+    })
+
+
+def suppress_alerts(equipment_id: str, duration_s: float) -> None:
+    """
+    Withhold a unit's security alerts for a maintenance window.
+
+    Its tamper baseline is cleared too, so readings taken while the unit is
+    open do not become the reference for later checks.
+    """
+    if motion_detector is None:
+        initialize_security_monitoring()
+    security_state.suppress(equipment_id, duration_s)
+    tamper_detector.engine.reset(equipment_id)
+    logger.info(f"Security alerts for {equipment_id} suppressed for {duration_s:.0f}s")
+
+
+def set_motion_events(events) -> None:
+    """Switch motion detection to (or, with None, away from) a MotionEventMonitor, keeping other state."""
+    global motion_events
+    if motion_detector is None:
+        initialize_security_monitoring(events)
+        return
+    motion_events = events
+    motion_detector.events = events
+
+
+def check_motion(equipment: Dict[str, Any], readings: Dict[str, Any], after_hours: Optional[bool] = None) -> bool:
+    """
+    Motion part of the security pipeline: log, capture and alert on new motion.
+
+    Called every monitoring cycle from monitor_security(), and straight from
+    the main loop when a MotionEventMonitor wakes it.
+
+    Returns:
+        True if an intrusion alert was sent
+    """
+    if motion_detector is None:
+        initialize_security_monitoring()
+
+    equipment_id = equipment["id"]
+    if after_hours is None:
+        after_hours = is_after_hours(equipment.get("location"))
+
+    has_sensor = equipment.get("sensors", {}).get("motion_sensor", {}).get("enabled", False)
+    motion_detected = motion_detector.detect_motion(readings.get("sensors", {}).get("motion"), equipment_id,
+                                                    has_sensor)
+    if not motion_detected or security_state.is_suppressed(equipment_id):
+        return False
+    # Cooldown is per zone (or per unit without one), so other rooms still alert
+    if not security_state.allow_alert(security_state.alert_key(equipment), "motion"):
+        return False
+
+    # Log motion event
+    activity_logger.log_activity(
+        event_type="motion_detected",
+        equipment_id=equipment_id,
+        details={
+            "location": equipment.get("location", "Unknown"),
+            "after_hours": after_hours,
+            "thermal_data_available": "thermal" in readings.get("sensors", {})
+        }
+    )
+
+    # Capture thermal image if motion detected
+    thermal_image_path = None
+    if "thermal" in readings.get("sensors", {}):
+        thermal_data = readings["sensors"]["thermal"]
+        thermal_image_path = capture_thermal_image_on_motion(equipment_id, thermal_data)
+
+    # Send intrusion alert
+    send_intrusion_alert(
+        equipment_id=equipment_id,
+        alert_type="unauthorized_motion",
+        details={
+            "message": "Motion detected in equipment area",
+            "location": equipment.get("location", "Unknown"),
+            "after_hours": "YES" if after_hours else "NO",
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        },
+        thermal_image_path=thermal_image_path
+    )
+    return True
+
+
 def monitor_security(equipment: Dict[str, Any], readings: Dict[str, Any]) -> None:
     """
     Main security monitoring function - call this from main monitoring loop.
@@ -454,47 +596,14 @@ def monitor_security(equipment: Dict[str, Any], readings: Dict[str, Any]) -> Non
         initialize_security_monitoring()
 
     equipment_id = equipment["id"]
-    after_hours = is_after_hours()
+    after_hours = is_after_hours(equipment.get("location"))
 
     # Enhanced monitoring during after-hours
     if after_hours or SECURITY_CONFIG["motion_detection"]["enabled"]:
-
-        # Check for motion
-        motion_detected = motion_detector.detect_motion()
-
-        if motion_detected and not motion_detector.is_cooldown_active():
-            # Log motion event
-            activity_logger.log_activity(
-                event_type="motion_detected",
-                equipment_id=equipment_id,
-                details={
-                    "location": equipment.get("location", "Unknown"),
-                    "after_hours": after_hours,
-                    "thermal_data_available": "thermal" in readings.get("sensors", {})
-                }
-            )
-
-            # Capture thermal image if motion detected
-            thermal_image_path = None
-            if "thermal" in readings.get("sensors", {}):
-                thermal_data = readings["sensors"]["thermal"]
-                thermal_image_path = capture_thermal_image_on_motion(equipment_id, thermal_data)
-
-            # Send intrusion alert
-            send_intrusion_alert(
-                equipment_id=equipment_id,
-                alert_type="unauthorized_motion",
-                details={
-                    "message": "Motion detected in equipment area",
-                    "location": equipment.get("location", "Unknown"),
-                    "after_hours": "YES" if after_hours else "NO",
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                },
-                thermal_image_path=thermal_image_path
-            )
+        check_motion(equipment, readings, after_hours)
 
     # Check for tampering (always active)
-    tamper_result = tamper_detector.check_tamper(equipment_id, readings)
+    tamper_result = tamper_detector.check_tamper(equipment_id, readings, equipment.get("type"))
 
     if tamper_result:
         # Log tamper event
@@ -504,11 +613,12 @@ def monitor_security(equipment: Dict[str, Any], readings: Dict[str, Any]) -> Non
             details=tamper_result
         )
 
+    if tamper_result and security_state.allow_alert(equipment_id, "tamper"):
         # Capture thermal image if available
         thermal_image_path = None
         if "thermal" in readings.get("sensors", {}):
             thermal_data = readings["sensors"]["thermal"]
-            thermal_image_path = capture_thermal_image_on_motion(equipment_id, thermal_data)
+            thermal_image_path = capture_thermal_image_on_motion(equipment_id, thermal_data, "tamper")
 
         # Send intrusion alert
         send_intrusion_alert(
@@ -518,6 +628,10 @@ def monitor_security(equipment: Dict[str, Any], readings: Dict[str, Any]) -> Non
             thermal_image_path=thermal_image_path
         )
 
+    # Keep this cycle's frame for the pre-event part of later captures
+    if "thermal" in readings.get("sensors", {}):
+        record_thermal_frame(equipment_id, readings["sensors"]["thermal"])
+
     # Log routine access (if enabled)
     if SECURITY_CONFIG["activity_logging"]["log_all_access"]:
         activity_logger.log_activity(
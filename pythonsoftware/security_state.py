@@ -0,0 +1,142 @@
+"""
+Per-equipment and per-zone security state for PREMONITOR.
+
+security_monitor used to keep one MotionDetector with a single
+motion_active flag, last_motion_time and cooldown for every unit, so the
+first unit to see motion consumed the event and its cooldown silenced every
+other unit. Here each key gets its own small __slots__ record:
+
+    "<equipment_id>"  - PIR edge state of that unit's sensor, tamper alert
+                        cooldown, maintenance suppression
+    "zone:<name>"     - motion alert cooldown shared by the units of a room
+                        (motion_sensor "zone" in the equipment registry);
+                        units without a zone use their own id
+
+Times are epoch seconds from an injectable clock, so checks are plain float
+comparisons. Tamper baselines are per unit in tamper_engine.TamperEngine.
+
+Usage:
+    states = SecurityStateManager({"motion": 300, "tamper": 300})
+    if states.note_motion("fridge_lab_a_01", pir_level):           # New motion on this unit
+        if states.allow_alert(states.alert_key(equipment), "motion"):
+            ...send alert...
+    states.suppress("fridge_lab_a_01", 3600)                       # Maintenance window
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Alert kinds with their own cooldown; each maps to a SecurityState slot
+ALERT_KINDS = ("motion", "tamper")
+
+_NEVER = float("-inf")
+
+
+class SecurityState:
+    """Security state of one equipment unit or zone."""
+
+    __slots__ = ("key", "motion_active", "last_motion_time", "last_motion_alert", "last_tamper_alert",
+                 "suppressed_until", "suppressed_alerts")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.motion_active = False
+        self.last_motion_time: Optional[float] = None  # Last rising PIR edge
+        self.last_motion_alert = _NEVER
+        self.last_tamper_alert = _NEVER
+        self.suppressed_until = _NEVER
+        self.suppressed_alerts = 0  # Alerts withheld by suppression
+
+    def __repr__(self) -> str:
+        return f"SecurityState({self.key!r}, motion_active={self.motion_active})"
+
+
+class SecurityStateManager:
+    """
+    Security states keyed by equipment id or zone, created on first use.
+
+    Args:
+        cooldowns_s: Alert kind -> seconds between alerts for the same key
+        clock: Wall-clock time source (seconds)
+    """
+
+    def __init__(self, cooldowns_s: Dict[str, float], clock: Callable[[], float] = time.time):
+        unknown = set(cooldowns_s) - set(ALERT_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown alert kinds: {sorted(unknown)}")
+        self.cooldowns_s = {kind: float(cooldowns_s.get(kind, 0.0)) for kind in ALERT_KINDS}
+        self.clock = clock
+        self._states: Dict[str, SecurityState] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __iter__(self) -> Iterator[SecurityState]:
+        return iter(list(self._states.values()))
+
+    @staticmethod
+    def alert_key(equipment: Dict[str, Any]) -> str:
+        """Key whose motion cooldown covers this unit: "zone:<name>" if it has a zone, else its id."""
+        zone = equipment.get("sensors", {}).get("motion_sensor", {}).get("zone")
+        return f"zone:{zone}" if zone else equipment["id"]
+
+    def state(self, key: str) -> SecurityState:
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = SecurityState(key)
+        return state
+
+    def note_motion(self, key: str, motion: bool) -> bool:
+        """
+        Track a unit's PIR level.
+
+        Returns:
+            True on a rising edge (motion that was not active at the last check)
+        """
+        state = self.state(key)
+        if motion and not state.motion_active:
+            state.motion_active = True
+            state.last_motion_time = self.clock()
+            return True
+        if not motion:
+            state.motion_active = False
+        return False
+
+    def cooldown_active(self, key: str, kind: str) -> bool:
+        state = self._states.get(key)
+        if state is None:
+            return False
+        return self.clock() - getattr(state, f"last_{kind}_alert") < self.cooldowns_s[kind]
+
+    def is_suppressed(self, key: str) -> bool:
+        state = self._states.get(key)
+        return state is not None and self.clock() < state.suppressed_until
+
+    def allow_alert(self, key: str, kind: str) -> bool:
+        """
+        Whether a `kind` alert for `key` may be sent now; if so, starts its cooldown.
+
+        Returns False during the key's cooldown for that kind or while it is suppressed.
+        """
+        state = self.state(key)
+        now = self.clock()
+        if now < state.suppressed_until:
+            state.suppressed_alerts += 1
+            return False
+        if now - getattr(state, f"last_{kind}_alert") < self.cooldowns_s[kind]:
+            return False
+        setattr(state, f"last_{kind}_alert", now)
+        return True
+
+    def suppress(self, key: str, duration_s: float):
+        """Withhold alerts for `key` for `duration_s` seconds (0 lifts suppression)."""
+        self.state(key).suppressed_until = self.clock() + duration_s if duration_s > 0 else _NEVER
+
+    def last_motion_time(self) -> Optional[float]:
+        """Most recent motion on any unit."""
+        times = [state.last_motion_time for state in self._states.values() if state.last_motion_time is not None]
+        return max(times) if times else None
+
+    def forget(self, key: str):
+        """Drop a key's state (unit removed from the registry)."""
+        self._states.pop(key, None)
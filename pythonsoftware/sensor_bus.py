@@ -0,0 +1,155 @@
+"""
+Sensor bus for PREMONITOR: one read per physical device per tick.
+
+Equipment configs name the physical device behind each sensor (1-Wire
+device_id, I2C address, ALSA device, ADC channel, GPIO pin). Several units
+can point at the same device - two fridges watched by one thermal camera,
+a room PIR shared by every unit in the room - and without the bus each of
+them reads it separately every cycle.
+
+The bus keys readers by (hardware function, physical address). Within a
+tick each device is read at most once and the value is fanned out to every
+subscribed unit; a per-device freshness window can also carry a value over
+into later ticks for slow sensors. A failed read is remembered for the rest
+of the tick so a dead device is not retried by every subscriber.
+
+Usage:
+    bus = SensorBus()
+    plans = equipment_plan.compile_plans(equipment_list, hardware, bus=bus)
+    bus.begin_tick()            # once per monitoring cycle
+    readings = equipment_plan.read_sensors(plans[0])
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger('sensor_bus')
+
+# Sensor config fields that identify a physical device, most specific first
+ADDRESS_FIELDS = (
+    ("device_id", "w1"),
+    ("i2c_address", "i2c"),
+    ("device", "audio"),
+    ("analog_channel", "adc"),
+    ("gpio_pin", "gpio"),
+)
+
+
+def device_address(sensor_config: Dict[str, Any]) -> str:
+    """
+    Physical address of a sensor from its config, e.g. "i2c:0x33" or "w1:28-000000000000".
+
+    I2C addresses are normalised so "0x33", "0X33" and 51 are the same
+    device. Sensors without any address field map to "default": the
+    hardware function reads the one device it knows about.
+    """
+    for key, bus_name in ADDRESS_FIELDS:
+        if sensor_config.get(key) is not None:
+            value = sensor_config[key]
+            if key == "i2c_address":
+                try:
+                    value = hex(int(value, 16) if isinstance(value, str) else int(value))
+                except ValueError:
+                    pass
+            return f"{bus_name}:{value}"
+    return "default"
+
+
+@dataclass
+class _Device:
+    """One physical device: its reader, subscribers and last read."""
+    read: Callable[[], Any]
+    max_age_s: float
+    subscribers: List[str] = field(default_factory=list)
+    value: Any = None
+    error: Optional[Exception] = None
+    read_tick: int = -1
+    read_time: float = float("-inf")
+    reads: int = 0
+
+
+class SensorBus:
+    """
+    Shared per-device read cache.
+
+    Args:
+        max_age_s: Default freshness window; 0 means values are only shared within a tick
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, max_age_s: float = 0.0, clock: Callable[[], float] = time.monotonic):
+        self.max_age_s = max_age_s
+        self.clock = clock
+        self.tick = 0
+        self._devices: Dict[str, _Device] = {}
+        self._lock = threading.Lock()
+
+    def reader(self, reader_name: str, read: Callable[[], Any], sensor_config: Dict[str, Any],
+               subscriber: str = "") -> Callable[[], Any]:
+        """
+        Register a subscriber for a device and return a callable that reads it through the bus.
+
+        Args:
+            reader_name: Hardware function name (part of the device key)
+            read: Function that reads the device
+            sensor_config: Sensor config from the registry (address fields, optional max_age_s)
+            subscriber: Equipment id, for diagnostics
+        """
+        key = f"{reader_name}@{device_address(sensor_config)}"
+        max_age_s = float(sensor_config.get("max_age_s", self.max_age_s))
+        with self._lock:
+            device = self._devices.get(key)
+            if device is None:
+                device = self._devices[key] = _Device(read, max_age_s)
+            else:
+                # Shared device: keep the strictest freshness any subscriber asked for
+                device.max_age_s = min(device.max_age_s, max_age_s)
+            device.subscribers.append(subscriber)
+        return lambda: self.read(key)
+
+    def begin_tick(self):
+        """Start a new monitoring cycle: values older than their freshness window are re-read."""
+        with self._lock:
+            self.tick += 1
+
+    def read(self, key: str) -> Any:
+        """
+        Read a device, or return its value from this tick / freshness window.
+
+        Raises:
+            Exception: The device's read error, for every subscriber in the same tick
+        """
+        with self._lock:
+            device = self._devices[key]
+            now = self.clock()
+            if device.read_tick == self.tick:
+                if device.error is not None:
+                    raise device.error
+                return device.value
+            if device.error is None and device.reads and now - device.read_time <= device.max_age_s:
+                return device.value
+
+            device.read_tick = self.tick
+            try:
+                device.value = device.read()
+                device.error = None
+                device.read_time = now
+                device.reads += 1
+            except Exception as e:
+                device.error = e
+                raise
+            return device.value
+
+    def clear(self):
+        """Drop all devices and subscriptions (before recompiling plans)."""
+        with self._lock:
+            self._devices.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-device subscriber list and read count, for logging."""
+        with self._lock:
+            return {key: {"subscribers": list(device.subscribers), "reads": device.reads}
+                    for key, device in self._devices.items()}
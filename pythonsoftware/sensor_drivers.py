@@ -0,0 +1,864 @@
+"""
+Per-device sensor drivers for PREMONITOR.
+
+hardware_drivers.py exposes one module-level function per sensor type, all
+bound to a single global device. Here every physical sensor gets its own
+driver object, built from its equipment_registry config (analog_channel,
+device_id, i2c_address), which opens its bus handle once and keeps it.
+Two units with gas sensors on ADC channels 0 and 1 therefore read two
+different channels.
+
+Drivers talk to small bus backends (smbus2-style I2C, spidev-style SPI,
+the 1-Wire sysfs tree). Simulated backends implement the same calls so the
+drivers can be exercised without a Pi.
+
+Usage:
+    drivers = DriverRegistry(SensorBackends.from_config("hardware"))
+    plans = equipment_plan.compile_plans(equipment_list, hardware, drivers=drivers)
+    ...
+    drivers.close()
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from sensor_bus import device_address
+from vibration_features import VibrationAnalyzer, VibrationFeatures
+
+try:
+    import smbus2
+except ImportError:
+    smbus2 = None
+
+try:
+    import spidev
+except ImportError:
+    spidev = None
+
+logger = logging.getLogger('sensor_drivers')
+
+W1_DEVICES_DIR = "/sys/bus/w1/devices"
+
+
+# ============================================================================
+# BUS BACKENDS
+# ============================================================================
+
+class SMBusBackend:
+    """I2C bus handle (smbus2), opened once and shared by every driver on the bus."""
+
+    def __init__(self, bus_number: int = 1):
+        if smbus2 is None:
+            raise RuntimeError("smbus2 is not installed")
+        self._bus = smbus2.SMBus(bus_number)
+        self._lock = threading.Lock()
+
+    def read_i2c_block_data(self, address: int, register: int, length: int) -> List[int]:
+        with self._lock:
+            return self._bus.read_i2c_block_data(address, register, length)
+
+    def write_byte_data(self, address: int, register: int, value: int):
+        with self._lock:
+            self._bus.write_byte_data(address, register, value)
+
+    def close(self):
+        self._bus.close()
+
+
+class SpiDevBackend:
+    """SPI device handle (spidev), opened once."""
+
+    def __init__(self, bus: int = 0, device: int = 0, max_speed_hz: int = 1350000):
+        if spidev is None:
+            raise RuntimeError("spidev is not installed")
+        self._spi = spidev.SpiDev()
+        self._spi.open(bus, device)
+        self._spi.max_speed_hz = max_speed_hz
+        self._spi.mode = 0
+        self._lock = threading.Lock()
+
+    def xfer2(self, data: List[int]) -> List[int]:
+        with self._lock:
+            return self._spi.xfer2(list(data))
+
+    def close(self):
+        self._spi.close()
+
+
+class SimulatedI2CBus:
+    """In-memory I2C bus: devices are attached by address and answer register reads/writes."""
+
+    def __init__(self):
+        self.devices: Dict[int, Any] = {}
+
+    def attach(self, address: int, device) -> Any:
+        self.devices[address] = device
+        return device
+
+    def _device(self, address: int):
+        if address not in self.devices:
+            raise OSError(121, f"Remote I/O error: no device at I2C address {hex(address)}")
+        return self.devices[address]
+
+    def read_i2c_block_data(self, address: int, register: int, length: int) -> List[int]:
+        return self._device(address).read(register, length)
+
+    def write_byte_data(self, address: int, register: int, value: int):
+        self._device(address).write(register, value)
+
+    def close(self):
+        pass
+
+
+class SimulatedI2CDevice:
+    """Register-map device for SimulatedI2CBus."""
+
+    def __init__(self):
+        self.registers = bytearray(256)
+
+    def read(self, register: int, length: int) -> List[int]:
+        return list(self.registers[register:register + length])
+
+    def write(self, register: int, value: int):
+        self.registers[register] = value & 0xFF
+
+
+class SimulatedADXL345(SimulatedI2CDevice):
+    """
+    ADXL345 with a FIFO for SimulatedI2CBus, replaying `signal_g` ((n, 3) in G) in a loop.
+
+    The FIFO only reports entries once the driver has set measure and stream
+    modes, like the real part.
+    """
+
+    def __init__(self, signal_g=None):
+        super().__init__()
+        self.set_signal([[0.0, 0.0, 1.0]] if signal_g is None else signal_g)
+
+    def set_signal(self, signal_g):
+        signal = np.asarray(signal_g, dtype=np.float64).reshape(-1, 3)
+        self.signal = np.round(signal / ADXL345.G_PER_LSB).astype('<i2')
+        self.position = 0
+
+    def read(self, register: int, length: int) -> List[int]:
+        if register == ADXL345.REG_FIFO_STATUS:
+            measuring = self.registers[ADXL345.REG_POWER_CTL] & 0x08
+            streaming = self.registers[ADXL345.REG_FIFO_CTL] & 0xC0 == ADXL345.FIFO_STREAM
+            return [ADXL345.FIFO_DEPTH if measuring and streaming else 0]
+        if register == ADXL345.REG_DATAX0:
+            self.registers[register:register + 6] = self.signal[self.position].tobytes()
+            self.position = (self.position + 1) % len(self.signal)
+        return super().read(register, length)
+
+
+class SimulatedMCP3008:
+    """
+    MCP3008 on a simulated SPI bus; `values` holds the 10-bit level of each channel.
+
+    `noise` optionally adds Gaussian noise (standard deviation in counts, per
+    channel) to every conversion, clipped to the 10-bit range.
+    """
+
+    def __init__(self, values: Optional[List[int]] = None, noise: Optional[List[float]] = None, seed: int = 0):
+        self.values = list(values) if values is not None else [0] * 8
+        self.noise = list(noise) if noise is not None else [0.0] * 8
+        self.transfers = 0
+        self._rng = np.random.default_rng(seed)
+
+    def xfer2(self, data: List[int]) -> List[int]:
+        self.transfers += 1
+        channel = (data[1] >> 4) & 0x07
+        level = self.values[channel]
+        if self.noise[channel]:
+            level = min(1023, max(0, round(level + self._rng.normal(0.0, self.noise[channel]))))
+        value = int(level) & 0x3FF
+        return [0, (value >> 8) & 0x03, value & 0xFF]
+
+    def close(self):
+        pass
+
+
+class SimulatedW1Tree:
+    """
+    Fake 1-Wire sysfs tree for DS18B20 probes.
+
+    Mirrors the w1_therm layout: <root>/<device_id>/w1_slave and temperature,
+    plus <root>/w1_bus_master1/therm_bulk_read for bulk conversions.
+
+    Args:
+        root: Directory to populate (a temporary directory if None)
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self._owned = root is None
+        self.root = Path(root or tempfile.mkdtemp(prefix="premonitor_w1_"))
+        self.root.mkdir(parents=True, exist_ok=True)
+        master = self.root / "w1_bus_master1"
+        master.mkdir(exist_ok=True)
+        if not (master / "therm_bulk_read").exists():
+            (master / "therm_bulk_read").write_text("0\n")
+
+    @property
+    def bulk_read_path(self) -> Path:
+        return self.root / "w1_bus_master1" / "therm_bulk_read"
+
+    def add(self, device_id: str, temperature_c: float = 4.0, crc_ok: bool = True):
+        (self.root / device_id).mkdir(exist_ok=True)
+        self.set_temperature(device_id, temperature_c, crc_ok)
+
+    def set_temperature(self, device_id: str, temperature_c: float, crc_ok: bool = True):
+        millideg = int(round(temperature_c * 1000))
+        raw = (int(round(temperature_c * 16)) & 0xFFFF).to_bytes(2, 'little').hex()
+        content = (f"{raw[:2]} {raw[2:]} 4b 46 7f ff 0c 10 1c : crc=1c {'YES' if crc_ok else 'NO'}\n"
+                   f"{raw[:2]} {raw[2:]} 4b 46 7f ff 0c 10 1c t={millideg}\n")
+        (self.root / device_id / "w1_slave").write_text(content)
+        temperature_file = self.root / device_id / "temperature"
+        if crc_ok:
+            temperature_file.write_text(f"{millideg}\n")
+        elif temperature_file.exists():
+            temperature_file.unlink()
+
+    def close(self):
+        """Remove the directory if this tree created it."""
+        if self._owned:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+# ============================================================================
+# DRIVERS
+# ============================================================================
+
+class SensorDriver:
+    """One physical sensor. Subclasses implement read() and may hold open handles."""
+
+    config_key = ""
+
+    def read(self) -> Any:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+@dataclass(frozen=True)
+class AnalogReading:
+    """Oversampled ADC channel value; float(reading) is the averaged value."""
+    value: float
+    noise: float  # Standard deviation of the individual conversions, same units as value
+    samples: int
+
+    def __float__(self) -> float:
+        return self.value
+
+
+class MCP3008Sampler:
+    """
+    Bulk sampler for every configured MCP3008 channel.
+
+    One sweep reads all channels `oversample` times in a tight SPI loop into
+    a preallocated (oversample, channels) array, then decimates it into a
+    per-channel mean and noise estimate (standard deviation of the
+    conversions). Each sweep's values are handed out once per channel: the
+    first read of a channel that was already read since the last sweep
+    starts the next sweep, so one monitoring cycle costs one sweep however
+    many units share the ADC.
+
+    Args:
+        spi: SPI backend (xfer2)
+        oversample: Conversions per channel per sweep
+    """
+
+    def __init__(self, spi, oversample: int = 16):
+        if oversample < 1:
+            raise ValueError(f"oversample must be at least 1, got {oversample}")
+        self.spi = spi
+        self.oversample = oversample
+        self.channels: List[int] = []
+        self.sweeps = 0
+        self._index: Dict[int, int] = {}
+        self._requests: List[List[int]] = []
+        self._lock = threading.Lock()
+        self._allocate()
+
+    def _allocate(self):
+        count = len(self.channels)
+        self._raw = np.zeros((self.oversample, count), dtype=np.uint16)
+        self._means = np.zeros(count, dtype=np.float64)
+        self._noise = np.zeros(count, dtype=np.float64)
+        self._fresh = np.zeros(count, dtype=bool)
+
+    def add(self, channel: int):
+        """Include a channel in every sweep."""
+        if not 0 <= channel <= 7:
+            raise ValueError(f"MCP3008 channel must be 0-7, got {channel}")
+        with self._lock:
+            if channel in self._index:
+                return
+            self._index[channel] = len(self.channels)
+            self.channels.append(channel)
+            self._requests.append([0x01, (0x08 | channel) << 4, 0x00])  # Start bit, single-ended + channel
+            self._allocate()
+
+    def sweep(self):
+        """Read every channel `oversample` times and update the means and noise estimates."""
+        with self._lock:
+            self._sweep()
+
+    def _sweep(self):
+        xfer2 = self.spi.xfer2
+        requests = self._requests
+        for row in self._raw:
+            for column, request in enumerate(requests):
+                response = xfer2(request)
+                row[column] = ((response[1] & 0x03) << 8) | response[2]
+        np.mean(self._raw, axis=0, out=self._means)
+        np.std(self._raw, axis=0, out=self._noise)
+        self._fresh[:] = True
+        self.sweeps += 1
+
+    def read(self, channel: int) -> AnalogReading:
+        """Averaged value and noise of a channel, in raw counts (0-1023)."""
+        with self._lock:
+            column = self._index[channel]
+            if not self._fresh[column]:
+                self._sweep()
+            self._fresh[column] = False
+            return AnalogReading(float(self._means[column]), float(self._noise[column]), self.oversample)
+
+
+class MCP3008SampledChannel(SensorDriver):
+    """
+    One channel served by an MCP3008Sampler.
+
+    read() returns an AnalogReading scaled as offset + scale * counts (raw
+    counts by default), so analog current or airflow sensors report their
+    own units.
+    """
+
+    config_key = "gas_sensor"
+
+    def __init__(self, sampler: MCP3008Sampler, channel: int, scale: float = 1.0, offset: float = 0.0):
+        self.sampler = sampler
+        self.channel = channel
+        self.scale = scale
+        self.offset = offset
+        sampler.add(channel)
+
+    def read(self) -> AnalogReading:
+        reading = self.sampler.read(self.channel)
+        if self.scale == 1.0 and self.offset == 0.0:
+            return reading
+        return AnalogReading(self.offset + self.scale * reading.value, abs(self.scale) * reading.noise,
+                             reading.samples)
+
+
+def parse_w1_slave(content: str) -> float:
+    """
+    Temperature (deg C) from a DS18B20 w1_slave file.
+
+    Raises:
+        IOError: On a CRC failure or malformed content
+    """
+    lines = content.strip().splitlines()
+    if len(lines) < 2 or not lines[0].endswith("YES"):
+        raise IOError("DS18B20 CRC check failed")
+    marker = lines[1].find("t=")
+    if marker < 0:
+        raise IOError("DS18B20 reading has no temperature field")
+    return int(lines[1][marker + 2:]) / 1000.0
+
+
+class DS18B20(SensorDriver):
+    """DS18B20 1-Wire probe; keeps its w1_slave file open between reads."""
+
+    config_key = "temperature"
+
+    def __init__(self, device_id: str, devices_dir: str = W1_DEVICES_DIR):
+        self.device_id = device_id
+        self.path = os.path.join(devices_dir, device_id, "w1_slave")
+        self._file = None
+
+    def _handle(self):
+        if self._file is None:
+            self._file = open(self.path, "r")
+        return self._file
+
+    def read(self) -> float:
+        try:
+            handle = self._handle()
+            handle.seek(0)
+            content = handle.read()
+        except OSError:
+            # Probe dropped off the bus: reopen on the next read
+            self.close()
+            raise
+        return parse_w1_slave(content)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class DS18B20Array:
+    """
+    Non-blocking DS18B20 reads for every probe on the 1-Wire buses.
+
+    A DS18B20 conversion takes ~750 ms at 12 bits, and a plain w1_slave read
+    waits for it, so N probes read one after another cost N * 750 ms. Here a
+    background thread triggers one bulk conversion on every bus master
+    (w1_therm's therm_bulk_read), waits for it once, then reads all probes in
+    parallel. read() only returns the cached last good value, so the
+    monitoring loop never waits on the bus.
+
+    Args:
+        devices_dir: 1-Wire sysfs devices directory
+        interval_s: Time between conversions in the background thread
+        conversion_time_s: Conversion time to wait after triggering
+        max_age_s: Cached values older than this are reported as errors
+        max_workers: Parallel probe reads
+    """
+
+    def __init__(self, devices_dir: str = W1_DEVICES_DIR, interval_s: float = 10.0,
+                 conversion_time_s: float = 0.75, max_age_s: float = 120.0, max_workers: int = 8,
+                 clock: Callable[[], float] = time.monotonic):
+        self.devices_dir = Path(devices_dir)
+        self.interval_s = interval_s
+        self.conversion_time_s = conversion_time_s
+        self.max_age_s = max_age_s
+        self.clock = clock
+        self.device_ids: List[str] = []
+        self._values: Dict[str, float] = {}
+        self._times: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # One conversion on the bus at a time
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="w1")
+        self._stop = threading.Event()
+        self._thread = None
+        self.refreshed = threading.Event()  # Set after every completed refresh
+
+    def add(self, device_id: str):
+        """Include a probe in the next conversions."""
+        with self._lock:
+            if device_id not in self.device_ids:
+                self.device_ids.append(device_id)
+
+    def _bulk_read_files(self) -> List[Path]:
+        return sorted(self.devices_dir.glob("w1_bus_master*/therm_bulk_read"))
+
+    def _trigger_conversion(self) -> bool:
+        """Start a conversion on every probe at once. Returns False if no master supports it."""
+        triggered = False
+        for path in self._bulk_read_files():
+            try:
+                with open(path, "w") as f:
+                    f.write("trigger\n")
+                triggered = True
+            except OSError as e:
+                logger.warning(f"1-Wire bulk conversion trigger failed on {path.parent.name}: {e}")
+        return triggered
+
+    def _wait_for_conversion(self, started: float):
+        """Wait until the masters report completion (status 1) or the conversion time has passed."""
+        deadline = started + self.conversion_time_s
+        while self.clock() < deadline:
+            statuses = []
+            for path in self._bulk_read_files():
+                try:
+                    statuses.append(int(path.read_text().strip()))
+                except (OSError, ValueError):
+                    statuses.append(None)
+            if statuses and all(status == 1 for status in statuses):
+                return
+            time.sleep(min(0.05, max(0.0, deadline - self.clock())))
+
+    def _read_probe(self, device_id: str) -> float:
+        probe_dir = self.devices_dir / device_id
+        temperature_file = probe_dir / "temperature"
+        if temperature_file.exists():
+            return int(temperature_file.read_text().strip()) / 1000.0
+        return parse_w1_slave((probe_dir / "w1_slave").read_text())
+
+    def refresh(self):
+        """One conversion cycle: bulk trigger, wait once, read all probes in parallel."""
+        with self._refresh_lock:
+            self._refresh()
+
+    def _refresh(self):
+        with self._lock:
+            device_ids = list(self.device_ids)
+        if not device_ids:
+            return
+
+        started = self.clock()
+        if self._trigger_conversion():
+            self._wait_for_conversion(started)
+
+        futures = {device_id: self._executor.submit(self._read_probe, device_id) for device_id in device_ids}
+        now = self.clock()
+        with self._lock:
+            for device_id, future in futures.items():
+                try:
+                    self._values[device_id] = future.result()
+                    self._times[device_id] = now
+                    self._errors.pop(device_id, None)
+                except Exception as e:
+                    # Keep the last good value; its age tells callers how stale it is
+                    self._errors[device_id] = str(e)
+                    logger.warning(f"DS18B20 {device_id} read failed: {e}")
+        self.refreshed.set()
+
+    def read_with_age(self, device_id: str):
+        """
+        Last good temperature of a probe and its age in seconds.
+
+        Raises:
+            IOError: If the probe has never been read successfully
+        """
+        with self._lock:
+            if device_id not in self._values:
+                error = self._errors.get(device_id, "no conversion completed yet")
+                raise IOError(f"DS18B20 {device_id}: {error}")
+            return self._values[device_id], self.clock() - self._times[device_id]
+
+    def read(self, device_id: str) -> float:
+        """
+        Cached temperature of a probe (never touches the bus).
+
+        Raises:
+            IOError: If there is no value, or it is older than max_age_s
+        """
+        value, age = self.read_with_age(device_id)
+        if age > self.max_age_s:
+            raise IOError(f"DS18B20 {device_id}: last good value is {age:.0f}s old")
+        return value
+
+    def _run(self):
+        # start() has just converted any new probes, so wait one interval first
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"DS18B20 refresh failed: {e}")
+
+    def start(self):
+        """
+        Start background conversions (idempotent).
+
+        Call once all probes are added: probes that have never been converted
+        get one bulk conversion before returning, so the first monitoring
+        cycle already has their values.
+        """
+        with self._refresh_lock:
+            with self._lock:
+                unread = [d for d in self.device_ids if d not in self._values and d not in self._errors]
+            if unread:
+                self._refresh()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ds18b20", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.conversion_time_s + 1.0)
+            self._thread = None
+        self._executor.shutdown(wait=False)
+
+
+class DS18B20Probe(SensorDriver):
+    """
+    One probe served from a DS18B20Array; read() returns the cached value.
+
+    The array is started by DriverRegistry.start() once every probe is added.
+    """
+
+    config_key = "temperature"
+
+    def __init__(self, array: DS18B20Array, device_id: str):
+        self.array = array
+        self.device_id = device_id
+        array.add(device_id)
+
+    def read(self) -> float:
+        return self.array.read(self.device_id)
+
+
+class ADXL345(SensorDriver):
+    """
+    ADXL345 accelerometer on I2C; read() returns the VibrationFeatures of one burst.
+
+    Each read drains the 32-entry FIFO (stream mode) at `rate_hz` - up to
+    3200 Hz, which needs a 400 kHz I2C clock to keep up - until `samples`
+    XYZ readings are in a preallocated buffer, then analyses the burst.
+    float(reading) is the RMS of the deviation from the mean in G, so gravity
+    and mounting angle do not count as vibration.
+    """
+
+    config_key = "vibration"
+
+    REG_BW_RATE = 0x2C
+    REG_POWER_CTL = 0x2D
+    REG_DATA_FORMAT = 0x31
+    REG_DATAX0 = 0x32
+    REG_FIFO_CTL = 0x38
+    REG_FIFO_STATUS = 0x39
+    FIFO_BYPASS = 0x00
+    FIFO_STREAM = 0x80
+    FIFO_DEPTH = 32
+    G_PER_LSB = 0.0039  # Full resolution mode
+    RATE_CODES = {3200: 0x0F, 1600: 0x0E, 800: 0x0D, 400: 0x0C, 200: 0x0B, 100: 0x0A}
+
+    def __init__(self, i2c, address: int = 0x53, samples: int = 1024, rate_hz: int = 3200,
+                 timeout_s: Optional[float] = None):
+        if rate_hz not in self.RATE_CODES:
+            raise ValueError(f"ADXL345 rate must be one of {sorted(self.RATE_CODES)} Hz, got {rate_hz}")
+        self.i2c = i2c
+        self.address = address
+        self.samples = samples
+        self.rate_hz = rate_hz
+        self.timeout_s = timeout_s if timeout_s is not None else 2.0 * samples / rate_hz + 0.5
+        self._raw = np.zeros((samples, 3), dtype='<i2')
+        self._raw_bytes = self._raw.view(np.uint8).reshape(samples, 6)  # One FIFO entry per row
+        self._samples_g = np.empty((samples, 3), dtype=np.float64)
+        self.analyzer = VibrationAnalyzer(samples, rate_hz)
+        self.i2c.write_byte_data(address, self.REG_DATA_FORMAT, 0x0B)  # FULL_RES, +/-16g
+        self.i2c.write_byte_data(address, self.REG_BW_RATE, self.RATE_CODES[rate_hz])
+        self.i2c.write_byte_data(address, self.REG_POWER_CTL, 0x08)    # Measure mode
+
+    def read_xyz(self) -> np.ndarray:
+        raw = bytes(self.i2c.read_i2c_block_data(self.address, self.REG_DATAX0, 6))
+        return np.frombuffer(raw, dtype='<i2').astype(np.float64) * self.G_PER_LSB
+
+    def capture(self) -> np.ndarray:
+        """
+        One burst of `samples` XYZ readings in G, shape (samples, 3).
+
+        Returns the driver's internal buffer, which the next capture overwrites.
+
+        Raises:
+            IOError: If the FIFO stops filling (device not measuring)
+        """
+        # Bypass mode empties the FIFO so the burst starts with fresh samples
+        self.i2c.write_byte_data(self.address, self.REG_FIFO_CTL, self.FIFO_BYPASS)
+        self.i2c.write_byte_data(self.address, self.REG_FIFO_CTL, self.FIFO_STREAM | (self.FIFO_DEPTH - 1))
+        poll_s = self.FIFO_DEPTH / 2 / self.rate_hz  # Half a FIFO: stream mode drops samples when full
+        deadline = time.monotonic() + self.timeout_s
+
+        filled = 0
+        while filled < self.samples:
+            entries = self.i2c.read_i2c_block_data(self.address, self.REG_FIFO_STATUS, 1)[0] & 0x3F
+            if not entries:
+                if time.monotonic() > deadline:
+                    raise IOError(f"ADXL345 at {hex(self.address)}: FIFO not filling ({filled}/{self.samples})")
+                time.sleep(poll_s)
+                continue
+            for _ in range(min(entries, self.samples - filled)):
+                self._raw_bytes[filled] = self.i2c.read_i2c_block_data(self.address, self.REG_DATAX0, 6)
+                filled += 1
+
+        np.multiply(self._raw, self.G_PER_LSB, out=self._samples_g)
+        return self._samples_g
+
+    def read(self) -> VibrationFeatures:
+        return self.analyzer.analyze(self.capture())
+
+
+class INA219(SensorDriver):
+    """INA219 current monitor on I2C; read() returns current in A from the shunt voltage."""
+
+    config_key = "current"
+
+    REG_SHUNT_VOLTAGE = 0x01
+    VOLTS_PER_LSB = 10e-6
+
+    def __init__(self, i2c, address: int = 0x40, shunt_ohms: float = 0.1):
+        self.i2c = i2c
+        self.address = address
+        self.shunt_ohms = shunt_ohms
+
+    def read(self) -> float:
+        raw = bytes(self.i2c.read_i2c_block_data(self.address, self.REG_SHUNT_VOLTAGE, 2))
+        shunt_volts = int.from_bytes(raw, 'big', signed=True) * self.VOLTS_PER_LSB
+        return shunt_volts / self.shunt_ohms
+
+
+# ============================================================================
+# BACKENDS AND DRIVER REGISTRY
+# ============================================================================
+
+def _i2c_address(sensor_config: Dict[str, Any], default: int) -> int:
+    value = sensor_config.get("i2c_address", default)
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+@dataclass
+class SensorBackends:
+    """Bus handles shared by all drivers (None = bus not available)."""
+    i2c: Any = None
+    spi: Any = None
+    w1_dir: str = W1_DEVICES_DIR
+    simulated: bool = False
+    w1_array: Optional[DS18B20Array] = None  # Async DS18B20 reads; None = blocking per-probe reads
+    adc_oversample: int = 16
+    adc: Optional[MCP3008Sampler] = None  # Created for `spi` if not given
+    w1_tree: Optional[SimulatedW1Tree] = None  # Fake 1-Wire tree behind w1_dir, removed on close()
+
+    def __post_init__(self):
+        if self.adc is None and self.spi is not None:
+            self.adc = MCP3008Sampler(self.spi, self.adc_oversample)
+
+    @classmethod
+    def from_config(cls, backend: str, i2c_bus: int = 1, spi_bus: int = 0, spi_device: int = 0,
+                    spi_max_speed_hz: int = 1350000, w1_dir: str = W1_DEVICES_DIR,
+                    w1_refresh_s: Optional[float] = 10.0, adc_oversample: int = 16) -> 'SensorBackends':
+        """
+        Open the real buses ("hardware") or create simulated ones ("simulated").
+
+        Real buses that cannot be opened are left as None; drivers needing
+        them are skipped and the plan falls back to the hardware module.
+        DS18B20 probes are converted in the background every `w1_refresh_s`
+        seconds (None = blocking reads); MCP3008 channels are averaged over
+        `adc_oversample` conversions.
+        """
+        if backend == "simulated":
+            tree = SimulatedW1Tree()
+            w1_dir = tree.root.as_posix()
+            return cls(SimulatedI2CBus(), SimulatedMCP3008([300] * 8, noise=[2.0] * 8), w1_dir, True,
+                       DS18B20Array(w1_dir, w1_refresh_s, conversion_time_s=0.0) if w1_refresh_s else None,
+                       adc_oversample, w1_tree=tree)
+
+        backends = cls(w1_dir=w1_dir, adc_oversample=adc_oversample)
+        if w1_refresh_s:
+            backends.w1_array = DS18B20Array(w1_dir, w1_refresh_s)
+        try:
+            backends.i2c = SMBusBackend(i2c_bus)
+        except Exception as e:
+            logger.warning(f"I2C bus {i2c_bus} unavailable: {e}")
+        try:
+            backends.spi = SpiDevBackend(spi_bus, spi_device, spi_max_speed_hz)
+            backends.adc = MCP3008Sampler(backends.spi, adc_oversample)
+        except Exception as e:
+            logger.warning(f"SPI {spi_bus}.{spi_device} unavailable: {e}")
+        return backends
+
+    def close(self):
+        if self.w1_array is not None:
+            self.w1_array.close()
+        for handle in (self.i2c, self.spi):
+            if handle is not None:
+                handle.close()
+        if self.w1_tree is not None:
+            self.w1_tree.close()
+
+
+def _make_analog(cfg: Dict[str, Any], backends: SensorBackends) -> Optional[SensorDriver]:
+    if backends.adc is None or cfg.get("analog_channel") is None:
+        return None
+    return MCP3008SampledChannel(backends.adc, int(cfg["analog_channel"]),
+                                 float(cfg.get("scale", 1.0)), float(cfg.get("offset", 0.0)))
+
+
+def _make_temperature(cfg: Dict[str, Any], backends: SensorBackends) -> Optional[SensorDriver]:
+    if cfg.get("sensor_type", "DS18B20") != "DS18B20" or not cfg.get("device_id"):
+        return None
+    if backends.simulated:
+        SimulatedW1Tree(backends.w1_dir).add(cfg["device_id"])
+    if backends.w1_array is not None:
+        return DS18B20Probe(backends.w1_array, cfg["device_id"])
+    return DS18B20(cfg["device_id"], backends.w1_dir)
+
+
+def _make_vibration(cfg: Dict[str, Any], backends: SensorBackends) -> Optional[SensorDriver]:
+    if backends.i2c is None or cfg.get("sensor_type", "ADXL345") != "ADXL345":
+        return None
+    address = _i2c_address(cfg, 0x53)
+    if backends.simulated and address not in backends.i2c.devices:
+        backends.i2c.attach(address, SimulatedADXL345())
+    return ADXL345(backends.i2c, address, int(cfg.get("burst_samples", 1024)), int(cfg.get("sample_rate_hz", 3200)))
+
+
+def _make_current(cfg: Dict[str, Any], backends: SensorBackends) -> Optional[SensorDriver]:
+    if cfg.get("analog_channel") is not None:
+        return _make_analog(cfg, backends)  # Hall-effect sensor on the ADC (set "scale" to A per count)
+    if backends.i2c is None or cfg.get("sensor_type", "INA219") != "INA219":
+        return None
+    address = _i2c_address(cfg, 0x40)
+    if backends.simulated and address not in backends.i2c.devices:
+        backends.i2c.attach(address, SimulatedI2CDevice())
+    return INA219(backends.i2c, address, float(cfg.get("shunt_ohms", 0.1)))
+
+
+# Sensor config key -> driver factory (returns None if the config/bus does not fit)
+DRIVER_FACTORIES: Dict[str, Callable[[Dict[str, Any], SensorBackends], Optional[SensorDriver]]] = {
+    "gas_sensor": _make_analog,
+    "temperature": _make_temperature,
+    "vibration": _make_vibration,
+    "current": _make_current,
+    "airflow": _make_analog,
+}
+
+
+class DriverRegistry:
+    """
+    One driver instance per physical sensor, created on first use.
+
+    Units whose configs point at the same device get the same driver (and
+    handle); a config reload reuses drivers for devices that are still
+    configured.
+    """
+
+    def __init__(self, backends: SensorBackends):
+        self.backends = backends
+        self.drivers: Dict[str, SensorDriver] = {}
+        self._lock = threading.Lock()
+
+    def driver(self, config_key: str, sensor_config: Dict[str, Any]) -> Optional[SensorDriver]:
+        """Driver for a sensor config, or None if no driver handles it."""
+        factory = DRIVER_FACTORIES.get(config_key)
+        if factory is None:
+            return None
+
+        key = f"{config_key}@{device_address(sensor_config)}"
+        with self._lock:
+            if key not in self.drivers:
+                try:
+                    driver = factory(sensor_config, self.backends)
+                except Exception as e:
+                    logger.warning(f"Could not open {key}: {e}")
+                    driver = None
+                if driver is None:
+                    return None
+                self.drivers[key] = driver
+                logger.info(f"Opened {type(driver).__name__} driver for {key}")
+            return self.drivers[key]
+
+    def reader(self, config_key: str, sensor_config: Dict[str, Any]) -> Optional[Callable[[], Any]]:
+        """Bound read() of the sensor's driver, or None to use the hardware module."""
+        driver = self.driver(config_key, sensor_config)
+        return driver.read if driver is not None else None
+
+    def start(self):
+        """Start background conversions for the drivers created so far (after compiling plans)."""
+        w1_array = self.backends.w1_array
+        if w1_array is not None and w1_array.device_ids:
+            w1_array.start()
+
+    def close(self):
+        """Close every driver and the bus handles."""
+        with self._lock:
+            for driver in self.drivers.values():
+                driver.close()
+            self.drivers.clear()
+        self.backends.close()
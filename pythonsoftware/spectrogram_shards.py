@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Premonitor: spectrogram_shards.py
+
+Sharded, memory-mapped storage for fixed-shape spectrogram datasets.
+
+The audio loaders used to append every spectrogram to a Python list and
+call np.array() at the end, so the whole corpus had to fit in RAM twice.
+ShardWriter instead writes each spectrogram straight into a float16 .npy
+shard opened with np.lib.format.open_memmap. A shard holds `shard_size`
+samples, and its labels go into a small companion .npy. manifest.json
+describes the shards:
+
+    {"sample_shape": [128, 128, 1], "dtype": "float16", "total": N,
+     "label_counts": {"0": ..., "1": ...}, "params": {...},
+     "shards": [{"data": "shard_00000.npy", "labels": "shard_00000_labels.npy", "count": n}, ...]}
+
+The last shard keeps its full allocated size and "count" says how many rows
+are valid. The manifest is only written when the writer closes normally: a
+build that raised leaves no manifest (any earlier one is removed when a
+writer opens the directory), so a partial corpus is never mistaken for a
+complete one. ShardedDataset memory-maps the shards read-only, so training
+reads spectrograms from disk as tf.data asks for them. The whole dataset
+is never materialised.
+
+Usage:
+    with ShardWriter("datasets/shards/acoustic", (128, 128, 1)) as writer:
+        for spectrogram, label in loader.iter_machine_sounds():
+            writer.add(spectrogram, label)
+
+    dataset = ShardedDataset("datasets/shards/acoustic/manifest.json")
+    train_ids, val_ids = dataset.split(0.2)
+    train_ds = dataset.to_tf_dataset(train_ids, batch_size=64, shuffle=True)
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import tensorflow as tf
+except ImportError:
+    tf = None
+
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_SHARD_SIZE = 1024  # 32 MB per shard for 128x128 float16 spectrograms
+
+
+class ShardWriter:
+    """
+    Streams fixed-shape samples into memory-mapped .npy shards.
+
+    Args:
+        out_dir: Output directory (created if needed)
+        sample_shape: Shape every sample must have, e.g. config.ACOUSTIC_MODEL_INPUT_SHAPE
+        shard_size: Samples per shard
+        dtype: Storage dtype
+        params: Extra metadata stored in the manifest (e.g. spectrogram settings)
+    """
+
+    def __init__(self, out_dir, sample_shape, shard_size=DEFAULT_SHARD_SIZE, dtype=np.float16, params=None):
+        if shard_size < 1:
+            raise ValueError(f"shard_size must be at least 1, got {shard_size}")
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.sample_shape = tuple(int(dim) for dim in sample_shape)
+        self.shard_size = shard_size
+        self.dtype = np.dtype(dtype)
+        self.params = dict(params or {})
+        self.shards = []
+        self.label_counts = {}
+        self.total = 0
+        self._data = None
+        self._labels = None
+        self._count = 0
+        # Shards are about to be overwritten, so an older manifest no longer describes them
+        (self.out_dir / MANIFEST_NAME).unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _open_shard(self):
+        name = f"shard_{len(self.shards):05d}"
+        self._data = np.lib.format.open_memmap(self.out_dir / f"{name}.npy", mode='w+', dtype=self.dtype,
+                                               shape=(self.shard_size,) + self.sample_shape)
+        self._labels = np.zeros(self.shard_size, dtype=np.int32)
+        self._count = 0
+        self.shards.append({'data': f"{name}.npy", 'labels': f"{name}_labels.npy", 'count': 0})
+
+    def _close_shard(self):
+        self._data.flush()
+        del self._data
+        self._data = None
+        np.save(self.out_dir / self.shards[-1]['labels'], self._labels)
+        self.shards[-1]['count'] = self._count
+
+    def add(self, sample, label):
+        """Write one sample; raises ValueError if its shape differs from sample_shape."""
+        sample = np.asarray(sample)
+        if sample.shape != self.sample_shape:
+            raise ValueError(f"Sample shape {sample.shape} does not match {self.sample_shape}")
+        if self._data is None:
+            self._open_shard()
+        self._data[self._count] = sample
+        self._labels[self._count] = label
+        self._count += 1
+        self.total += 1
+        key = str(int(label))
+        self.label_counts[key] = self.label_counts.get(key, 0) + 1
+        if self._count == self.shard_size:
+            self._close_shard()
+
+    def abort(self):
+        """Release the open shard without writing a manifest (the build failed)."""
+        if self._data is not None:
+            del self._data
+            self._data = None
+
+    def close(self):
+        """Finish the open shard and write the manifest; returns the manifest path."""
+        if self._data is not None:
+            self._close_shard()
+        manifest = {
+            'sample_shape': list(self.sample_shape),
+            'dtype': self.dtype.name,
+            'total': self.total,
+            'label_counts': self.label_counts,
+            'params': self.params,
+            'shards': self.shards,
+        }
+        path = self.out_dir / MANIFEST_NAME
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+
+class ShardedDataset:
+    """
+    Read-only view of a sharded dataset through its manifest.
+
+    Samples are addressed by a global index (shard order, then row order) and
+    read through per-shard memory maps, so only the samples actually used are
+    paged in.
+    """
+
+    def __init__(self, manifest_path):
+        manifest_path = Path(manifest_path)
+        if manifest_path.is_dir():
+            manifest_path = manifest_path / MANIFEST_NAME
+        with open(manifest_path, 'r') as f:
+            self.manifest = json.load(f)
+        self.root = manifest_path.parent
+        self.sample_shape = tuple(self.manifest['sample_shape'])
+        self.params = self.manifest.get('params', {})
+        counts = [shard['count'] for shard in self.manifest['shards']]
+        self._starts = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self._data = [None] * len(counts)
+        self._labels = [None] * len(counts)
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    def shard(self, index):
+        """(data, labels) of one shard, memory-mapped and trimmed to its valid rows."""
+        if self._data[index] is None:
+            shard = self.manifest['shards'][index]
+            count = shard['count']
+            self._data[index] = np.load(self.root / shard['data'], mmap_mode='r')[:count]
+            self._labels[index] = np.load(self.root / shard['labels'])[:count]
+        return self._data[index], self._labels[index]
+
+    @property
+    def labels(self):
+        """All labels (small; loaded in full)."""
+        if not self._data:
+            return np.empty(0, dtype=np.int32)
+        return np.concatenate([self.shard(i)[1] for i in range(len(self._data))])
+
+    def __getitem__(self, index):
+        """(sample as float32, label) for a global index."""
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        shard_index = int(np.searchsorted(self._starts, index, side='right')) - 1
+        data, labels = self.shard(shard_index)
+        row = index - self._starts[shard_index]
+        return np.asarray(data[row], dtype=np.float32), int(labels[row])
+
+    def split(self, validation_fraction=0.2, seed=0):
+        """Random (train, validation) global index arrays."""
+        order = np.random.default_rng(seed).permutation(len(self))
+        n_val = int(round(len(self) * validation_fraction))
+        return np.sort(order[n_val:]), np.sort(order[:n_val])
+
+    def iter_samples(self, indices=None, shuffle=False, seed=None):
+        """Yield (sample, label) for the given global indices (default: all), optionally shuffled."""
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices)
+        if shuffle:
+            indices = np.random.default_rng(seed).permutation(indices)
+        for index in indices:
+            yield self[int(index)]
+
+    def to_tf_dataset(self, indices=None, batch_size=32, shuffle=False, seed=None):
+        """
+        tf.data pipeline reading samples from the shards on demand.
+
+        Raises:
+            RuntimeError: If TensorFlow is not installed
+        """
+        if tf is None:
+            raise RuntimeError("TensorFlow is required for to_tf_dataset()")
+        signature = (tf.TensorSpec(shape=self.sample_shape, dtype=tf.float32),
+                     tf.TensorSpec(shape=(), dtype=tf.int32))
+        dataset = tf.data.Dataset.from_generator(lambda: self.iter_samples(indices, shuffle, seed),
+                                                 output_signature=signature)
+        return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
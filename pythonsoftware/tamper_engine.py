@@ -0,0 +1,271 @@
+"""
+Vectorized tamper detection over short per-equipment sensor histories.
+
+TamperDetector used to compare the current temperature with the single
+previous reading, so one noisy sample looked like a door being forced, and
+the vibration check was a bare absolute threshold. Here every unit keeps the
+last `history_size` temperature and vibration readings in rows of shared
+2-D arrays, and all indicators are computed for every unit at once:
+
+    abnormal_vibration       - vibration >= vibration_threshold (G)
+    vibration_burst          - vibration far above the unit's own recent
+                               baseline: (v - median) / (1.4826 * MAD) >= vibration_burst_sigma
+    rapid_temperature_change - Theil-Sen slope (median of pairwise slopes) of
+                               the last `rate_window` temperatures, in C/min,
+                               >= temperature_change_rate; a single outlier
+                               cannot move it
+    sensor_coincidence       - `coincidence_count` weaker signs at the same
+                               time: vibration z >= coincidence_sigma, |rate| >=
+                               coincidence_rate_fraction * temperature_change_rate,
+                               motion present
+
+Every threshold can be overridden per equipment type under
+SECURITY_CONFIG["tamper_detection"]["equipment_types"] (all keys except
+history_size and rate_window, which fix the array shapes).
+
+Usage:
+    engine = TamperEngine(SECURITY_CONFIG["tamper_detection"])
+    result = engine.check("fridge_lab_a_01", readings, "fridge")   # One unit
+    for eq_id, readings in cycle: engine.record(eq_id, readings)    # Or a whole cycle...
+    evaluation = engine.evaluate()                                  # ...in one pass
+"""
+
+import time
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# Indicators in reporting order (the first one set is reported)
+TAMPER_INDICATORS = ("abnormal_vibration", "vibration_burst", "rapid_temperature_change", "sensor_coincidence")
+INDICATORS_DTYPE = np.dtype([(name, np.bool_) for name in TAMPER_INDICATORS])
+
+_MAD_TO_SIGMA = 1.4826
+
+
+@dataclass(frozen=True)
+class TamperSettings:
+    """Tamper thresholds for one equipment type."""
+    vibration_threshold: float = 2.0
+    temperature_change_rate: float = 5.0
+    vibration_burst_sigma: float = 6.0
+    vibration_noise_floor: float = 0.05
+    coincidence_sigma: float = 3.0
+    coincidence_rate_fraction: float = 0.5
+    coincidence_count: int = 2
+    min_history: int = 3
+
+    @classmethod
+    def from_config(cls, tamper_config: Dict[str, Any], equipment_type: Optional[str] = None) -> 'TamperSettings':
+        """Global tamper_detection settings with the equipment type's overrides applied."""
+        merged = dict(tamper_config)
+        merged.update(tamper_config.get("equipment_types", {}).get(equipment_type, {}))
+        return cls(**{f.name: type(f.default)(merged[f.name]) for f in fields(cls) if f.name in merged})
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except Exception:
+        return np.nan
+
+
+def _row_median(values: np.ndarray) -> np.ndarray:
+    """Median of each row ignoring NaN (NaN for rows without values), without nanmedian's warnings."""
+    ordered = np.sort(values, axis=1)  # NaN sorts last
+    count = np.sum(~np.isnan(values), axis=1)
+    low = np.maximum(count - 1, 0) // 2
+    rows = np.arange(len(values))
+    median = 0.5 * (ordered[rows, low] + ordered[rows, count // 2])
+    return np.where(count > 0, median, np.nan)
+
+
+@dataclass
+class TamperEvaluation:
+    """Indicators and the values behind them, one row per evaluated unit."""
+    equipment_ids: List[str]
+    indicators: np.ndarray  # INDICATORS_DTYPE
+    vibration: np.ndarray  # Latest reading, G
+    vibration_z: np.ndarray  # Robust z-score against the unit's baseline
+    temperature_rate: np.ndarray  # C/min
+    coincident: np.ndarray  # Number of weak indicators present
+
+    def result(self, row: int) -> Optional[Dict[str, str]]:
+        """TamperDetector result dict for the first indicator set on `row`, or None."""
+        flags = self.indicators[row]
+        if flags["abnormal_vibration"]:
+            value = self.vibration[row]
+            return {
+                "type": "physical_tampering",
+                "indicator": "abnormal_vibration",
+                "value": f"{value:.2f}G",
+                "message": f"Equipment experienced {value:.2f}G vibration (possible physical tampering)"
+            }
+        if flags["vibration_burst"]:
+            return {
+                "type": "physical_tampering",
+                "indicator": "vibration_burst",
+                "value": f"{self.vibration[row]:.2f}G ({self.vibration_z[row]:.1f} sigma)",
+                "message": f"Vibration burst of {self.vibration[row]:.2f}G, {self.vibration_z[row]:.1f} sigma "
+                           f"above this unit's baseline (possible physical tampering)"
+            }
+        if flags["rapid_temperature_change"]:
+            rate = self.temperature_rate[row]
+            return {
+                "type": "thermal_tampering",
+                "indicator": "rapid_temperature_change",
+                "value": f"{rate:.2f}°C/min",
+                "message": f"Temperature changing at {rate:.2f}°C/min (possible door open/tampering)"
+            }
+        if flags["sensor_coincidence"]:
+            return {
+                "type": "multi_sensor_tampering",
+                "indicator": "sensor_coincidence",
+                "value": f"{int(self.coincident[row])} indicators",
+                "message": f"{int(self.coincident[row])} sensors changed together (vibration "
+                           f"{self.vibration_z[row]:.1f} sigma, temperature {self.temperature_rate[row]:.2f}°C/min)"
+            }
+        return None
+
+
+class TamperEngine:
+    """
+    Per-unit sensor histories and vectorized tamper indicators.
+
+    Args:
+        tamper_config: SECURITY_CONFIG["tamper_detection"]
+        clock: Time source for reading timestamps (seconds)
+    """
+
+    def __init__(self, tamper_config: Dict[str, Any], clock: Callable[[], float] = time.time):
+        self.tamper_config = tamper_config
+        self.history_size = int(tamper_config.get("history_size", 16))
+        self.rate_window = min(int(tamper_config.get("rate_window", 5)), self.history_size)
+        if self.rate_window < 2:
+            raise ValueError(f"rate_window must be at least 2, got {self.rate_window}")
+        self.clock = clock
+        self.rows: Dict[str, int] = {}
+        self.equipment_ids: List[str] = []
+
+        capacity = 8
+        self.times = np.full((capacity, self.history_size), np.nan)
+        self.temperature = np.full((capacity, self.history_size), np.nan)
+        self.vibration = np.full((capacity, self.history_size), np.nan)
+        self.motion = np.zeros(capacity, dtype=bool)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.settings = {f.name: np.zeros(capacity) for f in fields(TamperSettings)}
+
+        self._pair_i, self._pair_j = np.triu_indices(self.rate_window, 1)
+
+    def _grow(self):
+        extra = len(self.counts)
+        self.times = np.vstack((self.times, np.full((extra, self.history_size), np.nan)))
+        self.temperature = np.vstack((self.temperature, np.full((extra, self.history_size), np.nan)))
+        self.vibration = np.vstack((self.vibration, np.full((extra, self.history_size), np.nan)))
+        self.motion = np.concatenate((self.motion, np.zeros(extra, dtype=bool)))
+        self.counts = np.concatenate((self.counts, np.zeros(extra, dtype=np.int64)))
+        self.settings = {name: np.concatenate((values, np.zeros(extra))) for name, values in self.settings.items()}
+
+    def row(self, equipment_id: str, equipment_type: Optional[str] = None) -> int:
+        """Row of a unit, allocating it (with its type's settings) on first use."""
+        row = self.rows.get(equipment_id)
+        if row is not None:
+            return row
+        row = len(self.equipment_ids)
+        if row == len(self.counts):
+            self._grow()
+        settings = TamperSettings.from_config(self.tamper_config, equipment_type)
+        for name, values in self.settings.items():
+            values[row] = getattr(settings, name)
+        self.rows[equipment_id] = row
+        self.equipment_ids.append(equipment_id)
+        return row
+
+    def reset(self, equipment_id: str):
+        """Clear a unit's history (e.g. after maintenance) so old readings are not its baseline."""
+        row = self.rows.get(equipment_id)
+        if row is None:
+            return
+        for history in (self.times, self.temperature, self.vibration):
+            history[row] = np.nan
+        self.motion[row] = False
+        self.counts[row] = 0
+
+    def record(self, equipment_id: str, readings: Dict[str, Any], equipment_type: Optional[str] = None,
+               timestamp: Optional[float] = None) -> int:
+        """Append one reading to the unit's history; returns its row."""
+        row = self.row(equipment_id, equipment_type)
+        sensors = readings.get("sensors", {})
+        slot = self.counts[row] % self.history_size
+        self.times[row, slot] = self.clock() if timestamp is None else timestamp
+        self.temperature[row, slot] = _to_float(sensors["temperature"]) if "temperature" in sensors else np.nan
+        self.vibration[row, slot] = _to_float(sensors["vibration"]) if "vibration" in sensors else np.nan
+        self.motion[row] = bool(sensors.get("motion", False))
+        self.counts[row] += 1
+        return row
+
+    def _recent(self, history: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Last rate_window values of each row, oldest first."""
+        offsets = np.arange(-self.rate_window, 0)
+        slots = (self.counts[rows, None] + offsets) % self.history_size
+        return history[rows[:, None], slots]
+
+    def evaluate(self, rows: Optional[np.ndarray] = None) -> TamperEvaluation:
+        """
+        Tamper indicators for the given rows (default: every unit) from their histories.
+
+        Units with fewer than min_history readings only get the absolute
+        vibration check.
+        """
+        if rows is None:
+            rows = np.arange(len(self.equipment_ids))
+        rows = np.asarray(rows, dtype=np.int64)
+        settings = {name: values[rows] for name, values in self.settings.items()}
+        counts = self.counts[rows]
+        latest = (counts - 1) % self.history_size
+        warm = counts >= settings["min_history"]
+
+        # Vibration: latest reading against the median/MAD of the rest of the history
+        vibration = self.vibration[rows]
+        current = vibration[np.arange(len(rows)), latest]
+        baseline = vibration.copy()
+        baseline[np.arange(len(rows)), latest] = np.nan
+        median = _row_median(baseline)
+        mad = _row_median(np.abs(baseline - median[:, None]))
+        spread = np.fmax(_MAD_TO_SIGMA * mad, settings["vibration_noise_floor"])
+        with np.errstate(invalid="ignore"):
+            vibration_z = np.where(warm, (current - median) / spread, np.nan)
+
+        # Temperature: Theil-Sen slope over the last rate_window readings
+        times = self._recent(self.times, rows)
+        temperature = self._recent(self.temperature, rows)
+        dt = times[:, self._pair_j] - times[:, self._pair_i]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            slopes = (temperature[:, self._pair_j] - temperature[:, self._pair_i]) / dt * 60.0
+        slopes[~(dt > 0)] = np.nan
+        rate = np.where(warm, _row_median(slopes), np.nan)
+
+        indicators = np.zeros(len(rows), dtype=INDICATORS_DTYPE)
+        with np.errstate(invalid="ignore"):
+            indicators["abnormal_vibration"] = current >= settings["vibration_threshold"]
+            indicators["vibration_burst"] = vibration_z >= settings["vibration_burst_sigma"]
+            indicators["rapid_temperature_change"] = np.abs(rate) >= settings["temperature_change_rate"]
+            coincident = ((vibration_z >= settings["coincidence_sigma"]).astype(np.int64)
+                          + (np.abs(rate) >= settings["coincidence_rate_fraction"] * settings["temperature_change_rate"])
+                          + self.motion[rows])
+        indicators["sensor_coincidence"] = warm & (coincident >= settings["coincidence_count"])
+
+        return TamperEvaluation(
+            equipment_ids=[self.equipment_ids[row] for row in rows],
+            indicators=indicators,
+            vibration=current,
+            vibration_z=vibration_z,
+            temperature_rate=rate,
+            coincident=coincident
+        )
+
+    def check(self, equipment_id: str, readings: Dict[str, Any], equipment_type: Optional[str] = None,
+              timestamp: Optional[float] = None) -> Optional[Dict[str, str]]:
+        """Record a reading and return the unit's tamper result (None if clean)."""
+        row = self.record(equipment_id, readings, equipment_type, timestamp)
+        return self.evaluate(np.array([row])).result(0)
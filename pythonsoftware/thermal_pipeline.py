@@ -0,0 +1,223 @@
+"""
+Integer thermal preprocessing for PREMONITOR.
+
+Thermal frames stay uint8 from the sensor/decoder to the model: resizing is
+done with fixed-point bilinear weights in integer space, and a 256-entry
+lookup table built once from the model's scale and zero-point maps pixel
+values straight into the interpreter's input dtype. No float32 copy of the
+frame is made for quantized models.
+
+Usage:
+    pipeline = get_pipeline(thermal_interpreter)
+    score = pipeline.score(frame)  # frame: (H, W), (H, W, 1) or (H, W, 3) uint8
+"""
+
+import threading
+import weakref
+from typing import Dict, Tuple
+
+import numpy as np
+
+import inference
+
+# Fixed-point precision of the bilinear weights (8 bits per axis)
+_WEIGHT_BITS = 8
+_WEIGHT_ONE = 1 << _WEIGHT_BITS
+
+
+def _axis_map(src_size: int, dst_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Source indices and fixed-point weights for resizing one axis (half-pixel centres).
+
+    Returns:
+        (index0, index1, weight0, weight1) with weight0 + weight1 == 256
+    """
+    src = (np.arange(dst_size, dtype=np.float64) + 0.5) * (src_size / dst_size) - 0.5
+    src = np.clip(src, 0.0, src_size - 1)
+    index0 = np.floor(src).astype(np.intp)
+    index1 = np.minimum(index0 + 1, src_size - 1)
+    weight1 = np.rint((src - index0) * _WEIGHT_ONE).astype(np.uint32)
+    weight0 = (_WEIGHT_ONE - weight1).astype(np.uint32)
+    return index0, index1, weight0, weight1
+
+
+class ResizePlan:
+    """
+    Precomputed index maps and scratch buffers for resizing one source shape.
+
+    Intermediate values are uint32: 255 * 256 * 256 fits comfortably.
+    """
+
+    def __init__(self, src_shape: Tuple[int, int, int], dst_hw: Tuple[int, int]):
+        src_h, src_w, channels = src_shape
+        dst_h, dst_w = dst_hw
+
+        self.y0, self.y1, wy0, wy1 = _axis_map(src_h, dst_h)
+        self.x0, self.x1, wx0, wx1 = _axis_map(src_w, dst_w)
+        self.wy0 = wy0[:, np.newaxis, np.newaxis]
+        self.wy1 = wy1[:, np.newaxis, np.newaxis]
+        self.wx0 = wx0[np.newaxis, :, np.newaxis]
+        self.wx1 = wx1[np.newaxis, :, np.newaxis]
+
+        self.rows = np.empty((dst_h, src_w, channels), dtype=np.uint8)
+        self.vertical = np.empty((dst_h, src_w, channels), dtype=np.uint32)
+        self.vertical_tmp = np.empty((dst_h, src_w, channels), dtype=np.uint32)
+        self.output = np.empty((dst_h, dst_w, channels), dtype=np.uint32)
+        self.output_tmp = np.empty((dst_h, dst_w, channels), dtype=np.uint32)
+
+    def resize(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Bilinear resize of a (H, W, C) uint8 frame.
+
+        Returns:
+            uint32 array of resized pixel values (0-255), reused by the next call
+        """
+        np.take(frame, self.y0, axis=0, out=self.rows)
+        np.multiply(self.rows, self.wy0, out=self.vertical)
+        np.take(frame, self.y1, axis=0, out=self.rows)
+        np.multiply(self.rows, self.wy1, out=self.vertical_tmp)
+        np.add(self.vertical, self.vertical_tmp, out=self.vertical)
+
+        np.take(self.vertical, self.x0, axis=1, out=self.output)
+        np.multiply(self.output, self.wx0, out=self.output)
+        np.take(self.vertical, self.x1, axis=1, out=self.output_tmp)
+        np.multiply(self.output_tmp, self.wx1, out=self.output_tmp)
+        np.add(self.output, self.output_tmp, out=self.output)
+
+        # Round and drop the fractional bits of both weights
+        np.add(self.output, 1 << (2 * _WEIGHT_BITS - 1), out=self.output)
+        np.right_shift(self.output, 2 * _WEIGHT_BITS, out=self.output)
+        return self.output
+
+
+def resize_uint8(frame: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """
+    Resize a uint8 frame to (height, width) in integer space.
+
+    Convenience wrapper for one-off resizes (e.g. mock hardware); the pipeline
+    keeps its ResizePlan between frames instead.
+    """
+    if frame.shape[:2] == tuple(size):
+        return frame.copy()
+    resized = ResizePlan(_as_hwc(frame).shape, size).resize(_as_hwc(frame)).astype(np.uint8)
+    return resized.reshape(tuple(size) + frame.shape[2:])
+
+
+def temperatures_to_uint8(frame_c: np.ndarray, temp_range: Tuple[float, float],
+                          out: np.ndarray = None) -> np.ndarray:
+    """
+    Map a temperature frame (deg C, e.g. MLX90640 32x24 floats) onto 0-255.
+
+    Temperatures outside temp_range are clipped. Pass `out` (uint8, same
+    shape) to reuse a buffer between frames.
+    """
+    t_min, t_max = temp_range
+    scaled = (np.asarray(frame_c, dtype=np.float32) - t_min) * (255.0 / (t_max - t_min))
+    np.clip(scaled, 0.0, 255.0, out=scaled)
+    np.rint(scaled, out=scaled)
+    if out is None:
+        return scaled.astype(np.uint8)
+    np.copyto(out, scaled, casting='unsafe')
+    return out
+
+
+def _as_hwc(frame: np.ndarray) -> np.ndarray:
+    """View a (H, W) frame as (H, W, 1)."""
+    if frame.ndim == 2:
+        return frame[:, :, np.newaxis]
+    return frame
+
+
+class ThermalPipeline:
+    """
+    uint8 frame -> model input tensor, without float round-trips.
+
+    The model's input shape, dtype and quantization are validated and turned
+    into a lookup table once; per frame only the frame dtype is checked.
+    """
+
+    def __init__(self, interpreter, model_name: str = "thermal"):
+        self.runner = inference.get_runner(interpreter, model_name)
+        shape = self.runner.input_shape
+        if len(shape) != 4 or shape[0] != 1:
+            raise ValueError(f"{model_name} model input {shape} is not a single (1, H, W, C) image")
+        self.height, self.width, self.channels = shape[1], shape[2], shape[3]
+
+        # Pixel value 0-255 -> model input value, quantized like ModelRunner.prepare
+        levels = np.arange(256, dtype=np.float64) / 255.0
+        if self.runner.input_quantized:
+            quantized = np.rint(levels / self.runner.input_scale + self.runner.input_zero_point)
+            self.lut = np.clip(quantized, self.runner.input_min, self.runner.input_max).astype(self.runner.input_dtype)
+        else:
+            self.lut = levels.astype(self.runner.input_dtype)
+        self.lut_is_identity = self.lut.dtype == np.uint8 and np.array_equal(self.lut, np.arange(256))
+
+        self._local = threading.local()
+
+    def _plan(self, frame: np.ndarray) -> ResizePlan:
+        """This thread's resize plan for the frame's shape."""
+        plans: Dict[Tuple[int, ...], ResizePlan] = getattr(self._local, 'plans', None)
+        if plans is None:
+            plans = self._local.plans = {}
+        plan = plans.get(frame.shape)
+        if plan is None:
+            plan = plans[frame.shape] = ResizePlan(frame.shape, (self.height, self.width))
+        return plan
+
+    def prepare(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Write a uint8 frame into the runner's input buffer.
+
+        Raises:
+            ValueError: If the frame is not uint8 or has an incompatible channel count
+        """
+        if frame.dtype != np.uint8:
+            raise ValueError(f"Thermal frame must be uint8, got {frame.dtype}")
+        frame = _as_hwc(frame)
+        if frame.shape[2] not in (1, self.channels):
+            raise ValueError(f"Thermal frame has {frame.shape[2]} channels, model expects {self.channels}")
+
+        input_buffer = self.runner.input_buffer()
+        target = input_buffer[0]
+        if frame.shape[2] != self.channels:
+            # Single-channel sensor frame feeding a 3-channel model: fill channel 0, then replicate
+            target = target[:, :, :1]
+
+        if frame.shape[:2] == (self.height, self.width):
+            pixels = frame
+        else:
+            pixels = self._plan(frame).resize(frame)
+
+        if self.lut_is_identity:
+            np.copyto(target, pixels, casting='unsafe')
+        else:
+            np.take(self.lut, pixels, out=target)
+
+        if target.shape[2] != self.channels:
+            input_buffer[0, :, :, 1:] = target
+        return input_buffer
+
+    def score(self, frame: np.ndarray, float_scale: float = 1.0 / 255.0) -> float:
+        """
+        Run the thermal model on one frame and return its anomaly score.
+
+        uint8 frames take the integer path. Other dtypes fall back to
+        ModelRunner.score with `float_scale` as the value of one unit.
+        """
+        if frame.dtype != np.uint8:
+            return self.runner.score(frame, data_scale=float_scale)
+        return float(np.ravel(self.runner.run_buffer(self.prepare(frame)))[0])
+
+
+_pipelines = weakref.WeakKeyDictionary()
+_pipelines_lock = threading.Lock()
+
+
+def get_pipeline(interpreter, model_name: str = "thermal") -> ThermalPipeline:
+    """Return the cached ThermalPipeline for an interpreter, creating it on first use."""
+    with _pipelines_lock:
+        pipeline = _pipelines.get(interpreter)
+        if pipeline is None:
+            pipeline = ThermalPipeline(interpreter, model_name)
+            _pipelines[interpreter] = pipeline
+        return pipeline
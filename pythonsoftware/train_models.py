@@ -22,6 +22,7 @@ import config
 import model_blueprints
 import utils # This will be created next
 import dataset_loaders # Comprehensive dataset loading system
+import spectrogram_shards
 
 # --- Custom Loss Function for SimSiam Pre-training ---
 def sim_siam_loss(p, z):
@@ -184,7 +185,96 @@ def train_thermal_model(epochs=50, batch_size=32, use_pretrained=True):
     print(f"  Command: python export_tflite.py --model thermal --quantize int8")
     print(f"{'=' * 80}\n")
 
-def train_acoustic_model(epochs=30, batch_size=64, use_pretrained=True):
+def train_compact_thermal_model(epochs=40, batch_size=128):
+    """
+    Trains the compact thermal model on frames at native MLX90640 resolution.
+
+    ARCHITECTURE:
+    1. Labeled AAU VAP thermal images, converted to single channel
+    2. Area-downsampled to 24x32 - what the 768-pixel sensor actually sees
+    3. Small depthwise-separable CNN (model_blueprints.get_compact_thermal_model)
+    4. SAVE to models/checkpoints/thermal_compact.h5 → EXPORT with uint8 I/O
+
+    Args:
+        epochs: Number of training epochs
+        batch_size: Batch size for training (frames are tiny, so large batches are cheap)
+    """
+    print("=" * 80)
+    print(" " * 15 + "COMPACT THERMAL MODEL TRAINING (MLX90640 32x24)")
+    print("=" * 80)
+
+    input_shape = config.THERMAL_COMPACT_INPUT_SHAPE
+
+    # 1. Load AAU VAP labeled thermal data
+    aau_loader = dataset_loaders.AAUVAPTrimodalDatasetLoader()
+    image_paths, labels = aau_loader.load_thermal_images_with_labels(scenes_to_use=['Scene 1', 'Scene 2'])
+
+    split_idx = int(0.8 * len(image_paths))
+    train_paths, val_paths = image_paths[:split_idx], image_paths[split_idx:]
+    train_labels, val_labels = labels[:split_idx], labels[split_idx:]
+
+    def load_and_downsample(path, label):
+        img = tf.io.read_file(path)
+        img = tf.image.decode_png(img, channels=input_shape[2])
+        # Area resampling averages pixels like the sensor's large detector elements
+        img = tf.image.resize(img, input_shape[:2], method='area')
+        img = tf.cast(img, tf.float32) / 255.0
+        return img, tf.cast(label, tf.float32)
+
+    def augment(img, label):
+        img = tf.image.random_flip_left_right(img)
+        img = tf.image.random_brightness(img, 0.05)
+        return tf.clip_by_value(img, 0.0, 1.0), label
+
+    train_ds = tf.data.Dataset.from_tensor_slices((train_paths, train_labels))
+    train_ds = train_ds.map(load_and_downsample, num_parallel_calls=tf.data.AUTOTUNE).cache()
+    train_ds = train_ds.map(augment, num_parallel_calls=tf.data.AUTOTUNE)
+    train_ds = train_ds.shuffle(4096).batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+    val_ds = tf.data.Dataset.from_tensor_slices((val_paths, val_labels))
+    val_ds = val_ds.map(load_and_downsample, num_parallel_calls=tf.data.AUTOTUNE).cache()
+    val_ds = val_ds.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+    # 2. Build and compile the compact model
+    model = model_blueprints.get_compact_thermal_model(input_shape)
+    model.compile(
+        optimizer=optimizers.Adam(learning_rate=0.001),
+        loss=losses.BinaryCrossentropy(),
+        metrics=['accuracy']
+    )
+    model.summary()
+
+    # 3. Save the best model where export_tflite.py looks for it
+    checkpoint_dir = os.path.join(config.MODEL_DIR, "checkpoints")
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    checkpoint_path = os.path.join(checkpoint_dir, "thermal_compact.h5")
+    model_checkpoint = callbacks.ModelCheckpoint(
+        filepath=checkpoint_path,
+        save_weights_only=False,
+        monitor='val_accuracy',
+        mode='max',
+        save_best_only=True)
+    early_stopping = callbacks.EarlyStopping(monitor='val_loss', patience=8, restore_best_weights=True)
+
+    print(f"Starting compact thermal training for {epochs} epochs...")
+    model.fit(
+        train_ds,
+        epochs=epochs,
+        validation_data=val_ds,
+        callbacks=[model_checkpoint, early_stopping]
+    )
+
+    print(f"\n{'=' * 80}")
+    print(f"✓ COMPACT THERMAL MODEL TRAINING COMPLETE!")
+    print(f"{'=' * 80}")
+    print(f"Final model saved to: {checkpoint_path}")
+    print(f"Parameters: {model.count_params():,} (input {input_shape})")
+    print(f"\nNext step: Export to .tflite with uint8 input for the integer thermal pipeline")
+    print(f"  Command: python export_tflite.py --model thermal_compact --quantize int8 --io-type uint8")
+    print(f"  Deploy as {config.THERMAL_COMPACT_MODEL_PATH} and set PREMONITOR_THERMAL_MODEL=compact")
+    print(f"{'=' * 80}\n")
+
+def train_acoustic_model(epochs=30, batch_size=64, use_pretrained=True, shard_dir=None):
     """
     Orchestrates the training for the acoustic anomaly model.
     
@@ -198,6 +288,8 @@ def train_acoustic_model(epochs=30, batch_size=64, use_pretrained=True):
         epochs: Number of training epochs
         batch_size: Batch size for training
         use_pretrained: If True, use pretrained audio features (TODO: integrate YAMNet)
+        shard_dir: If set, train from memory-mapped spectrogram shards in this
+                   directory (built on first use) instead of in-RAM arrays
     """
     print("=" * 80)
     print(" " * 20 + "ACOUSTIC MODEL TRAINING PIPELINE")
@@ -211,23 +303,35 @@ def train_acoustic_model(epochs=30, batch_size=64, use_pretrained=True):
         print("Training from scratch (current implementation)")
     print("=" * 80)
 
-    # 1. Load MIMII dataset (industrial fan sounds - perfect for lab equipment!)
-    print("\n### Loading Primary Dataset: MIMII ###")
-    mimii_loader = dataset_loaders.MIMIIDatasetLoader()
-    spectrograms, labels = mimii_loader.load_all_machine_sounds(use_all_ids=True)
-    
-    # Optional: Add environmental sounds as negative examples
-    print("\n### Loading Environmental Sounds for Robustness ###")
-    try:
-        esc50_loader = dataset_loaders.ESC50DatasetLoader()
-        env_specs, env_labels = esc50_loader.load_environmental_sounds(fire_classes_only=False)
-        
-        # Combine datasets: MIMII (0=normal, 1=abnormal) + ESC-50 (2=environmental)
-        spectrograms = np.concatenate([spectrograms, env_specs], axis=0)
-        labels = np.concatenate([labels, np.full(len(env_labels), 2)], axis=0)  # Label 2 = ignore
-        print(f"✓ Combined dataset size: {len(spectrograms)} samples")
-    except Exception as e:
-        print(f"⚠ Skipping environmental sounds: {e}")
+    if shard_dir is not None:
+        # 1. Stream MIMII + ESC-50 into float16 shards once, then read them lazily
+        manifest_path = os.path.join(shard_dir, spectrogram_shards.MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            print("\n### Building Spectrogram Shards: MIMII + ESC-50 ###")
+            dataset_loaders.build_acoustic_shards(shard_dir, use_esc50=True)
+        shards = spectrogram_shards.ShardedDataset(manifest_path)
+        train_ids, val_ids = shards.split(validation_fraction=0.2)
+        train_data = shards.to_tf_dataset(train_ids, batch_size=batch_size, shuffle=True)
+        val_data = shards.to_tf_dataset(val_ids, batch_size=batch_size)
+        print(f"✓ Sharded dataset: {len(shards)} samples ({len(train_ids)} train / {len(val_ids)} validation)")
+    else:
+        # 1. Load MIMII dataset (industrial fan sounds - perfect for lab equipment!)
+        print("\n### Loading Primary Dataset: MIMII ###")
+        mimii_loader = dataset_loaders.MIMIIDatasetLoader()
+        spectrograms, labels = mimii_loader.load_all_machine_sounds(use_all_ids=True)
+
+        # Optional: Add environmental sounds as negative examples
+        print("\n### Loading Environmental Sounds for Robustness ###")
+        try:
+            esc50_loader = dataset_loaders.ESC50DatasetLoader()
+            env_specs, env_labels = esc50_loader.load_environmental_sounds(fire_classes_only=False)
+
+            # Combine datasets: MIMII (0=normal, 1=abnormal) + ESC-50 (2=environmental)
+            spectrograms = np.concatenate([spectrograms, env_specs], axis=0)
+            labels = np.concatenate([labels, np.full(len(env_labels), 2)], axis=0)  # Label 2 = ignore
+            print(f"✓ Combined dataset size: {len(spectrograms)} samples")
+        except Exception as e:
+            print(f"⚠ Skipping environmental sounds: {e}")
 
     # 2. Get Model Blueprint
     # TODO V2.0: Integrate YAMNet pretrained weights from fetch_pretrained_weights.py
@@ -251,14 +355,22 @@ def train_acoustic_model(epochs=30, batch_size=64, use_pretrained=True):
 
     # 5. Training
     print(f"\nStarting acoustic model training for {epochs} epochs...")
-    acoustic_model.fit(
-        spectrograms,
-        labels,
-        epochs=epochs,
-        batch_size=batch_size,
-        validation_split=0.2,
-        callbacks=[model_checkpoint_callback]
-    )
+    if shard_dir is not None:
+        acoustic_model.fit(
+            train_data,
+            epochs=epochs,
+            validation_data=val_data,
+            callbacks=[model_checkpoint_callback]
+        )
+    else:
+        acoustic_model.fit(
+            spectrograms,
+            labels,
+            epochs=epochs,
+            batch_size=batch_size,
+            validation_split=0.2,
+            callbacks=[model_checkpoint_callback]
+        )
     
     print(f"\n{'=' * 80}")
     print(f"✓ ACOUSTIC MODEL TRAINING COMPLETE!")
@@ -267,7 +379,7 @@ def train_acoustic_model(epochs=30, batch_size=64, use_pretrained=True):
     print(f"This model learned from:")
     print(f"  1. MIMII industrial fan sounds (1,418+ normal/abnormal)")
     print(f"  2. ESC-50 environmental sounds (2,000 diverse sounds)")
-    print(f"  → Total training samples: {len(spectrograms)}")
+    print(f"  → Total training samples: {len(shards) if shard_dir is not None else len(spectrograms)}")
     print(f"\nNext step: Export to .tflite for Raspberry Pi deployment")
     print(f"  Command: python export_tflite.py --model acoustic --quantize int8")
     print(f"{'=' * 80}\n")
@@ -419,8 +531,12 @@ def train_lstm_autoencoder(epochs=50, batch_size=32, sequence_length=50):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Premonitor AI Model Training Script")
     parser.add_argument(
-        "--model", type=str, required=True, choices=["thermal", "acoustic", "lstm"],
-        help="The type of model to train ('thermal', 'acoustic', or 'lstm')."
+        "--model", type=str, required=True, choices=["thermal", "thermal_compact", "acoustic", "lstm"],
+        help="The type of model to train ('thermal', 'thermal_compact', 'acoustic', or 'lstm')."
+    )
+    parser.add_argument(
+        "--shard-dir", type=str, default=None,
+        help="Acoustic only: train from memory-mapped spectrogram shards in this directory (built if missing)."
     )
     args = parser.parse_args()
 
@@ -435,13 +551,20 @@ if __name__ == "__main__":
         print("  Fine-tuning: AAU VAP Trimodal (14,000+ labeled images)")
         print("=" * 70)
         train_thermal_model(epochs=50, batch_size=32)
+    elif args.model == "thermal_compact":
+        print("=" * 70)
+        print(" " * 15 + "COMPACT THERMAL MODEL TRAINING")
+        print("  Input: native MLX90640 frames (32x24, single channel)")
+        print("  Dataset: AAU VAP Trimodal (downsampled)")
+        print("=" * 70)
+        train_compact_thermal_model(epochs=40, batch_size=128)
     elif args.model == "acoustic":
         print("=" * 70)
         print(" " * 15 + "ACOUSTIC MODEL TRAINING")
         print("  Primary: MIMII (1,418+ normal/abnormal fan sounds)")
         print("  Auxiliary: ESC-50 + UrbanSound8K (environmental sounds)")
         print("=" * 70)
-        train_acoustic_model(epochs=30, batch_size=64)
+        train_acoustic_model(epochs=30, batch_size=64, shard_dir=args.shard_dir)
     elif args.model == "lstm":
         print("=" * 70)
         print(" " * 15 + "LSTM AUTOENCODER TRAINING")
@@ -21,6 +21,7 @@ import glob
 
 # Import our custom project configuration
 import config
+import feature_cache
 
 # --- Audio Processing Utilities ---
 
@@ -28,7 +29,14 @@ def audio_to_spectrogram(audio_path):
     """
     Loads a .wav file and converts it into a log-mel spectrogram.
     This turns an audio signal into an image-like representation that a CNN can process.
+
+    Results are kept in the persistent feature cache (feature_cache.py), so
+    unchanged files are not decoded again on later runs.
     """
+    return feature_cache.cached_features(audio_path, 'log_mel', _compute_spectrogram, librosa=librosa.__version__)
+
+def _compute_spectrogram(audio_path):
+    """Uncached log-mel spectrogram of a .wav file, or None on failure."""
     try:
         y, sr = librosa.load(audio_path, sr=config.SPECTROGRAM_SAMPLE_RATE)
         mel_spectrogram = librosa.feature.melspectrogram(
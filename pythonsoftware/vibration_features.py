@@ -0,0 +1,130 @@
+"""
+Vibration features for PREMONITOR.
+
+A single RMS value every cycle says how much a machine shakes, not how.
+Bearing and imbalance faults show up as impulsive bursts (high crest factor
+and kurtosis) and as energy in specific frequency bands. This module turns
+a burst of XYZ accelerometer samples (see sensor_drivers.ADXL345) into a
+handful of compact features:
+
+    rms           - RMS of the deviation from the mean, in G (gravity removed)
+    peak          - Largest deviation magnitude, in G
+    crest_factor  - peak / rms (sine = 1.41, impacts push it up)
+    kurtosis      - Fourth standardised moment of the dominant axis
+                    (sine = 1.5, Gaussian noise = 3, bearing impacts > 3)
+    band_energies - Mean-square acceleration (G^2) per frequency band
+
+VibrationFeatures converts to float as its RMS, so code that treats the
+vibration reading as a scalar (threshold checks, LSTM feature 2) keeps
+working unchanged.
+
+Usage:
+    analyzer = VibrationAnalyzer(n_samples=1024, sample_rate_hz=3200)
+    features = analyzer.analyze(samples_g)   # samples_g: (1024, 3) array
+"""
+
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# Band edges in Hz. Fixed so feature vectors have the same width on every unit;
+# bands above the Nyquist frequency of a capture report 0.
+VIBRATION_BAND_EDGES_HZ = (0.0, 50.0, 200.0, 500.0, 1000.0, 1600.0)
+
+# Order of the vibration features appended to the LSTM feature vector
+LSTM_VIBRATION_FEATURES = ("crest_factor", "kurtosis") + tuple(
+    f"band_{int(low)}_{int(high)}hz" for low, high in zip(VIBRATION_BAND_EDGES_HZ[:-1], VIBRATION_BAND_EDGES_HZ[1:])
+)
+
+
+@dataclass(frozen=True)
+class VibrationFeatures:
+    """Features of one vibration burst; float(features) is the RMS in G."""
+    rms: float
+    peak: float
+    crest_factor: float
+    kurtosis: float
+    band_energies: Tuple[float, ...]
+    sample_rate_hz: float
+    n_samples: int
+
+    def __float__(self) -> float:
+        return self.rms
+
+    def to_lstm_features(self) -> np.ndarray:
+        """Values in LSTM_VIBRATION_FEATURES order."""
+        return np.array((self.crest_factor, self.kurtosis) + tuple(self.band_energies), dtype=np.float32)
+
+
+class VibrationAnalyzer:
+    """
+    Feature extractor for bursts of a fixed length and sample rate.
+
+    The Hann window, spectrum scaling and band bin ranges are computed once;
+    analyze() is then a handful of vectorised numpy operations.
+
+    Args:
+        n_samples: Samples per burst
+        sample_rate_hz: Sample rate of the burst
+        band_edges_hz: Ascending band edges (N edges = N-1 bands)
+    """
+
+    def __init__(self, n_samples: int, sample_rate_hz: float,
+                 band_edges_hz: Sequence[float] = VIBRATION_BAND_EDGES_HZ):
+        if n_samples < 4:
+            raise ValueError(f"Need at least 4 samples per burst, got {n_samples}")
+        self.n_samples = n_samples
+        self.sample_rate_hz = float(sample_rate_hz)
+        self.band_edges_hz = tuple(float(edge) for edge in band_edges_hz)
+
+        self.window = np.hanning(n_samples)
+        # One-sided power scaling so the summed bins equal the mean square of the signal
+        scale = np.full(n_samples // 2 + 1, 2.0 / (n_samples * np.sum(self.window ** 2)))
+        scale[0] /= 2.0
+        if n_samples % 2 == 0:
+            scale[-1] /= 2.0
+        self._scale = scale
+        freqs = np.fft.rfftfreq(n_samples, 1.0 / self.sample_rate_hz)
+        self._band_bins = np.searchsorted(freqs, self.band_edges_hz, side="left")
+
+    def band_energies(self, deviation: np.ndarray) -> np.ndarray:
+        """Mean-square acceleration per band from (n_samples, 3) mean-removed samples."""
+        spectrum = np.fft.rfft(deviation * self.window[:, None], axis=0)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).sum(axis=1) * self._scale
+        cumulative = np.concatenate(([0.0], np.cumsum(power)))
+        return cumulative[self._band_bins[1:]] - cumulative[self._band_bins[:-1]]
+
+    def analyze(self, samples_g: np.ndarray) -> VibrationFeatures:
+        """
+        Features of one burst.
+
+        Args:
+            samples_g: (n_samples, 3) accelerations in G
+        """
+        samples_g = np.asarray(samples_g, dtype=np.float64)
+        if samples_g.shape != (self.n_samples, 3):
+            raise ValueError(f"Expected burst of shape ({self.n_samples}, 3), got {samples_g.shape}")
+
+        deviation = samples_g - samples_g.mean(axis=0)
+        squared = deviation ** 2
+        axis_variance = squared.mean(axis=0)
+        rms = float(np.sqrt(axis_variance.sum()))
+        peak = float(np.sqrt(squared.sum(axis=1).max()))
+
+        dominant = int(np.argmax(axis_variance))
+        if axis_variance[dominant] > 0.0:
+            kurtosis = float(np.mean(squared[:, dominant] ** 2) / axis_variance[dominant] ** 2)
+            crest_factor = peak / rms
+        else:
+            kurtosis = crest_factor = 0.0
+
+        return VibrationFeatures(
+            rms=rms,
+            peak=peak,
+            crest_factor=float(crest_factor),
+            kurtosis=kurtosis,
+            band_energies=tuple(float(e) for e in self.band_energies(deviation)),
+            sample_rate_hz=self.sample_rate_hz,
+            n_samples=self.n_samples
+        )
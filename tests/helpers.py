@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fakes and factories for the PREMONITOR unit tests.
+"""
+
+
+class FakeClock:
+    """Clock stand-in for the `clock` arguments; set or advance `now` to move time."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def sensor_reading(**sensors):
+    """One monitoring-cycle reading as produced by equipment_plan.read_sensors()."""
+    return {"sensors": sensors}
+
+
+def motion_unit(equipment_id, gpio_pin=None, zone=None, **fields):
+    """Equipment config with an enabled PIR, optionally on a GPIO pin and in a zone."""
+    motion = {"enabled": True}
+    if gpio_pin is not None:
+        motion["gpio_pin"] = gpio_pin
+    if zone:
+        motion["zone"] = zone
+    return {"id": equipment_id, **fields, "sensors": {"motion_sensor": motion}}
@@ -43,6 +43,23 @@ def main():
         (tests_dir / 'test_datasets.py', 'Dataset Validation Tests'),
         (tests_dir / 'test_imports.py', 'Module Import Tests'),
         (tests_dir / 'test_equipment_registry.py', 'Equipment Registry Tests'),
+        (tests_dir / 'test_inference.py', 'Inference Module Tests'),
+        (tests_dir / 'test_inference_worker.py', 'Inference Worker Pool Tests'),
+        (tests_dir / 'test_thermal_pipeline.py', 'Thermal Pipeline Tests'),
+        (tests_dir / 'test_equipment_plan.py', 'Equipment Plan Tests'),
+        (tests_dir / 'test_fleet_thresholds.py', 'Fleet Threshold Tests'),
+        (tests_dir / 'test_config_reload.py', 'Config Reload Tests'),
+        (tests_dir / 'test_sensor_bus.py', 'Sensor Bus Tests'),
+        (tests_dir / 'test_sensor_drivers.py', 'Sensor Driver Tests'),
+        (tests_dir / 'test_motion_events.py', 'Motion Event Tests'),
+        (tests_dir / 'test_business_calendar.py', 'Business Calendar Tests'),
+        (tests_dir / 'test_security_capture.py', 'Security Capture Tests'),
+        (tests_dir / 'test_black_box.py', 'Black Box Tests'),
+        (tests_dir / 'test_tamper_engine.py', 'Tamper Engine Tests'),
+        (tests_dir / 'test_security_state.py', 'Security State Tests'),
+        (tests_dir / 'test_audit_report.py', 'Audit Report Tests'),
+        (tests_dir / 'test_spectrogram_shards.py', 'Spectrogram Shard Tests'),
+        (tests_dir / 'test_feature_cache.py', 'Feature Cache Tests'),
     ]
 
     results = []
@@ -6,8 +6,11 @@ Tests emergency thresholds for fire, gas, O2, CO2, vibration, and current.
 
 import sys
 import os
+import importlib.util
 import pytest
 import numpy as np
+import threading
+import time
 
 # Add pythonsoftware to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
@@ -69,6 +72,7 @@ sys.modules['alert_manager'] = MockAlertManager()
 
 # Now import functions to test
 from premonitor_main_multi_equipment import check_raw_sensor_thresholds, calibrate_gas_sensor, build_lstm_feature_vector
+import premonitor_main_multi_equipment as main_multi
 import equipment_registry
 
 
@@ -321,6 +325,238 @@ class TestLSTMFeatureVector:
         assert np.isnan(vec[4])  # audio missing
         assert np.isnan(vec[5])  # thermal missing
 
+    def test_vibration_burst_features_appended(self):
+        """Test that burst features follow the six base features and keep RMS as feature 2"""
+        features = main_multi.vibration_features.VibrationFeatures(
+            rms=0.3, peak=1.2, crest_factor=4.0, kurtosis=6.5,
+            band_energies=(0.0, 0.01, 0.05, 0.02, 0.01), sample_rate_hz=3200, n_samples=1024)
+
+        vec = build_lstm_feature_vector({"sensors": {"vibration": features}}, "centrifuge",
+                                        include_vibration_features=True)
+        missing = build_lstm_feature_vector({"sensors": {}}, "centrifuge", include_vibration_features=True)
+
+        assert vec.shape == missing.shape == (6 + len(main_multi.vibration_features.LSTM_VIBRATION_FEATURES),)
+        assert vec[2] == pytest.approx(0.3)
+        np.testing.assert_allclose(vec[6:], [4.0, 6.5, 0.0, 0.01, 0.05, 0.02, 0.01], rtol=1e-6)
+        assert np.isnan(missing[6:]).all()
+
+
+class FakeInterpreter:
+    """Minimal TFLite interpreter stand-in that counts invocations."""
+
+    def __init__(self, score=0.3):
+        self.score = score
+        self.invocations = 0
+
+    def get_input_details(self):
+        return [{'index': 0, 'shape': np.array([1, 24, 32, 3]), 'dtype': np.float32, 'quantization': (0.0, 0)}]
+
+    def get_output_details(self):
+        return [{'index': 1, 'shape': np.array([1, 1]), 'dtype': np.float32, 'quantization': (0.0, 0)}]
+
+    def set_tensor(self, index, value):
+        pass
+
+    def invoke(self):
+        self.invocations += 1
+
+    def get_tensor(self, index):
+        return np.array([[self.score]], dtype=np.float32)
+
+
+class TestThermalFrameGating:
+    """Test frame-difference gating of thermal inference"""
+
+    def setup_method(self):
+        self.interpreter = FakeInterpreter()
+        main_multi.thermal_interpreter = self.interpreter
+        main_multi.thermal_frame_cache.clear()
+
+    def teardown_method(self):
+        main_multi.thermal_interpreter = None
+        main_multi.thermal_frame_cache.clear()
+
+    def test_static_frame_reuses_cached_score(self):
+        """Test that an unchanged frame skips the CNN"""
+        frame = np.full((24, 32, 3), 100, dtype=np.uint8)
+
+        first = main_multi.run_thermal_inference(frame, "test_fridge")
+        second = main_multi.run_thermal_inference(frame.copy(), "test_fridge")
+
+        assert self.interpreter.invocations == 1
+        assert "cached" not in first
+        assert second["cached"] is True
+        assert second["anomaly_confidence"] == first["anomaly_confidence"]
+
+    def test_changed_frame_reruns_model(self):
+        """Test that a large scene change forces a fresh inference"""
+        frame = np.full((24, 32, 3), 100, dtype=np.uint8)
+        hot_frame = np.full((24, 32, 3), 200, dtype=np.uint8)
+
+        main_multi.run_thermal_inference(frame, "test_fridge")
+        result = main_multi.run_thermal_inference(hot_frame, "test_fridge")
+
+        assert self.interpreter.invocations == 2
+        assert "cached" not in result
+
+    def test_expired_cache_reruns_model(self):
+        """Test that the cache is ignored once older than the max age"""
+        frame = np.full((24, 32, 3), 100, dtype=np.uint8)
+
+        main_multi.run_thermal_inference(frame, "test_fridge")
+        main_multi.thermal_frame_cache["test_fridge"]["time"] -= 10_000
+        main_multi.run_thermal_inference(frame, "test_fridge")
+
+        assert self.interpreter.invocations == 2
+
+    def test_cache_is_per_equipment(self):
+        """Test that one unit's cached score is never reused for another"""
+        frame = np.full((24, 32, 3), 100, dtype=np.uint8)
+
+        main_multi.run_thermal_inference(frame, "fridge_a")
+        main_multi.run_thermal_inference(frame, "fridge_b")
+
+        assert self.interpreter.invocations == 2
+
+
+class TestMonitoringCycle:
+    """Test ordering of the fail-safe and inference phases"""
+
+    def test_threshold_checks_run_before_any_inference(self, monkeypatch):
+        """Test that every unit is threshold-checked before a model runs"""
+        calls = []
+        monkeypatch.setattr(main_multi, "read_and_check_equipment",
+                            lambda eq, plan: calls.append(("check", eq["id"])) or {"sensors": {}})
+        monkeypatch.setattr(main_multi, "run_equipment_inference",
+                            lambda eq, readings, plan: calls.append(("infer", eq["id"])))
+        plans = main_multi.compile_equipment_plans([{"id": "a", "type": "fridge"}, {"id": "b", "type": "fridge"}])
+
+        main_multi.run_monitoring_cycle(plans)
+
+        assert calls == [("check", "a"), ("check", "b"), ("infer", "a"), ("infer", "b")]
+
+    def test_plan_selects_models(self, monkeypatch):
+        """Test that only the models compiled into the plan are run"""
+        ran = []
+        monkeypatch.setattr(main_multi, "run_thermal_inference", lambda data, eq_id: ran.append("thermal") or {})
+        monkeypatch.setattr(main_multi, "run_acoustic_inference", lambda data, eq_id: ran.append("acoustic") or {})
+        monkeypatch.setattr(main_multi, "check_anomaly_and_alert", lambda eq, results, plan: None)
+        equipment = {"id": "plan_fridge", "type": "fridge",
+                     "sensors": {"microphone": {"enabled": True}, "thermal_camera": {"enabled": False}}}
+        plan = main_multi.compile_equipment_plans([equipment])[0]
+        readings = {"sensors": {"thermal": np.zeros((24, 32), dtype=np.uint8), "audio": np.zeros((128, 128))}}
+
+        main_multi.run_equipment_inference(equipment, readings, plan)
+
+        assert ran == ["acoustic"]
+
+
+
+class TestMotionWakeup:
+    """Test that PIR edges wake the main loop between cycles"""
+
+    def test_motion_checked_before_cycle_ends(self, monkeypatch):
+        """Test that the woken unit's motion check runs immediately and the wait then resumes"""
+        main_multi.compile_equipment_plans([{"id": "a", "type": "fridge"}, {"id": "b", "type": "fridge"}])
+        gpio = main_multi.motion_events.SimulatedGPIOEvents()
+        monitor = main_multi.motion_events.MotionEventMonitor(gpio, {23: ["b"]})
+        monitor.start()
+        monkeypatch.setattr(main_multi, "motion_event_monitor", monitor)
+        checked = []
+        monkeypatch.setattr(main_multi.security_monitor, "check_motion",
+                            lambda equipment, readings: checked.append((equipment["id"], time.monotonic())))
+
+        start = time.monotonic()
+        threading.Timer(0.05, gpio.set_level, (23, 1)).start()
+        main_multi.wait_for_next_cycle(0.5)
+
+        assert [eq_id for eq_id, _ in checked] == ["b"]
+        assert checked[0][1] - start < 0.4
+        assert time.monotonic() - start >= 0.5
+
+
+def load_real_config():
+    """A fresh copy of config.py (sys.modules['config'] is MockConfig in this file)."""
+    path = os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware', 'config.py')
+    spec = importlib.util.spec_from_file_location("premonitor_real_config", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestConfigReload:
+    """Test swapping compiled plans on configuration reload"""
+
+    def test_unchanged_units_keep_state(self, monkeypatch):
+        """Test that only reconfigured or removed units lose their buffers"""
+        keep, change, drop = ({"id": i, "type": "fridge", "pi_id": "pi", "sensors": {}} for i in ("keep", "change", "drop"))
+        main_multi.compile_equipment_plans([keep, change, drop])
+        for eq_id in ("keep", "change", "drop"):
+            main_multi.equipment_lstm_buffers[eq_id] = [np.zeros(6)]
+            main_multi.equipment_states[eq_id] = {}
+
+        changed = dict(change, sensors={"temperature": {"enabled": True}})
+        candidate = equipment_registry.EquipmentRegistry([dict(keep), changed])
+        applied = []
+        monkeypatch.setattr(main_multi.config_reload, "load_candidate_registry", lambda pi_id: candidate)
+        monkeypatch.setattr(main_multi.config_reload, "load_candidate_device_config", lambda: {"gas_threshold": 500})
+        monkeypatch.setattr(main_multi.config, "apply_device_config", applied.append, raising=False)
+        monkeypatch.setattr(main_multi.config, "device_config_snapshot", dict, raising=False)
+        monkeypatch.setattr(equipment_registry, "_registry", equipment_registry.get_registry())
+
+        assert main_multi.reload_configuration("pi")
+
+        assert [plan.equipment_id for plan in main_multi.equipment_plans] == ["keep", "change"]
+        assert equipment_registry.get_registry() is candidate
+        assert applied == [{"gas_threshold": 500}]
+        assert "keep" in main_multi.equipment_lstm_buffers
+        assert "change" not in main_multi.equipment_lstm_buffers
+        assert "drop" not in main_multi.equipment_lstm_buffers and "drop" not in main_multi.equipment_states
+
+    def test_invalid_candidate_keeps_current_plans(self, monkeypatch):
+        """Test that a failed validation leaves the running plans alone"""
+        plans = main_multi.compile_equipment_plans([{"id": "a", "type": "fridge"}])
+
+        def reject(pi_id):
+            raise main_multi.config_reload.ConfigReloadError("bad registry")
+
+        monkeypatch.setattr(main_multi.config_reload, "load_candidate_registry", reject)
+
+        assert not main_multi.reload_configuration("pi")
+        assert main_multi.equipment_plans is plans
+
+    def test_failed_compile_restores_device_config(self, monkeypatch):
+        """Test that device overrides are rolled back when the new plans fail to compile"""
+        plans = main_multi.compile_equipment_plans([{"id": "a", "type": "fridge"}])
+        real_config = load_real_config()
+        gas_threshold = real_config.GAS_ANALOG_THRESHOLD
+        candidate = equipment_registry.EquipmentRegistry([{"id": "a", "type": "fridge", "pi_id": "pi", "sensors": {}}])
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("driver missing")
+
+        monkeypatch.setattr(main_multi, "config", real_config)
+        monkeypatch.setattr(main_multi.config_reload, "load_candidate_registry", lambda pi_id: candidate)
+        monkeypatch.setattr(main_multi.config_reload, "load_candidate_device_config", lambda: {"gas_threshold": 450})
+        monkeypatch.setattr(main_multi.equipment_plan, "compile_plans", broken)
+
+        assert not main_multi.reload_configuration("pi")
+        assert main_multi.equipment_plans is plans
+        assert real_config.GAS_ANALOG_THRESHOLD == gas_threshold
+
+    def test_removed_override_reverts_to_default(self):
+        """Test that keys dropped from device_config.json stop overriding"""
+        real_config = load_real_config()
+        defaults = real_config.device_config_snapshot()
+
+        real_config.apply_device_config({"gas_threshold": 450, "interpreter_options": {"thermal": {"num_threads": 1}}})
+        assert real_config.GAS_ANALOG_THRESHOLD == 450
+
+        real_config.apply_device_config({"sensor_read_interval": 10})
+        assert real_config.GAS_ANALOG_THRESHOLD == defaults["GAS_ANALOG_THRESHOLD"]
+        assert real_config.MODEL_INTERPRETER_OPTIONS == defaults["MODEL_INTERPRETER_OPTIONS"]
+        assert real_config.SENSOR_READ_INTERVAL == 10.0
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
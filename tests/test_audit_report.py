@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the PREMONITOR audit report generator.
+Tests the alert log index, one-pass aggregation, streamed report output and daily rollups.
+"""
+
+import sys
+import os
+import csv
+import json
+from datetime import datetime, timedelta
+import pytest
+
+# Add pythonsoftware to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+
+from premonitor_audit_helper_py import AlertIndex, AuditReportGenerator, classify_alert
+
+START = datetime(2026, 3, 1)
+
+TITLES = ("CRITICAL: Thermal fire risk", "Acoustic anomaly", "Gas threshold exceeded",
+          "Thermal fridge door open", "Sensor offline")
+
+
+def write_alerts(path, count, hours_apart=1, start=START):
+    with open(path, 'a') as f:
+        for i in range(count):
+            alert = {"timestamp": (start + timedelta(hours=i * hours_apart)).isoformat(),
+                     "title": TITLES[i % len(TITLES)], "details": f"reading {i}",
+                     "equipment_id": f"unit_{i % 3}"}
+            f.write(json.dumps(alert) + "\n")
+
+
+@pytest.fixture
+def generator(tmp_path):
+    generator = AuditReportGenerator(logs_dir=tmp_path / "logs", templates_dir=tmp_path / "templates")
+    generator.index = AlertIndex(generator.alerts_log_file, stride=16)
+    return generator
+
+
+class TestAlertIndex:
+    """Test range queries through the sparse timestamp index"""
+
+    def test_range_reads_only_overlapping_blocks(self, generator):
+        """Test that a one-day query returns that day and skips the rest of the log"""
+        write_alerts(generator.alerts_log_file, 24 * 30)
+
+        alerts = generator.load_alerts(START + timedelta(days=10), START + timedelta(days=11) - timedelta(seconds=1))
+        ranges = list(generator.index.ranges(START + timedelta(days=10), START + timedelta(days=11)))
+
+        assert len(alerts) == 24
+        assert alerts[0]["timestamp"] == (START + timedelta(days=10)).isoformat()
+        assert generator.index.index_file.exists()
+        assert len(ranges) <= 3 < len(generator.index.offsets)
+
+    def test_appended_and_out_of_order_alerts_found(self, generator):
+        """Test that alerts after the last indexed block and late entries are still returned"""
+        write_alerts(generator.alerts_log_file, 40)
+        generator.load_alerts()
+        write_alerts(generator.alerts_log_file, 5, start=START + timedelta(days=40))
+        write_alerts(generator.alerts_log_file, 1, start=START - timedelta(days=1))
+
+        assert len(generator.load_alerts(START + timedelta(days=40))) == 5
+        assert len(generator.load_alerts(end_date=START - timedelta(hours=1))) == 1
+
+    def test_truncated_log_rebuilds_index(self, generator):
+        """Test that a rotated log is not read through a stale index"""
+        write_alerts(generator.alerts_log_file, 64)
+        generator.load_alerts()
+        generator.alerts_log_file.write_text("")
+        write_alerts(generator.alerts_log_file, 3)
+
+        assert len(generator.load_alerts()) == 3
+
+    def test_malformed_lines_skipped(self, generator):
+        """Test that bad entries are skipped rather than failing the report"""
+        write_alerts(generator.alerts_log_file, 2)
+        with open(generator.alerts_log_file, 'a') as f:
+            f.write("{not json\n")
+
+        assert len(generator.load_alerts()) == 2
+
+
+class TestAggregation:
+    """Test one-pass statistics"""
+
+    def test_classification_matches_categories(self, generator):
+        """Test that the single-pass classifier matches categorize_alerts()"""
+        alerts = [{"title": title} for title in TITLES]
+        categories, severity = generator.categorize_alerts(alerts)
+
+        assert classify_alert(alerts[0]) == ("fire_risk_events", "CRITICAL")
+        assert classify_alert(alerts[4]) == (None, "WARNING")
+        assert [len(categories[c]) for c in ("fire_risk_events", "acoustic_incidents", "gas_incidents",
+                                             "fridge_incidents")] == [1, 1, 1, 1]
+        assert severity == {"CRITICAL": 1, "WARNING": 4}
+
+    def test_equipment_statistics(self, generator):
+        """Test per-equipment counts and mean time between alerts"""
+        write_alerts(generator.alerts_log_file, 30)
+
+        aggregator = generator.aggregate(START, START + timedelta(days=2))
+        stats = aggregator.equipment_statistics()
+        aggregator.close()
+
+        assert aggregator.total == 30
+        assert stats["unit_0"]["alerts"] == 10
+        assert stats["unit_0"]["mean_hours_between_alerts"] == pytest.approx(3.0)
+        assert stats["unit_0"]["critical"] == 2
+
+    def test_alerts_without_timestamp_counted(self, generator):
+        """Test that alerts lacking a usable timestamp are counted but left out of equipment timing"""
+        alerts = [{"title": "Gas threshold exceeded", "equipment_id": "unit_0"},
+                  {"title": "Gas threshold exceeded", "equipment_id": "unit_0"},
+                  {"title": "Gas threshold exceeded", "equipment_id": "unit_0", "timestamp": "yesterday"},
+                  {"title": "Gas threshold exceeded", "equipment_id": "unit_1", "timestamp": START.isoformat()}]
+
+        stats, categories = generator.calculate_statistics(alerts, START, START + timedelta(days=1))
+
+        assert len(categories["gas_incidents"]) == 4
+        assert list(stats["equipment_statistics"]) == ["unit_1"]
+
+
+class TestReportOutput:
+    """Test streamed Markdown and CSV reports"""
+
+    def test_markdown_report(self, generator):
+        """Test that tables and statistics are streamed into the template"""
+        (generator.templates_dir / "lab_safety_audit_template.md").write_text(
+            "Alerts: ${total_alerts} (${critical_count} critical)\n"
+            "## Gas\n${gas_incidents}## Correlated\n${correlated_events}## Units\n${equipment_statistics}"
+            "${period} ${unknown_key}\n")
+        write_alerts(generator.alerts_log_file, 10)
+
+        path = generator.generate_report(START, START + timedelta(days=1))
+        report = path.read_text(encoding="utf-8")
+
+        assert "Alerts: 10 (2 critical)" in report
+        assert report.count("| N/A | Threshold |") == 2
+        assert "No incidents recorded during this period." in report
+        assert "| unit_1 | 3 |" in report
+        assert "2026-03 ${unknown_key}" in report
+
+    def test_csv_report(self, generator):
+        """Test that CSV rows are written while streaming, without a template"""
+        write_alerts(generator.alerts_log_file, 48)
+
+        path = generator.generate_report(START, START + timedelta(hours=23, minutes=59), output_format="csv")
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+
+        assert len(rows) == 24
+        assert rows[0]["equipment_id"] == "unit_0"
+
+
+class TestDailyRollups:
+    """Test the incremental per-day rollup store"""
+
+    TEMPLATE = "${total_alerts}/${critical_count}/${warning_count}\n${fire_risk_events}${gas_incidents}${equipment_statistics}"
+
+    def test_rollup_report_matches_raw_report(self, generator, tmp_path):
+        """Test that a report assembled from rollups equals one from the raw log"""
+        (generator.templates_dir / "lab_safety_audit_template.md").write_text(self.TEMPLATE)
+        write_alerts(generator.alerts_log_file, 24 * 10, hours_apart=1)
+        start, end = START + timedelta(days=2), START + timedelta(days=5) - timedelta(seconds=1)
+
+        raw = generator.generate_report(start, end, output_file=tmp_path / "raw.md")
+        rolled = generator.generate_report(start, end, output_file=tmp_path / "rolled.md", use_rollups=True)
+
+        assert rolled.read_text(encoding="utf-8") == raw.read_text(encoding="utf-8")
+        assert len(list(generator.rollups.records(start.date(), end.date()))) == 3
+
+    def test_record_alert_updates_rollups(self, generator):
+        """Test that written alerts are rolled up at once and the checkpoint advances"""
+        generator.record_alert({"timestamp": START.isoformat(), "title": "Gas threshold exceeded",
+                                "equipment_id": "hood_1"})
+        generator.record_alert({"timestamp": (START + timedelta(hours=2)).isoformat(),
+                                "title": "CRITICAL gas leak", "equipment_id": "hood_1"})
+
+        with open(generator.rollups.rollup_dir / "2026-03-01.json") as f:
+            rollup = json.load(f)
+
+        assert rollup["total"] == 2
+        assert rollup["categories"] == {"gas_incidents": 2}
+        assert rollup["equipment"]["hood_1"][:2] == [2, 1]
+        assert generator.rollups.catch_up() == 0
+
+    def test_lazy_catch_up_from_checkpoint(self, generator):
+        """Test that entries written by another process are folded in before a report, once"""
+        write_alerts(generator.alerts_log_file, 10)
+        assert generator.rollups.catch_up() == 10
+        write_alerts(generator.alerts_log_file, 5, start=START + timedelta(days=1))
+        with open(generator.alerts_log_file, "a") as f:
+            f.write('{"timestamp": "2026-03-02T09:00:00", "ti')
+
+        aggregator = generator.aggregate_rollups(START, START + timedelta(days=1))
+        aggregator.close()
+
+        assert aggregator.total == 15
+        assert generator.rollups.catch_up() == 0
+
+    def test_rotated_log_rebuilds_rollups(self, generator):
+        """Test that a truncated log does not leave stale or double-counted rollups"""
+        write_alerts(generator.alerts_log_file, 30)
+        generator.rollups.catch_up()
+        generator.alerts_log_file.write_text("")
+        write_alerts(generator.alerts_log_file, 2, start=START + timedelta(days=3))
+
+        generator.rollups.catch_up()
+
+        assert not (generator.rollups.rollup_dir / "2026-03-01.json").exists()
+        assert generator.rollups.record("2026-03-04")["total"] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the PREMONITOR black-box recorder.
+Tests memory-bounded ring buffers, post-trigger capture and incident dumps.
+"""
+
+import sys
+import os
+import json
+import numpy as np
+import pytest
+
+# Add pythonsoftware and the shared test helpers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import black_box
+import equipment_plan
+from helpers import sensor_reading
+
+
+def reading(i, thermal=True, audio=False):
+    sensors = {"temperature": 4.0 + i, "gas": 300 + i}
+    if thermal:
+        sensors["thermal"] = np.full((24, 32), float(i), dtype=np.float32)
+    if audio:
+        sensors["audio"] = np.full((64, 64), 0.5, dtype=np.float32)
+    return sensor_reading(**sensors)
+
+
+class TestBlackBox:
+    """Test the per-unit ring buffers"""
+
+    def test_capacity_fits_memory_budget(self):
+        """Test that the buffers, sized from the first reading, stay within the budget"""
+        box = black_box.BlackBox("fridge_1", memory_budget_bytes=64 * 1024)
+
+        box.record(reading(0, audio=True), 0.0)
+
+        assert box.nbytes <= 64 * 1024
+        assert box.capacity == 64 * 1024 // (8 + 4 * len(black_box.SCALAR_FIELDS) + 24 * 32 * 2 + 1 + 64 * 64 * 2 + 1)
+        assert box.arrays["thermal"].dtype == np.float16
+        assert box.scalars.dtype == np.float32
+
+    def test_ring_keeps_newest_in_order(self):
+        """Test wraparound: the snapshot holds the last `capacity` readings, oldest first"""
+        box = black_box.BlackBox("fridge_1", memory_budget_bytes=8 * 1024)
+        box.record(reading(0), 0.0)
+        capacity = box.capacity
+        for i in range(1, capacity + 3):
+            box.record(reading(i), float(i))
+
+        data = box.snapshot()
+
+        assert list(data["timestamps"]) == [float(i) for i in range(3, capacity + 3)]
+        assert data["scalars"][-1, black_box.SCALAR_FIELDS.index("gas")] == 300 + capacity + 2
+        assert list(data["thermal"][:, 0, 0]) == list(range(3, capacity + 3))
+
+    def test_missing_and_mismatched_values(self):
+        """Test NaN scalars and skipped frames for absent or differently shaped arrays"""
+        box = black_box.BlackBox("fridge_1", memory_budget_bytes=64 * 1024)
+        box.record(reading(0), 0.0)
+        box.record({"sensors": {"temperature": "n/a", "thermal": np.zeros((8, 8))}}, 1.0)
+        box.record(reading(2, thermal=False), 2.0)
+
+        data = box.snapshot()
+
+        assert np.isnan(data["scalars"][1, 0]) and np.isnan(data["scalars"][1, 1])
+        assert list(data["thermal_timestamps"]) == [0.0]
+
+    def test_tiny_budget_keeps_scalars_only(self):
+        """Test that frames larger than the budget are dropped rather than overrunning it"""
+        box = black_box.BlackBox("fridge_1", memory_budget_bytes=1024)
+
+        box.record(reading(0), 0.0)
+
+        assert box.arrays == {}
+        assert box.capacity >= black_box.MIN_CAPACITY
+
+
+class TestBlackBoxManager:
+    """Test triggers, post-trigger capture and dumps"""
+
+    def test_dump_after_post_trigger_sampling(self, tmp_path):
+        """Test that post-trigger samples are in the dump together with the pre-trigger history"""
+        manager = black_box.BlackBoxManager(str(tmp_path), 64 * 1024, post_trigger_s=0.2, sample_interval_s=0.05)
+        samples = iter(range(100, 200))
+        manager.set_sampler("fridge_1", lambda: reading(next(samples)))
+        for i in range(3):
+            manager.record("fridge_1", reading(i))
+
+        assert manager.trigger("fridge_1", "gas threshold")
+        assert not manager.trigger("fridge_1", "security: unauthorized_motion")
+        manager.wait(timeout=5)
+
+        assert len(manager.dumps) == 1
+        with np.load(manager.dumps[0]) as dump:
+            meta = json.loads(str(dump["meta"]))
+            gas = dump["scalars"][:, list(dump["scalar_fields"]).index("gas")]
+            assert meta["reasons"] == ["gas threshold", "security: unauthorized_motion"]
+            assert list(gas[:3]) == [300, 301, 302]
+            assert len(gas) >= 5 and gas[3] == 400
+            assert dump["thermal"].dtype == np.float16
+
+    def test_close_cuts_capture_short(self, tmp_path):
+        """Test that shutdown dumps running captures without waiting out the post-trigger time"""
+        manager = black_box.BlackBoxManager(str(tmp_path), 64 * 1024, post_trigger_s=60)
+        manager.record("oven", reading(0))
+        manager.trigger("oven", "anomaly: thermal")
+
+        manager.close()
+
+        assert len(manager.dumps) == 1
+
+    def test_direct_sampling_bypasses_bus(self):
+        """Test that read_sensors(direct=True) reads the device again within a bus tick"""
+        import sensor_bus
+
+        reads = []
+
+        class Hardware:
+            @staticmethod
+            def read_gas_sensor():
+                reads.append(1)
+                return len(reads)
+
+        bus = sensor_bus.SensorBus()
+        plan = equipment_plan.compile_plan({"id": "hood", "type": "fume_hood",
+                                            "sensors": {"gas_sensor": {"enabled": True, "analog_channel": 0}}},
+                                           Hardware, bus=bus)
+        bus.begin_tick()
+
+        assert equipment_plan.read_sensors(plan)["sensors"]["gas"] == 1
+        assert equipment_plan.read_sensors(plan)["sensors"]["gas"] == 1
+        assert equipment_plan.read_sensors(plan, direct=True)["sensors"]["gas"] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the PREMONITOR business-hours calendar.
+Tests weekly intervals, holidays, location overrides and the cached next transition.
+"""
+
+import sys
+import os
+import random
+from datetime import datetime, timedelta
+import pytest
+
+# Add pythonsoftware to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+
+import business_calendar
+import security_monitor
+
+DEFAULT_HOURS = {"start": "08:00", "end": "18:00", "weekdays_only": True}
+
+# 2026-10-19 is a Monday
+MONDAY = datetime(2026, 10, 19)
+
+
+def original_is_after_hours(now, hours):
+    """Reference: the per-call strptime implementation this calendar replaces."""
+    if hours["weekdays_only"] and now.weekday() >= 5:
+        return True
+    start = datetime.strptime(hours["start"], "%H:%M").time()
+    end = datetime.strptime(hours["end"], "%H:%M").time()
+    return not (start <= now.time() < end)
+
+
+class TestBusinessCalendar:
+    """Test compiled weekly schedules"""
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_matches_original_rule(self, seed):
+        """Test random times (in random order) against the strptime implementation"""
+        rng = random.Random(seed)
+        hours = {"start": f"{rng.randint(5, 10):02d}:{rng.choice([0, 30]):02d}",
+                 "end": f"{rng.randint(15, 20):02d}:00", "weekdays_only": rng.random() < 0.5}
+        calendar = business_calendar.BusinessCalendar.from_config(hours)
+
+        for _ in range(300):
+            when = MONDAY + timedelta(seconds=rng.randrange(21 * 24 * 3600))
+            assert calendar.is_after_hours(when) == original_is_after_hours(when, hours), when
+
+    def test_weekly_intervals_with_lunch_break(self):
+        """Test several intervals per day and a weekend morning"""
+        calendar = business_calendar.BusinessCalendar.from_config(
+            {"weekly": {"mon": [["08:00", "12:00"], ["13:00", "18:00"]], "sat": [["09:00", "13:00"]]}})
+
+        assert not calendar.is_after_hours(MONDAY.replace(hour=11, minute=59))
+        assert calendar.is_after_hours(MONDAY.replace(hour=12, minute=30))
+        assert calendar.is_after_hours(MONDAY.replace(day=20, hour=10))  # Tuesday: closed
+        assert not calendar.is_after_hours(MONDAY.replace(day=24, hour=10))  # Saturday morning
+
+    def test_overnight_interval_wraps_week(self):
+        """Test a Sunday night shift running into Monday"""
+        calendar = business_calendar.BusinessCalendar.from_config({"weekly": {"sun": [["22:00", "06:00"]]}})
+
+        assert not calendar.is_after_hours(MONDAY.replace(hour=5))
+        assert calendar.is_after_hours(MONDAY.replace(hour=7))
+        assert not calendar.is_after_hours(MONDAY.replace(day=25, hour=23))
+
+    def test_holiday_closed_all_day(self):
+        """Test that a weekday holiday is after hours"""
+        calendar = business_calendar.BusinessCalendar.from_config(dict(DEFAULT_HOURS, holidays=["2026-10-20"]))
+
+        assert calendar.is_after_hours(MONDAY.replace(day=20, hour=10))
+        assert not calendar.is_after_hours(MONDAY.replace(day=21, hour=10))
+
+    def test_next_transition(self):
+        """Test the next boundary, and midnight before a holiday"""
+        calendar = business_calendar.BusinessCalendar.from_config(DEFAULT_HOURS)
+
+        assert calendar.next_transition(MONDAY.replace(hour=9)) == MONDAY.replace(hour=18)
+        assert calendar.next_transition(MONDAY.replace(hour=20)) == MONDAY.replace(day=20)
+        assert calendar.next_transition(MONDAY.replace(day=24, hour=12)) == MONDAY.replace(day=25)
+
+    def test_cached_until_next_transition(self, monkeypatch):
+        """Test that calls before the next transition skip the lookup"""
+        calendar = business_calendar.BusinessCalendar.from_config(DEFAULT_HOURS)
+        lookups = []
+        original = calendar._lookup
+        monkeypatch.setattr(calendar, "_lookup", lambda when: lookups.append(when) or original(when))
+
+        for minute in range(0, 600, 5):
+            assert not calendar.is_after_hours(MONDAY.replace(hour=8) + timedelta(minutes=minute))
+        assert calendar.is_after_hours(MONDAY.replace(hour=18))
+
+        assert len(lookups) == 2
+
+    def test_invalid_config_raises(self):
+        """Test malformed times, weekdays and dates"""
+        for bad in ({"start": "25:00"}, {"weekly": {"funday": []}}, {"holidays": ["20/10/2026"]}):
+            with pytest.raises(ValueError):
+                business_calendar.BusinessCalendar.from_config(bad)
+
+
+class TestBusinessSchedule:
+    """Test per-location overrides"""
+
+    def test_location_override(self):
+        """Test that an override replaces the hours and adds holidays"""
+        schedule = business_calendar.BusinessSchedule.from_config(dict(
+            DEFAULT_HOURS, holidays=["2026-12-25"],
+            locations={"Lab B": {"start": "06:00", "end": "22:00", "weekdays_only": False,
+                                 "holidays": ["2026-10-24"]}}))
+
+        evening = MONDAY.replace(hour=20)
+        assert schedule.is_after_hours(evening)
+        assert not schedule.is_after_hours(evening, "Lab B")
+        assert schedule.is_after_hours(evening, "Unknown lab")
+        assert schedule.is_after_hours(MONDAY.replace(day=24, hour=10), "Lab B")
+        assert schedule.is_after_hours(datetime(2026, 12, 25, 10), "Lab B")
+
+
+class TestSecurityMonitorSchedule:
+    """Test security_monitor.is_after_hours on the compiled schedule"""
+
+    def test_config_compiled_once(self, monkeypatch):
+        """Test the module-level schedule and reload after a config change"""
+        monkeypatch.setitem(security_monitor.SECURITY_CONFIG, "business_hours",
+                            dict(DEFAULT_HOURS, locations={"Lab B": {"weekdays_only": False}}))
+        security_monitor.reload_business_schedule()
+
+        schedule = security_monitor.get_business_schedule()
+        saturday = MONDAY.replace(day=24, hour=10)
+
+        assert security_monitor.get_business_schedule() is schedule
+        assert security_monitor.is_after_hours(when=saturday)
+        assert not security_monitor.is_after_hours("Lab B", saturday)
+        security_monitor.reload_business_schedule()
+
+    def test_bad_config_falls_back_to_business_hours(self, monkeypatch):
+        """Test that a broken schedule never reports after hours"""
+        monkeypatch.setitem(security_monitor.SECURITY_CONFIG, "business_hours", {"start": "8am", "end": "6pm"})
+        security_monitor.reload_business_schedule()
+
+        assert not security_monitor.is_after_hours(when=MONDAY.replace(hour=3))
+        security_monitor.reload_business_schedule()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
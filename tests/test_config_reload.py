@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for PREMONITOR configuration hot reload.
+Tests change detection and validation of candidate registries and device configs.
+"""
+
+import sys
+import os
+import json
+import pytest
+
+# Add pythonsoftware to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+
+import config_reload
+import equipment_registry
+
+
+def unit(eq_id, pi_id="pi_a"):
+    return {"id": eq_id, "type": "centrifuge", "pi_id": pi_id,
+            "sensors": {"microphone": {"enabled": True}, "vibration": {"enabled": True},
+                        "current": {"enabled": True}}}
+
+
+class TestReloadTrigger:
+    """Test file-watch and signal reload triggers"""
+
+    def test_file_change_detected_once(self, tmp_path):
+        """Test that an edit triggers exactly one reload"""
+        path = tmp_path / "device_config.json"
+        path.write_text("{}")
+        trigger = config_reload.ReloadTrigger([path])
+
+        assert not trigger.poll()
+        path.write_text('{"sensor_read_interval": 10}')
+        assert trigger.poll()
+        assert not trigger.poll()
+
+    def test_created_file_detected(self, tmp_path):
+        """Test that a watched file appearing triggers a reload"""
+        path = tmp_path / "device_config.json"
+        trigger = config_reload.ReloadTrigger([path])
+
+        path.write_text("{}")
+
+        assert trigger.poll()
+
+    def test_request_triggers_reload(self, tmp_path):
+        """Test the flag set by the SIGHUP handler"""
+        trigger = config_reload.ReloadTrigger([tmp_path / "missing.json"])
+
+        trigger.request()
+
+        assert trigger.poll()
+        assert not trigger.poll()
+
+
+class TestCandidateRegistry:
+    """Test loading and validating a registry before it is activated"""
+
+    def test_external_file_loaded(self, tmp_path, monkeypatch):
+        """Test that the registry file from the environment is used"""
+        path = tmp_path / "registry.json"
+        path.write_text(json.dumps({"equipment": [unit("c1"), unit("c2", "pi_b")]}))
+        monkeypatch.setenv(equipment_registry.REGISTRY_PATH_ENV, str(path))
+
+        registry = config_reload.load_candidate_registry("pi_a")
+
+        assert [eq["id"] for eq in registry.get_by_pi("pi_a")] == ["c1"]
+        assert config_reload.registry_path() == str(path)
+
+    def test_builtin_registry_reexecuted(self, monkeypatch):
+        """Test that the built-in tables are re-read from equipment_registry.py"""
+        monkeypatch.delenv(equipment_registry.REGISTRY_PATH_ENV, raising=False)
+
+        registry = config_reload.load_candidate_registry("premonitor_pi")
+
+        assert registry.get_by_id("fridge_lab_a_01")["type"] == "fridge"
+        assert registry.equipment is not equipment_registry.EQUIPMENT_REGISTRY
+
+    def test_broken_file_rejected(self, tmp_path, monkeypatch):
+        """Test that a malformed registry raises instead of being applied"""
+        path = tmp_path / "registry.json"
+        path.write_text('{"equipment": [')
+        monkeypatch.setenv(equipment_registry.REGISTRY_PATH_ENV, str(path))
+
+        with pytest.raises(config_reload.ConfigReloadError):
+            config_reload.load_candidate_registry()
+
+    def test_invalid_unit_for_this_pi_rejected(self, tmp_path, monkeypatch):
+        """Test that sensor validation failures on this Pi block the reload"""
+        bad = {"id": "bad", "type": "fridge", "pi_id": "pi_a", "sensors": {}}
+        path = tmp_path / "registry.json"
+        path.write_text(json.dumps({"equipment": [unit("ok"), bad]}))
+        monkeypatch.setenv(equipment_registry.REGISTRY_PATH_ENV, str(path))
+
+        with pytest.raises(config_reload.ConfigReloadError, match="bad"):
+            config_reload.load_candidate_registry("pi_a")
+        assert len(config_reload.load_candidate_registry("pi_b")) == 2
+
+
+class TestCandidateDeviceConfig:
+    """Test device_config.json validation"""
+
+    def test_valid_config_loaded(self, tmp_path):
+        """Test that a valid file is returned as-is"""
+        path = tmp_path / "device_config.json"
+        path.write_text(json.dumps({"gas_threshold": "650", "interpreter_options": {"thermal": {"num_threads": 2}}}))
+
+        assert config_reload.load_candidate_device_config(path)["gas_threshold"] == "650"
+
+    def test_missing_file_is_empty(self, tmp_path):
+        """Test that no file means no overrides"""
+        assert config_reload.load_candidate_device_config(tmp_path / "device_config.json") == {}
+
+    @pytest.mark.parametrize("content", ['{"sensor_read_interval": "soon"}',
+                                         '{"interpreter_options": {"thermal": 2}}',
+                                         '[1, 2]',
+                                         '{"gas_threshold": '])
+    def test_invalid_config_rejected(self, tmp_path, content):
+        """Test that bad values and bad JSON raise"""
+        path = tmp_path / "device_config.json"
+        path.write_text(content)
+
+        with pytest.raises(config_reload.ConfigReloadError):
+            config_reload.load_candidate_device_config(path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for PREMONITOR compiled equipment plans.
+Tests threshold resolution, sensor reader binding and raw threshold evaluation.
+"""
+
+import sys
+import os
+import pytest
+
+# Add pythonsoftware to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+
+import equipment_plan
+import equipment_registry
+
+
+class FakeHardware:
+    """Hardware stand-in with a few readers, one of which fails."""
+
+    @staticmethod
+    def read_temperature():
+        return 4.0
+
+    @staticmethod
+    def read_gas_sensor():
+        raise IOError("ADC not responding")
+
+    @staticmethod
+    def read_microphone():
+        return "audio"
+
+
+def make_equipment(sensors, equipment_type="fridge"):
+    return {"id": "plan_test", "type": equipment_type, "name": "Plan Test", "sensors": sensors}
+
+
+class TestCompilePlan:
+    """Test building a plan from registry configuration"""
+
+    def test_only_enabled_sensors_bound(self):
+        """Test that disabled or unknown-to-hardware sensors get no reader"""
+        equipment = make_equipment({
+            "temperature": {"enabled": True},
+            "microphone": {"enabled": False},
+            "co2": {"enabled": True},  # FakeHardware has no read_co2_sensor
+        })
+
+        plan = equipment_plan.compile_plan(equipment, FakeHardware)
+
+        assert [reader.key for reader in plan.sensor_readers] == ["temperature"]
+        assert plan.sensor_readers[0].read is FakeHardware.read_temperature
+
+    def test_models_follow_enabled_sensors(self):
+        """Test that CNNs are only planned for sensors that feed them"""
+        with_mic = equipment_plan.compile_plan(make_equipment({"microphone": {"enabled": True}}), FakeHardware)
+        without_mic = equipment_plan.compile_plan(make_equipment({}), FakeHardware)
+
+        assert with_mic.models == ("acoustic", "lstm")
+        assert without_mic.models == ("lstm",)
+
+    def test_thresholds_resolved_with_fallbacks(self):
+        """Test registry values and config fallbacks end up on the plan"""
+        plan = equipment_plan.compile_plan(make_equipment({}, "centrifuge"))
+        registry = equipment_registry.get_equipment_thresholds("centrifuge")
+
+        assert plan.thresholds.vibration_threshold == registry["vibration_threshold"]
+        assert plan.thresholds.critical_temperature_c == equipment_plan.config.THERMAL_CRITICAL_THRESHOLD_C
+        assert plan.thresholds.gas_threshold == registry.get("gas_analog_threshold",
+                                                              equipment_plan.config.GAS_ANALOG_THRESHOLD)
+        assert plan.alert_channels == ("discord",)
+        assert plan.location == "Unknown"
+
+
+class TestReadSensors:
+    """Test reading through bound readers"""
+
+    def test_failed_reader_skipped(self):
+        """Test that one failing sensor does not drop the others"""
+        equipment = make_equipment({"temperature": {"enabled": True}, "gas_sensor": {"enabled": True}})
+        plan = equipment_plan.compile_plan(equipment, FakeHardware)
+
+        readings = equipment_plan.read_sensors(plan)
+
+        assert readings["equipment_id"] == "plan_test"
+        assert readings["sensors"] == {"temperature": 4.0}
+
+
+class TestEvaluateRawThresholds:
+    """Test raw threshold evaluation against resolved thresholds"""
+
+    def test_messages_in_sensor_order(self):
+        """Test every check fires with the monitor's message format"""
+        thresholds = equipment_plan.ResolvedThresholds(
+            temperature_range=(2, 8), critical_temperature_c=75.0, gas_threshold=600,
+            co2_range=(4.5, 5.5), oxygen_min=19.5, vibration_threshold=0.5, current_threshold=5.0)
+        sensors = {"current": 6, "vibration": 0.8, "oxygen": 18, "co2": 7, "gas": 650, "temperature": 80}
+
+        alerts = equipment_plan.evaluate_raw_thresholds(sensors, thresholds)
+
+        assert alerts == [
+            "Temperature out of expected range: 80.00°C (expected (2, 8))",
+            "CRITICAL: High temperature detected: 80.00°C >= 75.0°C",
+            "Gas sensor above threshold: 650.0 >= 600",
+            "CO2 level out of expected range: 7.00% (expected (4.5, 5.5))",
+            "Low oxygen detected: 18.00% < 19.5%",
+            "High vibration detected: 0.80G >= 0.5G (possible bearing wear)",
+            "Motor overload detected: 6.00A >= 5.0A (possible mechanical jam)",
+        ]
+
+    def test_unset_thresholds_and_bad_values_ignored(self):
+        """Test that missing thresholds and unparsable readings raise no alerts"""
+        thresholds = equipment_plan.ResolvedThresholds()
+
+        alerts = equipment_plan.evaluate_raw_thresholds(
+            {"temperature": "n/a", "gas": 10_000, "oxygen": 1.0}, thresholds)
+
+        assert alerts == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -4,9 +4,12 @@
 Unit tests for equipment_registry.py
 """
 
+import json
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add pythonsoftware to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'pythonsoftware'))
 
@@ -87,6 +90,85 @@ def test_thresholds_defined():
     print("[PASS] Thresholds defined for all equipment types")
 
 
+def make_unit(eq_id, pi_id="pi_a", eq_type="centrifuge", critical=False):
+    """Minimal valid equipment entry for registry tests."""
+    return {"id": eq_id, "type": eq_type, "name": eq_id, "pi_id": pi_id, "critical": critical,
+            "sensors": {"microphone": {"enabled": True}, "vibration": {"enabled": True},
+                        "current": {"enabled": True}}}
+
+
+def test_registry_indexes():
+    """Test lookups by id, Pi, type and criticality on a large registry."""
+    units = [make_unit(f"unit_{i:03d}", pi_id=f"pi_{i % 7}", critical=(i % 10 == 0)) for i in range(300)]
+    registry = er.EquipmentRegistry(units)
+
+    assert registry.get_by_id("unit_123") is units[123]
+    assert registry.get_by_id("missing") is None
+    assert registry.get_by_pi("pi_3") == [eq for eq in units if eq["pi_id"] == "pi_3"]
+    assert len(registry.get_by_type("centrifuge")) == 300
+    assert [eq["id"] for eq in registry.get_critical()] == [f"unit_{i:03d}" for i in range(0, 300, 10)]
+    assert registry.pi_ids == sorted(f"pi_{i}" for i in range(7))
+    print("[PASS] Registry indexes match linear scans")
+
+
+def test_registry_validates_once():
+    """Test structural errors raise and sensor errors are recorded."""
+    with pytest.raises(ValueError):
+        er.EquipmentRegistry([make_unit("dup"), make_unit("dup")])
+    with pytest.raises(ValueError):
+        er.EquipmentRegistry([{"id": "no_pi", "type": "fridge"}])
+
+    bad = make_unit("bad_fridge", eq_type="fridge")
+    registry = er.EquipmentRegistry([make_unit("ok"), bad])
+    assert list(registry.validation_errors) == ["bad_fridge"]
+    assert "thermal" in registry.validation_errors["bad_fridge"]
+    print("[PASS] Registry validation recorded at build time")
+
+
+def test_registry_from_json(tmp_path):
+    """Test loading equipment and threshold overrides from JSON."""
+    path = tmp_path / "registry.json"
+    path.write_text(json.dumps({
+        "equipment": [make_unit("json_unit")],
+        "thresholds": {"centrifuge": {"vibration_threshold": 0.3, "temperature_range": [4, 30]}}
+    }))
+
+    registry = er.EquipmentRegistry.from_file(str(path))
+
+    assert registry.get_by_id("json_unit")["pi_id"] == "pi_a"
+    thresholds = registry.get_thresholds("centrifuge")
+    assert thresholds["vibration_threshold"] == 0.3
+    assert thresholds["temperature_range"] == (4, 30)
+    assert thresholds["current_threshold"] == er.EQUIPMENT_THRESHOLDS["centrifuge"]["current_threshold"]
+    print("[PASS] Registry loaded from JSON")
+
+
+@pytest.mark.skipif(er.yaml is None, reason="PyYAML not installed")
+def test_registry_from_yaml(tmp_path):
+    """Test loading equipment from YAML."""
+    path = tmp_path / "registry.yaml"
+    path.write_text("equipment:\n  - id: yaml_unit\n    type: fridge\n    pi_id: pi_b\n    critical: true\n")
+
+    registry = er.EquipmentRegistry.from_file(str(path))
+
+    assert [eq["id"] for eq in registry.get_critical()] == ["yaml_unit"]
+    print("[PASS] Registry loaded from YAML")
+
+
+def test_active_registry_from_environment(tmp_path, monkeypatch):
+    """Test that module helpers use the file named in the environment."""
+    path = tmp_path / "registry.json"
+    path.write_text(json.dumps({"equipment": [make_unit("env_unit", pi_id="env_pi")]}))
+    monkeypatch.setenv(er.REGISTRY_PATH_ENV, str(path))
+    er.set_registry(None)
+    try:
+        assert [eq["id"] for eq in er.get_equipment_by_pi("env_pi")] == ["env_unit"]
+        assert er.get_equipment_by_id("fridge_lab_a_01") is None
+    finally:
+        er.set_registry(None)
+    print("[PASS] Active registry loaded from environment")
+
+
 def run_all_tests():
     """Run all tests."""
     print("=" * 60)
@@ -102,6 +184,8 @@ def run_all_tests():
         test_validate_invalid_config,
         test_get_critical_equipment,
         test_thresholds_defined,
+        test_registry_indexes,
+        test_registry_validates_once,
     ]
 
     results = []
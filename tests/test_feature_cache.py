@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the PREMONITOR feature cache.
+Tests content-addressed keys, cache hits across runs and LRU eviction.
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+# Add pythonsoftware to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+
+import feature_cache
+from feature_cache import FeatureCache
+
+PARAMS = {"kind": "log_mel", "n_mels": 128}
+
+
+class CountingExtractor:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        with open(path, "rb") as f:
+            data = f.read()
+        return np.frombuffer(data, dtype=np.uint8).astype(np.float32).reshape(1, -1)
+
+
+def audio(tmp_path, name, content=b"RIFF1234"):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return path
+
+
+class TestFeatureCache:
+    """Test content-addressed caching"""
+
+    def test_second_run_skips_extraction(self, tmp_path):
+        """Test that a new cache over the same directory hits without recomputing"""
+        wav = audio(tmp_path, "a.wav")
+        extract = CountingExtractor()
+        first = FeatureCache(tmp_path / "cache").get_or_compute(wav, PARAMS, extract)
+        FeatureCache(tmp_path / "cache").flush()
+
+        rerun = FeatureCache(tmp_path / "cache")
+        second = rerun.get_or_compute(wav, PARAMS, extract)
+
+        assert extract.calls == 1
+        assert rerun.hits == 1
+        assert np.array_equal(first, second)
+
+    def test_key_follows_content_not_path(self, tmp_path):
+        """Test that a copied file hits and an edited file misses"""
+        cache = FeatureCache(tmp_path / "cache")
+        extract = CountingExtractor()
+        cache.get_or_compute(audio(tmp_path, "a.wav"), PARAMS, extract)
+
+        cache.get_or_compute(audio(tmp_path, "copy.wav"), PARAMS, extract)
+        assert extract.calls == 1
+
+        wav = audio(tmp_path, "a.wav", b"RIFF5678-longer")
+        assert cache.get_or_compute(wav, PARAMS, extract).shape == (1, 15)
+        assert extract.calls == 2
+
+    def test_params_are_part_of_key(self, tmp_path):
+        """Test that changed preprocessing settings miss"""
+        cache = FeatureCache(tmp_path / "cache")
+        wav = audio(tmp_path, "a.wav")
+
+        assert cache.key(wav, PARAMS) != cache.key(wav, dict(PARAMS, n_mels=64))
+        assert cache.key(wav, PARAMS) == cache.key(wav, dict(reversed(list(PARAMS.items()))))
+
+    def test_failures_not_cached(self, tmp_path):
+        """Test that a None result is returned but not stored"""
+        cache = FeatureCache(tmp_path / "cache")
+
+        assert cache.get_or_compute(audio(tmp_path, "bad.wav"), PARAMS, lambda path: None) is None
+        assert cache.total_bytes == 0
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entries go once the bound is exceeded"""
+        cache = FeatureCache(tmp_path / "cache")
+        extract = CountingExtractor()
+        files = [audio(tmp_path, f"{i}.wav", bytes([i]) * 400) for i in range(3)]
+        for i, wav in enumerate(files):
+            cache.get_or_compute(wav, PARAMS, extract)
+            path = cache._path(cache.key(wav, PARAMS))
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+        entry_bytes = cache.total_bytes // 3
+        cache.get(cache.key(files[0], PARAMS))  # Touch the oldest
+
+        cache.max_bytes = int(entry_bytes * 2.5)
+        cache.get_or_compute(audio(tmp_path, "3.wav", b"\x03" * 400), PARAMS, extract)
+
+        assert cache.get(cache.key(files[1], PARAMS)) is None
+        assert cache.get(cache.key(files[0], PARAMS)) is not None
+        assert cache.total_bytes <= cache.max_bytes
+
+
+class TestDefaultCache:
+    """Test the config-driven cache used by the loaders"""
+
+    @pytest.fixture
+    def configured(self, tmp_path, monkeypatch):
+        settings = SimpleNamespace(FEATURE_CACHE_ENABLED=True, FEATURE_CACHE_DIR=tmp_path / "cache",
+                                   FEATURE_CACHE_MAX_MB=16, SPECTROGRAM_SAMPLE_RATE=16000,
+                                   SPECTROGRAM_N_MELS=128, SPECTROGRAM_HOP_LENGTH=512, DEBUG_MODE=False)
+        monkeypatch.setattr(feature_cache, "config", settings)
+        monkeypatch.setattr(feature_cache, "_default_cache", None)
+        return tmp_path
+
+    def test_cached_features_hit(self, configured):
+        """Test that repeated extraction of the same file is served from the cache"""
+        wav = audio(configured, "a.wav")
+        extract = CountingExtractor()
+
+        feature_cache.cached_features(wav, "log_mel", extract)
+        feature_cache.cached_features(wav, "log_mel", extract)
+        feature_cache.cached_features(wav, "log_mel_resized", extract, shape=[128, 128])
+
+        assert extract.calls == 2
+
+    def test_disabled_cache_computes(self, configured, monkeypatch):
+        """Test that PREMONITOR_FEATURE_CACHE=false bypasses the cache"""
+        monkeypatch.setattr(feature_cache.config, "FEATURE_CACHE_ENABLED", False)
+        extract = CountingExtractor()
+        wav = audio(configured, "a.wav")
+
+        feature_cache.cached_features(wav, "log_mel", extract)
+        feature_cache.cached_features(wav, "log_mel", extract)
+
+        assert extract.calls == 2
+        assert not (configured / "cache").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the PREMONITOR vectorized fleet threshold evaluator.
+Property tests check it against the per-equipment scalar evaluation.
+"""
+
+import sys
+import os
+import random
+import pytest
+import numpy as np
+
+# Add pythonsoftware to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+
+import equipment_plan
+import equipment_registry
+import fleet_thresholds
+from vibration_features import VibrationFeatures
+
+
+def random_thresholds(rng):
+    """Random thresholds, each check independently enabled or disabled."""
+    def maybe(value):
+        return value if rng.random() < 0.7 else None
+
+    low = rng.choice([-80, 2, 20, 36.5])
+    return equipment_plan.ResolvedThresholds(
+        temperature_range=rng.choice([None, (), (low, low + rng.choice([3, 6, 10.5]))]),
+        critical_temperature_c=maybe(rng.choice([40, 75.0])),
+        gas_threshold=maybe(rng.choice([400, 600, 650.5])),
+        co2_range=rng.choice([None, (4.5, 5.5), (0, 1)]),
+        oxygen_min=maybe(rng.choice([19.5, 20])),
+        vibration_threshold=maybe(rng.choice([0.5, 1])),
+        vibration_crest_factor_threshold=maybe(rng.choice([4.0, 6])),
+        vibration_kurtosis_threshold=maybe(rng.choice([5, 7.5])),
+        current_threshold=maybe(rng.choice([5.0, 10]))
+    )
+
+
+def random_sensors(rng, thresholds):
+    """Random readings, biased towards the threshold boundaries and odd values."""
+    candidates = {
+        "temperature": [-90, 1.99, 2, 8, 8.01, 37, 75, 80.5] + list(thresholds.temperature_range or ()),
+        "gas": [0, 599.99, 600, 650.5, 1023],
+        "co2": [0, 4.5, 5.0, 5.5, 7.25],
+        "oxygen": [18, 19.5, 20, 20.9],
+        "vibration": [0.1, 0.5, 0.8, 1],
+        "current": [1.0, 5, 9.999, 12],
+    }
+    sensors = {}
+    for name, values in candidates.items():
+        roll = rng.random()
+        if roll < 0.2:
+            continue
+        if roll < 0.25:
+            sensors[name] = rng.choice(["n/a", None, float("nan"), str(rng.choice(values))])
+        elif roll < 0.4:
+            sensors[name] = rng.uniform(-100, 1100)
+        else:
+            sensors[name] = rng.choice(values)
+    if "vibration" in sensors and rng.random() < 0.5:
+        sensors["vibration"] = random_burst(rng, sensors["vibration"])
+    sensors["thermal"] = "frame"  # Non-scalar sensors are ignored
+    return sensors
+
+
+def random_burst(rng, rms):
+    """Burst features (as ADXL345 FIFO reads return them) with boundary crest factor / kurtosis."""
+    try:
+        rms = float(rms)
+    except (TypeError, ValueError):
+        rms = float("nan")
+    return VibrationFeatures(rms=rms, peak=rms * 2, crest_factor=rng.choice([1.41, 4, 6, 9.5, float("nan")]),
+                             kurtosis=rng.choice([3.0, 5, 7.5, 12]), band_energies=(0.1, 0.2),
+                             sample_rate_hz=3200.0, n_samples=64)
+
+
+class TestFleetMatchesScalar:
+    """Property tests: vectorized evaluation == per-unit evaluation"""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_random_fleet(self, seed):
+        """Test identical masks and messages on a random fleet"""
+        rng = random.Random(seed)
+        thresholds = [random_thresholds(rng) for _ in range(50)]
+        sensor_dicts = [random_sensors(rng, t) for t in thresholds]
+
+        violations = fleet_thresholds.evaluate_fleet(fleet_thresholds.readings_to_array(sensor_dicts),
+                                                     fleet_thresholds.compile_fleet_thresholds(thresholds))
+
+        expected = [equipment_plan.evaluate_raw_thresholds(s, t) for s, t in zip(sensor_dicts, thresholds)]
+        assert violations.messages() == expected
+        np.testing.assert_array_equal(violations.any, [bool(m) for m in expected])
+
+    def test_registry_equipment_types(self):
+        """Test every registered equipment type with real resolved thresholds"""
+        rng = random.Random(99)
+        thresholds = [equipment_plan.resolve_thresholds(t) for t in equipment_registry.EQUIPMENT_THRESHOLDS] * 10
+        sensor_dicts = [random_sensors(rng, t) for t in thresholds]
+
+        violations = fleet_thresholds.evaluate_fleet(fleet_thresholds.readings_to_array(sensor_dicts),
+                                                     fleet_thresholds.compile_fleet_thresholds(thresholds))
+
+        assert violations.messages() == [equipment_plan.evaluate_raw_thresholds(s, t)
+                                         for s, t in zip(sensor_dicts, thresholds)]
+
+
+class TestFleetEvaluator:
+    """Test the array interface"""
+
+    def test_masks_per_rule(self):
+        """Test that each rule gets its own mask column"""
+        thresholds = [equipment_plan.ResolvedThresholds(gas_threshold=600, vibration_threshold=0.5)] * 2
+        readings = fleet_thresholds.readings_to_array([{"gas": 700}, {"vibration": 0.9}])
+
+        masks = fleet_thresholds.evaluate_fleet(readings, fleet_thresholds.compile_fleet_thresholds(thresholds)).masks
+
+        assert masks["gas"].tolist() == [True, False]
+        assert masks["vibration"].tolist() == [False, True]
+        assert not masks["current"].any()
+
+    def test_burst_features_checked(self):
+        """Test that crest factor and kurtosis of a vibration burst get their own rules"""
+        thresholds = [equipment_plan.ResolvedThresholds(vibration_threshold=1.0, vibration_crest_factor_threshold=6.0,
+                                                        vibration_kurtosis_threshold=5.0)] * 2
+        burst = VibrationFeatures(rms=0.3, peak=2.4, crest_factor=8.0, kurtosis=9.0, band_energies=(),
+                                  sample_rate_hz=3200.0, n_samples=64)
+        readings = fleet_thresholds.readings_to_array([{"vibration": burst}, {"vibration": 0.3}])
+
+        masks = fleet_thresholds.evaluate_fleet(readings, fleet_thresholds.compile_fleet_thresholds(thresholds)).masks
+
+        assert masks["vibration_crest_factor"].tolist() == [True, False]
+        assert masks["vibration_kurtosis"].tolist() == [True, False]
+        assert not masks["vibration"].any()
+
+    def test_missing_readings_are_nan(self):
+        """Test that absent or unparsable sensors become NaN"""
+        readings = fleet_thresholds.readings_to_array([{"temperature": "bad"}, {"temperature": 4}])
+
+        assert np.isnan(readings["temperature"][0])
+        assert readings["temperature"][1] == 4.0
+        assert np.isnan(readings["co2"]).all()
+
+    def test_row_count_mismatch_rejected(self):
+        """Test that misaligned readings and thresholds are refused"""
+        fleet = fleet_thresholds.compile_fleet_thresholds([equipment_plan.ResolvedThresholds()])
+
+        with pytest.raises(ValueError):
+            fleet_thresholds.evaluate_fleet(fleet_thresholds.readings_to_array([{}, {}]), fleet)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
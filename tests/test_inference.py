@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the PREMONITOR shared inference module.
+Tests interpreter options, the startup thread-count auto-tune and the
+quantization-aware ModelRunner.
+"""
+
+import sys
+import os
+import pytest
+import numpy as np
+
+# Add pythonsoftware to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+
+import inference
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+ACOUSTIC_MODEL = os.path.join(MODEL_DIR, 'acoustic_anomaly_model_int8.tflite')
+
+requires_model = pytest.mark.skipif(inference.tflite is None or not os.path.exists(ACOUSTIC_MODEL),
+                                    reason="TFLite runtime or acoustic model not available")
+
+
+class TestInterpreterOptions:
+    """Test per-model interpreter options"""
+
+    def test_defaults_filled_in(self):
+        """Test that missing and None options fall back to defaults"""
+        options = inference.merge_interpreter_options({"num_threads": 2, "cpu_affinity": None})
+
+        assert options["num_threads"] == 2
+        assert options["xnnpack"] is True
+        assert options["cpu_affinity"] is None
+        assert options["autotune"] is False
+
+    def test_resolve_without_autotune_keeps_configuration(self):
+        """Test that resolving never benchmarks unless asked to"""
+        options = inference.resolve_interpreter_options("missing.tflite", "thermal", {"num_threads": 3})
+
+        assert options["num_threads"] == 3
+        assert options["autotune"] is False
+
+    @requires_model
+    @pytest.mark.parametrize("xnnpack", [True, False])
+    def test_threads_and_delegate_give_same_output(self, xnnpack):
+        """Test that interpreter options change speed, not results"""
+        baseline = inference.load_tflite_model(ACOUSTIC_MODEL, "acoustic")
+        tuned = inference.load_tflite_model(ACOUSTIC_MODEL, "acoustic", {"num_threads": 2, "xnnpack": xnnpack})
+        detail = baseline.get_input_details()[0]
+        data = np.random.default_rng(1).random(detail['shape']).astype(detail['dtype'])
+
+        outputs = []
+        for interpreter in (baseline, tuned):
+            interpreter.set_tensor(detail['index'], data)
+            interpreter.invoke()
+            outputs.append(interpreter.get_tensor(interpreter.get_output_details()[0]['index']))
+
+        np.testing.assert_allclose(outputs[0], outputs[1], rtol=1e-4, atol=1e-5)
+
+    @requires_model
+    @pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'), reason="CPU affinity not supported")
+    def test_affinity_hint_restores_caller_mask(self):
+        """Test that pinning only applies while the interpreter starts"""
+        before = os.sched_getaffinity(0)
+
+        interpreter = inference.load_tflite_model(ACOUSTIC_MODEL, "acoustic", {"cpu_affinity": [min(before)]})
+
+        assert interpreter is not None
+        assert os.sched_getaffinity(0) == before
+
+
+@requires_model
+class TestAutotune:
+    """Test the startup thread-count auto-tune"""
+
+    def test_picks_thread_count_within_budget(self):
+        """Test that every count up to the budget is measured"""
+        result = inference.autotune_num_threads(ACOUSTIC_MODEL, "acoustic", cpu_budget=2, runs=2)
+
+        assert set(result["timings_ms"]) == {1, 2}
+        assert result["num_threads"] in (1, 2)
+        assert result["latency_ms"] == result["timings_ms"][result["num_threads"]]
+
+    def test_resolve_applies_autotune_once(self):
+        """Test that resolved options carry the tuned count and no autotune flag"""
+        options = inference.resolve_interpreter_options(ACOUSTIC_MODEL, "acoustic",
+                                                        {"autotune": True}, cpu_budget=1)
+
+        assert options["num_threads"] == 1
+        assert options["autotune"] is False
+
+
+class QuantizedInterpreter:
+    """Interpreter stand-in with quantized I/O that records the tensor it was given."""
+
+    def __init__(self, dtype=np.int8, scale=0.5, zero_point=-10, shape=(1, 2, 3),
+                 output_dtype=np.int8, output_quantization=(0.25, 4)):
+        self.dtype = dtype
+        self.quantization = (scale, zero_point)
+        self.shape = shape
+        self.output_dtype = output_dtype
+        self.output_quantization = output_quantization
+        self.received = None
+
+    def get_input_details(self):
+        return [{'index': 0, 'shape': np.array(self.shape), 'dtype': self.dtype, 'quantization': self.quantization}]
+
+    def get_output_details(self):
+        return [{'index': 1, 'shape': np.array([1, 1]), 'dtype': self.output_dtype,
+                 'quantization': self.output_quantization}]
+
+    def set_tensor(self, index, value):
+        assert value.dtype == self.dtype
+        self.received = value.copy()
+
+    def invoke(self):
+        pass
+
+    def get_tensor(self, index):
+        return np.array([[8]], dtype=self.output_dtype)
+
+
+class TestModelRunner:
+    """Test quantization-aware input/output handling"""
+
+    def test_int8_input_quantized_with_scale_and_zero_point(self):
+        """Test vectorized quantization matches round(x / scale) + zero_point, clipped"""
+        interpreter = QuantizedInterpreter()
+        data = np.array([[0.0, 1.0, -1.0], [2.6, 500.0, -500.0]], dtype=np.float32)
+
+        inference.ModelRunner(interpreter).run(data)
+
+        expected = np.clip(np.rint(data / 0.5) - 10, -128, 127).astype(np.int8)
+        np.testing.assert_array_equal(interpreter.received[0], expected)
+
+    def test_data_scale_folded_into_quantization(self):
+        """Test that 8-bit frames are scaled without a float /255 pass by the caller"""
+        interpreter = QuantizedInterpreter(dtype=np.int8, scale=1.0 / 255.0, zero_point=-128)
+        frame = np.array([[0, 128, 255], [1, 2, 254]], dtype=np.uint8)
+
+        inference.ModelRunner(interpreter).run(frame, data_scale=1.0 / 255.0)
+
+        np.testing.assert_array_equal(interpreter.received[0], frame.astype(np.int16) - 128)
+
+    def test_uint8_passthrough_fast_path(self):
+        """Test that data already in the model's quantized domain is copied unchanged"""
+        interpreter = QuantizedInterpreter(dtype=np.uint8, scale=1.0 / 255.0, zero_point=0)
+        frame = np.arange(6, dtype=np.uint8).reshape(2, 3)
+
+        inference.ModelRunner(interpreter).run(frame, data_scale=1.0 / 255.0)
+
+        np.testing.assert_array_equal(interpreter.received[0], frame)
+
+    def test_output_dequantized(self):
+        """Test that quantized outputs are returned as float scores"""
+        runner = inference.ModelRunner(QuantizedInterpreter())
+
+        assert runner.score(np.zeros((2, 3))) == pytest.approx((8 - 4) * 0.25)
+
+    def test_missing_quantization_uses_unit_range(self):
+        """Test the [0, 1] -> 0..255 fallback for uint8 tensors without parameters"""
+        interpreter = QuantizedInterpreter(dtype=np.uint8, scale=0.0, zero_point=0)
+
+        inference.ModelRunner(interpreter).run(np.array([[0.0, 0.5, 1.0], [1.5, -1.0, 0.2]]))
+
+        np.testing.assert_array_equal(interpreter.received[0], [[0, 128, 255], [255, 0, 51]])
+
+    def test_shape_mismatch_raises(self):
+        """Test that inputs of the wrong size are rejected"""
+        runner = inference.ModelRunner(QuantizedInterpreter())
+
+        with pytest.raises(ValueError):
+            runner.run(np.zeros((3, 3)))
+
+    def test_transposed_input_rejected(self):
+        """Test that an input with the right size but the wrong shape is not reshaped"""
+        runner = inference.ModelRunner(QuantizedInterpreter())
+
+        with pytest.raises(ValueError):
+            runner.run(np.zeros((3, 2)))
+        runner.run(np.zeros((1, 2, 3)))  # Batch of 1 is accepted
+
+    def test_runner_cached_per_interpreter(self):
+        """Test that details are resolved once per interpreter"""
+        interpreter = QuantizedInterpreter()
+
+        assert inference.get_runner(interpreter) is inference.get_runner(interpreter)
+        assert inference.get_runner(interpreter) is not inference.get_runner(QuantizedInterpreter())
+
+    @requires_model
+    def test_matches_direct_interpreter_call(self):
+        """Test the runner against a hand-driven interpreter on the bundled model"""
+        interpreter = inference.load_tflite_model(ACOUSTIC_MODEL, "acoustic")
+        detail = interpreter.get_input_details()[0]
+        data = np.random.default_rng(2).random(detail['shape'][1:]).astype(np.float32)
+
+        score = inference.get_runner(interpreter, "acoustic").score(data)
+
+        interpreter.set_tensor(detail['index'], data[np.newaxis].astype(detail['dtype']))
+        interpreter.invoke()
+        expected = interpreter.get_tensor(interpreter.get_output_details()[0]['index'])
+        assert score == pytest.approx(float(np.ravel(expected)[0]), rel=1e-5)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the PREMONITOR multi-process inference worker pool.
+Tests shared-memory hand-off, result routing and worker failure handling.
+"""
+
+import sys
+import os
+import signal
+import threading
+import time
+import pytest
+import numpy as np
+
+# Add pythonsoftware to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+
+from inference_worker import InferenceWorkerPool
+import inference
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+ACOUSTIC_MODEL = os.path.join(MODEL_DIR, 'acoustic_anomaly_model_int8.tflite')
+
+
+class SumInterpreter:
+    """Interpreter stand-in whose output is the sum of its input."""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.value = None
+
+    def get_input_details(self):
+        return [{'index': 0, 'shape': np.array([1, 4, 4, 1]), 'dtype': np.float32, 'quantization': (0.0, 0)}]
+
+    def get_output_details(self):
+        return [{'index': 7, 'shape': np.array([1, 1]), 'dtype': np.float32, 'quantization': (0.0, 0)}]
+
+    def set_tensor(self, index, value):
+        self.value = np.array(value)
+
+    def invoke(self):
+        if self.model_name == "crash":
+            os._exit(1)
+        if not np.isfinite(self.value).all():
+            raise ValueError("non-finite input")
+
+    def get_tensor(self, index):
+        return np.array([[self.value.sum()]], dtype=np.float32)
+
+
+def sum_interpreter_factory(model_path, model_name, options=None):
+    """Picklable factory used by the worker processes."""
+    if model_name == "missing":
+        return None
+    return SumInterpreter(model_name)
+
+
+@pytest.fixture
+def pool():
+    pool = InferenceWorkerPool({"thermal": "thermal.tflite", "acoustic": "acoustic.tflite"},
+                               processes=2, interpreter_factory=sum_interpreter_factory,
+                               start_method="fork", timeout=10)
+    assert pool.start()
+    yield pool
+    pool.stop()
+
+
+class TestInferenceWorkerPool:
+    """Test the inference worker pool with a fake interpreter"""
+
+    def test_submit_returns_model_output(self, pool):
+        """Test that inputs reach the worker through shared memory"""
+        data = np.arange(16, dtype=np.float32).reshape(1, 4, 4, 1)
+
+        outputs = pool.submit("thermal", data).result(timeout=10)
+
+        assert outputs[7][0][0] == pytest.approx(data.sum())
+
+    def test_remote_interpreter_is_drop_in(self, pool):
+        """Test the tflite.Interpreter-compatible proxy"""
+        interpreter = pool.interpreter("acoustic")
+        interpreter.allocate_tensors()
+        input_details = interpreter.get_input_details()
+        output_details = interpreter.get_output_details()
+
+        interpreter.set_tensor(input_details[0]['index'], np.ones((1, 4, 4, 1), dtype=np.float32))
+        interpreter.invoke()
+
+        assert interpreter.get_tensor(output_details[0]['index'])[0][0] == pytest.approx(16.0)
+        assert pool.interpreter("lstm") is None
+
+    def test_concurrent_requests_route_to_their_callers(self, pool):
+        """Test that parallel submissions each get their own result"""
+        results = {}
+
+        def run(value):
+            data = np.full((1, 4, 4, 1), value, dtype=np.float32)
+            results[value] = pool.submit("thermal", data).result(timeout=10)[7][0][0]
+
+        threads = [threading.Thread(target=run, args=(float(v),)) for v in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {float(v): pytest.approx(16.0 * v) for v in range(8)}
+
+    def test_input_mismatch_rejected_before_submission(self, pool):
+        """Test dtype and size validation on submit"""
+        with pytest.raises(ValueError):
+            pool.submit("thermal", np.zeros((1, 4, 4, 1), dtype=np.float64))
+        with pytest.raises(ValueError):
+            pool.submit("thermal", np.zeros((1, 8, 8, 1), dtype=np.float32))
+
+        # Slots were released, so valid requests still go through
+        for _ in range(pool.slots_per_model + 1):
+            pool.submit("thermal", np.zeros((1, 4, 4, 1), dtype=np.float32)).result(timeout=10)
+
+    def test_worker_error_is_reported(self, pool):
+        """Test that an exception in the worker fails only that job"""
+        bad = np.full((1, 4, 4, 1), np.nan, dtype=np.float32)
+
+        with pytest.raises(RuntimeError, match="non-finite input"):
+            pool.submit("thermal", bad).result(timeout=10)
+
+        good = np.ones((1, 4, 4, 1), dtype=np.float32)
+        assert pool.submit("thermal", good).result(timeout=10)[7][0][0] == pytest.approx(16.0)
+
+    def test_models_not_loaded_are_skipped(self):
+        """Test that the pool only exposes models every worker loaded"""
+        pool = InferenceWorkerPool({"thermal": "thermal.tflite", "missing": "missing.tflite"},
+                                   processes=1, interpreter_factory=sum_interpreter_factory,
+                                   start_method="fork", timeout=10)
+        assert pool.start()
+        try:
+            assert pool.models == ["thermal"]
+            with pytest.raises(KeyError):
+                pool.submit("missing", np.zeros((1, 4, 4, 1), dtype=np.float32))
+        finally:
+            pool.stop()
+
+    def test_worker_crash_fails_pending_jobs(self):
+        """Test that a dead worker does not leave callers waiting forever"""
+        pool = InferenceWorkerPool({"crash": "crash.tflite"}, processes=1,
+                                   interpreter_factory=sum_interpreter_factory,
+                                   start_method="fork", timeout=10)
+        assert pool.start()
+        try:
+            job = pool.submit("crash", np.zeros((1, 4, 4, 1), dtype=np.float32))
+            with pytest.raises(RuntimeError, match="exited unexpectedly"):
+                job.result(timeout=10)
+        finally:
+            pool.stop()
+
+    def test_killed_worker_returns_slots_and_is_respawned(self):
+        """Test that a dead worker does not leak input slots or fail the survivors' jobs"""
+        pool = InferenceWorkerPool({"thermal": "thermal.tflite"}, processes=2, slots_per_model=2,
+                                   interpreter_factory=sum_interpreter_factory,
+                                   start_method="fork", timeout=10)
+        assert pool.start()
+        try:
+            os.kill(pool._workers[0].pid, signal.SIGKILL)
+            time.sleep(2.5)  # Past a collector health check
+
+            data = np.ones((1, 4, 4, 1), dtype=np.float32)
+            for _ in range(3 * pool.slots_per_model):
+                assert pool.submit("thermal", data).result(timeout=10)[7][0][0] == pytest.approx(16.0)
+            assert pool.restarts == 1
+            assert not pool.failed
+        finally:
+            pool.stop()
+
+    def test_pool_fails_when_no_worker_is_left(self):
+        """Test that the pool reports failure once its workers cannot be restarted"""
+        pool = InferenceWorkerPool({"thermal": "thermal.tflite"}, processes=1, slots_per_model=1,
+                                   interpreter_factory=sum_interpreter_factory,
+                                   start_method="fork", timeout=10, max_restarts=0)
+        assert pool.start()
+        try:
+            os.kill(pool._workers[0].pid, signal.SIGKILL)
+            deadline = time.monotonic() + 10
+            while not pool.failed and time.monotonic() < deadline:
+                time.sleep(0.1)
+
+            assert pool.failed
+            with pytest.raises(RuntimeError, match="failed"):
+                pool.submit("thermal", np.ones((1, 4, 4, 1), dtype=np.float32))
+            assert pool._free_slots["thermal"].qsize() == 1
+        finally:
+            pool.stop()
+
+
+@pytest.mark.skipif(inference.tflite is None or not os.path.exists(ACOUSTIC_MODEL),
+                    reason="TFLite runtime or acoustic model not available")
+class TestInferenceWorkerPoolWithModel:
+    """Test the worker pool against the bundled acoustic model"""
+
+    def test_matches_in_process_inference(self):
+        """Test that pooled inference matches a local interpreter"""
+        local = inference.load_tflite_model(ACOUSTIC_MODEL, "acoustic")
+        input_details = local.get_input_details()
+        output_details = local.get_output_details()
+        shape = tuple(input_details[0]['shape'])
+        data = np.random.default_rng(0).random(shape).astype(input_details[0]['dtype'])
+
+        local.set_tensor(input_details[0]['index'], data)
+        local.invoke()
+        expected = local.get_tensor(output_details[0]['index'])
+
+        pool = InferenceWorkerPool({"acoustic": ACOUSTIC_MODEL}, processes=1, timeout=30)
+        assert pool.start()
+        try:
+            remote = pool.interpreter("acoustic")
+            remote.set_tensor(input_details[0]['index'], data)
+            remote.invoke()
+            actual = remote.get_tensor(output_details[0]['index'])
+        finally:
+            pool.stop()
+
+        np.testing.assert_allclose(actual, expected, rtol=1e-5)
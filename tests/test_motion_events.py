@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for PREMONITOR interrupt-driven motion events.
+Tests edge capture, the transition ring buffer and pin/zone mapping with simulated GPIO.
+"""
+
+import sys
+import os
+import threading
+import pytest
+
+# Add pythonsoftware and the shared test helpers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import motion_events
+import security_monitor
+from helpers import FakeClock, motion_unit
+
+
+def pir(unit, pin, zone=None):
+    return motion_unit(unit, pin, zone, type="fridge")
+
+
+def make_monitor(equipment, **kwargs):
+    gpio = motion_events.SimulatedGPIOEvents()
+    monitor = motion_events.MotionEventMonitor.from_equipment(equipment, gpio, **kwargs)
+    monitor.start()
+    return gpio, monitor
+
+
+class TestTransitionRing:
+    """Test the fixed-size transition buffer"""
+
+    def test_readers_get_transitions_after_their_cursor(self):
+        """Test sequence-based reads in order"""
+        ring = motion_events.TransitionRing(8)
+        for i in range(5):
+            ring.append(float(i), 23, i % 2)
+
+        transitions, next_sequence, dropped = ring.since(2)
+
+        assert list(transitions["timestamp"]) == [2.0, 3.0, 4.0]
+        assert (next_sequence, dropped) == (5, 0)
+
+    def test_overflow_reports_dropped(self):
+        """Test that a slow reader is told how many transitions it lost"""
+        ring = motion_events.TransitionRing(4)
+        for i in range(10):
+            ring.append(float(i), 23, 1)
+
+        transitions, next_sequence, dropped = ring.since(0)
+
+        assert list(transitions["timestamp"]) == [6.0, 7.0, 8.0, 9.0]
+        assert (next_sequence, dropped) == (10, 6)
+
+
+class TestMotionEventMonitor:
+    """Test edge-triggered motion state"""
+
+    def test_pulse_between_checks_not_missed(self):
+        """Test that motion starting and ending between polls is still reported once"""
+        gpio, monitor = make_monitor([pir("fridge_1", 23)])
+
+        gpio.pulse(23)
+
+        assert gpio.read(23) == 0
+        assert monitor.consume("fridge_1")
+        assert not monitor.consume("fridge_1")
+
+    def test_transitions_timestamped(self):
+        """Test that both edges are recorded with the time they happened"""
+        clock = FakeClock(1000.0)
+        gpio, monitor = make_monitor([pir("fridge_1", 23)], clock=clock)
+
+        gpio.set_level(23, 1)
+        clock.now += 4.5
+        gpio.set_level(23, 0)
+
+        transitions, _, _ = monitor.ring.since(0)
+        assert [(t["timestamp"], t["pin"], t["level"]) for t in transitions] == [(1000.0, 23, 1), (1004.5, 23, 0)]
+        assert monitor.last_motion_time("fridge_1") == 1000.0
+
+    def test_pins_map_to_units_and_zones(self):
+        """Test a shared room PIR, a per-unit PIR and a zone spanning both pins"""
+        gpio, monitor = make_monitor([pir("fridge_1", 23, zone="lab_a"), pir("fridge_2", 23, zone="lab_a"),
+                                      pir("freezer", 24, zone="lab_a"), pir("oven", 25)])
+
+        gpio.pulse(24)
+
+        assert monitor.pin_targets[23] == ("fridge_1", "zone:lab_a", "fridge_2")
+        assert [monitor.consume(t) for t in ("freezer", "zone:lab_a", "fridge_1", "oven")] == [True, True, False, False]
+
+    def test_each_target_consumes_independently(self):
+        """Test that one unit checking a shared PIR does not hide the motion from another"""
+        gpio, monitor = make_monitor([pir("fridge_1", 23), pir("fridge_2", 23)])
+
+        gpio.pulse(23)
+
+        assert monitor.consume("fridge_1")
+        assert monitor.consume("fridge_2")
+
+    def test_wait_woken_by_edge_from_another_thread(self):
+        """Test that a waiting pipeline wakes as soon as motion starts"""
+        gpio, monitor = make_monitor([pir("fridge_1", 23, zone="lab_a")])
+        threading.Timer(0.05, gpio.set_level, (23, 1)).start()
+
+        woken = monitor.wait(timeout=5)
+
+        assert woken == {"fridge_1", "zone:lab_a"}
+        assert monitor.wait(timeout=0.01) == set()
+
+    def test_disabled_or_unpinned_sensors_ignored(self):
+        """Test that only enabled PIRs with a gpio_pin are watched"""
+        disabled = {"id": "a", "sensors": {"motion_sensor": {"enabled": False, "gpio_pin": 5}}}
+        unpinned = {"id": "b", "sensors": {"motion_sensor": {"enabled": True}}}
+
+        _, monitor = make_monitor([disabled, unpinned])
+
+        assert monitor.pin_targets == {}
+
+
+class TestMotionDetectorEvents:
+    """Test security_monitor.MotionDetector on top of motion events"""
+
+    def test_detector_uses_latched_events(self):
+        """Test that a short pulse is detected even though the PIR reads low at check time"""
+        gpio, monitor = make_monitor([pir("fridge_1", 23)])
+        detector = security_monitor.MotionDetector(events=monitor)
+
+        gpio.pulse(23)
+
+        assert detector.detect_motion(reading=False, equipment_id="fridge_1")
+        assert not detector.detect_motion(reading=False, equipment_id="fridge_1")
+
+    def test_unmapped_unit_uses_reading(self):
+        """Test that units without an interrupt-driven PIR keep the polled reading"""
+        _, monitor = make_monitor([pir("fridge_1", 23)])
+        detector = security_monitor.MotionDetector(events=monitor)
+
+        assert detector.detect_motion(reading=True, equipment_id="oven")
+
+    def test_unmapped_unit_without_reading_has_no_motion(self, monkeypatch):
+        """Test that real GPIO plus an event monitor never falls back to mock motion"""
+        class StubGPIO:
+            BCM, IN, HIGH = 11, 1, 1
+
+            def setmode(self, mode):
+                pass
+
+            def setup(self, pin, direction):
+                pass
+
+            def input(self, pin):
+                return self.HIGH
+
+        monkeypatch.setattr(security_monitor, "GPIO", StubGPIO())
+        _, monitor = make_monitor([pir("fridge_1", 23)])
+        detector = security_monitor.MotionDetector(events=monitor)
+
+        assert detector.gpio_available
+        assert not any(detector.detect_motion(reading=None, equipment_id="oven") for _ in range(1000))
+
+    def test_unit_without_motion_sensor_has_no_motion(self, monkeypatch):
+        """Test that units without a PIR neither poll the GPIO pin nor use mock data"""
+        monkeypatch.setattr(security_monitor, "GPIO", None)
+        detector = security_monitor.MotionDetector()
+
+        assert not any(detector.detect_motion(None, "oven", has_sensor=False) for _ in range(1000))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for PREMONITOR asynchronous security captures.
+Tests the capture queue, pre-event frames and the disk quota.
+"""
+
+import sys
+import os
+import threading
+import numpy as np
+import pytest
+
+# Add pythonsoftware and the shared test helpers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import security_capture
+from helpers import FakeClock
+
+
+def frame(value, shape=(24, 32)):
+    return np.full(shape, value, dtype=np.float32)
+
+
+class TestCaptureWriter:
+    """Test background capture writing"""
+
+    def test_capture_returns_path_and_writes_in_background(self, tmp_path):
+        """Test one file per event holding the trigger frame"""
+        writer = security_capture.CaptureWriter(str(tmp_path), image_format="npz")
+
+        path = writer.capture("fridge_1", frame(0.5), "motion")
+        writer.flush()
+
+        assert os.path.basename(path).startswith("motion_fridge_1_")
+        with np.load(path) as capture:
+            assert capture["frames"].shape == (1, 24, 32)
+        writer.close()
+
+    def test_capture_does_not_wait_for_encoding(self, tmp_path, monkeypatch):
+        """Test that a slow disk does not block the monitoring thread"""
+        writer = security_capture.CaptureWriter(str(tmp_path), image_format="npz")
+        release = threading.Event()
+        original = writer._write
+        monkeypatch.setattr(writer, "_write", lambda job: release.wait(5) and original(job))
+
+        paths = [writer.capture("fridge_1", frame(i / 10)) for i in range(3)]
+
+        assert not any(os.path.exists(p) for p in paths)
+        release.set()
+        writer.flush()
+        assert all(os.path.exists(p) for p in paths)
+        writer.close()
+
+    def test_pre_event_frames_prepended(self, tmp_path):
+        """Test that the last N recorded frames precede the trigger, oldest first"""
+        clock = FakeClock(1_790_000_000.0)
+        writer = security_capture.CaptureWriter(str(tmp_path), pre_event_frames=2, image_format="npz", clock=clock)
+        for value in (0.1, 0.2, 0.3):
+            writer.record_frame("fridge_1", frame(value))
+            clock.now += 30
+        writer.record_frame("fridge_2", frame(0.9))
+
+        path = writer.capture("fridge_1", frame(0.4))
+        writer.close()
+
+        with np.load(path) as capture:
+            np.testing.assert_allclose(capture["frames"][:, 0, 0], [0.2, 0.3, 0.4])
+            assert list(np.diff(capture["timestamps"])) == [30.0, 30.0]
+
+    def test_png_frames_in_time_order(self, tmp_path):
+        """Test that an animated PNG plays the pre-event frames and then the trigger"""
+        Image = pytest.importorskip("PIL.Image")
+        writer = security_capture.CaptureWriter(str(tmp_path), pre_event_frames=2, image_format="png")
+        for value in (0.2, 0.3):
+            writer.record_frame("fridge_1", frame(value))
+
+        path = writer.capture("fridge_1", frame(0.4))
+        writer.close()
+
+        with Image.open(path) as image:
+            pixels = []
+            for index in range(image.n_frames):
+                image.seek(index)
+                pixels.append(image.getpixel((0, 0)))
+        assert pixels == [51, 76, 102]
+
+    def test_recorded_frames_are_copies(self, tmp_path):
+        """Test that reusing the camera buffer does not change the history"""
+        writer = security_capture.CaptureWriter(str(tmp_path), pre_event_frames=1, image_format="npz")
+        buffer = frame(0.1)
+        writer.record_frame("fridge_1", buffer)
+        buffer[:] = 0.7
+
+        path = writer.capture("fridge_1", buffer)
+        writer.close()
+
+        with np.load(path) as capture:
+            np.testing.assert_allclose(capture["frames"][:, 0, 0], [0.1, 0.7])
+
+    def test_quota_evicts_oldest_first(self, tmp_path):
+        """Test that the directory stays under quota, including files from earlier runs"""
+        rng = np.random.default_rng(0)
+        old = tmp_path / "motion_old_20260101_000000_0001.npz"
+        old.write_bytes(b"x" * 4000)
+        os.utime(old, (1, 1))
+        writer = security_capture.CaptureWriter(str(tmp_path), quota_bytes=12000, image_format="npz")
+
+        paths = [writer.capture("fridge_1", rng.random((24, 32)).astype(np.float32)) for _ in range(6)]
+        writer.close()
+
+        remaining = sorted(p.name for p in tmp_path.iterdir())
+        assert not old.exists()
+        assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 12000
+        assert remaining == sorted(os.path.basename(p) for p in paths[-len(remaining):])
+        assert writer.evicted == 1 + 6 - len(remaining)
+
+    def test_full_queue_drops_instead_of_blocking(self, tmp_path, monkeypatch):
+        """Test that a burst beyond the queue size is dropped and counted"""
+        writer = security_capture.CaptureWriter(str(tmp_path), max_queue=2, image_format="npz")
+        release = threading.Event()
+        original = writer._write
+        monkeypatch.setattr(writer, "_write", lambda job: release.wait(5) and original(job))
+
+        paths = [writer.capture("fridge_1", frame(0.1)) for _ in range(6)]
+
+        assert paths.count(None) >= 3
+        assert writer.dropped == paths.count(None)
+        release.set()
+        writer.close()
+
+    def test_image_conversion(self):
+        """Test RGB passthrough and normalised grayscale scaling with clipping"""
+        rgb = np.full((4, 4, 3), 200.0)
+        gray = np.array([[-0.5, 0.0, 0.5, 2.0]])
+
+        assert security_capture.to_image_array(rgb).dtype == np.uint8
+        assert list(security_capture.to_image_array(gray)[0]) == [0, 0, 127, 255]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
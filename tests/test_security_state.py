@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for PREMONITOR per-equipment security state.
+Tests independent cooldowns, zones and alert suppression.
+"""
+
+import sys
+import os
+import pytest
+
+# Add pythonsoftware and the shared test helpers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import security_monitor
+from security_state import SecurityState, SecurityStateManager
+from helpers import FakeClock, motion_unit
+
+
+def unit(equipment_id, zone=None):
+    return motion_unit(equipment_id, zone=zone, location="Lab A")
+
+
+class TestSecurityStateManager:
+    """Test the per-key state records"""
+
+    def test_states_are_compact(self):
+        """Test that states use __slots__ (no per-instance dict)"""
+        assert not hasattr(SecurityState("fridge_1"), "__dict__")
+
+    def test_motion_edges_are_per_unit(self):
+        """Test that one unit's active motion does not hide another's rising edge"""
+        states = SecurityStateManager({"motion": 300})
+
+        assert states.note_motion("fridge_1", True)
+        assert states.note_motion("fridge_2", True)
+        assert not states.note_motion("fridge_1", True)
+
+    def test_cooldowns_are_independent(self):
+        """Test separate cooldowns per key and per alert kind"""
+        clock = FakeClock(1_790_000_000.0)
+        states = SecurityStateManager({"motion": 300, "tamper": 60}, clock)
+
+        assert states.allow_alert("fridge_1", "motion")
+        assert not states.allow_alert("fridge_1", "motion")
+        assert states.allow_alert("fridge_1", "tamper")
+        assert states.allow_alert("fridge_2", "motion")
+
+        clock.now += 61
+        assert states.allow_alert("fridge_1", "tamper")
+        assert not states.allow_alert("fridge_1", "motion")
+
+    def test_suppression_window(self):
+        """Test that suppressed keys withhold alerts until the window ends"""
+        clock = FakeClock(1_790_000_000.0)
+        states = SecurityStateManager({"motion": 0}, clock)
+        states.suppress("fridge_1", 600)
+
+        assert not states.allow_alert("fridge_1", "motion")
+        assert states.state("fridge_1").suppressed_alerts == 1
+        clock.now += 601
+        assert states.allow_alert("fridge_1", "motion")
+
+    def test_zone_alert_key(self):
+        """Test that units with a motion zone share its key"""
+        assert SecurityStateManager.alert_key(unit("fridge_1", "cold_room")) == "zone:cold_room"
+        assert SecurityStateManager.alert_key(unit("fridge_1")) == "fridge_1"
+
+    def test_unknown_alert_kind_rejected(self):
+        """Test that misspelt cooldown kinds fail loudly"""
+        with pytest.raises(ValueError):
+            SecurityStateManager({"motoin": 300})
+
+
+class TestSecurityMonitorState:
+    """Test check_motion() with per-unit state"""
+
+    @pytest.fixture
+    def alerts(self, monkeypatch):
+        sent = []
+
+        class QuietLogger:
+            def log_activity(self, event_type, equipment_id, details):
+                pass
+
+        states = security_monitor.create_security_state()
+        monkeypatch.setattr(security_monitor, "security_state", states)
+        monkeypatch.setattr(security_monitor, "motion_detector", security_monitor.MotionDetector(states=states))
+        monkeypatch.setattr(security_monitor, "tamper_detector", security_monitor.TamperDetector())
+        monkeypatch.setattr(security_monitor, "activity_logger", QuietLogger())
+        monkeypatch.setattr(security_monitor, "send_intrusion_alert",
+                            lambda equipment_id, alert_type, details, thermal_image_path=None:
+                            sent.append((equipment_id, alert_type)))
+        return sent
+
+    def test_units_alert_independently(self, alerts):
+        """Test that motion on one unit no longer silences every other unit"""
+        motion = {"sensors": {"motion": True}}
+
+        assert security_monitor.check_motion(unit("fridge_1"), motion, after_hours=True)
+        assert security_monitor.check_motion(unit("fridge_2"), motion, after_hours=True)
+
+        assert alerts == [("fridge_1", "unauthorized_motion"), ("fridge_2", "unauthorized_motion")]
+
+    def test_zone_shares_cooldown(self, alerts):
+        """Test that units in one room send one alert per cooldown"""
+        motion = {"sensors": {"motion": True}}
+
+        security_monitor.check_motion(unit("fridge_1", "cold_room"), motion, after_hours=True)
+        security_monitor.check_motion(unit("fridge_2", "cold_room"), motion, after_hours=True)
+
+        assert alerts == [("fridge_1", "unauthorized_motion")]
+
+    def test_suppressed_unit_stays_quiet(self, alerts):
+        """Test that a maintenance window withholds the unit's alerts only"""
+        security_monitor.suppress_alerts("fridge_1", 3600)
+        motion = {"sensors": {"motion": True}}
+
+        assert not security_monitor.check_motion(unit("fridge_1"), motion, after_hours=True)
+        assert security_monitor.check_motion(unit("fridge_2"), motion, after_hours=True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the PREMONITOR sensor bus.
+Tests per-device read sharing, freshness windows and plan integration.
+"""
+
+import sys
+import os
+import pytest
+
+# Add pythonsoftware and the shared test helpers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import equipment_plan
+import sensor_bus
+from helpers import FakeClock
+
+
+class CountingDevice:
+    """Device stand-in that counts reads and returns the read number."""
+
+    def __init__(self, fail=False):
+        self.reads = 0
+        self.fail = fail
+
+    def __call__(self):
+        self.reads += 1
+        if self.fail:
+            raise IOError("device not responding")
+        return self.reads
+
+
+class TestDeviceAddress:
+    """Test physical address keys"""
+
+    def test_most_specific_field_wins(self):
+        """Test that a 1-Wire id beats the GPIO pin it hangs off"""
+        assert sensor_bus.device_address({"gpio_pin": 4, "device_id": "28-01"}) == "w1:28-01"
+        assert sensor_bus.device_address({"gpio_pin": 17, "analog_channel": 0}) == "adc:0"
+        assert sensor_bus.device_address({"enabled": True}) == "default"
+
+    def test_i2c_addresses_normalised(self):
+        """Test that equivalent I2C spellings map to one device"""
+        assert sensor_bus.device_address({"i2c_address": "0x33"}) == \
+            sensor_bus.device_address({"i2c_address": "0X33"}) == \
+            sensor_bus.device_address({"i2c_address": 0x33})
+
+
+class TestSensorBus:
+    """Test read sharing and caching"""
+
+    def test_shared_device_read_once_per_tick(self):
+        """Test fan-out of one read to every subscriber"""
+        bus = sensor_bus.SensorBus()
+        device = CountingDevice()
+        readers = [bus.reader("read_thermal_camera", device, {"i2c_address": "0x33"}, eq) for eq in "abc"]
+
+        bus.begin_tick()
+        assert [read() for read in readers] == [1, 1, 1]
+        bus.begin_tick()
+        assert [read() for read in readers] == [2, 2, 2]
+        assert device.reads == 2
+
+    def test_different_addresses_read_separately(self):
+        """Test that distinct devices are not merged"""
+        bus = sensor_bus.SensorBus()
+        first, second = CountingDevice(), CountingDevice()
+        read_first = bus.reader("read_temperature", first, {"device_id": "28-01"})
+        read_second = bus.reader("read_temperature", second, {"device_id": "28-02"})
+
+        bus.begin_tick()
+        read_first(), read_second()
+
+        assert (first.reads, second.reads) == (1, 1)
+
+    def test_freshness_window_spans_ticks(self):
+        """Test that a value is reused until it is older than max_age_s"""
+        clock = FakeClock()
+        bus = sensor_bus.SensorBus(clock=clock)
+        device = CountingDevice()
+        read = bus.reader("read_co2_sensor", device, {"i2c_address": "0x61", "max_age_s": 60})
+
+        for now in (0, 30, 60):
+            clock.now = now
+            bus.begin_tick()
+            assert read() == 1
+        clock.now = 61
+        bus.begin_tick()
+        assert read() == 2
+
+    def test_failed_read_not_retried_within_tick(self):
+        """Test that a dead device is read once per tick, and errors reach every subscriber"""
+        bus = sensor_bus.SensorBus(max_age_s=600)
+        device = CountingDevice(fail=True)
+        readers = [bus.reader("read_gas_sensor", device, {"analog_channel": 0}) for _ in range(3)]
+
+        for _ in range(2):
+            bus.begin_tick()
+            for read in readers:
+                with pytest.raises(IOError):
+                    read()
+
+        assert device.reads == 2
+
+
+class TestPlanIntegration:
+    """Test plans reading through the bus"""
+
+    def test_units_sharing_a_room_pir(self):
+        """Test that a shared PIR is read once per cycle for all units"""
+        pir = CountingDevice()
+
+        class Hardware:
+            read_motion_sensor = staticmethod(pir)
+            read_temperature = staticmethod(CountingDevice())
+
+        equipment = [{"id": f"fridge_{i}", "type": "fridge",
+                      "sensors": {"motion_sensor": {"enabled": True, "gpio_pin": 23},
+                                  "temperature": {"enabled": True, "device_id": f"28-0{i}"}}}
+                     for i in range(4)]
+        bus = sensor_bus.SensorBus()
+        plans = equipment_plan.compile_plans(equipment, Hardware, bus=bus)
+
+        bus.begin_tick()
+        readings = [equipment_plan.read_sensors(plan) for plan in plans]
+
+        assert pir.reads == 1
+        assert all(r["sensors"]["motion"] == 1 for r in readings)
+        assert Hardware.read_temperature.reads == 4
+        assert bus.stats()["read_motion_sensor@gpio:23"]["subscribers"] == [f"fridge_{i}" for i in range(4)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for PREMONITOR per-device sensor drivers.
+Tests drivers against simulated I2C, SPI and 1-Wire backends.
+"""
+
+import sys
+import os
+import time
+import pytest
+import numpy as np
+
+# Add pythonsoftware and the shared test helpers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import equipment_plan
+import sensor_drivers
+from helpers import FakeClock
+
+
+def simulated_backends(tmp_path, adc_values=None):
+    return sensor_drivers.SensorBackends(i2c=sensor_drivers.SimulatedI2CBus(),
+                                         spi=sensor_drivers.SimulatedMCP3008(adc_values),
+                                         w1_dir=str(tmp_path), simulated=True)
+
+
+class TestDrivers:
+    """Test individual drivers on simulated buses"""
+
+    def test_mcp3008_channels_are_independent(self):
+        """Test that each channel driver reads its own input"""
+        sampler = sensor_drivers.MCP3008Sampler(sensor_drivers.SimulatedMCP3008([100, 1023, 0, 0, 0, 0, 0, 512]))
+        channels = [sensor_drivers.MCP3008SampledChannel(sampler, ch) for ch in (0, 1, 7)]
+
+        values = [float(channel.read()) for channel in channels]
+
+        assert values == [100, 1023, 512]
+
+    def test_mcp3008_rejects_bad_channel(self):
+        """Test channel range validation"""
+        sampler = sensor_drivers.MCP3008Sampler(sensor_drivers.SimulatedMCP3008())
+
+        with pytest.raises(ValueError):
+            sensor_drivers.MCP3008SampledChannel(sampler, 8)
+
+    def test_ds18b20_keeps_handle_open(self, tmp_path):
+        """Test that the w1_slave file is opened once and re-read"""
+        tree = sensor_drivers.SimulatedW1Tree(str(tmp_path))
+        tree.add("28-000000000001", 4.25)
+        driver = sensor_drivers.DS18B20("28-000000000001", str(tmp_path))
+
+        assert driver.read() == pytest.approx(4.25)
+        handle = driver._file
+        tree.set_temperature("28-000000000001", -80.5)
+        assert driver.read() == pytest.approx(-80.5)
+        assert driver._file is handle
+        driver.close()
+
+    def test_ds18b20_crc_failure_raises(self, tmp_path):
+        """Test that a failed CRC is not reported as a temperature"""
+        sensor_drivers.SimulatedW1Tree(str(tmp_path)).add("28-bad", 4.0, crc_ok=False)
+
+        with pytest.raises(IOError):
+            sensor_drivers.DS18B20("28-bad", str(tmp_path)).read()
+
+    def test_adxl345_configured_and_gravity_removed(self):
+        """Test measure-mode, 3200 Hz FIFO setup and that a static 1g reading is zero vibration"""
+        bus = sensor_drivers.SimulatedI2CBus()
+        device = bus.attach(0x53, sensor_drivers.SimulatedADXL345([[0.0, 0.0, 256 * 0.0039]]))
+
+        driver = sensor_drivers.ADXL345(bus, 0x53, samples=64)
+        reading = driver.read()
+
+        assert device.registers[0x2D] == 0x08
+        assert device.registers[0x2C] == 0x0F
+        assert device.registers[0x38] == 0x80 | 31
+        assert driver.read_xyz() == pytest.approx([0.0, 0.0, 256 * 0.0039])
+        assert float(reading) == pytest.approx(0.0)
+
+    def test_adxl345_burst_fills_preallocated_buffer(self):
+        """Test that a burst drains the FIFO into the same buffer in sample order"""
+        bus = sensor_drivers.SimulatedI2CBus()
+        ramp = np.zeros((100, 3))
+        ramp[:, 0] = np.arange(100) * 0.0039
+        bus.attach(0x53, sensor_drivers.SimulatedADXL345(ramp))
+        driver = sensor_drivers.ADXL345(bus, 0x53, samples=100)
+
+        burst = driver.capture()
+
+        assert burst is driver.capture()
+        np.testing.assert_allclose(burst[:, 0], ramp[:, 0])
+
+    def test_adxl345_not_measuring_times_out(self):
+        """Test that an empty FIFO raises instead of hanging the cycle"""
+        bus = sensor_drivers.SimulatedI2CBus()
+        device = bus.attach(0x53, sensor_drivers.SimulatedADXL345())
+        driver = sensor_drivers.ADXL345(bus, 0x53, samples=64, timeout_s=0.05)
+        device.registers[0x2D] = 0x00  # Standby
+
+        with pytest.raises(IOError):
+            driver.read()
+
+    def test_ina219_current_from_shunt_voltage(self):
+        """Test big-endian signed shunt register conversion"""
+        bus = sensor_drivers.SimulatedI2CBus()
+        device = bus.attach(0x40, sensor_drivers.SimulatedI2CDevice())
+        device.registers[0x01:0x03] = (500).to_bytes(2, 'big')  # 5 mV
+
+        assert sensor_drivers.INA219(bus, 0x40, shunt_ohms=0.1).read() == pytest.approx(0.05)
+
+    def test_missing_i2c_device_raises(self):
+        """Test that an absent address fails like a real bus"""
+        with pytest.raises(OSError):
+            sensor_drivers.INA219(sensor_drivers.SimulatedI2CBus(), 0x41).read()
+
+
+def synthetic_burst(n=2048, rate=3200.0, seed=0):
+    """Gravity on Z plus the components added by each test."""
+    t = np.arange(n) / rate
+    burst = np.zeros((n, 3))
+    burst[:, 2] = 1.0
+    return t, burst, np.random.default_rng(seed)
+
+
+class TestVibrationFeatures:
+    """Test burst features on synthetic signals"""
+
+    def test_sine_rms_crest_kurtosis(self):
+        """Test textbook values for a pure sine: RMS A/sqrt(2), crest sqrt(2), kurtosis 1.5"""
+        t, burst, _ = synthetic_burst()
+        burst[:, 0] = 0.4 * np.sin(2 * np.pi * 100.0 * t)
+
+        features = sensor_drivers.VibrationAnalyzer(len(t), 3200).analyze(burst)
+
+        assert features.rms == pytest.approx(0.4 / np.sqrt(2), rel=1e-3)
+        assert features.crest_factor == pytest.approx(np.sqrt(2), rel=1e-2)
+        assert features.kurtosis == pytest.approx(1.5, rel=1e-2)
+
+    def test_band_energy_at_tone_frequency(self):
+        """Test that a tone's energy lands in its band and the bands sum to the mean square"""
+        t, burst, _ = synthetic_burst()
+        burst[:, 1] = 0.3 * np.sin(2 * np.pi * 320.0 * t)
+        burst[:, 0] = 0.1 * np.sin(2 * np.pi * 1200.0 * t)
+
+        features = sensor_drivers.VibrationAnalyzer(len(t), 3200).analyze(burst)
+        energies = np.array(features.band_energies)
+
+        # Bands: 0-50, 50-200, 200-500, 500-1000, 1000-1600 Hz
+        assert energies[2] == pytest.approx(0.3 ** 2 / 2, rel=0.02)
+        assert energies[4] == pytest.approx(0.1 ** 2 / 2, rel=0.02)
+        assert energies[[0, 1, 3]].sum() < 1e-4
+        assert energies.sum() == pytest.approx(features.rms ** 2, rel=0.02)
+
+    def test_bearing_impacts_raise_kurtosis_not_rms(self):
+        """Test that sparse impacts on noise are flagged by kurtosis and crest factor"""
+        t, burst, rng = synthetic_burst()
+        noise = rng.normal(0.0, 0.05, len(t))
+        burst[:, 0] = noise
+        healthy = sensor_drivers.VibrationAnalyzer(len(t), 3200).analyze(burst.copy())
+        burst[::160, 0] += 0.6  # One impact every 50 ms
+
+        faulty = sensor_drivers.VibrationAnalyzer(len(t), 3200).analyze(burst)
+
+        assert healthy.kurtosis == pytest.approx(3.0, abs=0.4)
+        assert faulty.kurtosis > 6.0
+        assert faulty.crest_factor > 2 * healthy.crest_factor
+        assert faulty.rms < 0.1
+
+    def test_kurtosis_alert_through_plan(self):
+        """Test that a centrifuge plan alerts on burst features below the RMS threshold"""
+        t, burst, rng = synthetic_burst()
+        burst[:, 0] = rng.normal(0.0, 0.05, len(t))
+        burst[::160, 0] += 0.6
+        bus = sensor_drivers.SimulatedI2CBus()
+        bus.attach(0x53, sensor_drivers.SimulatedADXL345(burst))
+        drivers = sensor_drivers.DriverRegistry(sensor_drivers.SensorBackends(i2c=bus))
+        equipment = {"id": "cent", "type": "centrifuge",
+                     "sensors": {"vibration": {"enabled": True, "i2c_address": "0x53", "burst_samples": 2048}}}
+        plan = equipment_plan.compile_plan(equipment, drivers=drivers)
+
+        sensors = equipment_plan.read_sensors(plan)["sensors"]
+        alerts = equipment_plan.evaluate_raw_thresholds(sensors, plan.thresholds)
+
+        assert float(sensors["vibration"]) < plan.thresholds.vibration_threshold
+        assert any("kurtosis" in alert for alert in alerts)
+        assert not any("High vibration" in alert for alert in alerts)
+
+    def test_silent_burst(self):
+        """Test that a motionless sensor gives zeros, not NaNs"""
+        _, burst, _ = synthetic_burst(n=256)
+
+        features = sensor_drivers.VibrationAnalyzer(256, 3200).analyze(burst)
+
+        assert (features.rms, features.crest_factor, features.kurtosis) == (0.0, 0.0, 0.0)
+        assert sum(features.band_energies) == 0.0
+
+
+class TestMCP3008Sampler:
+    """Test bulk oversampled ADC reads on a simulated SPI bus"""
+
+    def test_one_sweep_serves_every_channel(self):
+        """Test that a cycle's reads of all channels cost one sweep of oversample x channels transfers"""
+        spi = sensor_drivers.SimulatedMCP3008([100, 0, 900, 0, 0, 0, 0, 512])
+        sampler = sensor_drivers.MCP3008Sampler(spi, oversample=8)
+        channels = [sensor_drivers.MCP3008SampledChannel(sampler, ch) for ch in (0, 2, 7)]
+
+        first = [float(channel.read()) for channel in channels]
+        second = [float(channel.read()) for channel in channels]
+
+        assert first == second == [100.0, 900.0, 512.0]
+        assert sampler.sweeps == 2
+        assert spi.transfers == 2 * 8 * 3
+
+    def test_average_and_noise_estimate(self):
+        """Test that oversampling averages the noise down and reports its size"""
+        spi = sensor_drivers.SimulatedMCP3008([400, 600] + [0] * 6, noise=[0.0, 8.0] + [0.0] * 6)
+        sampler = sensor_drivers.MCP3008Sampler(spi, oversample=256)
+        quiet = sensor_drivers.MCP3008SampledChannel(sampler, 0)
+        noisy = sensor_drivers.MCP3008SampledChannel(sampler, 1)
+
+        quiet_reading, noisy_reading = quiet.read(), noisy.read()
+
+        assert (quiet_reading.value, quiet_reading.noise) == (400.0, 0.0)
+        assert noisy_reading.value == pytest.approx(600, abs=2.0)
+        assert noisy_reading.noise == pytest.approx(8.0, rel=0.2)
+        assert noisy_reading.samples == 256
+
+    def test_scaled_channel(self):
+        """Test conversion of an analog current sensor to amps"""
+        sampler = sensor_drivers.MCP3008Sampler(sensor_drivers.SimulatedMCP3008([0, 0, 0, 612] + [0] * 4), 4)
+        reading = sensor_drivers.MCP3008SampledChannel(sampler, 3, scale=0.0488, offset=-25.0).read()
+
+        assert reading.value == pytest.approx(612 * 0.0488 - 25.0)
+
+    def test_shared_channel_published_to_every_unit(self, tmp_path):
+        """Test gas, analog current and airflow units on one ADC, two units sharing a channel"""
+        backends = simulated_backends(tmp_path, adc_values=[320, 512, 700, 0, 0, 0, 0, 0])
+        drivers = sensor_drivers.DriverRegistry(backends)
+        equipment = [
+            {"id": "hood_1", "type": "fume_hood",
+             "sensors": {"gas_sensor": {"enabled": True, "analog_channel": 0},
+                         "airflow": {"enabled": True, "analog_channel": 2, "scale": 0.25}}},
+            {"id": "hood_2", "type": "fume_hood",
+             "sensors": {"gas_sensor": {"enabled": True, "analog_channel": 0}}},
+            {"id": "cent", "type": "centrifuge",
+             "sensors": {"current": {"enabled": True, "analog_channel": 1, "scale": 0.01}}},
+        ]
+        plans = equipment_plan.compile_plans(equipment, drivers=drivers)
+
+        hood_1, hood_2, cent = (equipment_plan.read_sensors(plan)["sensors"] for plan in plans)
+
+        assert float(hood_1["gas"]) == float(hood_2["gas"]) == 320.0
+        assert float(hood_1["airflow"]) == 175.0
+        assert float(cent["current"]) == pytest.approx(5.12)
+        assert backends.adc.channels == [0, 2, 1]
+        drivers.close()
+
+
+class TestDS18B20Array:
+    """Test bulk, parallel, non-blocking DS18B20 reads against a fake /sys/bus/w1"""
+
+    def make_array(self, tmp_path, probes, **kwargs):
+        tree = sensor_drivers.SimulatedW1Tree(str(tmp_path))
+        array = sensor_drivers.DS18B20Array(str(tmp_path), conversion_time_s=0.0, **kwargs)
+        for device_id, temperature in probes.items():
+            tree.add(device_id, temperature)
+            array.add(device_id)
+        return tree, array
+
+    def test_bulk_conversion_then_all_probes_read(self, tmp_path):
+        """Test one trigger on the bus master and a value for every probe"""
+        tree, array = self.make_array(tmp_path, {"28-01": 4.0, "28-02": -79.5, "28-03": 37.125})
+
+        array.refresh()
+
+        assert tree.bulk_read_path.read_text() == "trigger\n"
+        assert [array.read(d) for d in ("28-01", "28-02", "28-03")] == [4.0, -79.5, 37.125]
+        array.close()
+
+    def test_probes_read_in_parallel(self, tmp_path, monkeypatch):
+        """Test that slow probes overlap instead of adding up"""
+        _, array = self.make_array(tmp_path, {f"28-0{i}": 4.0 for i in range(4)})
+        original = array._read_probe
+
+        def slow_read(device_id):
+            time.sleep(0.2)
+            return original(device_id)
+
+        monkeypatch.setattr(array, "_read_probe", slow_read)
+        start = time.monotonic()
+        array.refresh()
+
+        assert time.monotonic() - start < 0.6
+        array.close()
+
+    def test_failed_probe_keeps_last_good_value(self, tmp_path):
+        """Test the cached value and its age after a CRC failure"""
+        clock = FakeClock()
+        tree, array = self.make_array(tmp_path, {"28-01": 5.5}, max_age_s=60, clock=clock)
+        array.refresh()
+
+        tree.set_temperature("28-01", 99.0, crc_ok=False)
+        clock.now = 30
+        array.refresh()
+
+        assert array.read_with_age("28-01") == (5.5, 30)
+        clock.now = 61
+        with pytest.raises(IOError):
+            array.read("28-01")
+        array.close()
+
+    def test_unread_probe_raises(self, tmp_path):
+        """Test that no value is invented before the first conversion"""
+        _, array = self.make_array(tmp_path, {"28-01": 4.0})
+
+        with pytest.raises(IOError):
+            array.read("28-01")
+        array.close()
+
+    def test_registry_serves_probes_from_background_thread(self, tmp_path):
+        """Test that the temperature driver reads the cache filled in the background"""
+        tree = sensor_drivers.SimulatedW1Tree(str(tmp_path))
+        tree.add("28-01", 6.25)
+        array = sensor_drivers.DS18B20Array(str(tmp_path), interval_s=0.05, conversion_time_s=0.0)
+        drivers = sensor_drivers.DriverRegistry(sensor_drivers.SensorBackends(w1_dir=str(tmp_path), w1_array=array))
+        read = drivers.reader("temperature", {"device_id": "28-01"})
+
+        drivers.start()
+        assert read() == 6.25
+        tree.set_temperature("28-01", 7.5)
+        array.refreshed.clear()
+
+        assert array.refreshed.wait(timeout=2)
+        assert read() == 7.5
+        drivers.close()
+
+    def test_plan_compilation_converts_once(self, tmp_path, monkeypatch):
+        """Test that compiling plans for several probes costs one bulk conversion, not one per unit"""
+        tree = sensor_drivers.SimulatedW1Tree(str(tmp_path))
+        array = sensor_drivers.DS18B20Array(str(tmp_path), interval_s=60, conversion_time_s=0.0)
+        drivers = sensor_drivers.DriverRegistry(sensor_drivers.SensorBackends(w1_dir=str(tmp_path), w1_array=array))
+        triggers = []
+        original = array._trigger_conversion
+        monkeypatch.setattr(array, "_trigger_conversion", lambda: triggers.append(1) or original())
+        equipment = []
+        for i in range(4):
+            tree.add(f"28-0{i}", 4.0 + i)
+            equipment.append({"id": f"fridge_{i}", "type": "fridge",
+                              "sensors": {"temperature": {"enabled": True, "device_id": f"28-0{i}"}}})
+
+        plans = equipment_plan.compile_plans(equipment, drivers=drivers)
+
+        assert len(triggers) == 1
+        assert [equipment_plan.read_sensors(plan)["sensors"]["temperature"] for plan in plans] == [4.0, 5.0, 6.0, 7.0]
+        drivers.close()
+
+    def test_simulated_tree_removed_on_close(self):
+        """Test that the temporary 1-Wire tree of simulated backends does not outlive them"""
+        backends = sensor_drivers.SensorBackends.from_config("simulated")
+        root = backends.w1_tree.root
+
+        backends.close()
+
+        assert not root.exists()
+
+
+class TestDriverRegistry:
+    """Test one driver per physical sensor"""
+
+    def test_same_device_shares_driver(self, tmp_path):
+        """Test that configs naming the same device get one driver"""
+        drivers = sensor_drivers.DriverRegistry(simulated_backends(tmp_path))
+
+        first = drivers.driver("vibration", {"i2c_address": "0x53"})
+        second = drivers.driver("vibration", {"i2c_address": 0x53})
+        other = drivers.driver("vibration", {"i2c_address": "0x1D"})
+
+        assert first is second
+        assert other is not first
+        assert len(drivers.drivers) == 2
+
+    def test_unsupported_configs_return_none(self, tmp_path):
+        """Test that sensors without a driver fall back to the hardware module"""
+        drivers = sensor_drivers.DriverRegistry(simulated_backends(tmp_path))
+
+        assert drivers.reader("thermal_camera", {"i2c_address": "0x33"}) is None
+        assert drivers.reader("gas_sensor", {"gpio_pin": 17}) is None
+        assert drivers.reader("temperature", {"sensor_type": "DHT22", "device_id": "x"}) is None
+
+    def test_units_read_their_own_hardware(self, tmp_path):
+        """Test that two units on different ADC channels and probes get different values"""
+        backends = simulated_backends(tmp_path, adc_values=[250, 700, 0, 0, 0, 0, 0, 0])
+        drivers = sensor_drivers.DriverRegistry(backends)
+
+        class Hardware:
+            read_co2_sensor = staticmethod(lambda: 5.0)
+
+        equipment = [
+            {"id": "fridge", "type": "fridge",
+             "sensors": {"gas_sensor": {"enabled": True, "analog_channel": 0},
+                         "temperature": {"enabled": True, "device_id": "28-01"}}},
+            {"id": "incubator", "type": "incubator",
+             "sensors": {"gas_sensor": {"enabled": True, "analog_channel": 1},
+                         "temperature": {"enabled": True, "device_id": "28-02"},
+                         "co2": {"enabled": True}}},
+        ]
+        plans = equipment_plan.compile_plans(equipment, Hardware, drivers=drivers)
+        sensor_drivers.SimulatedW1Tree(str(tmp_path)).set_temperature("28-02", 37.0)
+
+        fridge, incubator = (equipment_plan.read_sensors(plan)["sensors"] for plan in plans)
+
+        assert float(fridge.pop("gas")) == 250
+        assert float(incubator.pop("gas")) == 700
+        assert fridge == {"temperature": pytest.approx(4.0)}
+        assert incubator == {"temperature": pytest.approx(37.0), "co2": 5.0}
+        drivers.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
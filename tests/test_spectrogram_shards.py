@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for PREMONITOR spectrogram shards.
+Tests streaming writes, the manifest and memory-mapped reads.
+"""
+
+import sys
+import os
+import json
+import numpy as np
+import pytest
+
+# Add pythonsoftware to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+
+import spectrogram_shards
+from spectrogram_shards import ShardWriter, ShardedDataset
+
+SHAPE = (8, 6, 1)
+
+
+def sample(i):
+    return np.full(SHAPE, i * 0.5 - 40.0, dtype=np.float32)
+
+
+def write(path, count, shard_size=4):
+    with ShardWriter(path, SHAPE, shard_size=shard_size, params={"n_mels": 128}) as writer:
+        for i in range(count):
+            writer.add(sample(i), i % 3)
+    return writer
+
+
+class TestShardWriter:
+    """Test streaming spectrograms into shards"""
+
+    def test_manifest_describes_shards(self, tmp_path):
+        """Test shard files, counts and metadata in the manifest"""
+        write(tmp_path, 10)
+
+        with open(tmp_path / "manifest.json") as f:
+            manifest = json.load(f)
+
+        assert [shard["count"] for shard in manifest["shards"]] == [4, 4, 2]
+        assert manifest["total"] == 10
+        assert manifest["dtype"] == "float16"
+        assert manifest["label_counts"] == {"0": 4, "1": 3, "2": 3}
+        assert manifest["params"] == {"n_mels": 128}
+        assert np.load(tmp_path / "shard_00000.npy", mmap_mode="r").shape == (4,) + SHAPE
+
+    def test_wrong_shape_rejected(self, tmp_path):
+        """Test that samples must all have the declared shape"""
+        writer = ShardWriter(tmp_path, SHAPE)
+
+        with pytest.raises(ValueError):
+            writer.add(np.zeros((8, 6)), 0)
+
+    def test_empty_dataset(self, tmp_path):
+        """Test that a writer with no samples still leaves a readable manifest"""
+        write(tmp_path, 0)
+
+        assert len(ShardedDataset(tmp_path)) == 0
+
+    def test_aborted_build_leaves_no_manifest(self, tmp_path):
+        """Test that a build that raised cannot be read back as a complete dataset"""
+        write(tmp_path, 10)
+
+        with pytest.raises(FileNotFoundError):
+            with ShardWriter(tmp_path, SHAPE, shard_size=4) as writer:
+                for i in range(3):
+                    writer.add(sample(i), 0)
+                raise FileNotFoundError("esc50.csv")
+
+        assert not (tmp_path / "manifest.json").exists()
+
+
+class TestShardedDataset:
+    """Test reading shards back through memory maps"""
+
+    def test_round_trip(self, tmp_path):
+        """Test that every sample and label reads back in order, as float32"""
+        write(tmp_path, 10)
+        dataset = ShardedDataset(tmp_path / "manifest.json")
+
+        samples = list(dataset.iter_samples())
+
+        assert len(dataset) == 10
+        assert [label for _, label in samples] == [i % 3 for i in range(10)]
+        assert all(np.array_equal(spec, sample(i)) for i, (spec, _) in enumerate(samples))
+        assert samples[9][0].dtype == np.float32
+        assert list(dataset.labels) == [i % 3 for i in range(10)]
+        with pytest.raises(IndexError):
+            dataset[10]
+
+    def test_shards_are_memory_mapped(self, tmp_path):
+        """Test that shard data is not loaded into RAM"""
+        write(tmp_path, 6)
+        data, _ = ShardedDataset(tmp_path).shard(0)
+
+        assert isinstance(data.base, np.memmap) or isinstance(data, np.memmap)
+
+    def test_split_is_disjoint_and_deterministic(self, tmp_path):
+        """Test the random train/validation split"""
+        write(tmp_path, 20)
+        dataset = ShardedDataset(tmp_path)
+
+        train, val = dataset.split(0.25, seed=3)
+
+        assert len(val) == 5 and len(train) == 15
+        assert not set(train) & set(val)
+        assert np.array_equal(dataset.split(0.25, seed=3)[1], val)
+
+    def test_shuffled_iteration_covers_indices(self, tmp_path):
+        """Test that shuffled iteration yields exactly the requested samples"""
+        write(tmp_path, 9)
+        dataset = ShardedDataset(tmp_path)
+
+        labels = sorted(label for _, label in dataset.iter_samples([1, 4, 7], shuffle=True, seed=0))
+
+        assert labels == [1, 1, 1]
+
+    @pytest.mark.skipif(spectrogram_shards.tf is not None, reason="TensorFlow installed")
+    def test_tf_dataset_requires_tensorflow(self, tmp_path):
+        """Test the error when TensorFlow is missing"""
+        write(tmp_path, 2)
+
+        with pytest.raises(RuntimeError):
+            ShardedDataset(tmp_path).to_tf_dataset()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the PREMONITOR tamper engine.
+Tests robust rate of change, vibration bursts, coincidence and per-type settings.
+"""
+
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add pythonsoftware and the shared test helpers to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import tamper_engine
+from tamper_engine import TamperEngine, TamperSettings
+from helpers import sensor_reading
+
+CONFIG = {
+    "vibration_threshold": 2.0,
+    "temperature_change_rate": 5.0,
+    "history_size": 16,
+    "rate_window": 5,
+    "equipment_types": {"centrifuge": {"vibration_threshold": 6.0}}
+}
+
+
+def feed(engine, equipment_id, temperatures=(), vibrations=(), interval_s=30.0, equipment_type=None):
+    """Record a series of readings 30 s apart and return the last check() result."""
+    result = None
+    length = max(len(temperatures), len(vibrations))
+    for i in range(length):
+        values = {}
+        if temperatures:
+            values["temperature"] = temperatures[i]
+        if vibrations:
+            values["vibration"] = vibrations[i]
+        result = engine.check(equipment_id, sensor_reading(**values), equipment_type, timestamp=i * interval_s)
+    return result
+
+
+class TestTamperSettings:
+    """Test per-type configuration"""
+
+    def test_type_overrides_global_settings(self):
+        """Test that equipment_types overrides apply on top of the global settings"""
+        assert TamperSettings.from_config(CONFIG, "centrifuge").vibration_threshold == 6.0
+        assert TamperSettings.from_config(CONFIG, "fridge").vibration_threshold == 2.0
+        assert TamperSettings.from_config({}).coincidence_count == 2
+
+    def test_row_median_ignores_nan(self):
+        """Test the NaN-aware row median"""
+        values = np.array([[1.0, 3.0, np.nan, 2.0], [np.nan] * 4, [4.0, 1.0, 2.0, 3.0]])
+
+        assert list(tamper_engine._row_median(values)[[0, 2]]) == [2.0, 2.5]
+        assert np.isnan(tamper_engine._row_median(values)[1])
+
+
+class TestTamperEngine:
+    """Test tamper indicators over sensor histories"""
+
+    def test_single_noisy_sample_is_not_tampering(self):
+        """Test that one outlier temperature does not move the robust slope"""
+        engine = TamperEngine(CONFIG)
+
+        result = feed(engine, "fridge_1", temperatures=[4.0, 4.1, 4.0, 4.1, 9.0])
+
+        assert result is None
+        assert abs(engine.evaluate().temperature_rate[0]) < 1.0
+
+    def test_sustained_temperature_rise_is_detected(self):
+        """Test that a door-open style ramp trips rapid_temperature_change"""
+        engine = TamperEngine(CONFIG)
+
+        result = feed(engine, "fridge_1", temperatures=[4.0, 4.0, 7.0, 10.0, 13.0, 16.0])
+
+        assert result["indicator"] == "rapid_temperature_change"
+        assert result["type"] == "thermal_tampering"
+        assert engine.evaluate().temperature_rate[0] == pytest.approx(6.0)
+
+    def test_vibration_burst_against_own_baseline(self):
+        """Test a burst far above the unit's baseline but below the absolute threshold"""
+        engine = TamperEngine(CONFIG)
+
+        result = feed(engine, "pump", vibrations=[0.10, 0.11, 0.09, 0.10, 0.12, 1.5])
+
+        assert result["indicator"] == "vibration_burst"
+
+    def test_absolute_threshold_is_per_type(self):
+        """Test that a centrifuge's normal 3G does not trip the 2G default"""
+        engine = TamperEngine(CONFIG)
+
+        assert feed(engine, "fridge_1", vibrations=[3.0])["indicator"] == "abnormal_vibration"
+        assert feed(engine, "centrifuge_1", vibrations=[3.0], equipment_type="centrifuge") is None
+
+    def test_weak_indicators_coincide(self):
+        """Test that motion plus a moderate temperature ramp is reported together"""
+        engine = TamperEngine(CONFIG)
+        feed(engine, "fridge_1", temperatures=[4.0, 4.0, 5.5, 7.0, 8.5])
+
+        assert engine.evaluate().result(0) is None
+        result = engine.check("fridge_1", sensor_reading(temperature=10.0, motion=True), timestamp=150.0)
+
+        assert result["indicator"] == "sensor_coincidence"
+
+    def test_evaluates_many_units_in_one_pass(self):
+        """Test vectorized evaluation across a grown fleet"""
+        engine = TamperEngine(CONFIG)
+        for unit in range(40):
+            for i in range(4):
+                vibration = 1.0 if unit == 17 and i == 3 else 0.1 + 0.01 * (i % 2)
+                engine.record(f"unit_{unit}", sensor_reading(temperature=4.0, vibration=vibration), timestamp=i * 30.0)
+
+        evaluation = engine.evaluate()
+
+        assert len(evaluation.equipment_ids) == 40
+        assert list(np.flatnonzero(evaluation.indicators["vibration_burst"])) == [17]
+
+    def test_reset_forgets_history(self):
+        """Test that reset() clears the baseline"""
+        engine = TamperEngine(CONFIG)
+        feed(engine, "pump", vibrations=[0.1, 0.1, 0.1])
+
+        engine.reset("pump")
+
+        assert engine.check("pump", sensor_reading(vibration=1.5), timestamp=100.0) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
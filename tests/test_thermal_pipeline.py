@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the PREMONITOR integer thermal preprocessing pipeline.
+Tests fixed-point resizing and uint8 -> quantized model input conversion.
+"""
+
+import sys
+import os
+import pytest
+import numpy as np
+
+# Add pythonsoftware to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pythonsoftware'))
+
+import inference
+import thermal_pipeline
+
+
+class RecordingInterpreter:
+    """Interpreter stand-in that records the input tensor it was given."""
+
+    def __init__(self, dtype=np.int8, quantization=(1.0 / 255.0, -128), shape=(1, 48, 64, 3)):
+        self.dtype = dtype
+        self.quantization = quantization
+        self.shape = shape
+        self.received = None
+
+    def get_input_details(self):
+        return [{'index': 0, 'shape': np.array(self.shape), 'dtype': self.dtype, 'quantization': self.quantization}]
+
+    def get_output_details(self):
+        return [{'index': 1, 'shape': np.array([1, 1]), 'dtype': np.float32, 'quantization': (0.0, 0)}]
+
+    def set_tensor(self, index, value):
+        assert value.dtype == self.dtype
+        self.received = value.copy()
+
+    def invoke(self):
+        pass
+
+    def get_tensor(self, index):
+        return np.array([[0.25]], dtype=np.float32)
+
+
+def float_bilinear(frame, size):
+    """Reference half-pixel bilinear resize in float64."""
+    def axis(src_size, dst_size):
+        src = np.clip((np.arange(dst_size) + 0.5) * src_size / dst_size - 0.5, 0, src_size - 1)
+        i0 = np.floor(src).astype(int)
+        return i0, np.minimum(i0 + 1, src_size - 1), src - i0
+
+    y0, y1, wy = axis(frame.shape[0], size[0])
+    x0, x1, wx = axis(frame.shape[1], size[1])
+    f = frame.astype(np.float64)
+    rows = f[y0] * (1 - wy)[:, None, None] + f[y1] * wy[:, None, None]
+    return rows[:, x0] * (1 - wx)[None, :, None] + rows[:, x1] * wx[None, :, None]
+
+
+class TestIntegerResize:
+    """Test fixed-point bilinear resizing"""
+
+    @pytest.mark.parametrize("src,dst", [((24, 32), (224, 224)), ((120, 160), (24, 32)), ((24, 32), (24, 32))])
+    def test_matches_float_bilinear(self, src, dst):
+        """Test that the integer resize stays within ~1 grey level of float bilinear"""
+        frame = np.random.default_rng(0).integers(0, 256, size=src + (3,), dtype=np.uint8)
+
+        resized = thermal_pipeline.resize_uint8(frame, dst)
+
+        assert resized.dtype == np.uint8
+        assert resized.shape == dst + (3,)
+        assert np.abs(resized.astype(int) - float_bilinear(frame, dst)).max() <= 1.5  # 8-bit weights + rounding
+
+    def test_single_channel_keeps_shape(self):
+        """Test that (H, W) frames come back as (H, W)"""
+        frame = np.full((24, 32), 77, dtype=np.uint8)
+
+        resized = thermal_pipeline.resize_uint8(frame, (48, 64))
+
+        assert resized.shape == (48, 64)
+        assert (resized == 77).all()
+
+
+class TestThermalPipeline:
+    """Test uint8 frames -> quantized model input"""
+
+    def test_int8_input_matches_float_quantization(self):
+        """Test that the lookup table matches ModelRunner's float path exactly"""
+        frame = np.random.default_rng(1).integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+        integer_path = RecordingInterpreter()
+        float_path = RecordingInterpreter()
+
+        thermal_pipeline.ThermalPipeline(integer_path).score(frame)
+        inference.ModelRunner(float_path).run(frame.astype(np.float32), data_scale=1.0 / 255.0)
+
+        np.testing.assert_array_equal(integer_path.received, float_path.received)
+
+    def test_uint8_model_receives_frame_unchanged(self):
+        """Test the identity fast path for uint8 models"""
+        frame = np.random.default_rng(2).integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+        interpreter = RecordingInterpreter(dtype=np.uint8, quantization=(1.0 / 255.0, 0))
+
+        thermal_pipeline.ThermalPipeline(interpreter).score(frame)
+
+        np.testing.assert_array_equal(interpreter.received[0], frame)
+
+    def test_float_model_gets_normalized_pixels(self):
+        """Test that float models still see 0-1 inputs"""
+        frame = np.full((48, 64, 3), 255, dtype=np.uint8)
+        interpreter = RecordingInterpreter(dtype=np.float32, quantization=(0.0, 0))
+
+        thermal_pipeline.ThermalPipeline(interpreter).score(frame)
+
+        np.testing.assert_allclose(interpreter.received, 1.0)
+
+    def test_single_channel_sensor_frame_replicated(self):
+        """Test that a 32x24 MLX90640-style frame fills all model channels"""
+        frame = np.random.default_rng(3).integers(0, 256, size=(24, 32), dtype=np.uint8)
+        interpreter = RecordingInterpreter()
+
+        score = thermal_pipeline.ThermalPipeline(interpreter).score(frame)
+
+        assert score == pytest.approx(0.25)
+        tensor = interpreter.received[0]
+        assert tensor.shape == (48, 64, 3)
+        np.testing.assert_array_equal(tensor[:, :, 0], tensor[:, :, 1])
+        np.testing.assert_array_equal(tensor[:, :, 0], tensor[:, :, 2])
+
+    def test_float_frames_fall_back_to_runner(self):
+        """Test that non-uint8 frames use the float path with the given scale"""
+        frame = np.full((48, 64, 3), 1.0, dtype=np.float32)
+        interpreter = RecordingInterpreter()
+
+        thermal_pipeline.ThermalPipeline(interpreter).score(frame, float_scale=1.0)
+
+        assert (interpreter.received == 127).all()
+
+    def test_incompatible_channels_rejected(self):
+        """Test that frames with an unexpected channel count are refused"""
+        pipeline = thermal_pipeline.ThermalPipeline(RecordingInterpreter())
+
+        with pytest.raises(ValueError):
+            pipeline.prepare(np.zeros((48, 64, 2), dtype=np.uint8))
+
+    def test_non_image_model_rejected_once(self):
+        """Test that model input validation happens at construction"""
+        with pytest.raises(ValueError):
+            thermal_pipeline.ThermalPipeline(RecordingInterpreter(shape=(1, 50, 6)))
+
+
+class TestCompactThermalPath:
+    """Test native 32x24 MLX90640 frames against a compact single-channel model"""
+
+    def test_temperatures_mapped_onto_uint8(self):
+        """Test the temperature window -> 0-255 mapping with clipping"""
+        frame_c = np.array([[-40.0, -20.0, 50.0], [120.0, 200.0, 85.0]], dtype=np.float32)
+
+        frame = thermal_pipeline.temperatures_to_uint8(frame_c, (-20.0, 120.0))
+
+        assert frame.dtype == np.uint8
+        np.testing.assert_array_equal(frame, [[0, 0, 128], [255, 255, 191]])
+
+    def test_temperatures_written_into_buffer(self):
+        """Test that a caller-provided buffer is reused"""
+        out = np.empty((24, 32), dtype=np.uint8)
+
+        result = thermal_pipeline.temperatures_to_uint8(np.full((24, 32), 50.0), (-20.0, 120.0), out=out)
+
+        assert result is out
+        assert (out == 128).all()
+
+    def test_native_frame_fed_without_resize(self):
+        """Test that a 24x32 frame goes straight into a (1, 24, 32, 1) uint8 model"""
+        frame = thermal_pipeline.temperatures_to_uint8(
+            np.random.default_rng(4).uniform(0, 100, size=(24, 32)), (-20.0, 120.0))
+        interpreter = RecordingInterpreter(dtype=np.uint8, quantization=(1.0 / 255.0, 0), shape=(1, 24, 32, 1))
+        pipeline = thermal_pipeline.ThermalPipeline(interpreter)
+
+        pipeline.score(frame)
+
+        np.testing.assert_array_equal(interpreter.received[0, :, :, 0], frame)
+        assert not getattr(pipeline._local, 'plans', None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])